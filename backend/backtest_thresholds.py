@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Threshold backtest CLI - sweeps edge/consensus thresholds over stored slates.
+
+Usage:
+    python backtest_thresholds.py NBA --start 2025-12-22 --edges 6,8,10 --consensus 0,61,65
+    python backtest_thresholds.py NCAAB --line-sources opening,bet --dot-filters all,agree --json
+"""
+import argparse
+import asyncio
+import json
+
+from server import backtest_thresholds, _parse_backtest_list, client
+
+
+def print_table(result: dict, show_all: bool):
+    print(f"[Backtest] {result['league']} {result['start_date']} -> {result['end_date']}: "
+          f"{result['games_loaded']} games loaded, {result['games_graded']} graded "
+          f"(production threshold {result['production_threshold']}, odds {result['odds']})")
+    print()
+    header = f"{'source':<8} {'edge':>6} {'cons':>5} {'dots':<9} {'W-L-P':>12} {'n':>5} {'hit%':>6} {'roi%':>7}"
+    cells = result['cells'] if show_all else result['top']
+    print(header)
+    print("-" * len(header))
+    for cell in cells:
+        record = f"{cell['hits']}-{cell['misses']}-{cell['pushes']}"
+        hit_rate = f"{cell['hit_rate']:.1f}" if cell['hit_rate'] is not None else "-"
+        roi = f"{cell['roi']:+.1f}" if cell['roi'] is not None else "-"
+        print(f"{cell['line_source']:<8} {cell['edge_threshold']:>6} {cell['consensus_threshold']:>5} "
+              f"{cell['dot_filter']:<9} {record:>12} {cell['sample']:>5} {hit_rate:>6} {roi:>7}")
+    print()
+    print("Public (sides) record by consensus threshold:")
+    for row in result['public']:
+        hit_rate = f"{row['hit_rate']:.1f}%" if row['hit_rate'] is not None else "-"
+        print(f"  >= {row['consensus_threshold']}%: {row['hits']}-{row['misses']} ({hit_rate})")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Backtest edge/consensus thresholds over historical slates")
+    parser.add_argument('league', choices=['NBA', 'NHL', 'NCAAB'], type=str.upper)
+    parser.add_argument('--start', default='2025-12-22', help='Start date YYYY-MM-DD')
+    parser.add_argument('--end', default=None, help='End date YYYY-MM-DD (default: today)')
+    parser.add_argument('--edges', default=None, help='Comma-separated edge thresholds')
+    parser.add_argument('--consensus', default=None, help='Comma-separated O/U consensus thresholds (0 = no filter)')
+    parser.add_argument('--line-sources', default=None, help='opening,bet,live')
+    parser.add_argument('--dot-filters', default=None, help='all,agree,disagree,no_dot')
+    parser.add_argument('--odds', type=int, default=-110)
+    parser.add_argument('--min-sample', type=int, default=20)
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--all', action='store_true', help='Print every grid cell, not just the top ones')
+    parser.add_argument('--json', action='store_true', help='Print the raw JSON result')
+    args = parser.parse_args()
+
+    try:
+        result = await backtest_thresholds(
+            args.league,
+            start_date=args.start,
+            end_date=args.end,
+            edge_thresholds=_parse_backtest_list(args.edges),
+            consensus_thresholds=_parse_backtest_list(args.consensus),
+            line_sources=_parse_backtest_list(args.line_sources, str),
+            dot_filters=_parse_backtest_list(args.dot_filters, str),
+            odds=args.odds,
+            min_sample=args.min_sample,
+            top=args.top
+        )
+    finally:
+        client.close()
+
+    if args.json:
+        print(json.dumps(result, indent=2, default=str))
+    else:
+        print_table(result, args.all)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite - scraper parsing, records, messages, exports and full refreshes.
+
+Runs offline: scrapers replay a recorded fixture set (SCRAPE_FIXTURES_MODE=replay,
+see SCRAPER FIXTURES in server.py) and everything reads a seeded scratch Mongo
+database (BENCH_DB_NAME, dropped and re-seeded on every run). Results are
+written as JSON so two versions can be compared.
+
+Usage:
+    # record a fixture set once (live network), then benchmark against it
+    # (scrape.plays888_* pages are only recorded with PLAYS888_BASE_URL -> plays888_standin.py)
+    python benchmark.py --record --fixture-set 2026-02-10 --date 2026-02-10
+    python benchmark.py --fixture-set 2026-02-10 --date 2026-02-10
+    python benchmark.py --only records,compilation --runs 10
+    python benchmark.py --compare benchmark_results/20260210T0300_ab12cd3.json --fail-on-regression
+
+    # monitoring cycle time against plays888_standin.py (never the real sportsbook)
+    PLAYS888_BASE_URL=http://127.0.0.1:8888 python benchmark.py --only monitoring --monitor-accounts 50
+
+    # notification throughput against telegram_standin.py (never the real chat)
+    TELEGRAM_API_BASE_URL=http://127.0.0.1:8081 python benchmark.py --only notifications --notify-bets 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+BENCH_DB_NAME = os.environ.get('BENCH_DB_NAME', 'sports_trading_bench')
+if 'bench' not in BENCH_DB_NAME:
+    sys.exit(f"BENCH_DB_NAME must contain 'bench' (it is dropped and re-seeded): {BENCH_DB_NAME}")
+os.environ['DB_NAME'] = BENCH_DB_NAME
+os.environ.setdefault('SCRAPE_FIXTURES_MODE', 'replay')
+
+import server  # noqa: E402
+from server import db, client, scrape_fixtures, clear_scrape_results  # noqa: E402
+
+RESULTS_DIR = Path(__file__).parent / 'benchmark_results'
+SEASON_DAYS = 165
+GAMES_PER_DAY = {"NBA": 10, "NHL": 12, "NCAAB": 150, "NFL": 14}
+COMPILATION_BETS = 500
+
+
+# ==================== SEED DATA ====================
+
+def seed_game(rng: random.Random, league: str, num: int) -> dict:
+    """One completed game with every field the records/export code reads"""
+    base = {"NBA": 228, "NHL": 6, "NCAAB": 145, "NFL": 44}[league]
+    spread_base = {"NBA": 12, "NHL": 1.5, "NCAAB": 15, "NFL": 10}[league]
+    total = round(base + rng.uniform(-base * 0.06, base * 0.06) * 2) / 2
+    combined_ppg = round(total + rng.uniform(-base * 0.08, base * 0.08), 1)
+    edge = round(combined_ppg - total, 1)
+    away_score = int(base / 2 + rng.uniform(-base * 0.15, base * 0.15))
+    home_score = int(base / 2 + rng.uniform(-base * 0.15, base * 0.15))
+    final_score = away_score + home_score
+    away_pct = rng.randint(25, 75)
+    ranks = [rng.randint(1, 32) for _ in range(4)]
+    dots = ["🟢" if r <= 8 else "🔵" if r <= 16 else "🟡" if r <= 24 else "🔴" for r in ranks]
+    threshold = server.EDGE_THRESHOLDS.get(league, 8)
+    recommendation = "OVER" if edge >= threshold else "UNDER" if edge <= -threshold else None
+    has_bet = rng.random() < 0.2
+    bet_type = rng.choice(["OVER", "UNDER"]) if has_bet else None
+    bet_hit = (final_score > total) == (bet_type == "OVER") if has_bet else None
+    ou_pct = rng.randint(40, 80)
+    return {
+        "game_num": num,
+        "time": f"{rng.randint(1, 10)}:{rng.choice(['00', '30'])} PM",
+        "away_team": f"{league} Away {num}", "home_team": f"{league} Home {num}",
+        "away": f"A{num}", "home": f"H{num}",
+        "total": total, "opening_line": total + rng.choice([-1, -0.5, 0, 0.5, 1]),
+        "bet_line": total if has_bet else None,
+        "combined_ppg": combined_ppg, "combined_gpg": combined_ppg, "ppg_avg": combined_ppg,
+        "edge": edge, "recommendation": recommendation,
+        "final_score": final_score, "away_score": away_score, "home_score": home_score,
+        "actual_result": "OVER" if final_score > total else "UNDER",
+        "result_hit": (recommendation == "OVER") == (final_score > total) if recommendation else None,
+        "edge_hit": (recommendation == "OVER") == (final_score > total) if recommendation else None,
+        "spread": round(rng.uniform(-spread_base, spread_base) * 2) / 2,
+        "away_spread": round(rng.uniform(-spread_base, spread_base) * 2) / 2,
+        "home_spread": None,
+        "away_consensus_pct": away_pct, "home_consensus_pct": 100 - away_pct,
+        "ou_public_pct": ou_pct, "ou_public_pick": rng.choice(["OVER", "UNDER"]),
+        "away_ppg_rank": ranks[0], "away_last3_rank": ranks[1],
+        "home_ppg_rank": ranks[2], "home_last3_rank": ranks[3],
+        "away_dots": dots[0] + dots[1], "home_dots": dots[2] + dots[3], "dots": "".join(dots),
+        "has_bet": has_bet, "bet_type": bet_type, "user_bet": has_bet,
+        "user_bet_hit": bet_hit, "bet_result": ("won" if bet_hit else "lost") if has_bet else None,
+    }
+
+
+def seed_compilation_bet(rng: random.Random, num: int, day_label: str) -> dict:
+    wager = rng.choice([500, 600, 1000, 1300, 2000, 2200])
+    return {
+        "game": f"AWAY TEAM {num} / HOME TEAM {num}", "game_short": f"A{num}/H{num}",
+        "bet_type_short": rng.choice(["o", "u"]) + str(rng.randint(140, 240)),
+        "wager_short": f"${wager / 1000:g}K".replace("$0.", "$."), "to_win_short": f"${wager / 1100:.1f}K",
+        "result": rng.choice(["won", "lost", "push", None]),
+        "game_time": f"{rng.randint(1, 12)}:{rng.choice(['00', '15', '30', '45'])} {rng.choice(['AM', 'PM'])}",
+        "game_date": day_label, "country": rng.choice(["", "", "ESP", "ITA"]), "is_new": rng.random() < 0.05,
+    }
+
+
+async def seed_database(seed: int, season_start: str):
+    """Drop the bench database and fill it with a season of slates plus today's compilations"""
+    from zoneinfo import ZoneInfo
+    rng = random.Random(seed)
+    await client.drop_database(BENCH_DB_NAME)
+    start = datetime.strptime(season_start, '%Y-%m-%d')
+    for league, per_day in GAMES_PER_DAY.items():
+        docs = []
+        for offset in range(SEASON_DAYS):
+            date = (start + timedelta(days=offset)).strftime('%Y-%m-%d')
+            docs.append({"date": date, "games": [seed_game(rng, league, n) for n in range(1, per_day + 1)]})
+        await db[f"{league.lower()}_opportunities"].insert_many(docs)
+    arizona_tz = ZoneInfo('America/Phoenix')
+    now = datetime.now(arizona_tz)
+    today_label = now.strftime('%b %d').replace(' 0', ' ')
+    for account in ("jac075", "jac083"):
+        bets = [seed_compilation_bet(rng, n, today_label) for n in range(1, COMPILATION_BETS + 1)]
+        await db.daily_compilations.insert_one({"account": account, "date": now.strftime('%Y-%m-%d'),
+                                                "bets": bets, "total_result": 1250.0})
+    # scrapers log in with these; placeholders only, never the real plays888 accounts
+    await seed_monitor_accounts(2)
+
+
+async def seed_monitor_accounts(count: int):
+    """Replace the connections with `count` placeholder accounts (bench001, bench002, ...)"""
+    await db.connections.delete_many({})
+    await db.connections.insert_many([
+        {"username": f"bench{n:03d}", "password_encrypted": server.encrypt_password("bench"),
+         "is_connected": True, "created_at": datetime.now(timezone.utc)}
+        for n in range(1, count + 1)
+    ])
+
+
+async def monitoring_cycle():
+    """One full run_monitoring_cycle (open bets + results) against the stand-in"""
+    server.monitoring_enabled = True
+    mode = scrape_fixtures["mode"]
+    scrape_fixtures["mode"] = 'off'  # the stand-in is live; nothing to replay
+    try:
+        await server.run_monitoring_cycle()
+    finally:
+        scrape_fixtures["mode"] = mode
+
+
+BENCH_CHAT_ID = -100100100
+
+
+async def seed_telegram():
+    """Point the bot at the Telegram stand-in chat used by the notification cases"""
+    await db.telegram_config.delete_many({})
+    await db.telegram_config.insert_one({"bot_token": "123456:bench", "chat_id": BENCH_CHAT_ID})
+    await server.init_telegram_from_db()
+
+
+async def seed_standin_messages(count: int) -> list:
+    """Message ids created directly in the stand-in chat (no rate limit, not timed)"""
+    import httpx
+    async with httpx.AsyncClient() as http:
+        response = await http.post(f"{server.TELEGRAM_API_BASE_URL}/_standin/seed",
+                                   params={"chat_id": BENCH_CHAT_ID, "count": count})
+        return response.json()["message_ids"]
+
+
+async def notification_burst(count: int):
+    """`count` new TIPSTER bets in one cycle, notified one at a time like monitor_single_account"""
+    rng = random.Random(count)
+    stamp = int(time.time())
+    for n in range(count):
+        sport = rng.choice(["NBA", "NHL", "CBB"])
+        line = rng.randint(140, 240)
+        await server.send_telegram_notification({
+            "game": f"{sport} AWAY {n} vs {sport} HOME {n}", "bet_type": f"TOTAL {rng.choice('OU')}{line}",
+            "line": str(line), "odds": -110, "wager": 1100, "potential_win": 1000,
+            "ticket_number": f"{stamp}{n:05d}", "game_time": "7:00 PM", "game_date": "",
+            "country": sport, "status": "Placed", "league": f"{sport} - Benchmark",
+        }, account="jac083")
+
+
+async def setup_notification_burst():
+    await db.daily_compilations.delete_many({"account": "jac083"})
+
+
+async def setup_pending_deletions(count: int):
+    await db.scheduled_deletions.delete_many({})
+    past = datetime.now(timezone.utc) - timedelta(minutes=1)
+    await db.scheduled_deletions.insert_many([
+        {"chat_id": BENCH_CHAT_ID, "message_id": message_id, "delete_at": past, "created_at": past}
+        for message_id in await seed_standin_messages(count)
+    ])
+
+
+bulk_cleanup_range = {}
+
+
+async def setup_bulk_cleanup(count: int):
+    message_ids = await seed_standin_messages(count)
+    bulk_cleanup_range.update(start=message_ids[0], end=message_ids[-1])
+
+
+def telegram_counts() -> tuple:
+    """(Bot API requests, 429 answers) so far, from the METRICS registry"""
+    calls = sum(series["count"] for series in server.metric_values['telegram_api_seconds'].values())
+    limited = sum(server.metric_values['telegram_api_rate_limited_total'].values())
+    return calls, limited
+
+
+# ==================== CASES ====================
+
+def count_items(result) -> int:
+    """Games/rows a scraper or refresh returned"""
+    if isinstance(result, tuple):
+        result = result[0]
+    if isinstance(result, dict) and isinstance(result.get('games'), list):
+        return len(result['games'])
+    if isinstance(result, (list, dict)):
+        return len(result)
+    return 0
+
+
+def build_cases(date: str, season_start: str, day: str, monitor_accounts: int = 0, notify_bets: int = 0):
+    """
+    (name, group, coroutine factory, default runs, items per run - None counts the result)
+    plus an optional untimed setup coroutine factory run before every run
+    """
+    season_games = {league: SEASON_DAYS * per_day for league, per_day in GAMES_PER_DAY.items()}
+    cases = []
+    for league in ("NBA", "NHL", "NCAAB"):
+        cases.append((f"scrape.scoresandodds.{league}", "scrape", lambda lg=league: server.scrape_scoresandodds(lg, date), 3, None))
+    cases += [
+        ("scrape.cbssports.NBA", "scrape", lambda: server.scrape_cbssports_nba(date), 3, None),
+        ("scrape.cbssports.NHL", "scrape", lambda: server.scrape_cbssports_nhl(date), 3, None),
+        ("scrape.cbssports.NCAAB", "scrape", lambda: server.scrape_cbssports_ncaab(date), 3, None),
+        ("scrape.nhl_api", "scrape", lambda: server.scrape_nhl_api_schedule(date), 3, None),
+    ]
+    for league in ("NBA", "NHL"):
+        cases.append((f"scrape.covers_consensus.{league}", "scrape", lambda lg=league: server.scrape_covers_consensus(lg, date), 3, None))
+        cases.append((f"scrape.covers_ou.{league}", "scrape", lambda lg=league: server.scrape_covers_overunder_consensus(lg, date), 3, None))
+    cases.append(("scrape.plays888_totals.NBA", "scrape", lambda: server.scrape_plays888_totals("NBA"), 3, None))
+
+    cases.append(("records.calculate_from_start_date", "records", lambda: server.calculate_records_from_start_date(season_start), 5,
+                  season_games["NBA"] + season_games["NHL"] + season_games["NCAAB"]))
+    for detailed in (False, True):
+        cases.append((f"compilation.build_message{'.detailed' if detailed else ''}", "compilation",
+                      lambda d=detailed: server.build_compilation_message("jac075", detailed=d), 10, COMPILATION_BETS))
+    for league in ("NBA", "NHL", "NCAAB"):
+        for threshold in (57, 61, 65, 70):
+            cases.append((f"public.by_threshold.{league}.{threshold}", "public",
+                          lambda lg=league, t=threshold: server.get_public_records_by_threshold(lg, threshold=t, start_date=season_start), 5,
+                          season_games[league]))
+        cases.append((f"public.ou.{league}", "public",
+                      lambda lg=league: server.get_ou_public_records(lg, start_date=season_start), 5, season_games[league]))
+        cases.append((f"public.compound.{league}", "public", lambda lg=league: server.get_public_compound_records(lg), 5,
+                      season_games[league]))
+    for league in ("NBA", "NHL"):
+        cases.append((f"export.excel.{league}", "export",
+                      lambda lg=league: server.export_to_excel(league=lg, start_date=season_start), 3, season_games[league]))
+
+    cases += [
+        ("refresh.NBA", "refresh", lambda: server.refresh_opportunities(day=day), 1, None),
+        ("refresh.NHL", "refresh", lambda: server.refresh_nhl_opportunities(day=day), 1, None),
+        ("refresh.NCAAB", "refresh", lambda: server.refresh_ncaab_opportunities(day=day), 1, None),
+        ("refresh.NFL", "refresh", lambda: server.refresh_nfl_opportunities(day=day), 1, None),
+    ]
+    if monitor_accounts:
+        cases.append((f"monitoring.cycle.{monitor_accounts}_accounts", "monitoring", monitoring_cycle, 1, monitor_accounts))
+    if notify_bets:
+        cases += [
+            (f"notifications.new_bets.{notify_bets}", "notifications", lambda: notification_burst(notify_bets), 1,
+             notify_bets, setup_notification_burst),
+            ("notifications.pending_deletions.100", "notifications", server.process_pending_deletions, 3, 100,
+             lambda: setup_pending_deletions(100)),
+            ("notifications.bulk_cleanup.100", "notifications",
+             lambda: server.bulk_cleanup_telegram(bulk_cleanup_range["start"], bulk_cleanup_range["end"]), 3, 100,
+             lambda: setup_bulk_cleanup(100)),
+        ]
+    return cases
+
+
+async def run_case(name: str, factory, runs: int, warmup: bool, items_per_run: int = None, setup=None) -> dict:
+    """Time one case; scrape caches are cleared so every run really parses"""
+    timings, items, error = [], 0, None
+    misses_before = scrape_fixtures["missing"]
+    telegram_before = telegram_counts()
+    for attempt in range(runs + (1 if warmup else 0)):
+        clear_scrape_results()
+        if setup:
+            await setup()
+        started = time.perf_counter()
+        try:
+            result = await factory()
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            break
+        elapsed = time.perf_counter() - started
+        if warmup and attempt == 0:
+            continue
+        timings.append(elapsed * 1000)
+        items = items_per_run if items_per_run is not None else count_items(result)
+    entry = {"name": name, "runs": len(timings), "error": error,
+             "fixture_misses": scrape_fixtures["missing"] - misses_before}
+    telegram_after = telegram_counts()
+    if telegram_after != telegram_before:
+        entry["telegram_requests"] = telegram_after[0] - telegram_before[0]
+        entry["telegram_rate_limited"] = telegram_after[1] - telegram_before[1]
+    if timings:
+        ordered = sorted(timings)
+        entry.update({
+            "mean_ms": round(statistics.mean(timings), 2),
+            "median_ms": round(statistics.median(timings), 2),
+            "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 2),
+            "min_ms": round(ordered[0], 2),
+            "items": items,
+            "items_per_sec": round(items / (statistics.median(timings) / 1000), 1) if items else None,
+        })
+    return entry
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=Path(__file__).parent).stdout.strip() or 'unknown'
+    except OSError:
+        return 'unknown'
+
+
+def compare_results(current: dict, baseline_path: str, threshold: float) -> list:
+    """Print median deltas against a previous results file; return the regressed case names"""
+    baseline = {c["name"]: c for c in json.loads(Path(baseline_path).read_text())["cases"]}
+    regressions = []
+    print(f"\nCompared with {baseline_path} (regression = median +{threshold:.0%}):")
+    for case in current["cases"]:
+        old = baseline.get(case["name"])
+        if not old or not old.get("median_ms") or not case.get("median_ms"):
+            continue
+        change = case["median_ms"] / old["median_ms"] - 1
+        flag = "REGRESSION" if change > threshold else ""
+        if flag:
+            regressions.append(case["name"])
+        print(f"  {case['name']:<44} {old['median_ms']:>10.1f} -> {case['median_ms']:>10.1f} ms  {change:+7.1%} {flag}")
+    return regressions
+
+
+async def main():
+    from zoneinfo import ZoneInfo
+    today = datetime.now(ZoneInfo('America/Phoenix')).strftime('%Y-%m-%d')
+    parser = argparse.ArgumentParser(description="Benchmark parsers, records, exports and refreshes offline")
+    parser.add_argument('--fixture-set', default=os.environ.get('SCRAPE_FIXTURES_SET', 'default'))
+    parser.add_argument('--date', default=today, help='Slate date the fixture set was recorded for (YYYY-MM-DD)')
+    parser.add_argument('--day', default='today', help='day= passed to the refresh pipelines')
+    parser.add_argument('--record', action='store_true', help='Record the fixture set from the live sites instead of replaying')
+    parser.add_argument('--only', default=None, help='Comma-separated case name prefixes or groups (scrape,records,compilation,public,export,refresh)')
+    parser.add_argument('--runs', type=int, default=None, help='Override the per-case run count')
+    parser.add_argument('--no-warmup', action='store_true')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--monitor-accounts', type=int, default=0,
+                        help='Time a monitoring cycle over this many accounts (needs PLAYS888_BASE_URL -> plays888_standin.py)')
+    parser.add_argument('--notify-bets', type=int, default=0,
+                        help='Time notifying this many new bets in one cycle (needs TELEGRAM_API_BASE_URL -> telegram_standin.py)')
+    parser.add_argument('--output', default=None, help='Results file (default benchmark_results/<time>_<rev>.json)')
+    parser.add_argument('--compare', default=None, help='Previous results file to diff against')
+    parser.add_argument('--threshold', type=float, default=0.15, help='Median slowdown counted as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args()
+    if args.monitor_accounts and server.PLAYS888_BASE_URL == 'https://www.plays888.co':
+        sys.exit("--monitor-accounts needs PLAYS888_BASE_URL pointing at plays888_standin.py")
+    if args.notify_bets and server.TELEGRAM_API_BASE_URL == 'https://api.telegram.org':
+        sys.exit("--notify-bets needs TELEGRAM_API_BASE_URL pointing at telegram_standin.py")
+
+    scrape_fixtures["mode"] = 'record' if args.record else 'replay'
+    scrape_fixtures["set"] = args.fixture_set
+    season_start = (datetime.now(ZoneInfo('America/Phoenix')) - timedelta(days=SEASON_DAYS)).strftime('%Y-%m-%d')
+
+    try:
+        print(f"[Benchmark] Seeding {BENCH_DB_NAME} ({SEASON_DAYS} days from {season_start}, seed {args.seed})")
+        await seed_database(args.seed, season_start)
+        if args.monitor_accounts:
+            await seed_monitor_accounts(args.monitor_accounts)
+        if args.notify_bets:
+            await seed_telegram()
+        server.start_event_loop_monitor()
+        cases = build_cases(args.date, season_start, args.day, args.monitor_accounts, args.notify_bets)
+        if args.only:
+            wanted = [w.strip() for w in args.only.split(',') if w.strip()]
+            cases = [c for c in cases if any(c[0].startswith(w) or c[1] == w for w in wanted)]
+        if args.record and server.PLAYS888_BASE_URL == 'https://www.plays888.co':
+            # recording would log in to the real sportsbook; record those pages from plays888_standin.py
+            print("[Benchmark] Skipping scrape.plays888_* under --record (PLAYS888_BASE_URL is the live site)")
+            cases = [c for c in cases if not c[0].startswith('scrape.plays888')]
+        results = []
+        for name, group, factory, runs, items, *setup in cases:
+            entry = await run_case(name, factory, args.runs or runs, warmup=not args.no_warmup and not args.record,
+                                   items_per_run=items, setup=setup[0] if setup else None)
+            entry["group"] = group
+            results.append(entry)
+            if entry["error"]:
+                print(f"  {name:<44} ERROR {entry['error']}")
+            else:
+                rate = f"{entry['items_per_sec']:>9}/s" if entry["items_per_sec"] else ""
+                misses = f"  ({entry['fixture_misses']} fixture misses)" if entry["fixture_misses"] else ""
+                if "telegram_requests" in entry:
+                    misses += f"  ({entry['telegram_requests']} Bot API requests, {entry['telegram_rate_limited']} got 429)"
+                print(f"  {name:<44} median {entry['median_ms']:>10.1f} ms  p95 {entry['p95_ms']:>10.1f} ms  "
+                      f"{entry['items']:>5} items {rate}{misses}")
+    finally:
+        client.close()
+
+    started_at = datetime.now(timezone.utc)
+    output = {
+        "revision": git_revision(),
+        "started_at": started_at.isoformat(),
+        "python": sys.version.split()[0],
+        "fixture_set": args.fixture_set,
+        "fixture_mode": scrape_fixtures["mode"],
+        "slate_date": args.date,
+        "season_days": SEASON_DAYS,
+        "games_per_day": GAMES_PER_DAY,
+        "compilation_bets": COMPILATION_BETS,
+        "plays888_base_url": server.PLAYS888_BASE_URL,
+        "telegram_api_base_url": server.TELEGRAM_API_BASE_URL,
+        "event_loop": server.event_loop_lag_summary(),
+        "cases": results,
+    }
+    out_path = Path(args.output) if args.output else RESULTS_DIR / f"{started_at.strftime('%Y%m%dT%H%M')}_{output['revision']}.json"
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(json.dumps(output, indent=2, default=str))
+    print(f"\n[Benchmark] Results written to {out_path}")
+
+    if args.compare:
+        regressions = compare_results(output, args.compare, args.threshold)
+        if regressions and args.fail_on_regression:
+            sys.exit(f"{len(regressions)} case(s) regressed: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
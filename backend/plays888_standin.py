@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+"""
+Local plays888.co stand-in - an ASP.NET lookalike for load and latency testing.
+
+Serves the login form, Welcome.aspx, OpenBets.aspx, History.aspx and
+GradedBets.aspx with generated tables in the layout Plays888Service and the
+bet monitor parse (ticket/date cell, sport column, STRAIGHT BET description,
+"risk / win" cell, WINWIN/LOSELOSE result). Rows are deterministic per
+account, so ticket numbers are stable between monitoring cycles unless
+--new-bets-per-view adds fresh ones. Sessions expire after --session-ttl and
+/wager pages then redirect to the login form like the real site.
+
+Point the backend at it with PLAYS888_BASE_URL (use a scratch DB_NAME - the
+monitor writes bets and compilations):
+    python plays888_standin.py --port 8888 --open-bets 500 --latency-ms 150
+    PLAYS888_BASE_URL=http://127.0.0.1:8888 DB_NAME=sports_trading_bench python benchmark.py \\
+        --only monitoring --monitor-accounts 50
+"""
+import argparse
+import asyncio
+import html
+import random
+import secrets
+import time
+from datetime import datetime, timedelta
+from urllib.parse import parse_qs, quote
+
+from fastapi import FastAPI, Request
+from fastapi.responses import HTMLResponse, RedirectResponse
+
+SESSION_COOKIE = 'ASP.NET_SessionId'
+
+TEAMS = {
+    'NBA': ['MILWAUKEE BUCKS', 'BOSTON CELTICS', 'DENVER NUGGETS', 'PHOENIX SUNS', 'MIAMI HEAT',
+            'LOS ANGELES LAKERS', 'GOLDEN STATE WARRIORS', 'DALLAS MAVERICKS', 'NEW YORK KNICKS', 'UTAH JAZZ'],
+    'NHL': ['BOSTON BRUINS', 'TORONTO MAPLE LEAFS', 'EDMONTON OILERS', 'VEGAS GOLDEN KNIGHTS', 'UTAH MAMMOTH',
+            'COLORADO AVALANCHE', 'DALLAS STARS', 'NEW YORK RANGERS', 'FLORIDA PANTHERS', 'SEATTLE KRAKEN'],
+    'CBB': ['KANSAS', 'DUKE', 'GONZAGA', 'ARIZONA', 'PURDUE', 'HOUSTON', 'BAYLOR', 'MARQUETTE',
+            'CREIGHTON', 'KANSAS STATE', 'MIAMI (OHIO)', 'SAINT MARYS'],
+}
+TOTAL_RANGES = {'NBA': (205, 250), 'NHL': (5, 7), 'CBB': (125, 165)}
+WAGERS = [(1100, 1000), (2200, 2000), (550, 500), (1300, 1182), (660, 600)]
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title></head>
+<body><form id="aspnetForm" method="post" action="{action}"><div id="header">{header}</div>
+<div id="content">{content}</div></form></body></html>"""
+
+LOGIN_FORM = """<div class="login"><h2>Bienvenido</h2>{message}
+<input type="text" name="Account" id="Account" placeholder="Cuenta">
+<input type="password" name="Password" id="Password" placeholder="Clave">
+<button type="submit">Acceder</button></div>"""
+
+WELCOME_CONTENT = """<ul class="menu"><li><a href="/wager/CreateSports.aspx?WT=0">Straight</a></li>
+<li><a href="/wager/OpenBets.aspx">Open Bets</a></li><li><a href="/wager/History.aspx">History</a></li></ul>
+<div class="account">Account: {user}<br>Balance: {balance:,.2f}<br>Available: {available:,.2f}</div>"""
+
+BETS_TABLE = ('<table class="table" id="{table_id}"><tr><th>GameDate</th><th>User/Phone</th><th>Date Placed</th>'
+              '<th>Sport</th><th>Description</th><th>Risk/Win</th>{extra_headers}</tr>{rows}</table>')
+
+
+class StandinConfig:
+    """Command line settings shared by the request handlers"""
+
+    def __init__(self, args):
+        self.open_bets = args.open_bets
+        self.history_rows = args.history_rows
+        self.latency_ms = args.latency_ms
+        self.jitter_ms = args.jitter_ms
+        self.session_ttl = args.session_ttl
+        self.password = args.password
+        self.new_bets_per_view = args.new_bets_per_view
+        self.seed = args.seed
+
+
+config: StandinConfig = None
+sessions = {}  # session id -> {"user", "expires"}
+extra_bets = {}  # user -> tickets added by --new-bets-per-view
+stats = {"requests": 0, "logins": 0, "failed_logins": 0, "expired_sessions": 0, "pages": {}}
+
+app = FastAPI()
+
+
+def generate_bet(rng: random.Random, ticket: int, now: datetime, settled: bool) -> dict:
+    sport = rng.choice(['NBA', 'NBA', 'NHL', 'CBB', 'CBB'])
+    away, home = rng.sample(TEAMS[sport], 2)
+    low, high = TOTAL_RANGES[sport]
+    line = rng.randint(low, high)
+    half = '½' if rng.random() < 0.5 else ''
+    risk, win = rng.choice(WAGERS)
+    game_at = now - timedelta(days=rng.randint(0, 6), hours=rng.randint(1, 12)) if settled else now + timedelta(hours=rng.randint(1, 30))
+    return {
+        "ticket": ticket,
+        "sport": sport,
+        "game_at": game_at.replace(minute=rng.choice([0, 15, 30, 45]), second=0),
+        "placed_at": game_at - timedelta(hours=rng.randint(1, 8)),
+        "away": away, "home": home,
+        "pick": f"TOTAL {rng.choice('ou')}{line}{half}-110",
+        "risk": risk, "win": win,
+        "result": rng.choice(['WIN', 'LOSE', 'LOSE', 'WIN', 'PUSH']) if settled else None,
+    }
+
+
+def account_bets(user: str, settled: bool) -> list:
+    """Deterministic open or settled bets for an account"""
+    rng = random.Random(f"{config.seed}:{user}:{'settled' if settled else 'open'}")
+    count = config.history_rows if settled else config.open_bets
+    base = (337 if settled else 340) * 1000000 + rng.randint(0, 899999)
+    now = datetime.now()
+    bets = [generate_bet(rng, base + n, now, settled) for n in range(count)]
+    if not settled:
+        bets += extra_bets.get(user, [])
+    return bets
+
+
+def bet_row(bet: dict, user: str, settled: bool) -> str:
+    """One ticket row; description lines and cells are laid out like plays888's tables"""
+    # OpenBets shows "Ticket#:340605842 Jan 19 03:15 PM", History "Ticket #: 337..." plus the date
+    game_at = bet['game_at'].strftime('%b %d %I:%M %p')
+    if settled:
+        ticket_cell = f"Ticket #: {bet['ticket']}<br>{game_at}<br>{bet['game_at'].strftime('%m/%d/%Y')}"
+    else:
+        ticket_cell = f"Ticket#:{bet['ticket']} {game_at}"
+    description = (f"STRAIGHT BET[{bet['ticket'] % 10000}]<br>"
+                   f"({html.escape(bet['away'])} vrs {html.escape(bet['home'])})<br>{bet['pick']}")
+    # risk/win renders on the line after the pick, where scrape_open_bets looks for it
+    cells = [ticket_cell, user, bet['placed_at'].strftime('%m/%d/%Y %I:%M %p'), bet['sport'], description,
+             f"<br>{bet['risk']:.2f} / {bet['win']:.2f}"]
+    if settled:
+        amount = {'WIN': bet['win'], 'LOSE': -bet['risk'], 'PUSH': 0}[bet['result']]
+        cells += [f"{amount:.2f}", f"<span>{bet['result']}</span><span>{bet['result']}</span>"]
+    # no whitespace between cells: the monitor matches on row.textContent ("2000.00WINWIN")
+    return "<tr>" + "".join(f"<td>{cell}</td>" for cell in cells) + "</tr>"
+
+
+def weekly_summary(bets: list) -> str:
+    """Beginning / Mon..Sun / Total table with the Win/Loss row read by the daily summary"""
+    days = ['Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat', 'Sun']
+    profits = [0.0] * 7
+    for bet in bets:
+        profits[bet['game_at'].weekday()] += {'WIN': bet['win'], 'LOSE': -bet['risk'], 'PUSH': 0}[bet['result']]
+    header = "".join(f"<td>{cell}</td>" for cell in ['', 'Beginning', *days, 'Total'])
+    win_loss = "".join(f"<td>{cell}</td>" for cell in ['Win/Loss', '0.00', *[f"{p:,.2f}" for p in profits], f"{sum(profits):,.2f}"])
+    return f'<table class="summary"><tr>{header}</tr><tr>{win_loss}</tr></table>'
+
+
+def render_page(title: str, content: str, user: str = None, action: str = '') -> HTMLResponse:
+    header = f"<span>{html.escape(user)}</span> <a href=\"/wager/Welcome.aspx\">Inicio</a>" if user else ''
+    return HTMLResponse(PAGE_TEMPLATE.format(title=title, action=action, header=header, content=content))
+
+
+async def simulate_latency(request: Request):
+    stats["requests"] += 1
+    stats["pages"][request.url.path] = stats["pages"].get(request.url.path, 0) + 1
+    delay = config.latency_ms + random.uniform(-config.jitter_ms, config.jitter_ms)
+    if delay > 0:
+        await asyncio.sleep(delay / 1000)
+
+
+def session_user(request: Request):
+    sid = request.cookies.get(SESSION_COOKIE)
+    session = sessions.get(sid)
+    if not session:
+        return None
+    if session["expires"] < time.monotonic():
+        sessions.pop(sid, None)
+        stats["expired_sessions"] += 1
+        return None
+    return session["user"]
+
+
+def login_redirect(request: Request) -> RedirectResponse:
+    return RedirectResponse(f"/?ReturnUrl={quote(request.url.path)}", status_code=302)
+
+
+@app.get("/", response_class=HTMLResponse)
+@app.get("/Deportes.html", response_class=HTMLResponse)
+async def login_page(request: Request):
+    await simulate_latency(request)
+    return render_page("plays888", LOGIN_FORM.format(message=''), action='/Login.aspx')
+
+
+@app.post("/Login.aspx")
+async def login(request: Request):
+    await simulate_latency(request)
+    form = parse_qs((await request.body()).decode())
+    user = (form.get('Account') or [''])[0].strip()
+    password = (form.get('Password') or [''])[0]
+    if not user or (config.password and password != config.password):
+        stats["failed_logins"] += 1
+        message = '<div class="message">Invalid account or password</div>'
+        return render_page("plays888", LOGIN_FORM.format(message=message), action='/Login.aspx')
+    sid = secrets.token_hex(12)
+    sessions[sid] = {"user": user, "expires": time.monotonic() + config.session_ttl}
+    stats["logins"] += 1
+    response = RedirectResponse("/wager/Welcome.aspx", status_code=302)
+    response.set_cookie(SESSION_COOKIE, sid, httponly=True)
+    return response
+
+
+@app.get("/wager/Welcome.aspx", response_class=HTMLResponse)
+async def welcome(request: Request):
+    await simulate_latency(request)
+    user = session_user(request)
+    if not user:
+        return login_redirect(request)
+    rng = random.Random(f"{config.seed}:{user}:balance")
+    balance = rng.uniform(-20000, 50000)
+    return render_page("Welcome", WELCOME_CONTENT.format(user=html.escape(user), balance=balance, available=balance + 100000), user)
+
+
+@app.get("/wager/OpenBets.aspx", response_class=HTMLResponse)
+async def open_bets(request: Request):
+    await simulate_latency(request)
+    user = session_user(request)
+    if not user:
+        return login_redirect(request)
+    if config.new_bets_per_view:
+        rng = random.Random()
+        added = extra_bets.setdefault(user, [])
+        for _ in range(config.new_bets_per_view):
+            added.append(generate_bet(rng, 341000000 + len(added) + rng.randint(0, 99) * 10000, datetime.now(), settled=False))
+    rows = "".join(bet_row(bet, user, settled=False) for bet in account_bets(user, settled=False))
+    return render_page("Open Bets", BETS_TABLE.format(table_id="openBets", extra_headers='', rows=rows), user)
+
+
+@app.get("/wager/History.aspx", response_class=HTMLResponse)
+@app.get("/wager/GradedBets.aspx", response_class=HTMLResponse)
+async def history(request: Request):
+    await simulate_latency(request)
+    user = session_user(request)
+    if not user:
+        return login_redirect(request)
+    bets = account_bets(user, settled=True)
+    rows = "".join(bet_row(bet, user, settled=True) for bet in bets)
+    table = BETS_TABLE.format(table_id="history", extra_headers='<th>Win/Loss</th><th>Result</th>', rows=rows)
+    return render_page("History", weekly_summary(bets) + table, user)
+
+
+@app.get("/_standin/stats")
+async def standin_stats():
+    """Request counts per page, logins and live sessions"""
+    now = time.monotonic()
+    return {**stats, "active_sessions": sum(1 for s in sessions.values() if s["expires"] >= now)}
+
+
+def main():
+    global config
+    parser = argparse.ArgumentParser(description="Local plays888.co stand-in for load and latency tests")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8888)
+    parser.add_argument('--open-bets', type=int, default=20, help='Open bets per account')
+    parser.add_argument('--history-rows', type=int, default=50, help='Settled bets per account on History/GradedBets')
+    parser.add_argument('--latency-ms', type=float, default=0, help='Added to every response')
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--session-ttl', type=float, default=1200, help='Seconds until a login expires')
+    parser.add_argument('--password', default=None, help='Required password (default: accept any)')
+    parser.add_argument('--new-bets-per-view', type=int, default=0, help='Fresh tickets added on each OpenBets view')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+    config = StandinConfig(args)
+
+    import uvicorn
+    uvicorn.run(app, host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == "__main__":
+    main()
@@ -10,6 +10,8 @@ from datetime import datetime
 from bs4 import BeautifulSoup
 from pymongo import MongoClient
 
+from team_game_log import last3_from_game_log
+
 # Connect to MongoDB
 client = MongoClient(os.environ.get('MONGO_URL', 'mongodb://localhost:27017'))
 db = client[os.environ.get('DB_NAME', 'test_database')]
@@ -107,10 +109,12 @@ async def main():
                 if name and len(name) > 1 and len(name) < 30:
                     teams_to_scrape[name] = href
     
-    print(f"[NCAAB PPG] Scraping {len(teams_to_scrape)} teams...")
+    # Teams whose last 3 games are already in our stored finals don't need a page load
+    team_stats, teams_missing = last3_from_game_log(db, list(teams_to_scrape.keys()), today)
+    teams_to_scrape = {name: teams_to_scrape[name] for name in teams_missing}
+    print(f"[NCAAB PPG] {len(team_stats)} teams from game log, scraping {len(teams_to_scrape)} teams...")
     
     # Scrape teams in batches
-    team_stats = {}
     teams_list = list(teams_to_scrape.items())
     
     async with httpx.AsyncClient(headers=HEADERS, follow_redirects=True) as client:
@@ -9,6 +9,12 @@ from pathlib import Path
 from pydantic import BaseModel, Field, ConfigDict
 from typing import List, Optional, Dict, Any, Tuple
 import uuid
+import contextvars
+import threading
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
 import random
 from datetime import datetime, timezone, timedelta
 from cryptography.fernet import Fernet
@@ -18,6 +24,8 @@ from playwright.async_api import async_playwright, TimeoutError as PlaywrightTim
 import httpx
 from telegram import Bot
 from telegram.constants import ParseMode
+from telegram.request import HTTPXRequest
+from pymongo import monitoring
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.interval import IntervalTrigger
 from apscheduler.triggers.cron import CronTrigger
@@ -25,11 +33,47 @@ from apscheduler.triggers.cron import CronTrigger
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
+class MongoCommandTimer(monitoring.CommandListener):
+    """
+    Feeds mongo_command_seconds (see METRICS) and the MONGO COMMAND PROFILER;
+    callbacks run on driver threads
+    """
+
+    def __init__(self):
+        self.pending = {}
+
+    def started(self, event):
+        collection = event.command.get('collection' if event.command_name == 'getMore' else event.command_name)
+        self.pending[(event.connection_id, event.request_id)] = (collection if isinstance(collection, str) else '-', event.command)
+
+    def succeeded(self, event):
+        self.finished(event, failed=False)
+
+    def failed(self, event):
+        self.finished(event, failed=True)
+
+    def finished(self, event, failed: bool):
+        collection, command = self.pending.pop((event.connection_id, event.request_id), ('-', None))
+        seconds = event.duration_micros / 1e6
+        observe_metric('mongo_command_seconds', seconds, collection=collection, command=event.command_name)
+        if failed:
+            inc_metric('mongo_command_failures_total', collection=collection, command=event.command_name)
+        try:
+            record_mongo_command(collection, event.command_name, command, seconds, failed)
+        except Exception as e:
+            logger.debug(f"[Mongo] Profiler error: {e}")
+
+
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+mongo_command_timer = MongoCommandTimer()
+client = AsyncIOMotorClient(mongo_url, event_listeners=[mongo_command_timer])
 db = client[os.environ['DB_NAME']]
 
+# all: API + jobs + scheduler in one process; api / worker: see PROCESS ROLES
+PROCESS_ROLE = os.environ.get('PROCESS_ROLE', 'all')
+WORKER_ID = f"{os.uname().nodename}:{os.getpid()}"
+
 # Encryption key for storing credentials
 encryption_key = os.environ.get('ENCRYPTION_KEY')
 if not encryption_key:
@@ -62,7 +106,7 @@ async def init_telegram_from_db():
         # Try to load from database first
         config = await db.telegram_config.find_one({}, {"_id": 0})
         if config:
-            telegram_bot = Bot(token=config["bot_token"])
+            telegram_bot = make_telegram_bot(config["bot_token"])
             telegram_chat_id = int(config["chat_id"])
             logger.info(f"Telegram initialized from database (Chat ID: {telegram_chat_id})")
             return
@@ -74,7 +118,7 @@ async def init_telegram_from_db():
     chat_id = os.environ.get('TELEGRAM_CHAT_ID')
     
     if token and chat_id:
-        telegram_bot = Bot(token=token)
+        telegram_bot = make_telegram_bot(token)
         telegram_chat_id = int(chat_id)
         logger.info("Telegram initialized from environment variables")
     else:
@@ -83,11 +127,26 @@ async def init_telegram_from_db():
 # Startup event to initialize Telegram and auto-start monitoring
 @app.on_event("startup")
 async def startup_event():
+    await init_process_state()
+    if PROCESS_ROLE == 'all':
+        await start_scheduled_duties()
+        asyncio.create_task(job_worker_loop())
+    logger.info(f"Started as {PROCESS_ROLE} ({WORKER_ID})")
+
+
+async def init_process_state():
+    """Per-process setup shared by the API and worker processes"""
+    start_event_loop_monitor()
+    start_mongo_profiler()
     await init_telegram_from_db()
-    await auto_start_monitoring()
-    schedule_daily_summary()
-    await startup_recovery()  # Check if we missed anything overnight
-    await process_pending_deletions()  # Clean up any scheduled deletions from before restart
+    await load_team_aliases_from_db()  # Manual team aliases added via /teams/aliases
+    await ensure_game_identity_indexes()
+    await ensure_team_game_log_indexes()
+    await ensure_team_stats_indexes()
+    await ensure_ncaab_last3_indexes()
+    await recover_interrupted_jobs()
+    await ensure_scheduler_run_indexes()
+    await ensure_scrape_trace_collection()
 
 async def schedule_message_deletion(chat_id: int, message_id: int, delay_minutes: int = 15):
     """Schedule a message for deletion by storing in database (survives server restarts)"""
@@ -120,7 +179,7 @@ async def process_pending_deletions():
             logger.warning("No Telegram config found for deletion processing")
             return
         
-        bot = Bot(token=telegram_config["bot_token"])
+        bot = make_telegram_bot(telegram_config["bot_token"])
         
         deleted_count = 0
         for item in pending:
@@ -145,6 +204,762 @@ async def delete_message_later(bot, chat_id, message_id, delay_minutes=15):
     # Use database-backed scheduling instead of asyncio task
     await schedule_message_deletion(chat_id, message_id, delay_minutes)
 
+# ============================================================================
+# RESOURCE-AWARE JOB SCHEDULING
+# ============================================================================
+# Scheduled jobs, the monitoring loop and API background jobs each declare a
+# resource class. Every class has a global concurrency limit, so a Chromium job
+# that fires while another one is running waits for a slot instead of starting
+# a second browser on the box. Queue wait and run time are recorded per job.
+#
+# Limits count jobs, not browsers: one 'browser' job may launch several Chromium
+# instances itself (parallel backfill days, hedged_fetch racing sources), bounded
+# by that job's own concurrency setting. Bet monitoring has its own 'monitor'
+# lane so alerts never queue behind an hours-long backfill or 8PM scrape.
+
+JOB_RESOURCE_LIMITS = {
+    'browser': int(os.environ.get('BROWSER_JOB_CONCURRENCY', '1')),  # Playwright/Chromium jobs
+    'monitor': 1,  # bet monitoring cycle (Chromium), reserved
+    'http': 4,  # plain HTTP APIs (Telegram, NHL API, teamrankings)
+    'db': 8,  # MongoDB only
+}
+RESOURCE_RUN_HISTORY_DAYS = 14
+
+job_resource_semaphores: Dict[str, asyncio.Semaphore] = {}
+job_resource_waiting: Dict[str, List[str]] = {}
+job_resource_running: Dict[str, List[str]] = {}
+resource_job_stats: Dict[str, Dict[str, Any]] = {}
+
+
+async def run_with_resource(name: str, resource: str, fn, *args, **kwargs):
+    """Run fn once a slot of its resource class is free; records queue wait and duration"""
+    import time
+    semaphore = job_resource_semaphores.get(resource)
+    if semaphore is None:
+        semaphore = job_resource_semaphores[resource] = asyncio.Semaphore(JOB_RESOURCE_LIMITS[resource])
+    
+    queued_at = time.monotonic()
+    job_resource_waiting.setdefault(resource, []).append(name)
+    try:
+        await semaphore.acquire()
+    finally:
+        job_resource_waiting[resource].remove(name)
+    wait_seconds = time.monotonic() - queued_at
+    if wait_seconds >= 1:
+        logger.info(f"[Scheduler] {name} waited {wait_seconds:.0f}s for a {resource} slot")
+    
+    job_resource_running.setdefault(resource, []).append(name)
+    work_origin.set(f"job:{name}")
+    started_at = time.monotonic()
+    status = "ok"
+    try:
+        profile_mode = await take_armed_profile(name)
+        if profile_mode:
+            return await run_profiled(profile_mode, f"job {name}", fn, *args, **kwargs)
+        return await fn(*args, **kwargs)
+    except BaseException:
+        status = "error"
+        raise
+    finally:
+        semaphore.release()
+        job_resource_running[resource].remove(name)
+        duration = time.monotonic() - started_at
+        stats = resource_job_stats.setdefault(name, {
+            "resource": resource, "runs": 0, "errors": 0, "total_wait_seconds": 0.0,
+            "max_wait_seconds": 0.0, "total_duration_seconds": 0.0, "max_duration_seconds": 0.0
+        })
+        stats["runs"] += 1
+        stats["errors"] += status == "error"
+        stats["total_wait_seconds"] += wait_seconds
+        stats["max_wait_seconds"] = max(stats["max_wait_seconds"], wait_seconds)
+        stats["total_duration_seconds"] += duration
+        stats["max_duration_seconds"] = max(stats["max_duration_seconds"], duration)
+        stats["last_run_at"] = datetime.now(timezone.utc).isoformat()
+        stats["last_wait_seconds"] = round(wait_seconds, 2)
+        observe_metric('scheduler_job_seconds', duration, job=name, resource=resource)
+        observe_metric('scheduler_job_wait_seconds', wait_seconds, job=name, resource=resource)
+        inc_metric('scheduler_job_runs_total', job=name, status=status)
+        stats["last_duration_seconds"] = round(duration, 2)
+        try:
+            await db.scheduler_runs.insert_one({
+                "job": name, "resource": resource, "status": status,
+                "wait_seconds": round(wait_seconds, 2), "duration_seconds": round(duration, 2),
+                "finished_at": datetime.now(timezone.utc)
+            })
+        except Exception as e:
+            logger.debug(f"[Scheduler] Could not record run of {name}: {e}")
+
+
+def resource_scheduled(name: str, resource: str, fn):
+    """Wrap a scheduler job so it goes through run_with_resource"""
+    async def run_scheduled_job():
+        return await run_with_resource(name, resource, fn)
+    run_scheduled_job.__name__ = fn.__name__
+    return run_scheduled_job
+
+
+def resource_scheduler_status() -> Dict[str, Any]:
+    return {
+        "limits": JOB_RESOURCE_LIMITS,
+        "running": {resource: list(names) for resource, names in job_resource_running.items() if names},
+        "waiting": {resource: list(names) for resource, names in job_resource_waiting.items() if names},
+        "jobs": {
+            name: {
+                **{k: v for k, v in stats.items() if not k.startswith("total_")},
+                "avg_wait_seconds": round(stats["total_wait_seconds"] / stats["runs"], 2),
+                "avg_duration_seconds": round(stats["total_duration_seconds"] / stats["runs"], 2),
+                "max_wait_seconds": round(stats["max_wait_seconds"], 2),
+                "max_duration_seconds": round(stats["max_duration_seconds"], 2),
+            }
+            for name, stats in sorted(resource_job_stats.items())
+        },
+    }
+
+
+async def ensure_scheduler_run_indexes():
+    try:
+        await db.scheduler_runs.create_index("finished_at", expireAfterSeconds=RESOURCE_RUN_HISTORY_DAYS * 86400)
+        await db.scheduler_runs.create_index([("job", 1), ("finished_at", -1)])
+    except Exception as e:
+        logger.error(f"Error creating scheduler run indexes: {e}")
+
+
+@api_router.get("/scheduler/jobs")
+async def get_scheduler_jobs(job: str = None, limit: int = 20):
+    """Resource slots in use, queued jobs, per-job wait/duration stats and recent runs"""
+    query = {"job": job} if job else {}
+    recent = await db.scheduler_runs.find(query, {"_id": 0}).sort("finished_at", -1).to_list(min(limit, 200))
+    next_runs = {j.id: j.next_run_time.isoformat() if j.next_run_time else None for j in scheduler.get_jobs()}
+    result = {**resource_scheduler_status(), "next_runs": next_runs, "recent_runs": recent}
+    if PROCESS_ROLE == 'api':
+        result["workers"] = await worker_states("job_resources")
+    return result
+
+
+# ============================================================================
+# EVENT LOOP LAG MONITOR - find sync work that blocks the event loop
+# ============================================================================
+# A heartbeat task measures how late the loop wakes it up; a watchdog thread
+# notices when the heartbeat stops ticking and captures the loop thread's stack
+# at that moment - the sync call that is holding the loop. Stalls are logged and
+# kept for /debug/event-loop, grouped by the innermost server.py frame.
+# Known blocking helpers (pkill, Excel parsing/saving, the NCAAB PPG script) go
+# through run_blocking instead.
+
+LOOP_LAG_INTERVAL = 0.25  # heartbeat period, seconds
+LOOP_STALL_THRESHOLD_MS = int(os.environ.get('LOOP_STALL_THRESHOLD_MS', '250'))
+LOOP_STALL_HISTORY = 50
+LOOP_STALL_STACK_DEPTH = 15
+BLOCKING_EXECUTOR_WORKERS = int(os.environ.get('BLOCKING_EXECUTOR_WORKERS', '4'))
+
+blocking_executor = ThreadPoolExecutor(max_workers=BLOCKING_EXECUTOR_WORKERS, thread_name_prefix='blocking')
+loop_lag_state: Dict[str, Any] = {
+    "heartbeat": None, "loop_thread_id": None, "pending_stall": None,
+    "samples": 0, "total_lag_ms": 0.0, "max_lag_ms": 0.0, "last_lag_ms": 0.0, "stalls": 0,
+}
+loop_stalls = deque(maxlen=LOOP_STALL_HISTORY)
+loop_stall_offenders: Dict[str, Dict[str, Any]] = {}
+
+
+async def run_blocking(fn, *args, **kwargs):
+    """Run a blocking sync call (subprocess, file parsing, workbook writes) in blocking_executor"""
+    import functools
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(blocking_executor, functools.partial(fn, *args, **kwargs))
+
+
+def capture_loop_stack() -> Tuple[str, List[str]]:
+    """Stack of the event loop thread right now, and its innermost server.py frame"""
+    import sys
+    import traceback
+    frame = sys._current_frames().get(loop_lag_state["loop_thread_id"])
+    if frame is None:
+        return "unknown", []
+    frames = traceback.extract_stack(frame)[-LOOP_STALL_STACK_DEPTH:]
+    stack = [f"{Path(f.filename).name}:{f.lineno} in {f.name}" for f in frames]
+    own = [f for f in frames if f.filename == __file__]
+    offender = own[-1] if own else frames[-1]
+    return f"{offender.name} ({Path(offender.filename).name}:{offender.lineno})", stack
+
+
+def event_loop_watchdog():
+    """Watchdog thread: snapshot the loop's stack once per stalled heartbeat"""
+    import time
+    threshold = LOOP_STALL_THRESHOLD_MS / 1000
+    reported_beat = None
+    while True:
+        time.sleep(threshold / 2)
+        beat = loop_lag_state["heartbeat"]
+        if beat is None or beat == reported_beat:
+            continue
+        if time.monotonic() - beat - LOOP_LAG_INTERVAL >= threshold:
+            reported_beat = beat
+            offender, stack = capture_loop_stack()
+            loop_lag_state["pending_stall"] = {"beat": beat, "offender": offender, "stack": stack}
+
+
+def record_loop_stall(lag_ms: float, stall: Optional[Dict[str, Any]]):
+    offender = stall["offender"] if stall else "unknown (stall ended before the watchdog sampled it)"
+    loop_lag_state["stalls"] += 1
+    loop_stalls.append({
+        "at": datetime.now(timezone.utc).isoformat(),
+        "lag_ms": round(lag_ms, 1),
+        "offender": offender,
+        "stack": stall["stack"] if stall else [],
+    })
+    entry = loop_stall_offenders.setdefault(offender, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+    entry["count"] += 1
+    entry["total_ms"] += lag_ms
+    entry["max_ms"] = max(entry["max_ms"], lag_ms)
+    logger.warning(f"[LoopLag] Event loop blocked {lag_ms:.0f}ms in {offender}")
+
+
+async def event_loop_heartbeat():
+    import time
+    while True:
+        beat = time.monotonic()
+        loop_lag_state["heartbeat"] = beat
+        await asyncio.sleep(LOOP_LAG_INTERVAL)
+        lag_ms = max(0.0, (time.monotonic() - beat - LOOP_LAG_INTERVAL) * 1000)
+        loop_lag_state["samples"] += 1
+        loop_lag_state["total_lag_ms"] += lag_ms
+        loop_lag_state["last_lag_ms"] = lag_ms
+        loop_lag_state["max_lag_ms"] = max(loop_lag_state["max_lag_ms"], lag_ms)
+        if lag_ms >= LOOP_STALL_THRESHOLD_MS:
+            stall = loop_lag_state["pending_stall"]
+            record_loop_stall(lag_ms, stall if stall and stall["beat"] == beat else None)
+        loop_lag_state["pending_stall"] = None
+
+
+def start_event_loop_monitor():
+    """Start the heartbeat task and watchdog thread (once per process)"""
+    if loop_lag_state["loop_thread_id"] is not None:
+        return
+    loop_lag_state["loop_thread_id"] = threading.get_ident()
+    asyncio.create_task(event_loop_heartbeat())
+    threading.Thread(target=event_loop_watchdog, name='loop-watchdog', daemon=True).start()
+    logger.info(f"[LoopLag] Monitoring event loop (stall threshold {LOOP_STALL_THRESHOLD_MS}ms)")
+
+
+def event_loop_lag_summary() -> Dict[str, Any]:
+    samples = loop_lag_state["samples"]
+    return {
+        "stall_threshold_ms": LOOP_STALL_THRESHOLD_MS,
+        "avg_lag_ms": round(loop_lag_state["total_lag_ms"] / samples, 2) if samples else None,
+        "max_lag_ms": round(loop_lag_state["max_lag_ms"], 1),
+        "last_lag_ms": round(loop_lag_state["last_lag_ms"], 1),
+        "stalls": loop_lag_state["stalls"],
+        "blocking_executor_workers": BLOCKING_EXECUTOR_WORKERS,
+    }
+
+
+@api_router.get("/debug/event-loop")
+async def get_event_loop_lag(limit: int = 20):
+    """Event loop lag stats, worst offenders and the most recent stalls with stacks"""
+    offenders = sorted(loop_stall_offenders.items(), key=lambda item: item[1]["total_ms"], reverse=True)
+    return {
+        **event_loop_lag_summary(),
+        "offenders": [{"offender": name, "count": o["count"], "total_ms": round(o["total_ms"], 1),
+                       "max_ms": round(o["max_ms"], 1)} for name, o in offenders],
+        "recent_stalls": list(loop_stalls)[-limit:][::-1],
+    }
+
+
+# ============================================================================
+# METRICS - Prometheus text exposition at /api/metrics
+# ============================================================================
+# In-process counters, gauges and histograms (no client library or push
+# gateway). Timings are recorded where the work happens: monitoring cycles,
+# plays888 login/fetch/parse per account, page loads per host, scraped games,
+# Mongo commands per collection (command listener), Telegram API calls and
+# resource-scheduled jobs. Browser process count/RSS is read at scrape time.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+FAST_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+# name -> (type, help, buckets)
+METRICS = {
+    'monitoring_cycle_seconds': ('histogram', 'Bet monitoring cycle duration', LATENCY_BUCKETS),
+    'plays888_stage_seconds': ('histogram', 'plays888 login / page fetch / parse time per account', LATENCY_BUCKETS),
+    'scraper_page_ready_seconds': ('histogram', 'Outbound page load (goto) or GET time per host', LATENCY_BUCKETS),
+    'scrape_duration_seconds': ('histogram', 'Scraper run time per source (single-flight leaders only)', LATENCY_BUCKETS),
+    'scrape_games_parsed_total': ('counter', 'Games returned by scrapers', None),
+    'mongo_command_seconds': ('histogram', 'MongoDB command latency per collection', FAST_LATENCY_BUCKETS),
+    'mongo_command_failures_total': ('counter', 'Failed MongoDB commands', None),
+    'telegram_api_seconds': ('histogram', 'Telegram Bot API request latency per method', LATENCY_BUCKETS),
+    'telegram_api_errors_total': ('counter', 'Telegram Bot API requests that raised', None),
+    'telegram_api_rate_limited_total': ('counter', 'Telegram Bot API requests answered 429 (flood control)', None),
+    'scheduler_job_seconds': ('histogram', 'Run time of resource-scheduled jobs', LATENCY_BUCKETS),
+    'scheduler_job_wait_seconds': ('histogram', 'Time jobs waited for a resource slot', LATENCY_BUCKETS),
+    'scheduler_job_runs_total': ('counter', 'Resource-scheduled job runs by status', None),
+    'http_request_seconds': ('histogram', 'API request latency per route template', LATENCY_BUCKETS),
+    'browser_processes': ('gauge', 'Chromium/headless_shell processes on this host', None),
+    'browser_rss_bytes': ('gauge', 'Resident memory of Chromium/headless_shell processes', None),
+}
+
+metric_lock = threading.Lock()  # Mongo listener callbacks run on motor's executor threads
+metric_values: Dict[str, Dict[Tuple[Tuple[str, str], ...], Any]] = {name: {} for name in METRICS}
+
+
+def observe_metric(name: str, value: float, **labels):
+    """Add an observation to a histogram"""
+    buckets = METRICS[name][2]
+    key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+    with metric_lock:
+        series = metric_values[name].get(key)
+        if series is None:
+            series = metric_values[name][key] = {"buckets": [0] * len(buckets), "sum": 0.0, "count": 0}
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                series["buckets"][i] += 1
+        series["sum"] += value
+        series["count"] += 1
+
+
+def inc_metric(name: str, amount: float = 1, **labels):
+    key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+    with metric_lock:
+        metric_values[name][key] = metric_values[name].get(key, 0) + amount
+
+
+def set_metric(name: str, value: float, **labels):
+    key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+    with metric_lock:
+        metric_values[name][key] = value
+
+
+def escape_metric_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_metric_labels(key, extra: Tuple[str, str] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{k}="{escape_metric_label(v)}"' for k, v in pairs) + '}'
+
+
+def render_metrics() -> str:
+    """All series in Prometheus text exposition format 0.0.4"""
+    lines = []
+    with metric_lock:
+        for name, (kind, help_text, buckets) in METRICS.items():
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for key, value in metric_values[name].items():
+                if kind != 'histogram':
+                    lines.append(f"{name}{format_metric_labels(key)} {value}")
+                    continue
+                for bound, count in zip(buckets, value["buckets"]):
+                    lines.append(f"{name}_bucket{format_metric_labels(key, ('le', repr(float(bound))))} {count}")
+                lines.append(f"{name}_bucket{format_metric_labels(key, ('le', '+Inf'))} {value['count']}")
+                lines.append(f"{name}_sum{format_metric_labels(key)} {round(value['sum'], 6)}")
+                lines.append(f"{name}_count{format_metric_labels(key)} {value['count']}")
+    return '\n'.join(lines) + '\n'
+
+
+def read_browser_processes() -> Tuple[int, int]:
+    """(count, total RSS bytes) of Chromium processes, from /proc"""
+    page_size = os.sysconf('SC_PAGE_SIZE')
+    count, rss = 0, 0
+    for pid in os.listdir('/proc'):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f'/proc/{pid}/comm') as f:
+                comm = f.read().strip()
+            if 'chrom' not in comm and 'headless_shell' not in comm:
+                continue
+            with open(f'/proc/{pid}/statm') as f:
+                rss += int(f.read().split()[1]) * page_size
+            count += 1
+        except (OSError, ValueError, IndexError):
+            continue  # process exited while we were reading it
+    return count, rss
+
+
+class TelegramTimedRequest(HTTPXRequest):
+    """Bot API transport that records per-method latency"""
+
+    async def do_request(self, url: str, method: str, *args, **kwargs):
+        import time
+        api_method = url.rsplit('/', 1)[-1]
+        started = time.monotonic()
+        try:
+            status, payload = await super().do_request(url, method, *args, **kwargs)
+        except Exception:
+            inc_metric('telegram_api_errors_total', method=api_method)
+            raise
+        finally:
+            observe_metric('telegram_api_seconds', time.monotonic() - started, method=api_method)
+        if status == 429:
+            inc_metric('telegram_api_rate_limited_total', method=api_method)
+        return status, payload
+
+
+# api.telegram.org, or a local stand-in (telegram_standin.py) for latency/throughput tests
+TELEGRAM_API_BASE_URL = os.environ.get('TELEGRAM_API_BASE_URL', 'https://api.telegram.org').rstrip('/')
+
+
+def make_telegram_bot(token: str) -> Bot:
+    return Bot(token=token, request=TelegramTimedRequest(),
+               base_url=f"{TELEGRAM_API_BASE_URL}/bot", base_file_url=f"{TELEGRAM_API_BASE_URL}/file/bot")
+
+
+@api_router.get("/metrics")
+async def get_metrics():
+    """Prometheus scrape endpoint"""
+    from fastapi.responses import Response
+    try:
+        count, rss = await run_blocking(read_browser_processes)
+        set_metric('browser_processes', count)
+        set_metric('browser_rss_bytes', rss)
+    except Exception as e:
+        logger.debug(f"[Metrics] Could not read browser processes: {e}")
+    return Response(content=render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+# ============================================================================
+# MONGO COMMAND PROFILER - slow and unindexed queries by caller
+# ============================================================================
+# MongoCommandTimer hands every command to record_mongo_command, which groups
+# them by collection, command, normalized filter shape (values replaced by "?"),
+# calling server.py function and origin (route template or job name). The
+# caller is captured in the event loop thread when motor dispatches the call
+# (install_mongo_caller_tracking) and travels to the driver thread in the
+# copied context. Commands slower than MONGO_SLOW_MS get an explain
+# (queryPlanner) at most once per shape every MONGO_EXPLAIN_INTERVAL_SECONDS.
+
+MONGO_SLOW_MS = int(os.environ.get('MONGO_SLOW_MS', '100'))
+MONGO_EXPLAIN_INTERVAL_SECONDS = 600
+MONGO_PROFILE_MAX_GROUPS = 2000
+MONGO_SLOW_SAMPLE_HISTORY = 50
+MONGO_EXPLAINABLE = {'find', 'aggregate', 'count', 'distinct', 'update', 'delete', 'findAndModify'}
+MONGO_EXPLAIN_STRIP = {'lsid', '$db', '$clusterTime', 'txnNumber', '$readPreference', 'readConcern', 'writeConcern'}
+
+mongo_caller = contextvars.ContextVar('mongo_caller', default=None)
+work_origin = contextvars.ContextVar('work_origin', default=None)  # request scope or "job:<name>"
+mongo_explaining = contextvars.ContextVar('mongo_explaining', default=False)
+mongo_profile: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+mongo_profile_state = {"loop": None, "dropped_groups": 0}
+mongo_slow_samples = deque(maxlen=MONGO_SLOW_SAMPLE_HISTORY)
+mongo_explained_at: Dict[Tuple[str, str, str], float] = {}
+
+
+def query_shape(value: Any) -> Any:
+    """Filter with values replaced by "?" (operators and field names kept)"""
+    if isinstance(value, dict):
+        return {k: query_shape(v) for k, v in sorted(value.items())}
+    if isinstance(value, list):
+        shapes = [query_shape(v) for v in value if isinstance(v, (dict, list))]
+        return shapes or ["?"]
+    return "?"
+
+
+def command_filter(command_name: str, command: Dict[str, Any]) -> Any:
+    if command_name == 'find':
+        return command.get('filter', {})
+    if command_name in ('count', 'distinct', 'findAndModify'):
+        return command.get('query', {})
+    if command_name == 'update':
+        return (command.get('updates') or [{}])[0].get('q', {})
+    if command_name == 'delete':
+        return (command.get('deletes') or [{}])[0].get('q', {})
+    if command_name == 'aggregate':
+        match = next((stage['$match'] for stage in command.get('pipeline', []) if '$match' in stage), {})
+        return match
+    return None
+
+
+def find_server_caller() -> Optional[str]:
+    import sys
+    frame = sys._getframe(2)
+    while frame is not None:
+        if frame.f_code.co_filename == __file__:
+            return frame.f_code.co_name
+        frame = frame.f_back
+    return None
+
+
+def install_mongo_caller_tracking():
+    """Record the server.py function behind each motor call (motor copies the context into its executor)"""
+    import motor.frameworks.asyncio as motor_asyncio
+    original = motor_asyncio.run_on_executor
+    if getattr(original, 'tracks_mongo_caller', False):
+        return
+    
+    def run_on_executor(loop, fn, *args, **kwargs):
+        caller = find_server_caller()
+        if caller:  # cursor batches fetched from callbacks keep the caller of the first batch
+            mongo_caller.set(caller)
+        return original(loop, fn, *args, **kwargs)
+    
+    run_on_executor.tracks_mongo_caller = True
+    motor_asyncio.run_on_executor = run_on_executor
+
+
+def current_work_origin() -> str:
+    origin = work_origin.get()
+    if isinstance(origin, dict):
+        return f"{origin['method']} {route_template(origin)}"
+    return origin or "background"
+
+
+def record_mongo_command(collection: str, command_name: str, command: Optional[Dict[str, Any]], seconds: float, failed: bool):
+    """Called from driver threads by MongoCommandTimer"""
+    import json
+    import time
+    if mongo_explaining.get():
+        return
+    query = command_filter(command_name, command) if command else None
+    shape = json.dumps(query_shape(query), default=str) if query is not None else "-"
+    caller = mongo_caller.get() or "unknown"
+    origin = current_work_origin()
+    key = (collection, command_name, shape, caller, origin)
+    group = mongo_profile.get(key)
+    if group is None:
+        if len(mongo_profile) >= MONGO_PROFILE_MAX_GROUPS:
+            mongo_profile_state["dropped_groups"] += 1
+            return
+        group = mongo_profile[key] = {"count": 0, "failures": 0, "total_seconds": 0.0, "max_seconds": 0.0, "slow": 0}
+    group["count"] += 1
+    group["failures"] += failed
+    group["total_seconds"] += seconds
+    group["max_seconds"] = max(group["max_seconds"], seconds)
+    if seconds * 1000 < MONGO_SLOW_MS:
+        return
+    
+    group["slow"] += 1
+    sample = {
+        "at": datetime.now(timezone.utc).isoformat(), "ms": round(seconds * 1000, 1),
+        "collection": collection, "command": command_name, "shape": shape, "caller": caller, "origin": origin,
+    }
+    mongo_slow_samples.append(sample)
+    logger.warning(f"[Mongo] Slow {command_name} on {collection} ({sample['ms']}ms) from {caller} / {origin}: {shape}")
+    
+    explain_key = (collection, command_name, shape)
+    loop = mongo_profile_state["loop"]
+    if (command_name in MONGO_EXPLAINABLE and command and loop is not None
+            and time.monotonic() - mongo_explained_at.get(explain_key, -MONGO_EXPLAIN_INTERVAL_SECONDS) >= MONGO_EXPLAIN_INTERVAL_SECONDS):
+        mongo_explained_at[explain_key] = time.monotonic()
+        explain_command = {k: v for k, v in command.items() if k not in MONGO_EXPLAIN_STRIP}
+        loop.call_soon_threadsafe(lambda: asyncio.ensure_future(explain_slow_command(sample, explain_command)))
+
+
+def summarize_plan(plan: Dict[str, Any]) -> str:
+    """Winning plan as "STAGE(index) <- STAGE ..." from the leaf up"""
+    stages = []
+    while plan:
+        stage = plan.get("stage", "?")
+        stages.append(f"{stage}({plan['indexName']})" if plan.get("indexName") else stage)
+        children = plan.get("inputStages") or ([plan["inputStage"]] if plan.get("inputStage") else [])
+        plan = children[0] if children else None
+    return " <- ".join(reversed(stages))
+
+
+async def explain_slow_command(sample: Dict[str, Any], command: Dict[str, Any]):
+    mongo_explaining.set(True)
+    try:
+        result = await db.command({"explain": command, "verbosity": "queryPlanner"})
+        planner = result.get("queryPlanner") or (result.get("stages") or [{}])[0].get("$cursor", {}).get("queryPlanner", {})
+        plan = summarize_plan(planner.get("winningPlan", {}))
+        sample["plan"] = plan
+        sample["collscan"] = "COLLSCAN" in plan
+        if sample["collscan"]:
+            logger.warning(f"[Mongo] {sample['command']} on {sample['collection']} from {sample['caller']} is a COLLSCAN: {sample['shape']}")
+    except Exception as e:
+        sample["plan_error"] = str(e)[:200]
+
+
+def start_mongo_profiler():
+    mongo_profile_state["loop"] = asyncio.get_running_loop()
+    install_mongo_caller_tracking()
+
+
+@api_router.get("/debug/mongo")
+async def get_mongo_profile(sort: str = "total", limit: int = 30, collection: str = None):
+    """Top Mongo command groups (collection, command, filter shape, caller, origin) and recent slow samples with plans"""
+    sort_keys = {"total": "total_seconds", "max": "max_seconds", "count": "count", "slow": "slow"}
+    if sort not in sort_keys:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(sort_keys)}")
+    groups = []
+    for (coll, command_name, shape, caller, origin), group in list(mongo_profile.items()):
+        if collection and coll != collection:
+            continue
+        groups.append({
+            "collection": coll, "command": command_name, "shape": shape, "caller": caller, "origin": origin,
+            "count": group["count"], "failures": group["failures"], "slow": group["slow"],
+            "total_seconds": round(group["total_seconds"], 3),
+            "avg_ms": round(group["total_seconds"] / group["count"] * 1000, 2),
+            "max_ms": round(group["max_seconds"] * 1000, 1),
+        })
+    groups.sort(key=lambda g: g[sort_keys[sort]], reverse=True)
+    return {
+        "slow_ms": MONGO_SLOW_MS,
+        "groups_tracked": len(mongo_profile),
+        "dropped_groups": mongo_profile_state["dropped_groups"],
+        "top": groups[:limit],
+        "slow_samples": list(mongo_slow_samples)[::-1],
+    }
+
+
+# ============================================================================
+# ON-DEMAND PROFILING - cProfile / tracemalloc for one request or job run
+# ============================================================================
+# Off unless asked for: a request with `X-Profile: cpu|memory` (or
+# `?_profile=cpu|memory`) or a job armed through POST /debug/profiles/arm runs
+# inside a profiling session. CPU sessions save a .pstats file, memory sessions
+# a tracemalloc .snapshot; both are listed at /debug/profiles with a short
+# summary and downloadable. Only the newest PROFILE_MAX_ARTIFACTS are kept.
+# Armed jobs live in db.profile_arms, so a job armed on the API process is
+# profiled by whichever worker runs it (artifacts land in that host's PROFILE_DIR).
+# cProfile sees the whole loop thread, so other tasks interleaved with the
+# profiled one show up too - profile when the process is otherwise quiet.
+
+PROFILE_DIR = Path(os.environ.get('PROFILE_DIR', '/tmp/profiles'))
+PROFILE_MAX_ARTIFACTS = int(os.environ.get('PROFILE_MAX_ARTIFACTS', '20'))
+PROFILE_MODES = {'cpu': 'pstats', 'memory': 'snapshot'}
+PROFILE_SUMMARY_LINES = 25
+TRACEMALLOC_FRAMES = 25
+
+profile_active = {mode: False for mode in PROFILE_MODES}  # one session per mode at a time (both are process-global)
+
+
+def save_profile_artifact(mode: str, target: str, session, seconds: float) -> Dict[str, Any]:
+    """Write the artifact + .json summary, prune old ones; runs in blocking_executor"""
+    import io
+    import json
+    import re
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', target).strip('_')[:60] or 'profile'
+    name = f"{datetime.now(timezone.utc).strftime('%Y%m%dT%H%M%S%f')}_{mode}_{slug}.{PROFILE_MODES[mode]}"
+    path = PROFILE_DIR / name
+    if mode == 'cpu':
+        import pstats
+        session.dump_stats(str(path))
+        out = io.StringIO()
+        pstats.Stats(str(path), stream=out).sort_stats('cumulative').print_stats(PROFILE_SUMMARY_LINES)
+        summary = [line for line in out.getvalue().splitlines() if line.strip()][-PROFILE_SUMMARY_LINES:]
+    else:
+        session.dump(str(path))
+        summary = [str(stat) for stat in session.statistics('lineno')[:PROFILE_SUMMARY_LINES]]
+    meta = {
+        "name": name, "mode": mode, "target": target, "seconds": round(seconds, 3),
+        "bytes": path.stat().st_size, "created_at": datetime.now(timezone.utc).isoformat(), "summary": summary,
+    }
+    (PROFILE_DIR / f"{name}.json").write_text(json.dumps(meta))
+    
+    artifacts = sorted(p for p in PROFILE_DIR.iterdir() if p.suffix[1:] in PROFILE_MODES.values())
+    for old in artifacts[:-PROFILE_MAX_ARTIFACTS]:
+        old.unlink(missing_ok=True)
+        (PROFILE_DIR / f"{old.name}.json").unlink(missing_ok=True)
+    return meta
+
+
+async def run_profiled(mode: str, target: str, fn, *args, **kwargs):
+    """Await fn(*args) inside a profiling session; runs unprofiled if one of this mode is already active"""
+    import time
+    if mode not in PROFILE_MODES:
+        raise HTTPException(status_code=400, detail=f"Profile mode must be one of {', '.join(PROFILE_MODES)}")
+    if profile_active[mode]:
+        logger.warning(f"[Profile] {mode} session already running - {target} runs unprofiled")
+        return await fn(*args, **kwargs)
+    
+    profile_active[mode] = True
+    started = time.monotonic()
+    if mode == 'cpu':
+        import cProfile
+        session = cProfile.Profile()
+        session.enable()
+    else:
+        import tracemalloc
+        tracemalloc.start(TRACEMALLOC_FRAMES)
+    try:
+        return await fn(*args, **kwargs)
+    finally:
+        seconds = time.monotonic() - started
+        if mode == 'cpu':
+            session.disable()
+        else:
+            session = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+        profile_active[mode] = False
+        try:
+            meta = await run_blocking(save_profile_artifact, mode, target, session, seconds)
+            logger.info(f"[Profile] {target}: {mode} profile saved as {meta['name']} ({seconds:.1f}s)")
+        except Exception as e:
+            logger.error(f"[Profile] Could not save {mode} profile of {target}: {e}")
+
+
+async def take_armed_profile(job: str) -> Optional[str]:
+    """Profile mode for this run of a job, if armed (counts down the remaining runs)"""
+    try:
+        armed = await db.profile_arms.find_one_and_update({"job": job, "runs": {"$gt": 0}}, {"$inc": {"runs": -1}})
+        if armed and armed["runs"] <= 1:
+            await db.profile_arms.delete_one({"job": job, "runs": {"$lte": 0}})
+    except Exception as e:
+        logger.debug(f"[Profile] Could not check profile arm for {job}: {e}")
+        return None
+    return armed["mode"] if armed else None
+
+
+class ProfilingMiddleware:
+    """Profiles requests sent with X-Profile: cpu|memory (or ?_profile=); see /debug/profiles for the result"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        mode = None
+        if scope["type"] == "http":
+            if b"_profile=" in scope.get("query_string", b""):
+                from urllib.parse import parse_qs
+                mode = parse_qs(scope["query_string"].decode("latin-1")).get("_profile", [None])[0]
+            else:
+                mode = next((v.decode("latin-1") for k, v in scope["headers"] if k == b"x-profile"), None)
+        if mode not in PROFILE_MODES:
+            return await self.app(scope, receive, send)
+        
+        target = f"{scope['method']} {scope['path']}"
+        return await run_profiled(mode, target, self.app, scope, receive, send)
+
+
+@api_router.post("/debug/profiles/arm")
+async def arm_job_profile(job: str, mode: str = "cpu", runs: int = 1):
+    """Profile the next `runs` runs of a scheduled/background job (names as in /scheduler/jobs, e.g. process_8pm)"""
+    if mode not in PROFILE_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(PROFILE_MODES)}")
+    armed = {"mode": mode, "runs": max(1, runs), "armed_at": datetime.now(timezone.utc).isoformat()}
+    await db.profile_arms.update_one({"job": job}, {"$set": {"job": job, **armed}}, upsert=True)
+    return {"success": True, "job": job, **armed}
+
+
+@api_router.get("/debug/profiles")
+async def list_profiles():
+    """Saved profile artifacts, newest first, with their top entries"""
+    import json
+    artifacts = []
+    if PROFILE_DIR.exists():
+        for meta_path in sorted(PROFILE_DIR.glob("*.json"), reverse=True):
+            try:
+                artifacts.append(json.loads(meta_path.read_text()))
+            except (OSError, ValueError):
+                continue
+    armed_jobs = {arm.pop("job"): arm for arm in await db.profile_arms.find({}, {"_id": 0}).to_list(100)}
+    return {"armed_jobs": armed_jobs, "active": profile_active, "max_artifacts": PROFILE_MAX_ARTIFACTS,
+            "artifacts": artifacts}
+
+
+@api_router.get("/debug/profiles/{name}")
+async def download_profile(name: str):
+    """Download a .pstats (python -m pstats FILE) or tracemalloc .snapshot (tracemalloc.Snapshot.load)"""
+    from fastapi.responses import FileResponse
+    path = PROFILE_DIR / name
+    if path.parent != PROFILE_DIR or path.suffix[1:] not in PROFILE_MODES.values() or not path.exists():
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=name)
+
+
 def schedule_daily_summary():
     """Schedule the daily summary to run at 11 PM Arizona time"""
     global scheduler
@@ -157,7 +972,7 @@ def schedule_daily_summary():
     try:
         # Activity summary at 10:59 PM Arizona
         scheduler.add_job(
-            send_activity_summary,
+            resource_scheduled('activity_summary', 'http', send_activity_summary),
             trigger=CronTrigger(hour=22, minute=45, timezone='America/Phoenix'),  # 10:45 PM Arizona
             id='activity_summary',
             replace_existing=True
@@ -166,7 +981,7 @@ def schedule_daily_summary():
         
         # Betting summary at 11:00 PM Arizona
         scheduler.add_job(
-            send_daily_summary,
+            resource_scheduled('daily_summary', 'browser', send_daily_summary),  # plays888 daily totals
             trigger=CronTrigger(hour=22, minute=45, timezone='America/Phoenix'),  # 10:45 PM Arizona
             id='daily_summary',
             replace_existing=True
@@ -175,7 +990,7 @@ def schedule_daily_summary():
         
         # Daily cleanup at 9:00 AM Arizona
         scheduler.add_job(
-            daily_cleanup,
+            resource_scheduled('daily_cleanup', 'db', daily_cleanup),
             trigger=CronTrigger(hour=9, minute=0, timezone='America/Phoenix'),  # 9 AM Arizona
             id='daily_cleanup',
             replace_existing=True
@@ -184,7 +999,7 @@ def schedule_daily_summary():
         
         # NBA Opportunities refresh at 10:30 PM Arizona (before sleep mode at 10:45 PM)
         scheduler.add_job(
-            refresh_nba_opportunities_scheduled,
+            resource_scheduled('nba_opportunities_refresh', 'db', refresh_nba_opportunities_scheduled),
             trigger=CronTrigger(hour=22, minute=30, timezone='America/Phoenix'),  # 10:30 PM Arizona
             id='nba_opportunities_refresh',
             replace_existing=True
@@ -197,7 +1012,7 @@ def schedule_daily_summary():
         
         # #1 - 8:00 PM Arizona: Scrape tomorrow's games (opening lines) from ScoresAndOdds
         scheduler.add_job(
-            scrape_tomorrows_opening_lines,
+            resource_scheduled('scrape_tomorrows_opening_lines', 'browser', scrape_tomorrows_opening_lines),
             trigger=CronTrigger(hour=20, minute=0, timezone='America/Phoenix'),  # 8:00 PM Arizona
             id='scrape_tomorrows_opening_lines',
             replace_existing=True
@@ -206,7 +1021,7 @@ def schedule_daily_summary():
         
         # #4, #5, #6 - 5:00 AM Arizona: Morning data refresh
         scheduler.add_job(
-            morning_data_refresh,
+            resource_scheduled('morning_data_refresh', 'browser', morning_data_refresh),
             trigger=CronTrigger(hour=5, minute=0, timezone='America/Phoenix'),  # 5:00 AM Arizona
             id='morning_data_refresh',
             replace_existing=True
@@ -215,7 +1030,7 @@ def schedule_daily_summary():
         
         # NHL 1st Period 0-0 update at 11:00 PM Arizona
         scheduler.add_job(
-            update_nhl_first_period_zeros,
+            resource_scheduled('nhl_first_period_zeros_update', 'http', update_nhl_first_period_zeros),
             trigger=CronTrigger(hour=23, minute=0, timezone='America/Phoenix'),  # 11:00 PM Arizona
             id='nhl_first_period_zeros_update',
             replace_existing=True
@@ -235,7 +1050,7 @@ async def store_opening_line(league: str, date: str, away_team: str, home_team:
     This captures the FIRST line we see for a game.
     """
     try:
-        game_key = f"{league}_{date}_{away_team}_{home_team}".lower().replace(" ", "_")
+        game_key = opening_line_game_key(league, date, away_team, home_team)
         
         # Check if opening line already exists
         existing = await db.opening_lines.find_one({"game_key": game_key}, {"_id": 0})
@@ -254,6 +1069,7 @@ async def store_opening_line(league: str, date: str, away_team: str, home_team:
             "created_at": datetime.now(timezone.utc)
         })
         logger.info(f"Stored opening line for {away_team} @ {home_team}: {line}")
+        await link_game_identity(league, date, away_team, home_team, {"opening_lines": game_key})
         return line
     except Exception as e:
         logger.error(f"Error storing opening line: {e}")
@@ -264,10 +1080,18 @@ async def get_opening_line(league: str, date: str, away_team: str, home_team: st
     Get the stored opening line for a game.
     """
     try:
-        game_key = f"{league}_{date}_{away_team}_{home_team}".lower().replace(" ", "_")
+        game_key = opening_line_game_key(league, date, away_team, home_team)
         existing = await db.opening_lines.find_one({"game_key": game_key}, {"_id": 0})
         if existing:
             return existing.get('opening_line')
+        
+        # Stored under another spelling of the teams? Follow the game identity
+        identity = await db.game_identities.find_one({"game_id": game_identity_id(league, date, away_team, home_team)}, {"_id": 0, "keys.opening_lines": 1})
+        other_keys = [k for k in (identity or {}).get("keys", {}).get("opening_lines", []) if k != game_key]
+        if other_keys:
+            existing = await db.opening_lines.find_one({"game_key": {"$in": other_keys}}, {"_id": 0})
+            if existing:
+                return existing.get('opening_line')
         return None
     except Exception as e:
         logger.error(f"Error getting opening line: {e}")
@@ -395,6 +1219,10 @@ async def monitoring_loop():
     while True:
         loop_iteration += 1
         try:
+            if PROCESS_ROLE == 'worker':
+                # Started/stopped through the API process - follow the stored config while leader
+                monitoring_enabled = is_scheduler_leader and await monitoring_enabled_in_config()
+            
             if monitoring_enabled:
                 # 24/7 monitoring - no sleep hours
                 now_arizona = datetime.now(arizona_tz)
@@ -415,7 +1243,7 @@ async def monitoring_loop():
                 # Run monitoring check - wrapped in its own try/except
                 logger.info(f"[Loop #{loop_iteration}] Starting monitoring cycle...")
                 try:
-                    await run_monitoring_cycle()
+                    await run_with_resource('bet_monitor', 'monitor', run_monitoring_cycle)
                     logger.info(f"[Loop #{loop_iteration}] Monitoring cycle completed successfully")
                     consecutive_errors = 0  # Reset on success
                 except Exception as e:
@@ -482,7 +1310,8 @@ async def cleanup_zombie_browsers():
     import subprocess
     try:
         # Kill any orphaned chromium processes
-        result = subprocess.run(
+        result = await run_blocking(
+            subprocess.run,
             ['pkill', '-9', '-f', 'chromium'],
             capture_output=True,
             timeout=5
@@ -491,17 +1320,17 @@ async def cleanup_zombie_browsers():
             logger.info("[Cleanup] Killed orphaned chromium processes")
         
         # Also kill any playwright processes
-        subprocess.run(['pkill', '-9', '-f', 'playwright'], capture_output=True, timeout=5)
+        await run_blocking(subprocess.run, ['pkill', '-9', '-f', 'playwright'], capture_output=True, timeout=5)
         
         # Kill any node processes that might be stuck
-        subprocess.run(['pkill', '-9', '-f', 'node.*playwright'], capture_output=True, timeout=5)
+        await run_blocking(subprocess.run, ['pkill', '-9', '-f', 'node.*playwright'], capture_output=True, timeout=5)
         
     except subprocess.TimeoutExpired:
         logger.warning("[Cleanup] Timeout killing processes")
     except FileNotFoundError:
         # pkill not available, try alternative
         try:
-            subprocess.run(['killall', '-9', 'chromium'], capture_output=True, timeout=5)
+            await run_blocking(subprocess.run, ['killall', '-9', 'chromium'], capture_output=True, timeout=5)
         except:
             pass
     except Exception as e:
@@ -517,9 +1346,9 @@ async def aggressive_resource_cleanup():
     
     try:
         # Force kill ALL chromium processes
-        subprocess.run(['pkill', '-9', 'chromium'], capture_output=True, timeout=10)
-        subprocess.run(['pkill', '-9', 'chrome'], capture_output=True, timeout=10)
-        subprocess.run(['pkill', '-9', '-f', 'playwright'], capture_output=True, timeout=10)
+        await run_blocking(subprocess.run, ['pkill', '-9', 'chromium'], capture_output=True, timeout=10)
+        await run_blocking(subprocess.run, ['pkill', '-9', 'chrome'], capture_output=True, timeout=10)
+        await run_blocking(subprocess.run, ['pkill', '-9', '-f', 'playwright'], capture_output=True, timeout=10)
         
         # Force Python garbage collection
         gc.collect()
@@ -534,9 +1363,11 @@ async def aggressive_resource_cleanup():
 
 async def run_monitoring_cycle():
     """Run a single monitoring cycle with notifications"""
+    import time
     from zoneinfo import ZoneInfo
     arizona_tz = ZoneInfo('America/Phoenix')
     check_time = datetime.now(arizona_tz)
+    cycle_started = time.monotonic()
     new_bets_found = {"jac075": 0, "jac083": 0}  # Default value
     
     try:
@@ -575,6 +1406,7 @@ async def run_monitoring_cycle():
         
     except Exception as e:
         logger.error(f"Monitoring cycle error: {str(e)}", exc_info=True)
+    observe_metric('monitoring_cycle_seconds', time.monotonic() - cycle_started)
 
 
 async def startup_recovery():
@@ -2307,7 +3139,7 @@ async def get_plays888_daily_totals(username: str, password: str) -> dict:
             return None
         
         # Go to History page
-        await service.page.goto('https://www.plays888.co/wager/History.aspx', timeout=30000)
+        await guarded_goto(service.page, plays888_url('/wager/History.aspx'), timeout=30000)
         await service.page.wait_for_timeout(4000)
         
         # Extract the daily summary table
@@ -2794,16 +3626,16 @@ async def check_results_for_account(conn: dict):
         # Navigate to Bet History / Graded Bets page
         # Common URLs to try: GradedBets.aspx, BetHistory.aspx, History.aspx
         history_urls = [
-            'https://www.plays888.co/wager/GradedBets.aspx',
-            'https://www.plays888.co/wager/BetHistory.aspx',
-            'https://www.plays888.co/wager/History.aspx',
-            'https://www.plays888.co/wager/SettledBets.aspx'
+            plays888_url('/wager/GradedBets.aspx'),
+            plays888_url('/wager/BetHistory.aspx'),
+            plays888_url('/wager/History.aspx'),
+            plays888_url('/wager/SettledBets.aspx')
         ]
         
         page_loaded = False
         for url in history_urls:
             try:
-                await results_service.page.goto(url, timeout=15000)
+                await guarded_goto(results_service.page, url, timeout=15000)
                 await results_service.page.wait_for_timeout(3000)
                 
                 # Check if page has content (not a 404 or redirect)
@@ -3153,6 +3985,48 @@ async def send_result_notification(bet: dict, result: str, win_amount: float, ac
         logger.error(f"Failed to update result in compilation: {str(e)}")
 
 
+# plays888.co, or a local stand-in (plays888_standin.py) for load/latency tests
+PLAYS888_BASE_URL = os.environ.get('PLAYS888_BASE_URL', 'https://www.plays888.co').rstrip('/')
+
+
+def plays888_url(path: str = '') -> str:
+    """Absolute plays888 URL for a path like '/wager/OpenBets.aspx'"""
+    return f"{PLAYS888_BASE_URL}{path}"
+
+
+def plays888_timed(stage: str):
+    """
+    Record a Plays888Service call in plays888_stage_seconds per account (and as a
+    scrape trace); scrapers that set content_loaded_at are also split into
+    <stage>_fetch and <stage>_parse.
+    """
+    import functools
+    
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(self, *args, **kwargs):
+            import time
+            started = time.monotonic()
+            self.content_loaded_at = None
+            league = kwargs.get('league', args[0] if args and stage != 'login' else None)
+            try:
+                async with scrape_trace('plays888', stage, account=self.username, league=league):
+                    try:
+                        return await func(self, *args, **kwargs)
+                    finally:
+                        if self.content_loaded_at:
+                            record_span('parse', self.content_loaded_at)
+            finally:
+                finished = time.monotonic()
+                account = self.username or 'unknown'
+                observe_metric('plays888_stage_seconds', finished - started, account=account, stage=stage)
+                if self.content_loaded_at:
+                    observe_metric('plays888_stage_seconds', self.content_loaded_at - started, account=account, stage=f"{stage}_fetch")
+                    observe_metric('plays888_stage_seconds', finished - self.content_loaded_at, account=account, stage=f"{stage}_parse")
+        return wrapper
+    return decorator
+
+
 # Playwright automation service
 class Plays888Service:
     def __init__(self):
@@ -3160,6 +4034,8 @@ class Plays888Service:
         self.context = None
         self.page = None
         self.playwright = None
+        self.username = None  # account label for plays888_stage_seconds
+        self.content_loaded_at = None  # set by scrapers once the page text is in hand
         
     async def initialize(self):
         try:
@@ -3239,7 +4115,9 @@ class Plays888Service:
         await self.close()
         return False  # Don't suppress exceptions
     
+    @plays888_timed('login')
     async def login(self, username: str, password: str) -> Dict[str, Any]:
+        self.username = username
         try:
             await self.initialize()
             
@@ -3247,7 +4125,7 @@ class Plays888Service:
                 return {"success": False, "message": "Failed to initialize browser"}
             
             logger.info(f"Navigating to plays888.co for user {username}")
-            await self.page.goto('https://www.plays888.co', timeout=30000)
+            await guarded_goto(self.page, plays888_url(), timeout=30000)
             
             # Wait for page to load
             await self.page.wait_for_timeout(2000)
@@ -3305,7 +4183,7 @@ class Plays888Service:
         try:
             # This is a mock implementation - actual implementation would scrape the site
             # Navigate to sports betting page
-            await self.page.goto('https://www.plays888.co/Deportes.html', timeout=30000)
+            await guarded_goto(self.page, plays888_url('/Deportes.html'), timeout=30000)
             await self.page.wait_for_timeout(2000)
             
             # Mock opportunities for demo - American odds
@@ -3347,7 +4225,7 @@ class Plays888Service:
             logger.info(f"Placing bet: {game} - {bet_type} {line} @ {odds} for ${wager}")
             
             # Step 1: Navigate to plays888.co (should already be logged in)
-            await self.page.goto('https://www.plays888.co/wager/Welcome.aspx', timeout=30000)
+            await guarded_goto(self.page, plays888_url('/wager/Welcome.aspx'), timeout=30000)
             await self.page.wait_for_load_state('networkidle')
             await self.page.wait_for_timeout(2000)
             
@@ -3601,12 +4479,14 @@ class Plays888Service:
             await self.page.screenshot(path="/tmp/error.png")
             return {"success": False, "message": f"Error: {str(e)}", "screenshot": "/tmp/error.png"}
 
+    @plays888_timed('totals')
     async def scrape_totals(self, league: str = "NBA") -> List[Dict[str, Any]]:
         """
         Scrape over/under totals from plays888.co for a specific league
         Returns list of games with team names and total lines
         """
         import re
+        import time
         
         try:
             if not self.page:
@@ -3616,7 +4496,7 @@ class Plays888Service:
             logger.info(f"Scraping {league} totals from plays888.co")
             
             # Navigate directly to the CreateSports page (Straight bets)
-            await self.page.goto('https://www.plays888.co/wager/CreateSports.aspx?WT=0', timeout=30000)
+            await guarded_goto(self.page, plays888_url('/wager/CreateSports.aspx?WT=0'), timeout=30000)
             await self.page.wait_for_load_state('networkidle')
             await self.page.wait_for_timeout(2000)
             
@@ -3708,6 +4588,7 @@ class Plays888Service:
             
             # Get page text for parsing
             page_text = await self.page.inner_text('body')
+            self.content_loaded_at = time.monotonic()
             
             # Check if error message appeared
             if "select at least one League" in page_text:
@@ -3773,12 +4654,14 @@ class Plays888Service:
             traceback.print_exc()
             return []
 
+    @plays888_timed('open_bets')
     async def scrape_open_bets(self) -> List[Dict[str, Any]]:
         """
         Scrape open/pending bets from plays888.co
         Returns list of open bets with game info and bet type (over/under)
         """
         import re
+        import time
         
         # List of official NHL teams to filter out non-NHL hockey leagues
         NHL_TEAMS = [
@@ -3837,12 +4720,13 @@ class Plays888Service:
             logger.info("Scraping open bets from plays888.co")
             
             # Navigate to Open Bets page
-            await self.page.goto('https://www.plays888.co/wager/OpenBets.aspx', timeout=30000)
+            await guarded_goto(self.page, plays888_url('/wager/OpenBets.aspx'), timeout=30000)
             await self.page.wait_for_load_state('networkidle')
             await self.page.wait_for_timeout(2000)
             
             # Get page content
             page_text = await self.page.inner_text('body')
+            self.content_loaded_at = time.monotonic()
             
             # Parse open bets - collect raw bets first
             raw_bets = []
@@ -4156,6 +5040,7 @@ class Plays888Service:
             traceback.print_exc()
             return []
 
+    @plays888_timed('settled_bets')
     async def scrape_settled_bets_with_lines(self, league: str = "NBA") -> List[Dict[str, Any]]:
         """
         Scrape settled/graded bets from plays888.co History page
@@ -4163,6 +5048,7 @@ class Plays888Service:
         This is crucial for tracking what line the user bet at vs the closing line
         """
         import re
+        import time
         
         # Team lists for filtering
         NBA_TEAMS = ['ATLANTA HAWKS', 'BOSTON CELTICS', 'BROOKLYN NETS', 'CHARLOTTE HORNETS',
@@ -4214,12 +5100,13 @@ class Plays888Service:
             logger.info(f"Scraping settled bets with lines for {league}")
             
             # Navigate to History page (contains settled bets with original lines)
-            await self.page.goto('https://www.plays888.co/wager/History.aspx', timeout=30000)
+            await guarded_goto(self.page, plays888_url('/wager/History.aspx'), timeout=30000)
             await self.page.wait_for_load_state('networkidle')
             await self.page.wait_for_timeout(3000)
             
             # Get page text
             page_text = await self.page.inner_text('body')
+            self.content_loaded_at = time.monotonic()
             
             # Parse settled bets - look for TOTAL lines with results
             settled_bets = []
@@ -4297,97 +5184,623 @@ class Plays888Service:
             return []
 
 
-async def scrape_scoresandodds(league: str, date_str: str) -> List[Dict[str, Any]]:
+# ============================================================================
+# OUTBOUND FETCH GUARD - Per-host rate limiting and circuit breaking
+# ============================================================================
+# Every page.goto / httpx GET to an external site goes through guarded_goto /
+# guarded_get. Each host gets a token bucket (HOST_RATE_LIMITS) and a circuit
+# breaker: after BREAKER_FAILURE_THRESHOLD consecutive failures (exception,
+# HTTP 429 or 5xx) the breaker opens and calls fail immediately with
+# SourceUnavailableError instead of waiting out 30-60s timeouts. After the
+# cooldown one probe request is let through (half-open); success closes the
+# breaker, failure re-opens it with a longer cooldown.
+
+# host -> (requests per second, burst)
+HOST_RATE_LIMITS = {
+    'www.plays888.co': (2.0, 5),
+    'www.cbssports.com': (4.0, 8),
+    'contests.covers.com': (1.0, 3),
+    'www.scoresandodds.com': (1.0, 3),
+    'www.teamrankings.com': (1.0, 3),
+    'api-web.nhle.com': (5.0, 10),
+}
+# a PLAYS888_BASE_URL stand-in is throttled like the real site
+HOST_RATE_LIMITS.setdefault(httpx.URL(PLAYS888_BASE_URL).host, HOST_RATE_LIMITS['www.plays888.co'])
+DEFAULT_HOST_RATE_LIMIT = (1.0, 3)
+BREAKER_FAILURE_THRESHOLD = 5
+BREAKER_COOLDOWN_SECONDS = 60
+BREAKER_MAX_COOLDOWN_SECONDS = 600
+
+
+class SourceUnavailableError(Exception):
+    """Raised without contacting the host while its circuit breaker is open"""
+
+
+class HostGuard:
+    """Token bucket + circuit breaker for one external host"""
+
+    def __init__(self, host: str):
+        import time
+        self.host = host
+        self.rate, self.burst = HOST_RATE_LIMITS.get(host, DEFAULT_HOST_RATE_LIMIT)
+        self.tokens = float(self.burst)
+        self.refilled_at = time.monotonic()
+        self.lock = asyncio.Lock()
+        self.state = "closed"  # closed | open | half_open
+        self.consecutive_failures = 0
+        self.cooldown = BREAKER_COOLDOWN_SECONDS
+        self.opened_at = None
+        self.probe_in_flight = False
+        self.requests = 0
+        self.failures = 0
+        self.fast_failures = 0
+        self.last_error = None
+
+    async def acquire_token(self):
+        import time
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.refilled_at) * self.rate)
+                self.refilled_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def before_request(self) -> bool:
+        """Check the breaker; returns True if this request is the half-open probe"""
+        import time
+        if self.state == "open":
+            if time.monotonic() - self.opened_at < self.cooldown:
+                self.fast_failures += 1
+                raise SourceUnavailableError(f"{self.host} circuit open ({self.last_error}), retry in {self.cooldown - (time.monotonic() - self.opened_at):.0f}s")
+            self.state = "half_open"
+        if self.state == "half_open":
+            if self.probe_in_flight:
+                self.fast_failures += 1
+                raise SourceUnavailableError(f"{self.host} circuit half-open, probe in progress")
+            self.probe_in_flight = True
+            return True
+        return False
+
+    def record_success(self, probe: bool):
+        if probe:
+            self.probe_in_flight = False
+            logger.info(f"[Circuit] {self.host}: probe succeeded, closing breaker")
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.cooldown = BREAKER_COOLDOWN_SECONDS
+
+    def record_failure(self, probe: bool, error: str):
+        import time
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_error = error[:200]
+        if probe:
+            self.probe_in_flight = False
+            self.cooldown = min(self.cooldown * 2, BREAKER_MAX_COOLDOWN_SECONDS)
+        if probe or self.consecutive_failures >= BREAKER_FAILURE_THRESHOLD:
+            if self.state != "open":
+                logger.warning(f"[Circuit] {self.host}: opening breaker for {self.cooldown}s after {self.consecutive_failures} failures ({self.last_error})")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def status(self) -> Dict[str, Any]:
+        import time
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "requests": self.requests,
+            "failures": self.failures,
+            "fast_failures": self.fast_failures,
+            "cooldown_seconds": self.cooldown,
+            "reopens_in_seconds": round(max(0, self.cooldown - (time.monotonic() - self.opened_at)), 1) if self.state == "open" else None,
+            "tokens": round(self.tokens, 2),
+            "rate_per_second": self.rate,
+            "last_error": self.last_error,
+        }
+
+
+host_guards: Dict[str, HostGuard] = {}
+
+
+def get_host_guard(url: str) -> HostGuard:
+    from urllib.parse import urlparse
+    host = urlparse(url).hostname or url
+    guard = host_guards.get(host)
+    if guard is None:
+        guard = HostGuard(host)
+        host_guards[host] = guard
+    return guard
+
+
+async def guarded_fetch(url: str, fetch, status_of=None):
     """
-    Scrape game data from scoresandodds.com for a specific league and date
-    Uses Playwright for dynamic content scraping
-    
-    Args:
-        league: 'NBA', 'NHL', or 'NFL'
-        date_str: Date in 'YYYY-MM-DD' format
-    
-    Returns:
-        List of games with teams, total lines, and final scores (if available)
+    Run `fetch()` (a coroutine factory hitting `url`) under the host's breaker and
+    token bucket. `status_of(result)` gives the HTTP status used to detect 429/5xx.
     """
-    import re
-    from playwright.async_api import async_playwright
-    
-    # Build URL
-    league_paths = {
-        'NBA': 'nba',
-        'NHL': 'nhl',
-        'NFL': 'nfl',
-        'NCAAB': 'ncaab'
-    }
-    league_path = league_paths.get(league.upper(), 'nba')
-    url = f"https://www.scoresandodds.com/{league_path}?date={date_str}"
-    
-    logger.info(f"Scraping scoresandodds.com: {url}")
-    
-    # Team name normalization for matching
-    team_name_map = {
-        # NBA
-        'CAVALIERS': 'Cleveland', 'CAVS': 'Cleveland', 'CLEVELAND': 'Cleveland',
-        'KNICKS': 'New York', 'NEW YORK': 'New York',
-        'SPURS': 'San Antonio', 'SAN ANTONIO': 'San Antonio',
-        'THUNDER': 'Okla City', 'OKLAHOMA CITY': 'Okla City', 'OKC': 'Okla City',
-        'MAVERICKS': 'Dallas', 'DALLAS': 'Dallas', 'MAVS': 'Dallas',
-        'WARRIORS': 'Golden State', 'GOLDEN STATE': 'Golden State', 'GSW': 'Golden State',
-        'ROCKETS': 'Houston', 'HOUSTON': 'Houston',
-        'LAKERS': 'LA Lakers', 'LOS ANGELES LAKERS': 'LA Lakers', 'LAL': 'LA Lakers',
-        'TIMBERWOLVES': 'Minnesota', 'MINNESOTA': 'Minnesota', 'WOLVES': 'Minnesota',
-        'NUGGETS': 'Denver', 'DENVER': 'Denver',
-        'CELTICS': 'Boston', 'BOSTON': 'Boston',
-        '76ERS': 'Philadelphia', 'SIXERS': 'Philadelphia', 'PHILADELPHIA': 'Philadelphia',
-        'PACERS': 'Indiana', 'INDIANA': 'Indiana',
-        'NETS': 'Brooklyn', 'BROOKLYN': 'Brooklyn',
-        'MAGIC': 'Orlando', 'ORLANDO': 'Orlando',
-        'HORNETS': 'Charlotte', 'CHARLOTTE': 'Charlotte',
-        'BUCKS': 'Milwaukee', 'MILWAUKEE': 'Milwaukee',
-        'RAPTORS': 'Toronto', 'TORONTO': 'Toronto',
-        'HEAT': 'Miami', 'MIAMI': 'Miami',
-        'HAWKS': 'Atlanta', 'ATLANTA': 'Atlanta',
-        'BULLS': 'Chicago', 'CHICAGO': 'Chicago',
-        'GRIZZLIES': 'Memphis', 'MEMPHIS': 'Memphis',
-        'PISTONS': 'Detroit', 'DETROIT': 'Detroit',
-        'CLIPPERS': 'LA Clippers', 'LOS ANGELES CLIPPERS': 'LA Clippers', 'LAC': 'LA Clippers',
-        'SUNS': 'Phoenix', 'PHOENIX': 'Phoenix',
-        'KINGS': 'Sacramento', 'SACRAMENTO': 'Sacramento',
-        'BLAZERS': 'Portland', 'TRAIL BLAZERS': 'Portland', 'PORTLAND': 'Portland',
-        'JAZZ': 'Utah', 'UTAH': 'Utah',
-        'PELICANS': 'New Orleans', 'NEW ORLEANS': 'New Orleans',
-        'WIZARDS': 'Washington', 'WASHINGTON': 'Washington',
-    }
-    
-    def normalize_team(name):
-        if not name:
-            return name
-        name_upper = name.upper().strip()
-        for key, val in team_name_map.items():
-            if key in name_upper:
-                return val
-        return name.strip()
-    
+    guard = get_host_guard(url)
+    probe = guard.before_request()
     try:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            page = await browser.new_page()
-            
-            await page.goto(url, timeout=30000)
-            await page.wait_for_load_state('networkidle')
-            await page.wait_for_timeout(2000)
-            
-            games = []
-            
-            # Get all game rows from the page
-            # scoresandodds.com has event-card elements for each game
-            game_elements = await page.query_selector_all('[class*="event-card"]')
-            
-            # Extract team names from data-abbr attributes
-            team_abbrs = await page.evaluate('''() => {
-                const abbrs = [];
-                document.querySelectorAll('[data-abbr]').forEach(el => {
-                    const abbr = el.getAttribute('data-abbr');
+        await guard.acquire_token()
+        guard.requests += 1
+        result = await fetch()
+    except asyncio.CancelledError:
+        if probe:
+            guard.probe_in_flight = False
+        raise
+    except Exception as e:
+        guard.record_failure(probe, f"{type(e).__name__}: {e}")
+        raise
+    status = status_of(result) if status_of and result is not None else None
+    if status is not None and (status == 429 or status >= 500):
+        guard.record_failure(probe, f"HTTP {status}")
+    else:
+        guard.record_success(probe)
+    return result
+
+
+async def timed_fetch(url: str, method: str, fetch):
+    """Run fetch() and record it in scraper_page_ready_seconds"""
+    import time
+    started = time.monotonic()
+    try:
+        return await fetch()
+    finally:
+        observe_metric('scraper_page_ready_seconds', time.monotonic() - started, host=get_host_guard(url).host, method=method)
+        record_span(method, started, url)
+
+
+async def guarded_goto(page, url: str, **kwargs):
+    """page.goto through the outbound guard (or the fixture route, see SCRAPER FIXTURES)"""
+    if scrape_fixtures["mode"] != 'off':
+        await route_page_through_fixtures(page)
+        if scrape_fixtures["mode"] == 'replay':
+            return await timed_fetch(url, 'goto', lambda: page.goto(url, **kwargs))
+    return await guarded_fetch(url, lambda: timed_fetch(url, 'goto', lambda: page.goto(url, **kwargs)),
+                               status_of=lambda response: response.status)
+
+
+async def guarded_get(client, url: str, **kwargs):
+    """httpx client.get through the outbound guard (or from fixtures, see SCRAPER FIXTURES)"""
+    if scrape_fixtures["mode"] == 'replay':
+        return await timed_fetch(url, 'get', lambda: replay_http_fixture(url, kwargs.get('params')))
+    response = await guarded_fetch(url, lambda: timed_fetch(url, 'get', lambda: client.get(url, **kwargs)),
+                                   status_of=lambda response: response.status_code)
+    if scrape_fixtures["mode"] == 'record':
+        await run_blocking(save_fixture, 'GET', str(response.url), response.status_code,
+                           response.headers.get('content-type', ''), response.content)
+    return response
+
+
+# ============================================================================
+# SCRAPE TRACING - per-step spans for CBS / Covers / ScoresAndOdds / plays888
+# ============================================================================
+# Each single-flight scrape and each Plays888Service call runs in a trace
+# tagged with source, league and date. Page steps (wait_for_load_state,
+# wait_for_timeout, evaluate, inner_text, ...) and guarded goto/GET become spans
+# while a trace is active; time not covered by a span is parsing/processing.
+# Traces go to the capped db.scrape_traces collection; /debug/traces shows the
+# slowest ones per source with a navigation / rendering / extraction / parse
+# breakdown.
+
+SCRAPE_TRACE_COLLECTION_BYTES = 32 * 1024 * 1024
+SCRAPE_TRACE_MAX_SPANS = 300
+PAGE_SPAN_CATEGORIES = {
+    'goto': 'navigation', 'get': 'navigation', 'wait_for_load_state': 'navigation', 'wait_for_url': 'navigation',
+    'wait_for_timeout': 'rendering', 'wait_for_selector': 'rendering',
+    'evaluate': 'extraction', 'inner_text': 'extraction', 'content': 'extraction',
+    'query_selector': 'extraction', 'query_selector_all': 'extraction',
+    'click': 'interaction', 'fill': 'interaction',
+    'parse': 'parse',
+}
+TRACED_PAGE_METHODS = [m for m in PAGE_SPAN_CATEGORIES if m not in ('goto', 'get', 'parse')]  # goto/get: see timed_fetch
+
+current_scrape_trace = contextvars.ContextVar('current_scrape_trace', default=None)
+scrape_trace_writes: set = set()  # pending store_scrape_trace tasks (the loop only keeps weak references)
+
+
+def record_span(name: str, started: float, detail: Any = None):
+    """Add a span (started = time.monotonic() at its start) to the active trace, if any"""
+    import time
+    trace = current_scrape_trace.get()
+    if trace is None or len(trace["spans"]) >= SCRAPE_TRACE_MAX_SPANS:
+        return
+    span = {
+        "name": name,
+        "category": PAGE_SPAN_CATEGORIES.get(name, "other"),
+        "start_ms": round((started - trace["t0"]) * 1000, 1),
+        "duration_ms": round((time.monotonic() - started) * 1000, 1),
+    }
+    if detail is not None:
+        span["detail"] = str(detail)[:120]
+    trace["spans"].append(span)
+
+
+@asynccontextmanager
+async def scrape_trace(source: str, name: str, **tags):
+    """Trace one scrape; stored (in the background) when the block exits"""
+    import time
+    trace = {"source": source, "name": name, "tags": {k: v for k, v in tags.items() if v}, "spans": [],
+             "t0": time.monotonic(), "started_at": datetime.now(timezone.utc)}
+    token = current_scrape_trace.set(trace)
+    status = "ok"
+    try:
+        yield trace
+    except BaseException as e:
+        status = "cancelled" if isinstance(e, asyncio.CancelledError) else "error"
+        trace["error"] = f"{type(e).__name__}: {e}"[:200]
+        raise
+    finally:
+        current_scrape_trace.reset(token)
+        trace["duration_ms"] = round((time.monotonic() - trace.pop("t0")) * 1000, 1)
+        trace["status"] = status
+        task = asyncio.ensure_future(store_scrape_trace(trace))
+        scrape_trace_writes.add(task)
+        task.add_done_callback(scrape_trace_writes.discard)
+
+
+async def store_scrape_trace(trace: Dict[str, Any]):
+    breakdown: Dict[str, float] = {}
+    for span in trace["spans"]:
+        breakdown[span["category"]] = round(breakdown.get(span["category"], 0) + span["duration_ms"], 1)
+    covered = sum(breakdown.values())
+    if "parse" not in breakdown:
+        breakdown["parse"] = round(max(0.0, trace["duration_ms"] - covered), 1)  # whatever isn't a page step
+    trace["breakdown"] = breakdown
+    try:
+        await db.scrape_traces.insert_one(trace)
+    except Exception as e:
+        logger.debug(f"[Trace] Could not store trace {trace['source']}/{trace['name']}: {e}")
+
+
+def traced_page_method(method: str, original):
+    import functools
+    
+    @functools.wraps(original)
+    async def traced(self, *args, **kwargs):
+        if current_scrape_trace.get() is None:
+            return await original(self, *args, **kwargs)
+        import time
+        started = time.monotonic()
+        try:
+            return await original(self, *args, **kwargs)
+        finally:
+            record_span(method, started, args[0] if args else None)
+    traced.traces_spans = True
+    return traced
+
+
+def install_page_tracing():
+    """Wrap Playwright Page step methods so they record spans inside a scrape_trace"""
+    from playwright.async_api import Page
+    for method in TRACED_PAGE_METHODS:
+        original = getattr(Page, method)
+        if not getattr(original, 'traces_spans', False):
+            setattr(Page, method, traced_page_method(method, original))
+
+
+async def ensure_scrape_trace_collection():
+    install_page_tracing()
+    try:
+        if "scrape_traces" not in await db.list_collection_names():
+            await db.create_collection("scrape_traces", capped=True, size=SCRAPE_TRACE_COLLECTION_BYTES)
+        await db.scrape_traces.create_index([("source", 1), ("started_at", -1)])
+    except Exception as e:
+        logger.error(f"Error creating scrape trace collection: {e}")
+
+
+@api_router.get("/debug/traces")
+async def get_slowest_traces(source: str = None, hours: int = 24, limit: int = 10, league: str = None):
+    """Slowest scrape traces in the window (spans included) and the average step breakdown per source"""
+    query = {"started_at": {"$gte": datetime.now(timezone.utc) - timedelta(hours=hours)}}
+    if source:
+        query["source"] = source
+    if league:
+        query["tags.league"] = league.upper()
+    slowest = await db.scrape_traces.find(query, {"_id": 0}).sort("duration_ms", -1).to_list(min(limit, 100))
+    
+    averages = {}
+    async for trace in db.scrape_traces.find(query, {"_id": 0, "source": 1, "duration_ms": 1, "breakdown": 1}):
+        entry = averages.setdefault(trace["source"], {"traces": 0, "total_ms": 0.0, "breakdown_ms": {}})
+        entry["traces"] += 1
+        entry["total_ms"] += trace.get("duration_ms", 0)
+        for category, ms in trace.get("breakdown", {}).items():
+            entry["breakdown_ms"][category] = entry["breakdown_ms"].get(category, 0) + ms
+    for entry in averages.values():
+        count = entry.pop("traces")
+        entry["traces"] = count
+        entry["avg_ms"] = round(entry.pop("total_ms") / count, 1)
+        entry["avg_breakdown_ms"] = {k: round(v / count, 1) for k, v in sorted(entry.pop("breakdown_ms").items())}
+    return {"window_hours": hours, "by_source": averages, "slowest": slowest}
+
+
+# ============================================================================
+# SCRAPER FIXTURES - record live responses, replay them offline
+# ============================================================================
+# SCRAPE_FIXTURES_MODE=record saves every scraper response (httpx GETs through
+# guarded_get; Playwright documents, XHR/fetch and scripts through a page route)
+# under SCRAPE_FIXTURES_DIR/<set>/<host>/. With =replay the same paths are
+# served from those files - no network, no rate limiting - so parsers, the
+# plays888 page JS and whole refresh pipelines can be run and benchmarked
+# offline (point DB_NAME at a scratch database). A missing fixture fails like
+# an unavailable source. Mode and set can also be switched at /debug/fixtures.
+
+SCRAPE_FIXTURES_DIR = Path(os.environ.get('SCRAPE_FIXTURES_DIR', str(ROOT_DIR / 'fixtures')))
+SCRAPE_FIXTURE_MODES = ('off', 'record', 'replay')
+SCRAPE_FIXTURE_RESOURCE_TYPES = {'document', 'xhr', 'fetch', 'script'}
+
+scrape_fixtures = {
+    "mode": os.environ.get('SCRAPE_FIXTURES_MODE', 'off'),
+    "set": os.environ.get('SCRAPE_FIXTURES_SET', 'default'),
+    "recorded": 0, "replayed": 0, "missing": 0,
+}
+fixture_routed_pages = weakref.WeakSet()
+
+
+def fixture_path(method: str, url: str) -> Path:
+    import hashlib
+    import re
+    from urllib.parse import urlparse
+    parsed = urlparse(url)
+    slug = re.sub(r'[^A-Za-z0-9]+', '_', f"{parsed.path}_{parsed.query}").strip('_')[:80] or 'root'
+    digest = hashlib.sha1(f"{method} {url}".encode()).hexdigest()[:10]
+    return SCRAPE_FIXTURES_DIR / scrape_fixtures["set"] / (parsed.hostname or 'unknown') / f"{method}_{slug}_{digest}.json"
+
+
+def save_fixture(method: str, url: str, status: int, content_type: str, body: bytes):
+    import json
+    path = fixture_path(method, url)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    try:
+        payload, encoding = body.decode('utf-8'), 'utf-8'
+    except UnicodeDecodeError:
+        payload, encoding = base64.b64encode(body).decode(), 'base64'
+    path.write_text(json.dumps({
+        "method": method, "url": url, "status": status, "content_type": content_type,
+        "encoding": encoding, "body": payload, "recorded_at": datetime.now(timezone.utc).isoformat(),
+    }))
+    scrape_fixtures["recorded"] += 1
+
+
+def load_fixture(method: str, url: str) -> Optional[Dict[str, Any]]:
+    """Fixture with body decoded to bytes, or None"""
+    import json
+    path = fixture_path(method, url)
+    if not path.exists():
+        scrape_fixtures["missing"] += 1
+        logger.warning(f"[Fixtures] No {scrape_fixtures['set']} fixture for {method} {url}")
+        return None
+    fixture = json.loads(path.read_text())
+    fixture["body"] = base64.b64decode(fixture["body"]) if fixture["encoding"] == 'base64' else fixture["body"].encode('utf-8')
+    scrape_fixtures["replayed"] += 1
+    return fixture
+
+
+async def replay_http_fixture(url: str, params=None) -> httpx.Response:
+    full_url = str(httpx.URL(url, params=params) if params else httpx.URL(url))
+    fixture = await run_blocking(load_fixture, 'GET', full_url)
+    if fixture is None:
+        raise SourceUnavailableError(f"No fixture for {full_url} (replay mode)")
+    return httpx.Response(fixture["status"], headers={"content-type": fixture["content_type"] or "text/html"},
+                          content=fixture["body"], request=httpx.Request('GET', full_url))
+
+
+async def handle_fixture_route(route):
+    request = route.request
+    if request.resource_type not in SCRAPE_FIXTURE_RESOURCE_TYPES:
+        # images/fonts/styles: not needed to parse, never recorded
+        return await (route.abort() if scrape_fixtures["mode"] == 'replay' else route.continue_())
+    if scrape_fixtures["mode"] == 'record':
+        response = await route.fetch()
+        body = await response.body()
+        await run_blocking(save_fixture, request.method, request.url, response.status,
+                           response.headers.get('content-type', ''), body)
+        return await route.fulfill(response=response, body=body)
+    if scrape_fixtures["mode"] == 'replay':
+        fixture = await run_blocking(load_fixture, request.method, request.url)
+        if fixture is None:
+            if request.resource_type == 'document':
+                return await route.fulfill(status=404, body=f"No fixture for {request.url}")
+            return await route.abort()
+        return await route.fulfill(status=fixture["status"], content_type=fixture["content_type"] or None,
+                                   body=fixture["body"])
+    return await route.continue_()
+
+
+async def route_page_through_fixtures(page):
+    """Install the record/replay route on a page (once per page)"""
+    if page in fixture_routed_pages:
+        return
+    fixture_routed_pages.add(page)
+    await page.route("**/*", handle_fixture_route)
+
+
+@api_router.get("/debug/fixtures")
+async def get_scrape_fixtures():
+    """Fixture mode/set and the recorded sets with file counts per host"""
+    sets = {}
+    if SCRAPE_FIXTURES_DIR.exists():
+        for set_dir in sorted(p for p in SCRAPE_FIXTURES_DIR.iterdir() if p.is_dir()):
+            sets[set_dir.name] = {host.name: len(list(host.glob("*.json"))) for host in sorted(set_dir.iterdir()) if host.is_dir()}
+    return {**scrape_fixtures, "dir": str(SCRAPE_FIXTURES_DIR), "sets": sets}
+
+
+@api_router.post("/debug/fixtures/mode")
+async def set_scrape_fixture_mode(mode: str, fixture_set: str = None):
+    """Switch record/replay/off (and the fixture set, e.g. a date) for this process"""
+    import re
+    if mode not in SCRAPE_FIXTURE_MODES:
+        raise HTTPException(status_code=400, detail=f"mode must be one of {', '.join(SCRAPE_FIXTURE_MODES)}")
+    if fixture_set:
+        if not re.fullmatch(r'[A-Za-z0-9_.-]+', fixture_set):
+            raise HTTPException(status_code=400, detail="Invalid fixture set name")
+        scrape_fixtures["set"] = fixture_set
+    scrape_fixtures["mode"] = mode
+    clear_scrape_results()  # don't hand out live results in replay (or replayed ones afterwards)
+    logger.info(f"[Fixtures] Mode {mode}, set {scrape_fixtures['set']}")
+    return {"success": True, "mode": mode, "set": scrape_fixtures["set"]}
+
+
+# ============================================================================
+# SCRAPE SINGLE-FLIGHT - Coalesce concurrent scrapes of the same page
+# ============================================================================
+# Refresh Lines, Refresh Opportunities, the score updaters and the scheduled jobs
+# can all ask for the same CBS/Covers/ScoresAndOdds page for the same date within
+# minutes (frontend clicks overlap the jobs). Scrapers decorated with
+# @single_flight_scrape share one in-flight fetch per (source, league, date), and
+# a non-empty result is reused for SCRAPE_SINGLE_FLIGHT_TTL_SECONDS. Every caller
+# gets its own copy, since callers mutate the scraped game dicts.
+
+SCRAPE_SINGLE_FLIGHT_TTL_SECONDS = 90
+scrape_inflight: Dict[Tuple[str, str, str], asyncio.Future] = {}
+scrape_recent_results: Dict[Tuple[str, str, str], Dict[str, Any]] = {}
+scrape_single_flight_stats = {"fetches": 0, "coalesced": 0, "ttl_hits": 0}
+
+
+def single_flight_scrape(source: str, league: str = None):
+    """
+    Decorator for scrapers taking a league (unless fixed by `league`) and a date
+    (target_date / date_str / date argument).
+    """
+    import functools
+    import inspect
+    
+    def decorator(func):
+        signature = inspect.signature(func)
+        date_param = next((p for p in ('target_date', 'date_str', 'date') if p in signature.parameters), None)
+        
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            import copy
+            import time
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = (source, (league or str(bound.arguments.get('league', ''))).upper(), str(bound.arguments.get(date_param, '')))
+            
+            cached = scrape_recent_results.get(key)
+            if cached and time.monotonic() - cached["at"] < SCRAPE_SINGLE_FLIGHT_TTL_SECONDS:
+                scrape_single_flight_stats["ttl_hits"] += 1
+                logger.info(f"[Single-Flight] {key}: reusing result from {time.monotonic() - cached['at']:.0f}s ago")
+                return copy.deepcopy(cached["result"])
+            
+            inflight = scrape_inflight.get(key)
+            if inflight is not None:
+                scrape_single_flight_stats["coalesced"] += 1
+                logger.info(f"[Single-Flight] {key}: joining in-flight scrape")
+                try:
+                    return copy.deepcopy(await asyncio.shield(inflight))
+                except asyncio.CancelledError:
+                    if not inflight.cancelled():
+                        raise
+                    # The leading fetch was cancelled (e.g. it lost a hedged race) - fetch ourselves
+                    logger.info(f"[Single-Flight] {key}: in-flight scrape was cancelled, fetching")
+            
+            future = asyncio.get_running_loop().create_future()
+            scrape_inflight[key] = future
+            scrape_single_flight_stats["fetches"] += 1
+            started = time.monotonic()
+            try:
+                async with scrape_trace(source, func.__name__, league=key[1], date=key[2]):
+                    result = await func(*args, **kwargs)
+            except BaseException as e:
+                if isinstance(e, Exception):
+                    future.set_exception(e)
+                    future.exception()  # waiters re-raise it; don't warn about it being unretrieved
+                else:
+                    future.cancel()
+                raise
+            finally:
+                scrape_inflight.pop(key, None)
+            
+            observe_metric('scrape_duration_seconds', time.monotonic() - started, source=source)
+            inc_metric('scrape_games_parsed_total', len(result) if isinstance(result, list) else 0, source=source, league=key[1])
+            
+            snapshot = copy.deepcopy(result)
+            future.set_result(snapshot)
+            if result:
+                remember_scrape_result(key, snapshot)
+            return result
+        
+        return wrapper
+    return decorator
+
+
+def remember_scrape_result(key: Tuple[str, str, str], result: Any):
+    """Keep a result for reuse and drop the expired ones (entries stay in the order they were stored)"""
+    import time
+    now = time.monotonic()
+    scrape_recent_results.pop(key, None)
+    for old_key, entry in list(scrape_recent_results.items()):
+        if now - entry["at"] < SCRAPE_SINGLE_FLIGHT_TTL_SECONDS:
+            break
+        del scrape_recent_results[old_key]
+    scrape_recent_results[key] = {"result": result, "at": now}
+
+
+def clear_scrape_results(source: str = None):
+    """Drop reusable scrape results (all, or one source's)"""
+    for key in [k for k in scrape_recent_results if source is None or k[0] == source]:
+        scrape_recent_results.pop(key, None)
+
+
+@single_flight_scrape('scoresandodds')
+async def scrape_scoresandodds(league: str, date_str: str) -> List[Dict[str, Any]]:
+    """
+    Scrape game data from scoresandodds.com for a specific league and date
+    Uses Playwright for dynamic content scraping
+    
+    Args:
+        league: 'NBA', 'NHL', or 'NFL'
+        date_str: Date in 'YYYY-MM-DD' format
+    
+    Returns:
+        List of games with teams, total lines, and final scores (if available)
+    """
+    import re
+    from playwright.async_api import async_playwright
+    
+    # Build URL
+    league_paths = {
+        'NBA': 'nba',
+        'NHL': 'nhl',
+        'NFL': 'nfl',
+        'NCAAB': 'ncaab'
+    }
+    league_path = league_paths.get(league.upper(), 'nba')
+    url = f"https://www.scoresandodds.com/{league_path}?date={date_str}"
+    
+    logger.info(f"Scraping scoresandodds.com: {url}")
+    
+    # Team name normalization for matching (shared alias index)
+    team_index = get_team_index(league)
+    
+    def normalize_team(name):
+        if not name:
+            return name
+        return team_index.normalize(name, source='scoresandodds')
+    
+    try:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            page = await browser.new_page()
+            
+            await guarded_goto(page, url, timeout=30000)
+            await page.wait_for_load_state('networkidle')
+            await page.wait_for_timeout(2000)
+            
+            games = []
+            
+            # Get all game rows from the page
+            # scoresandodds.com has event-card elements for each game
+            game_elements = await page.query_selector_all('[class*="event-card"]')
+            
+            # Extract team names from data-abbr attributes
+            team_abbrs = await page.evaluate('''() => {
+                const abbrs = [];
+                document.querySelectorAll('[data-abbr]').forEach(el => {
+                    const abbr = el.getAttribute('data-abbr');
                     if (abbr && abbr.length > 2 && !['Next', 'Time', 'Rot#', 'Live', 'All', 'Picks', 'Details', 'ML'].includes(abbr)) {
                         // Skip numeric values (rotation numbers)
                         if (isNaN(abbr)) {
@@ -4603,6 +6016,7 @@ def convert_time_to_arizona(time_str: str) -> str:
         return time_str
 
 
+@single_flight_scrape('cbssports', league='NCAAB')
 async def scrape_cbssports_ncaab(target_date: str) -> List[Dict[str, Any]]:
     """
     Scrape NCAAB games and lines from CBS Sports.
@@ -4628,7 +6042,7 @@ async def scrape_cbssports_ncaab(target_date: str) -> List[Dict[str, Any]]:
             browser = await p.chromium.launch(headless=True)
             page = await browser.new_page()
             
-            await page.goto(url, timeout=60000)
+            await guarded_goto(page, url, timeout=60000)
             await page.wait_for_load_state("domcontentloaded", timeout=30000)
             await page.wait_for_timeout(3000)
             
@@ -4793,6 +6207,7 @@ async def scrape_cbssports_ncaab(target_date: str) -> List[Dict[str, Any]]:
         return []
 
 
+@single_flight_scrape('cbssports', league='NBA')
 async def scrape_cbssports_nba(target_date: str) -> List[Dict[str, Any]]:
     """
     Scrape NBA games and lines from CBS Sports.
@@ -4813,61 +6228,20 @@ async def scrape_cbssports_nba(target_date: str) -> List[Dict[str, Any]]:
     
     logger.info(f"Scraping CBS Sports NBA: {url}")
     
-    # NBA team name mapping
-    nba_team_map = {
-        'WIZARDS': 'Washington',
-        'BULLS': 'Chicago',
-        'KNICKS': 'New York',
-        'THUNDER': 'Okla City',
-        'BUCKS': 'Milwaukee',
-        'NUGGETS': 'Denver',
-        'WARRIORS': 'Golden State',
-        'MAVERICKS': 'Dallas',
-        'SUNS': 'Phoenix',
-        'SPURS': 'San Antonio',
-        'CAVALIERS': 'Cleveland',
-        'HEAT': 'Miami',
-        'CELTICS': 'Boston',
-        'LAKERS': 'LA Lakers',
-        'CLIPPERS': 'LA Clippers',
-        'KINGS': 'Sacramento',
-        'TRAIL BLAZERS': 'Portland',
-        'BLAZERS': 'Portland',
-        'JAZZ': 'Utah',
-        'TIMBERWOLVES': 'Minnesota',
-        'ROCKETS': 'Houston',
-        'PELICANS': 'New Orleans',
-        'GRIZZLIES': 'Memphis',
-        'HAWKS': 'Atlanta',
-        'MAGIC': 'Orlando',
-        'PACERS': 'Indiana',
-        '76ERS': 'Philadelphia',
-        'NETS': 'Brooklyn',
-        'RAPTORS': 'Toronto',
-        'HORNETS': 'Charlotte',
-        'PISTONS': 'Detroit',
-    }
+    # NBA team name mapping (shared alias index, see CBS_NBA_TEAM_MAP)
+    team_index = get_team_index('NBA')
     
     def normalize_nba_team(name):
         if not name:
             return name
-        name_upper = name.upper().strip()
-        # Check for exact match first (more specific)
-        if name_upper in nba_team_map:
-            return nba_team_map[name_upper]
-        # Then check for partial matches, but handle HORNETS/NETS conflict
-        # by checking longer keys first
-        for key in sorted(nba_team_map.keys(), key=len, reverse=True):
-            if key in name_upper:
-                return nba_team_map[key]
-        return name.strip()
+        return team_index.normalize(name, source='cbssports')
     
     try:
         async with async_playwright() as p:
             browser = await p.chromium.launch(headless=True)
             page = await browser.new_page()
             
-            await page.goto(url, timeout=60000)
+            await guarded_goto(page, url, timeout=60000)
             await page.wait_for_load_state("domcontentloaded", timeout=30000)
             await page.wait_for_timeout(3000)
             
@@ -5022,6 +6396,7 @@ async def scrape_cbssports_nba(target_date: str) -> List[Dict[str, Any]]:
         return []
 
 
+@single_flight_scrape('cbssports', league='NHL')
 async def scrape_cbssports_nhl(target_date: str) -> List[Dict[str, Any]]:
     """
     Scrape NHL games and lines from CBS Sports.
@@ -5041,59 +6416,20 @@ async def scrape_cbssports_nhl(target_date: str) -> List[Dict[str, Any]]:
     
     logger.info(f"Scraping CBS Sports NHL: {url}")
     
-    # NHL team name mapping
-    nhl_team_map = {
-        'CAPITALS': 'Washington',
-        'BRUINS': 'Boston',
-        'RANGERS': 'NY Rangers',
-        'ISLANDERS': 'NY Islanders',
-        'FLYERS': 'Philadelphia',
-        'PENGUINS': 'Pittsburgh',
-        'DEVILS': 'New Jersey',
-        'BLUE JACKETS': 'Columbus',
-        'HURRICANES': 'Carolina',
-        'PANTHERS': 'Florida',
-        'LIGHTNING': 'Tampa Bay',
-        'MAPLE LEAFS': 'Toronto',
-        'CANADIENS': 'Montreal',
-        'SENATORS': 'Ottawa',
-        'SABRES': 'Buffalo',
-        'RED WINGS': 'Detroit',
-        'BLACKHAWKS': 'Chicago',
-        'BLUES': 'St. Louis',
-        'PREDATORS': 'Nashville',
-        'STARS': 'Dallas',
-        'WILD': 'Minnesota',
-        'JETS': 'Winnipeg',
-        'AVALANCHE': 'Colorado',
-        'UTAH HC': 'Utah',
-        'UTAH': 'Utah',
-        'MAMMOTH': 'Utah',
-        'GOLDEN KNIGHTS': 'Vegas',
-        'KRAKEN': 'Seattle',
-        'SHARKS': 'San Jose',
-        'KINGS': 'LA Kings',
-        'DUCKS': 'Anaheim',
-        'OILERS': 'Edmonton',
-        'FLAMES': 'Calgary',
-        'CANUCKS': 'Vancouver',
-    }
+    # NHL team name mapping (shared alias index, see CBS_NHL_TEAM_MAP)
+    team_index = get_team_index('NHL')
     
     def normalize_nhl_team(name):
         if not name:
             return name
-        name_upper = name.upper().strip()
-        for key, val in nhl_team_map.items():
-            if key in name_upper:
-                return val
-        return name.strip()
+        return team_index.normalize(name, source='cbssports')
     
     try:
         async with async_playwright() as p:
             browser = await p.chromium.launch(headless=True)
             page = await browser.new_page()
             
-            await page.goto(url, timeout=60000)
+            await guarded_goto(page, url, timeout=60000)
             await page.wait_for_load_state("domcontentloaded", timeout=30000)
             await page.wait_for_timeout(3000)
             
@@ -5278,6 +6614,7 @@ async def scrape_cbssports_nhl(target_date: str) -> List[Dict[str, Any]]:
         return []
 
 
+@single_flight_scrape('nhl_api', league='NHL')
 async def scrape_nhl_api_schedule(target_date: str) -> List[Dict[str, Any]]:
     """
     Scrape NHL games from the official NHL API (no Playwright needed).
@@ -5294,32 +6631,8 @@ async def scrape_nhl_api_schedule(target_date: str) -> List[Dict[str, Any]]:
     """
     logger.info(f"[NHL API Fallback] Fetching schedule for {target_date}")
     
-    # NHL API team name mapping (from placeName to our format)
-    nhl_api_team_map = {
-        'Washington': 'Washington', 'Boston': 'Boston', 'New York': 'NY Rangers',
-        'Islanders': 'NY Islanders', 'Philadelphia': 'Philadelphia', 'Pittsburgh': 'Pittsburgh',
-        'New Jersey': 'New Jersey', 'Columbus': 'Columbus', 'Carolina': 'Carolina',
-        'Florida': 'Florida', 'Tampa Bay': 'Tampa Bay', 'Toronto': 'Toronto',
-        'Montréal': 'Montreal', 'Montreal': 'Montreal', 'Ottawa': 'Ottawa', 'Buffalo': 'Buffalo',
-        'Detroit': 'Detroit', 'Chicago': 'Chicago', 'St. Louis': 'St. Louis', 'St Louis': 'St. Louis',
-        'Nashville': 'Nashville', 'Dallas': 'Dallas', 'Minnesota': 'Minnesota',
-        'Winnipeg': 'Winnipeg', 'Colorado': 'Colorado', 'Utah': 'Utah',
-        'Vegas': 'Vegas', 'Seattle': 'Seattle', 'San Jose': 'San Jose',
-        'Los Angeles': 'LA Kings', 'Anaheim': 'Anaheim', 'Edmonton': 'Edmonton',
-        'Calgary': 'Calgary', 'Vancouver': 'Vancouver',
-        # Full names
-        'Capitals': 'Washington', 'Bruins': 'Boston', 'Rangers': 'NY Rangers',
-        'Flyers': 'Philadelphia', 'Penguins': 'Pittsburgh', 'Devils': 'New Jersey',
-        'Blue Jackets': 'Columbus', 'Hurricanes': 'Carolina', 'Panthers': 'Florida',
-        'Lightning': 'Tampa Bay', 'Maple Leafs': 'Toronto', 'Canadiens': 'Montreal',
-        'Senators': 'Ottawa', 'Sabres': 'Buffalo', 'Red Wings': 'Detroit',
-        'Blackhawks': 'Chicago', 'Blues': 'St. Louis', 'Predators': 'Nashville',
-        'Stars': 'Dallas', 'Wild': 'Minnesota', 'Jets': 'Winnipeg',
-        'Avalanche': 'Colorado', 'Golden Knights': 'Vegas', 'Kraken': 'Seattle',
-        'Sharks': 'San Jose', 'Kings': 'LA Kings', 'Ducks': 'Anaheim',
-        'Oilers': 'Edmonton', 'Flames': 'Calgary', 'Canucks': 'Vancouver',
-        'Hockey Club': 'Utah'
-    }
+    # NHL API placeName/commonName -> our format (shared alias index, see NHL_API_TEAM_MAP)
+    team_index = get_team_index('NHL')
     
     def normalize_api_team(team_data):
         """Extract and normalize team name from NHL API response"""
@@ -5339,10 +6652,12 @@ async def scrape_nhl_api_schedule(target_date: str) -> List[Dict[str, Any]]:
         else:
             common = str(common_name) if common_name else ''
         
-        # Try to match
-        for key, val in nhl_api_team_map.items():
-            if key.lower() in name.lower() or key.lower() in common.lower():
-                return val
+        # Try to match - common name first ("New York" is both Rangers and Islanders)
+        resolved = team_index.resolve(common, source='nhl_api') if common else None
+        if not resolved and name:
+            resolved = team_index.resolve(name, source='nhl_api')
+        if resolved:
+            return resolved
         
         # Fallback to place name
         return name if name else None
@@ -5350,7 +6665,7 @@ async def scrape_nhl_api_schedule(target_date: str) -> List[Dict[str, Any]]:
     try:
         async with httpx.AsyncClient(timeout=30.0) as client:
             # Get schedule for the target date
-            response = await client.get(f"https://api-web.nhle.com/v1/schedule/{target_date}")
+            response = await guarded_get(client, f"https://api-web.nhle.com/v1/schedule/{target_date}")
             
             if response.status_code != 200:
                 logger.warning(f"[NHL API Fallback] Failed to fetch schedule: HTTP {response.status_code}")
@@ -5406,6 +6721,7 @@ async def scrape_nhl_api_schedule(target_date: str) -> List[Dict[str, Any]]:
         return []
 
 
+@single_flight_scrape('covers_consensus')
 async def scrape_covers_consensus(league: str, target_date: str) -> Dict[str, Dict]:
     """
     Scrape betting consensus percentages and spreads from Covers.com
@@ -5440,7 +6756,7 @@ async def scrape_covers_consensus(league: str, target_date: str) -> Dict[str, Di
             browser = await p.chromium.launch(headless=True)
             page = await browser.new_page()
             
-            await page.goto(url, timeout=60000)
+            await guarded_goto(page, url, timeout=60000)
             await page.wait_for_load_state("networkidle")
             await page.wait_for_timeout(3000)
             
@@ -5583,6 +6899,7 @@ async def scrape_covers_consensus(league: str, target_date: str) -> Dict[str, Di
         return {}
 
 
+@single_flight_scrape('covers_ou')
 async def scrape_covers_overunder_consensus(league: str, target_date: str) -> Dict[str, Dict]:
     """
     Scrape Over/Under betting consensus percentages from Covers.com
@@ -5617,7 +6934,7 @@ async def scrape_covers_overunder_consensus(league: str, target_date: str) -> Di
             browser = await p.chromium.launch(headless=True)
             page = await browser.new_page()
             
-            await page.goto(url, timeout=60000)
+            await guarded_goto(page, url, timeout=60000)
             await page.wait_for_load_state("networkidle")
             await page.wait_for_timeout(5000)  # Wait longer for dynamic content
             
@@ -5847,6 +7164,159 @@ async def scrape_covers_overunder_consensus(league: str, target_date: str) -> Di
         return {}
 
 
+# ============================================================================
+# HEDGED MULTI-SOURCE FETCHING
+# ============================================================================
+# Instead of waiting out a slow primary source before trying the fallback,
+# hedged_fetch() starts the primary, and if it hasn't produced a usable result
+# within the data type's latency budget, starts the next source as well. The
+# first result that validates wins and the other fetches are cancelled. If no
+# source validates, the best non-empty result (in priority order) is returned,
+# same as the old sequential fallbacks (e.g. NHL API schedule without lines).
+
+HEDGE_LATENCY_BUDGETS = {'lines': 25, 'scores': 25, 'schedule': 15}  # seconds before launching the backup
+
+# (league, data type) -> sources in priority order
+HEDGE_SOURCES = {
+    ('NHL', 'lines'): ['cbssports', 'scoresandodds', 'nhl_api'],
+    ('NHL', 'scores'): ['cbssports', 'nhl_api'],
+    ('NHL', 'schedule'): ['cbssports', 'nhl_api'],
+    ('NBA', 'lines'): ['cbssports', 'scoresandodds'],
+    ('NBA', 'scores'): ['cbssports'],
+    ('NBA', 'schedule'): ['cbssports', 'scoresandodds'],
+    ('NCAAB', 'lines'): ['cbssports'],
+    ('NCAAB', 'scores'): ['cbssports'],
+    ('NCAAB', 'schedule'): ['cbssports'],
+}
+
+HEDGE_SOURCE_LABELS = {'cbssports': 'cbssports.com', 'scoresandodds': 'scoresandodds.com', 'nhl_api': 'nhl-api (no lines)'}
+
+HEDGE_LATENCY_SAMPLES = 200
+hedged_fetch_stats: Dict[str, Dict[str, Any]] = {}  # "{league}:{data_type}" -> wins/latencies
+
+
+def hedge_source_fetcher(source: str, league: str):
+    """Scraper coroutine function for a source/league"""
+    if source == 'cbssports':
+        return {'NBA': scrape_cbssports_nba, 'NHL': scrape_cbssports_nhl, 'NCAAB': scrape_cbssports_ncaab}[league]
+    if source == 'scoresandodds':
+        return lambda target_date: scrape_scoresandodds(league, target_date)
+    if source == 'nhl_api':
+        return scrape_nhl_api_schedule
+    raise ValueError(f"Unknown source: {source}")
+
+
+def hedge_result_is_valid(data_type: str, games) -> bool:
+    """Lines need at least one total, scores at least one final; a schedule just needs games"""
+    if not games:
+        return False
+    if data_type == 'lines':
+        return any(g.get('total') is not None for g in games)
+    if data_type == 'scores':
+        return any(g.get('final_score') is not None for g in games)
+    return True
+
+
+def _record_hedge_latency(stats: Dict[str, Any], source: str, seconds: float, outcome: str):
+    samples = stats["latencies"].setdefault(source, [])
+    samples.append(round(seconds, 2))
+    del samples[:-HEDGE_LATENCY_SAMPLES]
+    stats["outcomes"].setdefault(source, {}).setdefault(outcome, 0)
+    stats["outcomes"][source][outcome] += 1
+
+
+async def hedged_fetch(data_type: str, league: str, target_date: str, budget: float = None) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Fetch `data_type` ('lines', 'scores', 'schedule') for a league/date from its sources.
+    
+    Returns:
+        (games, winning source) - source is None if nothing came back
+    """
+    import time
+    league = league.upper()
+    sources = HEDGE_SOURCES.get((league, data_type), ['cbssports'])
+    budget = budget if budget is not None else HEDGE_LATENCY_BUDGETS.get(data_type, 20)
+    stats = hedged_fetch_stats.setdefault(f"{league}:{data_type}", {"wins": {}, "hedges": 0, "latencies": {}, "outcomes": {}})
+    
+    started = {}
+    tasks = {}
+    fallbacks = {}
+    
+    def launch(source):
+        started[source] = time.monotonic()
+        task = asyncio.create_task(hedge_source_fetcher(source, league)(target_date))
+        tasks[task] = source
+    
+    pending_sources = list(sources)
+    launch(pending_sources.pop(0))
+    winner = None
+    result = []
+    try:
+        while tasks:
+            done, _ = await asyncio.wait(list(tasks), timeout=budget if pending_sources else None, return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                # Budget spent with nothing usable yet: hedge with the next source
+                stats["hedges"] += 1
+                logger.info(f"[Hedge] {league} {data_type} {target_date}: no result after {budget}s, also trying {pending_sources[0]}")
+                launch(pending_sources.pop(0))
+                continue
+            for task in done:
+                source = tasks.pop(task)
+                elapsed = time.monotonic() - started[source]
+                try:
+                    games = task.result()
+                except Exception as e:
+                    logger.warning(f"[Hedge] {league} {data_type}: {source} failed after {elapsed:.1f}s: {e}")
+                    _record_hedge_latency(stats, source, elapsed, "error")
+                    games = None
+                if games is not None and hedge_result_is_valid(data_type, games):
+                    if winner is None:
+                        winner, result = source, games
+                        _record_hedge_latency(stats, source, elapsed, "won")
+                elif games is not None:
+                    _record_hedge_latency(stats, source, elapsed, "invalid" if games else "empty")
+                    if games:
+                        fallbacks[source] = games
+            if winner:
+                break
+            if pending_sources and not tasks:
+                # Everything launched so far came back unusable - don't wait out the budget
+                launch(pending_sources.pop(0))
+    finally:
+        for task, source in tasks.items():
+            task.cancel()
+            _record_hedge_latency(stats, source, time.monotonic() - started[source], "cancelled")
+    
+    if winner is None:
+        winner = next((s for s in sources if s in fallbacks), None)
+        result = fallbacks.get(winner, [])
+    if winner:
+        stats["wins"][winner] = stats["wins"].get(winner, 0) + 1
+    logger.info(f"[Hedge] {league} {data_type} {target_date}: using {winner or 'no source'} ({len(result)} games)")
+    return result, winner
+
+
+def hedged_fetch_summary() -> Dict[str, Any]:
+    """Wins and latency percentiles per league/data type for /process/status"""
+    import numpy as np
+    summary = {}
+    for key, stats in hedged_fetch_stats.items():
+        summary[key] = {
+            "wins": stats["wins"],
+            "hedges": stats["hedges"],
+            "outcomes": stats["outcomes"],
+            "latency_seconds": {
+                source: {
+                    "p50": round(float(np.percentile(samples, 50)), 2),
+                    "p95": round(float(np.percentile(samples, 95)), 2),
+                    "p99": round(float(np.percentile(samples, 99)), 2),
+                    "samples": len(samples)
+                } for source, samples in stats["latencies"].items() if samples
+            }
+        }
+    return summary
+
+
 async def scrape_cbssports_ncaab_with_team_urls(target_date: str) -> Tuple[List[Dict], Dict[str, str]]:
     """
     Scrape NCAAB games from CBS Sports including team URLs for Last 3 PPG lookup.
@@ -5866,7 +7336,7 @@ async def scrape_cbssports_ncaab_with_team_urls(target_date: str) -> Tuple[List[
             browser = await p.chromium.launch(headless=True)
             page = await browser.new_page()
             
-            await page.goto(url, timeout=60000)
+            await guarded_goto(page, url, timeout=60000)
             await page.wait_for_load_state("domcontentloaded", timeout=30000)
             await page.wait_for_timeout(3000)
             
@@ -5948,103 +7418,172 @@ async def scrape_cbssports_ncaab_with_team_urls(target_date: str) -> Tuple[List[
         return [], {}
 
 
-async def scrape_ncaab_team_last3_ppg(team_urls: Dict[str, str], max_concurrent: int = 5) -> Dict[str, Dict]:
+NCAAB_LAST3_REUSE_HOURS = 12  # saved team pages older than this are scraped again
+NCAAB_LAST3_KEEP_DAYS = 14  # ncaab_team_last3 rows expire after this (TTL index)
+NCAAB_LAST3_RETRY_POLL_SECONDS = 0.25
+
+
+async def ensure_ncaab_last3_indexes():
+    try:
+        await db.ncaab_team_last3.create_index([("date", 1), ("team", 1)], unique=True)
+        await db.ncaab_team_last3.create_index("scraped_at", expireAfterSeconds=NCAAB_LAST3_KEEP_DAYS * 86400)
+    except Exception as e:
+        logger.error(f"Error creating ncaab_team_last3 indexes: {e}")
+
+
+async def scrape_ncaab_team_last3_ppg(team_urls: Dict[str, str], max_concurrent: int = 5, results_date: str = None,
+                                      max_retries: int = 2) -> Dict[str, Dict]:
     """
     Scrape Last 3 game scores for NCAAB teams from CBS Sports team pages.
     
+    A pool of max_concurrent workers, each with one long-lived page, pulls teams
+    from a queue; failed teams go back on the queue after an exponential backoff
+    while the worker moves on to the next team. With results_date, each team is
+    saved to ncaab_team_last3 as soon as it's scraped, and teams saved for that
+    date within NCAAB_LAST3_REUSE_HOURS are not scraped again (resume).
+    
     Args:
         team_urls: Dict mapping team names to their CBS Sports URLs
-        max_concurrent: Maximum concurrent browser pages
+        max_concurrent: Number of workers (browser pages)
+        results_date: Slate date to save partial results under (optional)
+        max_retries: Retries per team after the first failure
         
     Returns:
         Dict mapping team names to their Last 3 stats
     """
     from playwright.async_api import async_playwright
     import re
+    import time
     
     logger.info(f"Scraping Last 3 PPG for {len(team_urls)} NCAAB teams...")
     
     team_stats = {}
-    semaphore = asyncio.Semaphore(max_concurrent)
+    if results_date:
+        fresh_since = datetime.now(timezone.utc) - timedelta(hours=NCAAB_LAST3_REUSE_HOURS)
+        async for doc in db.ncaab_team_last3.find({"date": results_date, "team": {"$in": list(team_urls.keys())},
+                                                   "scraped_at": {"$gte": fresh_since}}, {"_id": 0}):
+            team_stats[doc["team"]] = doc["stats"]
+        if team_stats:
+            logger.info(f"  Reusing {len(team_stats)} teams already scraped for {results_date}")
+    
+    queue = asyncio.Queue()
+    for team_name, team_url in team_urls.items():
+        if team_name not in team_stats:
+            queue.put_nowait((team_name, team_url, 0))
+    total = queue.qsize()
+    progress = {"done": 0, "failed": 0, "retrying": 0}
+    started = time.monotonic()
+    
+    def requeue(item):
+        progress["retrying"] -= 1
+        queue.put_nowait(item)
+    
+    async def scrape_team_page(page, team_name: str, team_url: str):
+        """Scrape a single team's Last 3 scores (None if no completed games)"""
+        full_url = f"https://www.cbssports.com{team_url}"
+        await guarded_goto(page, full_url, timeout=20000)
+        await page.wait_for_load_state("domcontentloaded")
+        await page.wait_for_timeout(800)
+        
+        # Get schedule section text
+        schedule_text = await page.evaluate("""() => {
+            const body = document.body.innerText;
+            const scheduleStart = body.indexOf('Schedule');
+            const scheduleEnd = body.indexOf('Full Schedule');
+            if (scheduleStart > -1 && scheduleEnd > -1) {
+                return body.substring(scheduleStart, scheduleEnd);
+            }
+            return body.substring(0, 2000);
+        }""")
+        
+        # Parse completed games
+        # Format: "W 83-69" (team won, scored 83) or "L 80-58" (team lost, scored 58)
+        completed_scores = []
+        for line in schedule_text.split('\n'):
+            match = re.search(r'\b([WL])\s+(\d+)-(\d+)\b', line)
+            if match:
+                result = match.group(1)
+                score1 = int(match.group(2))
+                score2 = int(match.group(3))
+                # W = team won, their score is LEFT (score1)
+                # L = team lost, their score is RIGHT (score2)
+                team_score = score1 if result == 'W' else score2
+                completed_scores.append(team_score)
+        
+        # Get last 3 scores (reverse since schedule is chronological)
+        if not completed_scores:
+            return None
+        last3 = completed_scores[-3:] if len(completed_scores) >= 3 else completed_scores
+        last3.reverse()  # Most recent first
+        
+        return {
+            'last3_scores': last3,
+            'last3_total': sum(last3),
+            'last3_avg': round(sum(last3) / len(last3), 1),
+            'games_played': len(completed_scores)
+        }
     
-    async def scrape_single_team(browser, team_name: str, team_url: str):
-        """Scrape a single team's Last 3 scores"""
-        async with semaphore:
-            try:
-                full_url = f"https://www.cbssports.com{team_url}"
-                page = await browser.new_page()
-                await page.goto(full_url, timeout=20000)
-                await page.wait_for_load_state("domcontentloaded")
-                await page.wait_for_timeout(800)
-                
-                # Get schedule section text
-                schedule_text = await page.evaluate("""() => {
-                    const body = document.body.innerText;
-                    const scheduleStart = body.indexOf('Schedule');
-                    const scheduleEnd = body.indexOf('Full Schedule');
-                    if (scheduleStart > -1 && scheduleEnd > -1) {
-                        return body.substring(scheduleStart, scheduleEnd);
-                    }
-                    return body.substring(0, 2000);
-                }""")
+    async def worker(browser):
+        page = await browser.new_page()
+        try:
+            while True:
+                try:
+                    team_name, team_url, attempt = queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    if not progress["retrying"]:
+                        return
+                    await asyncio.sleep(NCAAB_LAST3_RETRY_POLL_SECONDS)  # only backed-off teams are left
+                    continue
                 
-                await page.close()
+                try:
+                    stats = await scrape_team_page(page, team_name, team_url)
+                except Exception as e:
+                    if attempt < max_retries:
+                        delay = 2 ** attempt + random.uniform(0, 1)
+                        logger.debug(f"Error scraping {team_name} (attempt {attempt + 1}), retrying in {delay:.1f}s: {e}")
+                        progress["retrying"] += 1
+                        asyncio.get_running_loop().call_later(delay, requeue, (team_name, team_url, attempt + 1))
+                        # Start the retry from a fresh page
+                        try:
+                            await page.close()
+                        except Exception:
+                            pass
+                        page = await browser.new_page()
+                    else:
+                        logger.debug(f"Error scraping {team_name}, giving up: {e}")
+                        progress["failed"] += 1
+                    continue
                 
-                # Parse completed games
-                # Format: "W 83-69" (team won, scored 83) or "L 80-58" (team lost, scored 58)
-                completed_scores = []
-                for line in schedule_text.split('\n'):
-                    match = re.search(r'\b([WL])\s+(\d+)-(\d+)\b', line)
-                    if match:
-                        result = match.group(1)
-                        score1 = int(match.group(2))
-                        score2 = int(match.group(3))
-                        # W = team won, their score is LEFT (score1)
-                        # L = team lost, their score is RIGHT (score2)
-                        team_score = score1 if result == 'W' else score2
-                        completed_scores.append(team_score)
-                
-                # Get last 3 scores (reverse since schedule is chronological)
-                if completed_scores:
-                    last3 = completed_scores[-3:] if len(completed_scores) >= 3 else completed_scores
-                    last3.reverse()  # Most recent first
-                    
-                    return team_name, {
-                        'last3_scores': last3,
-                        'last3_total': sum(last3),
-                        'last3_avg': round(sum(last3) / len(last3), 1),
-                        'games_played': len(completed_scores)
-                    }
-            except Exception as e:
-                logger.debug(f"Error scraping {team_name}: {e}")
-            return team_name, None
+                if stats:
+                    team_stats[team_name] = stats
+                    if results_date:
+                        await db.ncaab_team_last3.update_one(
+                            {"date": results_date, "team": team_name},
+                            {"$set": {"stats": stats, "url": team_url, "scraped_at": datetime.now(timezone.utc)}},
+                            upsert=True
+                        )
+                progress["done"] += 1
+                if progress["done"] % 25 == 0:
+                    elapsed = time.monotonic() - started
+                    logger.info(f"  Scraped {progress['done']}/{total} teams ({progress['done'] / elapsed:.1f} teams/s)...")
+        finally:
+            try:
+                await page.close()
+            except Exception:
+                pass
     
-    try:
-        async with async_playwright() as p:
-            browser = await p.chromium.launch(headless=True)
-            
-            # Process teams in batches
-            teams_list = list(team_urls.items())
-            batch_size = 10
-            
-            for i in range(0, len(teams_list), batch_size):
-                batch = teams_list[i:i+batch_size]
-                tasks = [scrape_single_team(browser, name, url) for name, url in batch]
-                results = await asyncio.gather(*tasks, return_exceptions=True)
-                
-                for result in results:
-                    if isinstance(result, tuple) and result[1] is not None:
-                        team_name, stats = result
-                        team_stats[team_name] = stats
-                
-                logger.info(f"  Scraped {min(i+batch_size, len(teams_list))}/{len(teams_list)} teams...")
-            
-            await browser.close()
-            
-    except Exception as e:
-        logger.error(f"Error in batch scraping: {e}")
+    if total:
+        try:
+            async with async_playwright() as p:
+                browser = await p.chromium.launch(headless=True)
+                try:
+                    await asyncio.gather(*[worker(browser) for _ in range(min(max_concurrent, total))])
+                finally:
+                    await browser.close()
+        except Exception as e:
+            logger.error(f"Error in team page scraping: {e}")
     
-    logger.info(f"Got Last 3 PPG for {len(team_stats)}/{len(team_urls)} teams")
+    logger.info(f"Got Last 3 PPG for {len(team_stats)}/{len(team_urls)} teams ({progress['failed']} failed) in {time.monotonic() - started:.0f}s")
     return team_stats
 
 
@@ -6089,7 +7628,7 @@ def schedule_next_check():
 
 async def monitor_and_reschedule():
     """Run monitoring - called by manual check API"""
-    await run_monitoring_cycle()
+    await run_with_resource('bet_monitor', 'monitor', run_monitoring_cycle)
 
 
 async def send_check_notification(check_time, new_bets_found):
@@ -6099,7 +7638,7 @@ async def send_check_notification(check_time, new_bets_found):
         if not telegram_config or not telegram_config.get("bot_token"):
             return
         
-        bot = Bot(token=telegram_config["bot_token"])
+        bot = make_telegram_bot(telegram_config["bot_token"])
         chat_id = telegram_config["chat_id"]
         
         # Generate random next interval for display
@@ -6337,7 +7876,7 @@ async def monitor_single_account(conn: dict):
             return new_bets_count  # Return 0, not None
         
         # Navigate to Open Bets page
-        await monitor_service.page.goto('https://www.plays888.co/wager/OpenBets.aspx', timeout=30000)
+        await guarded_goto(monitor_service.page, plays888_url('/wager/OpenBets.aspx'), timeout=30000)
         await monitor_service.page.wait_for_timeout(5000)  # Wait longer for table to load
         
         # Extract open bets by parsing the table rows using Playwright
@@ -7008,7 +8547,7 @@ async def bulk_cleanup_telegram(start_msg_id: int, end_msg_id: int):
         if not telegram_config or not telegram_config.get("bot_token") or not telegram_config.get("chat_id"):
             raise HTTPException(status_code=400, detail="Telegram not configured")
         
-        bot = Bot(token=telegram_config["bot_token"])
+        bot = make_telegram_bot(telegram_config["bot_token"])
         chat_id = telegram_config["chat_id"]
         
         deleted_count = 0
@@ -7362,7 +8901,7 @@ async def configure_telegram(config: TelegramConfig):
     
     try:
         # Test the bot token
-        test_bot = Bot(token=config.bot_token)
+        test_bot = make_telegram_bot(config.bot_token)
         bot_info = await test_bot.get_me()
         
         # Store configuration in memory
@@ -7406,7 +8945,7 @@ async def telegram_status():
         try:
             config = await db.telegram_config.find_one({}, {"_id": 0})
             if config:
-                telegram_bot = Bot(token=config["bot_token"])
+                telegram_bot = make_telegram_bot(config["bot_token"])
                 telegram_chat_id = int(config["chat_id"])
                 logger.info("Telegram reloaded from database")
         except Exception as e:
@@ -7773,7 +9312,8 @@ async def start_monitoring():
     # Uses a wrapper that reschedules with random delay after each run
     schedule_next_check()
     
-    if not scheduler.running:
+    # With PROCESS_ROLE=api the scheduler runs in the leader worker, which picks up monitor_config
+    if not scheduler.running and PROCESS_ROLE == 'all':
         scheduler.start()
     
     logger.info("Bet monitoring started - checking every 5 minutes (paused 10:00 PM - 7:00 AM Arizona)")
@@ -7811,6 +9351,15 @@ async def stop_monitoring():
 @api_router.get("/monitoring/status")
 async def monitoring_status():
     """Get monitoring system status"""
+    if PROCESS_ROLE == 'api':
+        return {
+            "enabled": await monitoring_enabled_in_config(),
+            "interval": "7-15 minutes (random)",
+            "sleep_hours": "10:00 PM - 7:00 AM Arizona",
+            "running": "in worker",
+            "next_check": None
+        }
+    
     next_check = None
     try:
         if monitoring_enabled and scheduler.running:
@@ -7831,6 +9380,11 @@ async def monitoring_status():
 @api_router.post("/monitoring/check-now")
 async def check_now():
     """Manually trigger a bet check immediately"""
+    if PROCESS_ROLE == 'api':
+        if not await monitoring_enabled_in_config():
+            raise HTTPException(status_code=400, detail="Monitoring is not enabled. Please start monitoring first.")
+        return await submit_job("bet_check", {})
+    
     if not monitoring_enabled:
         raise HTTPException(status_code=400, detail="Monitoring is not enabled. Please start monitoring first.")
     
@@ -7849,7 +9403,7 @@ async def scrape_nba_odds():
     """Scrape NBA odds from TeamRankings"""
     import re
     async with httpx.AsyncClient(timeout=30) as client:
-        response = await client.get("https://www.teamrankings.com/nba/odds/")
+        response = await guarded_get(client, "https://www.teamrankings.com/nba/odds/")
         html = response.text
         
         games = []
@@ -7878,6 +9432,153 @@ async def scrape_nba_odds():
         
         return games
 
+# ============================================================================
+# TEAM STATS HISTORY - point-in-time PPG/GPG snapshots
+# ============================================================================
+# Every PPG/GPG rankings scrape is written to team_stats_history as one row per
+# (league, team, as_of) with season/L3 values and ranks, so any past slate can
+# be re-derived or backtested without re-scraping teamrankings. The newest
+# snapshot per league is kept in team_stats_cache for current reads.
+
+team_stats_cache: Dict[str, Dict[str, Any]] = {}  # league -> {"as_of", "source", "stats"}
+
+# The Jan 2026 Excel table in scrape_ppg_data_all_leagues isn't a dated scrape; earlier
+# builds snapshotted it as "today" on every run, so default reads skip those rows
+HARDCODED_PPG_SOURCE = "hardcoded_jan2026"
+
+# get_cached_ppg_data ignores snapshots older than this (falls back to ppg_data)
+TEAM_STATS_MAX_AGE_DAYS = 3
+
+
+def empty_team_stats() -> Dict[str, Dict[str, Any]]:
+    return {'season_ranks': {}, 'season_values': {}, 'last3_ranks': {}, 'last3_values': {}}
+
+
+def team_stats_from_ppg_data(league_data: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """{"season": {team: {rank, value}}, "last3": ...} (ppg_data layout) -> rankings scrape layout"""
+    stats = empty_team_stats()
+    for period in ('season', 'last3'):
+        for team, entry in (league_data or {}).get(period, {}).items():
+            stats[f'{period}_ranks'][team] = entry.get('rank')
+            stats[f'{period}_values'][team] = entry.get('value')
+    return stats
+
+
+def team_stats_to_ppg_data(stats: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+    """Rankings scrape layout -> ppg_data layout (what the 8PM job reads)"""
+    data = {"season": {}, "last3": {}}
+    for period in ('season', 'last3'):
+        for team, value in stats.get(f'{period}_values', {}).items():
+            data[period][team] = {"rank": stats.get(f'{period}_ranks', {}).get(team), "value": value}
+    return data
+
+
+async def record_team_stats_snapshot(league: str, as_of: str, stats: Dict[str, Dict[str, Any]], source: str) -> int:
+    """
+    Store one rankings scrape as of a date (stats in the scrape_*_ppg_rankings
+    layout). Re-scraping the same date and source overwrites that date's rows.
+    """
+    from pymongo import UpdateOne
+    league = league.upper()
+    teams = set(stats.get('season_values', {})) | set(stats.get('last3_values', {}))
+    if not teams:
+        return 0
+    team_index = get_team_index(league)
+    now = datetime.now(timezone.utc)
+    try:
+        await db.team_stats_history.bulk_write([
+            UpdateOne({"league": league, "team": team, "as_of": as_of, "source": source}, {"$set": {
+                "league": league,
+                "team": team,
+                "team_key": game_team_key(team_index, team),
+                "as_of": as_of,
+                "season_value": stats.get('season_values', {}).get(team),
+                "season_rank": stats.get('season_ranks', {}).get(team),
+                "last3_value": stats.get('last3_values', {}).get(team),
+                "last3_rank": stats.get('last3_ranks', {}).get(team),
+                "source": source,
+                "updated_at": now,
+            }}, upsert=True)
+            for team in teams
+        ], ordered=False)
+    except Exception as e:
+        logger.error(f"[Team Stats] Error recording {league} snapshot for {as_of}: {e}")
+        return 0
+    
+    cached = team_stats_cache.get(league)
+    if not cached or as_of >= cached["as_of"]:
+        team_stats_cache[league] = {"as_of": as_of, "source": source, "stats": stats}
+    logger.info(f"[Team Stats] {league} snapshot as of {as_of}: {len(teams)} teams ({source})")
+    return len(teams)
+
+
+async def get_team_stats_as_of(league: str, as_of: str = None, source: str = None) -> Optional[Dict[str, Any]]:
+    """
+    Latest snapshot on or before as_of (default: newest) as
+    {"as_of", "source", "stats"}; None when nothing was recorded yet.
+    Current reads (no date, no source) are served from team_stats_cache.
+    """
+    league = league.upper()
+    cached = team_stats_cache.get(league)
+    if cached and not source and (not as_of or as_of >= cached["as_of"]):
+        return cached
+    
+    query = {"league": league, "source": source or {"$ne": HARDCODED_PPG_SOURCE}}
+    if as_of:
+        query["as_of"] = {"$lte": as_of}
+    latest = await db.team_stats_history.find_one(query, {"_id": 0, "as_of": 1, "source": 1},
+                                                  sort=[("as_of", -1), ("updated_at", -1)])
+    if not latest:
+        return None
+    
+    # One scrape per snapshot: the newest date, and its most recently written source
+    stats = empty_team_stats()
+    query["as_of"] = latest["as_of"]
+    query["source"] = latest.get("source")
+    async for row in db.team_stats_history.find(query, {"_id": 0}):
+        team = row["team"]
+        for period in ('season', 'last3'):
+            if row.get(f'{period}_value') is not None:
+                stats[f'{period}_values'][team] = row[f'{period}_value']
+                stats[f'{period}_ranks'][team] = row.get(f'{period}_rank')
+    snapshot = {"as_of": latest["as_of"], "source": latest.get("source"), "stats": stats}
+    if not as_of and not source:
+        team_stats_cache[league] = snapshot
+    return snapshot
+
+
+async def ensure_team_stats_indexes():
+    try:
+        await db.team_stats_history.create_index([("league", 1), ("team", 1), ("as_of", -1), ("source", 1)], unique=True)
+        await db.team_stats_history.create_index([("league", 1), ("team_key", 1), ("as_of", -1)])
+        await db.team_stats_history.create_index([("league", 1), ("as_of", -1)])
+    except Exception as e:
+        logger.error(f"Error creating team stats history indexes: {e}")
+
+
+@api_router.get("/teams/stats-history/{league}")
+async def get_team_stats_history(league: str, date: str = None, team: str = None, source: str = None):
+    """
+    PPG/GPG snapshot as of a date (latest on or before it, default newest).
+    With `team`, that team's rows over time instead.
+    """
+    league = league.upper()
+    if league not in ['NBA', 'NHL', 'NCAAB']:
+        raise HTTPException(status_code=400, detail="Invalid league")
+    if team:
+        query = {"league": league, "team_key": game_team_key(get_team_index(league), team)}
+        if date:
+            query["as_of"] = {"$lte": date}
+        if source:
+            query["source"] = source
+        rows = await db.team_stats_history.find(query, {"_id": 0, "updated_at": 0}).sort("as_of", -1).to_list(400)
+        return {"league": league, "team": team, "history": rows}
+    snapshot = await get_team_stats_as_of(league, date, source)
+    if not snapshot:
+        raise HTTPException(status_code=404, detail=f"No {league} team stats recorded" + (f" on or before {date}" if date else ""))
+    return {"league": league, "requested": date, **snapshot}
+
+
 async def scrape_nba_ppg_rankings(target_date: str = None):
     """
     Scrape NBA Points Per Game rankings and values from teamrankings.com
@@ -7948,7 +9649,7 @@ async def scrape_nba_ppg_rankings(target_date: str = None):
             ppg_url = f"https://www.teamrankings.com/nba/stat/points-per-game?date={scrape_date}"
             logger.info(f"Scraping NBA PPG from teamrankings.com with date={scrape_date}")
             
-            season_response = await client.get(ppg_url, headers=headers)
+            season_response = await guarded_get(client, ppg_url, headers=headers)
             season_html = season_response.text
             
             # Parse season rankings - pattern: rank, team slug, team name, 2024-25 PPG, Last 3 PPG
@@ -7974,6 +9675,7 @@ async def scrape_nba_ppg_rankings(target_date: str = None):
                     result['last3_ranks'][team] = i
             
             logger.info(f"Scraped PPG data: {len(result['season_values'])} teams")
+            await record_team_stats_snapshot('NBA', scrape_date, result, 'teamrankings')
             return result
             
     except Exception as e:
@@ -8033,7 +9735,7 @@ async def scrape_ncaab_ppg_rankings(target_date: str = None):
             ppg_url = f"https://www.teamrankings.com/ncaa-basketball/stat/points-per-game?date={scrape_date}"
             logger.info(f"Scraping NCAAB PPG from teamrankings.com with date={scrape_date}")
             
-            response = await client.get(ppg_url, headers=headers)
+            response = await guarded_get(client, ppg_url, headers=headers)
             html = response.text
             
             # Parse rankings - pattern: rank, team slug, team name, 2024-25 PPG, Last 3 PPG
@@ -8058,6 +9760,7 @@ async def scrape_ncaab_ppg_rankings(target_date: str = None):
                 result['last3_ranks'][team] = i
             
             logger.info(f"Scraped NCAAB PPG data: {len(result['season_values'])} teams")
+            await record_team_stats_snapshot('NCAAB', scrape_date, result, 'teamrankings')
             return result
             
     except Exception as e:
@@ -8449,218 +10152,248 @@ async def scrape_ppg_data_all_leagues():
     try:
         await db.ppg_data.update_one(
             {"_id": "current"},
-            {"$set": {"data": ppg_data, "last_updated": datetime.now(timezone.utc), "source": "hardcoded_jan2026"}},
+            {"$set": {"data": ppg_data, "last_updated": datetime.now(timezone.utc), "source": HARDCODED_PPG_SOURCE}},
             upsert=True
         )
         logger.info("[PPG Data] Data cached in MongoDB")
     except Exception as e:
         logger.error(f"[PPG Data] Cache error: {e}")
     
+    # Not written to team_stats_history: these values were current in Jan 2026, not
+    # on the day this runs, and a dated snapshot would say otherwise to backtests
     return ppg_data
 
 
 async def get_cached_ppg_data():
-    """Get cached PPG data from MongoDB"""
+    """
+    Get current PPG data per league: its team stats snapshot if it is at most
+    TEAM_STATS_MAX_AGE_DAYS old, else the legacy ppg_data document
+    """
+    from zoneinfo import ZoneInfo
+    oldest = (datetime.now(ZoneInfo('America/Phoenix')) - timedelta(days=TEAM_STATS_MAX_AGE_DAYS)).strftime('%Y-%m-%d')
+    legacy = {}
     try:
         cached = await db.ppg_data.find_one({"_id": "current"})
         if cached and cached.get("data"):
-            return cached["data"]
+            legacy = cached["data"]
     except:
         pass
-    return None
+    
+    data = {}
+    for league in ('NBA', 'NHL', 'NCAAB'):
+        snapshot = None
+        try:
+            snapshot = await get_team_stats_as_of(league)
+        except Exception as e:
+            logger.error(f"[PPG Data] Team stats history read error for {league}: {e}")
+        if snapshot and snapshot["as_of"] < oldest:
+            logger.warning(f"[PPG Data] {league} snapshot from {snapshot['as_of']} is too old, not using it")
+            snapshot = None
+        if snapshot and snapshot["stats"].get("season_values"):
+            data[league] = team_stats_to_ppg_data(snapshot["stats"])
+        else:
+            data[league] = legacy.get(league) or {"season": {}, "last3": {}}
+    if not any(data[league]["season"] for league in data) and not legacy:
+        return None
+    return data
 
 
-async def scrape_tomorrows_opening_lines():
-    """
-    #1 - 8:00 PM Arizona: Scrape tomorrow's games and opening lines from CBS Sports
-    These are the opening lines for each game.
-    Creates full game documents in the opportunities collection.
-    Also fetches consensus data from Covers.com for moneylines/spreads.
-    """
+async def scrape_opening_lines_for_league(league: str, tomorrow: str) -> Dict[str, Any]:
+    """#1 for one league: CBS games + Covers consensus -> {league}_opportunities (raises on failure)"""
     from zoneinfo import ZoneInfo
     arizona_tz = ZoneInfo('America/Phoenix')
-    tomorrow = (datetime.now(arizona_tz) + timedelta(days=1)).strftime('%Y-%m-%d')
+    stored = 0
+    
+    # Use CBS Sports for all leagues (more reliable for opening lines)
+    if league == 'NCAAB':
+        games = await scrape_cbssports_ncaab(tomorrow)
+    elif league == 'NBA':
+        games = await scrape_cbssports_nba(tomorrow)
+    elif league == 'NHL':
+        # CBS first, hedged with ScoresAndOdds / NHL API if it's slow or fails
+        games, _ = await hedged_fetch('lines', 'NHL', tomorrow)
+    else:
+        games = await scrape_scoresandodds(league.upper(), tomorrow)
     
-    logger.info(f"[8PM Job] Scraping tomorrow's opening lines for {tomorrow}")
+    # Also scrape Covers.com for consensus data (moneylines/spreads)
+    consensus_data = {}
+    ou_consensus_data = {}
+    try:
+        consensus_data = await scrape_covers_consensus(league, tomorrow)
+        logger.info(f"[8PM Job] Fetched consensus data for {len(consensus_data)} teams from Covers.com")
+    except Exception as ce:
+        logger.warning(f"[8PM Job] Could not fetch Covers consensus for {league}: {ce}")
     
+    # Also scrape O/U consensus from Covers.com
     try:
-        # NFL eliminated - only process NBA, NHL, NCAAB
-        leagues = ['NBA', 'NHL', 'NCAAB']
+        ou_consensus_data = await scrape_covers_overunder_consensus(league, tomorrow)
+        logger.info(f"[8PM Job] Fetched O/U consensus data for {len(ou_consensus_data)} games from Covers.com")
+    except Exception as ce:
+        logger.warning(f"[8PM Job] Could not fetch Covers O/U consensus for {league}: {ce}")
+    
+    if games:
+        # Create full game documents for the opportunities collection
+        collection_name = f"{league.lower()}_opportunities"
+        collection = db[collection_name]
         
-        for league in leagues:
-            try:
-                # Use CBS Sports for all leagues (more reliable for opening lines)
-                if league == 'NCAAB':
-                    games = await scrape_cbssports_ncaab(tomorrow)
-                elif league == 'NBA':
-                    games = await scrape_cbssports_nba(tomorrow)
-                elif league == 'NHL':
-                    games = await scrape_cbssports_nhl(tomorrow)
-                    if not games:
-                        # Fallback to NHL API if CBS fails
-                        logger.warning(f"[8PM Job] CBS Sports failed for NHL, trying NHL API fallback...")
-                        games = await scrape_nhl_api_schedule(tomorrow)
-                else:
-                    games = await scrape_scoresandodds(league.upper(), tomorrow)
-                
-                # Also scrape Covers.com for consensus data (moneylines/spreads)
-                consensus_data = {}
-                ou_consensus_data = {}
-                try:
-                    consensus_data = await scrape_covers_consensus(league, tomorrow)
-                    logger.info(f"[8PM Job] Fetched consensus data for {len(consensus_data)} teams from Covers.com")
-                except Exception as ce:
-                    logger.warning(f"[8PM Job] Could not fetch Covers consensus for {league}: {ce}")
-                
-                # Also scrape O/U consensus from Covers.com
-                try:
-                    ou_consensus_data = await scrape_covers_overunder_consensus(league, tomorrow)
-                    logger.info(f"[8PM Job] Fetched O/U consensus data for {len(ou_consensus_data)} games from Covers.com")
-                except Exception as ce:
-                    logger.warning(f"[8PM Job] Could not fetch Covers O/U consensus for {league}: {ce}")
+        # Covers team consensus keyed by cleaned name and canonical team (built once)
+        team_index = get_team_index(league)
+        consensus_by_team = {}
+        for team_key, team_data in (consensus_data or {}).items():
+            consensus_by_team.setdefault(team_key.upper().replace('.', '').replace(' ', ''), team_data)
+            consensus_by_team.setdefault(game_team_key(team_index, team_key, 'covers'), team_data)
+        
+        processed_games = []
+        for game in games:
+            away = game.get('away_team') or game.get('away')
+            home = game.get('home_team') or game.get('home')
+            total = game.get('total')
+            time = game.get('time', 'TBD')
+            spread = game.get('spread')
+            spread_team = game.get('spread_team')
+            moneyline = game.get('moneyline')
+            moneyline_team = game.get('moneyline_team')
+            
+            if away and home:
+                game_doc = {
+                    'away_team': away,
+                    'home_team': home,
+                    'total': total,
+                    'opening_line': total,  # Store as opening line
+                    'time': time,
+                    'date': tomorrow
+                }
                 
-                if games:
-                    # Create full game documents for the opportunities collection
-                    collection_name = f"{league.lower()}_opportunities"
-                    collection = db[collection_name]
+                # Add spread for NBA/NCAAB
+                if league in ['NBA', 'NCAAB']:
+                    game_doc['spread'] = spread
+                    game_doc['spread_team'] = spread_team
+                    game_doc['opening_spread'] = spread
+                    game_doc['opening_spread_team'] = spread_team
+                
+                # Add moneyline for NHL
+                if league == 'NHL':
+                    game_doc['moneyline'] = moneyline
+                    game_doc['moneyline_team'] = moneyline_team
+                    game_doc['opening_moneyline'] = moneyline
+                    game_doc['opening_moneyline_team'] = moneyline_team
+                
+                # Try to add consensus data from Covers.com
+                if consensus_data:
+                    # Find matching team in consensus data
+                    away_upper = away.upper().replace('.', '').replace(' ', '')
+                    home_upper = home.upper().replace('.', '').replace(' ', '')
                     
-                    processed_games = []
-                    for game in games:
-                        away = game.get('away_team') or game.get('away')
-                        home = game.get('home_team') or game.get('home')
-                        total = game.get('total')
-                        time = game.get('time', 'TBD')
-                        spread = game.get('spread')
-                        spread_team = game.get('spread_team')
-                        moneyline = game.get('moneyline')
-                        moneyline_team = game.get('moneyline_team')
-                        
-                        if away and home:
-                            game_doc = {
-                                'away_team': away,
-                                'home_team': home,
-                                'total': total,
-                                'opening_line': total,  # Store as opening line
-                                'time': time,
-                                'date': tomorrow
-                            }
-                            
-                            # Add spread for NBA/NCAAB
-                            if league in ['NBA', 'NCAAB']:
-                                game_doc['spread'] = spread
-                                game_doc['spread_team'] = spread_team
-                                game_doc['opening_spread'] = spread
-                                game_doc['opening_spread_team'] = spread_team
-                            
-                            # Add moneyline for NHL
-                            if league == 'NHL':
-                                game_doc['moneyline'] = moneyline
-                                game_doc['moneyline_team'] = moneyline_team
-                                game_doc['opening_moneyline'] = moneyline
-                                game_doc['opening_moneyline_team'] = moneyline_team
-                            
-                            # Try to add consensus data from Covers.com
-                            if consensus_data:
-                                # Find matching team in consensus data
-                                away_upper = away.upper().replace('.', '').replace(' ', '')
-                                home_upper = home.upper().replace('.', '').replace(' ', '')
-                                
-                                # Try different matching strategies
-                                away_consensus = None
-                                home_consensus = None
-                                
-                                for team_key, team_data in consensus_data.items():
-                                    team_key_clean = team_key.upper().replace('.', '').replace(' ', '')
-                                    # Check if team key matches away or home
-                                    if team_key_clean in away_upper or away_upper in team_key_clean:
-                                        if away_consensus is None:
-                                            away_consensus = team_data
-                                    if team_key_clean in home_upper or home_upper in team_key_clean:
-                                        if home_consensus is None:
-                                            home_consensus = team_data
-                                
-                                if away_consensus:
-                                    game_doc['away_consensus_pct'] = away_consensus.get('consensus_pct')
-                                    game_doc['away_spread'] = away_consensus.get('spread')
-                                if home_consensus:
-                                    game_doc['home_consensus_pct'] = home_consensus.get('consensus_pct')
-                                    game_doc['home_spread'] = home_consensus.get('spread')
-                                
-                                if away_consensus or home_consensus:
-                                    logger.debug(f"[8PM Job] Added consensus for {away} @ {home}: Away {away_consensus}, Home {home_consensus}")
-                            
-                            # Try to add O/U consensus data from Covers.com
-                            if ou_consensus_data:
-                                # Match by team names
-                                for game_key, ou_data in ou_consensus_data.items():
-                                    ou_away = ou_data.get('away_team', '').upper()
-                                    ou_home = ou_data.get('home_team', '').upper()
-                                    away_upper = away.upper()
-                                    home_upper = home.upper()
-                                    
-                                    # Check if this O/U data matches our game
-                                    if (ou_away in away_upper or away_upper in ou_away or 
-                                        ou_home in home_upper or home_upper in ou_home):
-                                        over_pct = ou_data.get('over_pct', 0)
-                                        under_pct = ou_data.get('under_pct', 0)
-                                        
-                                        game_doc['over_consensus_pct'] = over_pct
-                                        game_doc['under_consensus_pct'] = under_pct
-                                        
-                                        # Set ou_public_pick if threshold met (61%+)
-                                        if over_pct >= 61:
-                                            game_doc['ou_public_pick'] = 'OVER'
-                                            game_doc['ou_public_pct'] = over_pct
-                                        elif under_pct >= 61:
-                                            game_doc['ou_public_pick'] = 'UNDER'
-                                            game_doc['ou_public_pct'] = under_pct
-                                        
-                                        logger.debug(f"[8PM Job] Added O/U consensus for {away} @ {home}: Over {over_pct}%, Under {under_pct}%")
-                                        break
-                            
-                            processed_games.append(game_doc)
-                            
-                            # Also store in opening_lines collection for tracking
-                            if total:
-                                await store_opening_line(league, tomorrow, away, home, total)
+                    away_consensus = (consensus_data.get(team_index.abbrev(away, 'covers')) or consensus_by_team.get(away_upper)
+                                      or consensus_by_team.get(game_team_key(team_index, away, 'covers')))
+                    home_consensus = (consensus_data.get(team_index.abbrev(home, 'covers')) or consensus_by_team.get(home_upper)
+                                      or consensus_by_team.get(game_team_key(team_index, home, 'covers')))
                     
-                    if processed_games:
-                        # All leagues now use CBS Sports
-                        data_source = "cbssports.com opening lines"
-                        if consensus_data:
-                            data_source += " + covers.com consensus"
-                        if ou_consensus_data:
-                            data_source += " + covers.com O/U"
-                        
-                        # Create or update the opportunities document
-                        await collection.update_one(
-                            {"date": tomorrow},
-                            {
-                                "$set": {
-                                    "date": tomorrow,
-                                    "games": processed_games,
-                                    "last_updated": datetime.now(arizona_tz).strftime('%I:%M %p'),
-                                    "data_source": data_source
-                                }
-                            },
-                            upsert=True
-                        )
-                        logger.info(f"[8PM Job] Created {len(processed_games)} {league} games for {tomorrow}")
-                    else:
-                        logger.warning(f"[8PM Job] No valid {league} games to store for {tomorrow}")
-                else:
-                    logger.warning(f"[8PM Job] No {league} games found for {tomorrow}")
+                    if away_consensus:
+                        game_doc['away_consensus_pct'] = away_consensus.get('consensus_pct')
+                        game_doc['away_spread'] = away_consensus.get('spread')
+                    if home_consensus:
+                        game_doc['home_consensus_pct'] = home_consensus.get('consensus_pct')
+                        game_doc['home_spread'] = home_consensus.get('spread')
                     
-            except Exception as e:
-                logger.error(f"[8PM Job] Error scraping {league}: {e}")
-                import traceback
-                traceback.print_exc()
-                
-    except Exception as e:
-        logger.error(f"[8PM Job] Error in scrape_tomorrows_opening_lines: {e}")
+                    if away_consensus or home_consensus:
+                        logger.debug(f"[8PM Job] Added consensus for {away} @ {home}: Away {away_consensus}, Home {home_consensus}")
+                
+                processed_games.append(game_doc)
+                
+                # Also store in opening_lines collection for tracking
+                if total:
+                    await store_opening_line(league, tomorrow, away, home, total)
+        
+        # Add O/U consensus data from Covers.com (joined on canonical team keys)
+        if ou_consensus_data and processed_games:
+            ou_rows = list(ou_consensus_data.values())
+            matching = match_games(league, processed_games, ou_rows, date=tomorrow, source='covers_ou')
+            leftovers = match_covers_ou_leftovers(league, processed_games, ou_rows, matching)
+            if leftovers:
+                logger.info(f"[8PM Job] {league} O/U consensus: {len(leftovers)} games matched by Covers code/name fallback")
+            for game_doc, ou_data in matching['pairs'] + leftovers:
+                over_pct = ou_data.get('over_pct', 0)
+                under_pct = ou_data.get('under_pct', 0)
+                
+                game_doc['over_consensus_pct'] = over_pct
+                game_doc['under_consensus_pct'] = under_pct
+                
+                # Set ou_public_pick if threshold met (61%+)
+                if over_pct >= 61:
+                    game_doc['ou_public_pick'] = 'OVER'
+                    game_doc['ou_public_pct'] = over_pct
+                elif under_pct >= 61:
+                    game_doc['ou_public_pick'] = 'UNDER'
+                    game_doc['ou_public_pct'] = under_pct
+                
+                logger.debug(f"[8PM Job] Added O/U consensus for {game_doc['away_team']} @ {game_doc['home_team']}: Over {over_pct}%, Under {under_pct}%")
+        
+        if processed_games:
+            # Link each game to its cross-source identity (stamps game_uid)
+            await register_game_identities(league, tomorrow, processed_games, source='cbs')
+            
+            # All leagues now use CBS Sports
+            data_source = "cbssports.com opening lines"
+            if consensus_data:
+                data_source += " + covers.com consensus"
+            if ou_consensus_data:
+                data_source += " + covers.com O/U"
+            
+            # Create or update the opportunities document
+            await collection.update_one(
+                {"date": tomorrow},
+                {
+                    "$set": {
+                        "date": tomorrow,
+                        "games": processed_games,
+                        "last_updated": datetime.now(arizona_tz).strftime('%I:%M %p'),
+                        "data_source": data_source
+                    }
+                },
+                upsert=True
+            )
+            logger.info(f"[8PM Job] Created {len(processed_games)} {league} games for {tomorrow}")
+            stored = len(processed_games)
+        else:
+            logger.warning(f"[8PM Job] No valid {league} games to store for {tomorrow}")
+    else:
+        logger.warning(f"[8PM Job] No {league} games found for {tomorrow}")
+    
+    return {"games_stored": stored}
 
 
-async def populate_ppg_and_dots_for_tomorrow(scraped_ppg_data=None, target_date=None):
+async def scrape_tomorrows_opening_lines(target_date: str = None, force: bool = False, run: Dict[str, Any] = None):
+    """
+    #1 - 8:00 PM Arizona: Scrape tomorrow's games and opening lines from CBS Sports
+    These are the opening lines for each game.
+    Creates full game documents in the opportunities collection.
+    Also fetches consensus data from Covers.com for moneylines/spreads.
+    
+    Each league is a pipeline stage: leagues run concurrently and a league
+    already completed for target_date is skipped unless force=True.
+    """
+    from zoneinfo import ZoneInfo
+    arizona_tz = ZoneInfo('America/Phoenix')
+    tomorrow = target_date or (datetime.now(arizona_tz) + timedelta(days=1)).strftime('%Y-%m-%d')
+    
+    logger.info(f"[8PM Job] Scraping tomorrow's opening lines for {tomorrow}")
+    
+    # NFL eliminated - only process NBA, NHL, NCAAB
+    leagues = ['NBA', 'NHL', 'NCAAB']
+    own_run = run is None
+    if own_run:
+        run = await start_pipeline_run('8pm_openers', tomorrow, force=force)
+    results = await asyncio.gather(*(
+        run_pipeline_stage(run, f"opening_lines:{league}", scrape_opening_lines_for_league, league, tomorrow)
+        for league in leagues
+    ))
+    if own_run:
+        await finish_pipeline_run(run)
+    return dict(zip(leagues, results))
+
+
+async def populate_ppg_and_dots_for_tomorrow(scraped_ppg_data=None, target_date=None, leagues=None, raise_errors=False):
     """
     #2 - After Scraping: Fill PPG Data & 4-Dot System for Tomorrow's Games
     
@@ -8674,6 +10407,8 @@ async def populate_ppg_and_dots_for_tomorrow(scraped_ppg_data=None, target_date=
     - 🔴 Red: Rank 25-32 (Bottom tier)
     
     If scraped_ppg_data is provided, use that instead of hardcoded values.
+    `leagues` limits the run (default NBA, NHL, NCAAB); with raise_errors a
+    league's failure is raised instead of only logged (8PM pipeline stages).
     """
     from zoneinfo import ZoneInfo
     arizona_tz = ZoneInfo('America/Phoenix')
@@ -8886,7 +10621,8 @@ async def populate_ppg_and_dots_for_tomorrow(scraped_ppg_data=None, target_date=
     # Edge thresholds by league
     edge_thresholds = {'NBA': 8, 'NHL': 0.6, 'NCAAB': 8}
     
-    for league in ['NBA', 'NHL', 'NCAAB']:
+    leagues = leagues or ['NBA', 'NHL', 'NCAAB']
+    for league in [lg for lg in ['NBA', 'NHL', 'NCAAB'] if lg in leagues]:
         try:
             collection_name = f"{league.lower()}_opportunities"
             collection = db[collection_name]
@@ -8922,184 +10658,15 @@ async def populate_ppg_and_dots_for_tomorrow(scraped_ppg_data=None, target_date=
             
             edge_threshold = edge_thresholds.get(league, 8)
             
-            # NCAAB team name normalization mapping (Plays888 -> TeamRankings)
-            ncaab_name_map = {
-                # State abbreviations
-                'Miss Valley St.': 'Mississippi Valley State', 'Miss. Valley St.': 'Mississippi Valley State',
-                'Southern U.': 'Southern', 'Southern Univ.': 'Southern',
-                'Illinois St.': 'Illinois State', 'Murray St.': 'Murray State',
-                'La. Tech': 'Louisiana Tech', 'Utah St.': 'Utah State',
-                'Wash. St.': 'Washington State', 'Oregon St.': 'Oregon State',
-                'Colo. St.': 'Colorado State', 'San Diego St.': 'San Diego State',
-                'San Fran.': 'San Francisco', 'Fla. St.': 'Florida State',
-                'Florida St.': 'Florida State', 'Michigan St.': 'Michigan State',
-                'Ohio St.': 'Ohio State', 'Penn St.': 'Penn State',
-                'Iowa St.': 'Iowa State', 'Kansas St.': 'Kansas State',
-                'Boise St.': 'Boise State', 'Fresno St.': 'Fresno State',
-                'Arizona St.': 'Arizona State', 'Ball St.': 'Ball State',
-                'Kent St.': 'Kent State', 'N.C. State': 'NC State',
-                'NC State': 'NC State', 'Appalachian St.': 'Appalachian State',
-                'Georgia St.': 'Georgia State', 'Wichita St.': 'Wichita State',
-                'Wright St.': 'Wright State', 'Youngstown St.': 'Youngstown State',
-                'Portland St.': 'Portland State', 'Sacramento St.': 'Sacramento State',
-                'San Jose St.': 'San Jose State', 'Idaho St.': 'Idaho State',
-                'Weber St.': 'Weber State', 'Montana St.': 'Montana State',
-                'N. Dakota St.': 'North Dakota State', 'S. Dakota St.': 'South Dakota State',
-                'Morehead St.': 'Morehead State', 'E. Kentucky': 'Eastern Kentucky',
-                'W. Kentucky': 'Western Kentucky', 'E. Michigan': 'Eastern Michigan',
-                'W. Michigan': 'Western Michigan', 'N. Illinois': 'Northern Illinois',
-                'S. Illinois': 'Southern Illinois', 'E. Illinois': 'Eastern Illinois',
-                'W. Illinois': 'Western Illinois', 'SE Missouri St.': 'Southeast Missouri State',
-                'SE Missouri': 'Southeast Missouri State', 'SIU Edwardsville': 'SIU-Edwardsville',
-                'UT Martin': 'Tennessee-Martin', 'Ark.-Pine Bluff': 'Arkansas-Pine Bluff',
-                'UAPB': 'Arkansas-Pine Bluff', 'Alcorn St.': 'Alcorn State',
-                'Jackson St.': 'Jackson State', 'Grambling St.': 'Grambling',
-                'Grambling': 'Grambling', 'Prairie View': 'Prairie View A&M',
-                'Texas Southern': 'Texas Southern', 'Alabama St.': 'Alabama State',
-                'Alabama A&M': 'Alabama A&M', 'Bethune-Cookman': 'Bethune-Cookman',
-                'Fla. A&M': 'Florida A&M', 'FAMU': 'Florida A&M',
-                'N.C. A&T': 'NC A&T', 'NC A&T': 'NC A&T',
-                'Norfolk St.': 'Norfolk State', 'Morgan St.': 'Morgan State',
-                'Delaware St.': 'Delaware State', 'Coppin St.': 'Coppin State',
-                'S.C. State': 'South Carolina State', 'SC State': 'South Carolina State',
-                'Howard': 'Howard', 'Hampton': 'Hampton',
-                # Directional schools
-                'N. Colorado': 'Northern Colorado', 'N. Arizona': 'Northern Arizona',
-                'N. Iowa': 'Northern Iowa', 'S. Alabama': 'South Alabama',
-                'S. Carolina': 'South Carolina', 'N. Carolina': 'North Carolina',
-                'W. Virginia': 'West Virginia', 'E. Carolina': 'East Carolina',
-                'E. Washington': 'Eastern Washington', 'C. Michigan': 'Central Michigan',
-                'C. Arkansas': 'Central Arkansas', 'C. Connecticut': 'Central Connecticut',
-                'Cent. Arkansas': 'Central Arkansas', 'Cent. Michigan': 'Central Michigan',
-                # NEW MAPPINGS - Missing teams from logs
-                'N. Kentucky': 'Northern Kentucky', 'N Kentucky': 'Northern Kentucky',
-                'Clev. St.': 'Cleveland State', 'Cleveland St.': 'Cleveland State',
-                'Ga. Southern': 'Georgia Southern', 'Ga Southern': 'Georgia Southern',
-                'UL-Monroe': 'Louisiana-Monroe', 'UL Monroe': 'Louisiana-Monroe', 'LA-Monroe': 'Louisiana-Monroe',
-                'UL-Lafayette': 'Louisiana', 'UL Lafayette': 'Louisiana', 'Louisiana-Lafayette': 'Louisiana',
-                'IUI': 'IUPUI', 'Ind.-Purdue': 'IUPUI',
-                'Akron': 'Akron', 'Princeton': 'Princeton', 'Cornell': 'Cornell',
-                'Siena': 'Siena', 'Niagara': 'Niagara', 'Iona': 'Iona',
-                'Green Bay': 'Green Bay', 'Milwaukee': 'Milwaukee',
-                'Dartmouth': 'Dartmouth', 'Yale': 'Yale', 'Harvard': 'Harvard',
-                'Brown': 'Brown', 'Penn': 'Penn', 'Columbia': 'Columbia',
-                'Fairfield': 'Fairfield', 'Marist': 'Marist', 'Canisius': 'Canisius',
-                'Detroit': 'Detroit Mercy', 'Detroit Mercy': 'Detroit Mercy',
-                'Mt St Mary\'s': "Mount St. Mary's", 'Mt. St. Mary\'s': "Mount St. Mary's",
-                "Mount St. Mary's": "Mount St. Mary's", 'Mt St Marys': "Mount St. Mary's",
-                'Saint Peter\'s': "Saint Peter's", "St. Peter's": "Saint Peter's",
-                'Grand Canyon': 'Grand Canyon', 'GCU': 'Grand Canyon',
-                'Loyola Chi.': 'Loyola Chicago', 'Loyola-Chi.': 'Loyola Chicago',
-                'UNLV': 'UNLV', 'Nevada': 'Nevada',
-                'Charlotte': 'Charlotte', 'Rice': 'Rice',
-                # Texas schools
-                'Texas A&M': 'Texas A&M', 'UTEP': 'UTEP', 'UTSA': 'UTSA',
-                'UT Arlington': 'Texas-Arlington', 'UTA': 'Texas-Arlington',
-                'UT Rio Grande': 'Texas-Rio Grande Valley', 'UTRGV': 'Texas-Rio Grande Valley',
-                'Texas St.': 'Texas State', 'Sam Houston': 'Sam Houston State',
-                'Sam Houston St.': 'Sam Houston State', 'Stephen F. Austin': 'Stephen F. Austin',
-                'SFA': 'Stephen F. Austin', 'Abilene Christian': 'Abilene Christian',
-                'Tarleton St.': 'Tarleton State', 'Lamar': 'Lamar',
-                # California schools
-                'USC': 'USC', 'UCLA': 'UCLA', 'Cal': 'California',
-                'Cal St. Fullerton': 'Cal State Fullerton', 'CSUF': 'Cal State Fullerton',
-                'Cal St. Northridge': 'Cal State Northridge', 'CSUN': 'Cal State Northridge',
-                'Long Beach St.': 'Long Beach State', 'Cal Poly': 'Cal Poly',
-                'UC Davis': 'UC Davis', 'UC Irvine': 'UC Irvine',
-                'UC Riverside': 'UC Riverside', 'UC San Diego': 'UC San Diego',
-                'UC Santa Barbara': 'UC Santa Barbara', 'UCSB': 'UC Santa Barbara',
-                'Pepperdine': 'Pepperdine', 'LMU': 'Loyola Marymount',
-                'Loyola Marymount': 'Loyola Marymount', 'Santa Clara': 'Santa Clara',
-                'San Diego': 'San Diego', 'Pacific': 'Pacific',
-                'St. Mary\'s': 'Saint Mary\'s', "Saint Mary's": "Saint Mary's",
-                'Gonzaga': 'Gonzaga', 'Portland': 'Portland',
-                # Other common variations
-                'UConn': 'Connecticut', 'Connecticut': 'Connecticut',
-                'UMass': 'Massachusetts', 'Massachusetts': 'Massachusetts',
-                'Miami': 'Miami', 'Miami (FL)': 'Miami', 'Miami FL': 'Miami',
-                'Miami (OH)': 'Miami (OH)', 'Miami OH': 'Miami (OH)',
-                'St. John\'s': "St. John's", "St. John's": "St. John's",
-                'St. Joseph\'s': "Saint Joseph's", "Saint Joseph's": "Saint Joseph's",
-                'St. Peter\'s': "Saint Peter's", 'St. Bonaventure': 'St. Bonaventure',
-                'Loyola-Md.': 'Loyola (MD)', 'Loyola MD': 'Loyola (MD)',
-                'Loyola Chicago': 'Loyola Chicago', 'Loyola-Chicago': 'Loyola Chicago',
-                'VCU': 'VCU', 'SMU': 'SMU', 'TCU': 'TCU', 'BYU': 'BYU',
-                'LSU': 'LSU', 'Ole Miss': 'Ole Miss', 'Miss. St.': 'Mississippi State',
-                'Mississippi St.': 'Mississippi State', 'Miss St.': 'Mississippi State',
-                'Ark. St.': 'Arkansas State', 'Arkansas St.': 'Arkansas State',
-                'Tulsa': 'Tulsa', 'Tulane': 'Tulane', 'Memphis': 'Memphis',
-                'Cincinnati': 'Cincinnati', 'UCF': 'UCF', 'USF': 'South Florida',
-                'South Florida': 'South Florida', 'Temple': 'Temple',
-                'La Salle': 'La Salle', 'Duquesne': 'Duquesne',
-                'Dayton': 'Dayton', 'Xavier': 'Xavier', 'Butler': 'Butler',
-                'Creighton': 'Creighton', 'Marquette': 'Marquette',
-                'DePaul': 'DePaul', 'Providence': 'Providence',
-                'Villanova': 'Villanova', 'Seton Hall': 'Seton Hall',
-                'Georgetown': 'Georgetown', 'Syracuse': 'Syracuse',
-                'Pittsburgh': 'Pittsburgh', 'Pitt': 'Pittsburgh',
-                'Notre Dame': 'Notre Dame', 'Boston College': 'Boston College',
-                'Wake Forest': 'Wake Forest', 'Duke': 'Duke',
-                'Virginia': 'Virginia', 'Virginia Tech': 'Virginia Tech',
-                'Louisville': 'Louisville', 'Clemson': 'Clemson',
-                'Georgia Tech': 'Georgia Tech', 'Ga. Tech': 'Georgia Tech',
-                'Northwestern': 'Northwestern', 'Wisconsin': 'Wisconsin',
-                'Minnesota': 'Minnesota', 'Nebraska': 'Nebraska',
-                'Purdue': 'Purdue', 'Indiana': 'Indiana', 'Illinois': 'Illinois',
-                'Maryland': 'Maryland', 'Rutgers': 'Rutgers',
-                'N\'western': 'Northwestern', 'N. Western': 'Northwestern',
-                'Seattle': 'Seattle', 'Seattle U': 'Seattle',
-                'Army': 'Army', 'Navy': 'Navy', 'Air Force': 'Air Force',
-                'Lehigh': 'Lehigh', 'Bucknell': 'Bucknell', 'Colgate': 'Colgate',
-                'Lafayette': 'Lafayette', 'American': 'American',
-                'Boston U': 'Boston University', 'Boston U.': 'Boston University',
-                'Holy Cross': 'Holy Cross', 'Fordham': 'Fordham',
-                'Richmond': 'Richmond', 'Davidson': 'Davidson',
-                'George Mason': 'George Mason', 'GMU': 'George Mason',
-                'George Washington': 'George Washington', 'GW': 'George Washington',
-                'St. Louis': 'Saint Louis', 'Saint Louis': 'Saint Louis',
-                'UNC': 'North Carolina', 'North Carolina': 'North Carolina',
-                'Stanford': 'Stanford', 'Oregon': 'Oregon', 'Washington': 'Washington',
-                'Colorado': 'Colorado', 'Utah': 'Utah', 'Arizona': 'Arizona',
-                'USC': 'USC', 'Cal': 'California', 'California': 'California',
-                # Queens and other newer teams
-                'Queens': 'Queens (NC)', 'Queens NC': 'Queens (NC)',
-                'Bellarmine': 'Bellarmine', 'Lindenwood': 'Lindenwood',
-                'Southern Ind.': 'Southern Indiana', 'Southern Indiana': 'Southern Indiana',
-                'Stonehill': 'Stonehill', 'Le Moyne': 'Le Moyne',
-                'Mercyhurst': 'Mercyhurst',
-                # More state schools
-                'Texas': 'Texas', 'Oklahoma': 'Oklahoma', 'Oklahoma St.': 'Oklahoma State',
-                'Baylor': 'Baylor', 'Kansas': 'Kansas', 'Houston': 'Houston',
-                'Auburn': 'Auburn', 'Alabama': 'Alabama', 'Tennessee': 'Tennessee',
-                'Kentucky': 'Kentucky', 'Florida': 'Florida', 'Georgia': 'Georgia',
-                'Vanderbilt': 'Vanderbilt', 'Arkansas': 'Arkansas',
-                'Missouri': 'Missouri', 'Texas Tech': 'Texas Tech',
-                'Iowa': 'Iowa', 'Michigan': 'Michigan',
-            }
+            # NCAAB team names -> TeamRankings names (shared alias index, see NCAAB_TEAM_NAME_MAP)
+            ncaab_resolver = get_team_index('NCAAB').resolver_for(ppg_season.keys()) if league == 'NCAAB' else None
             
-            def normalize_ncaab_team(name, ppg_dict):
-                """Try to find team in PPG dict with normalization"""
+            def normalize_ncaab_team(name):
+                """Find team in PPG dict with normalization"""
                 if not name:
                     return name
-                # Direct match
-                if name in ppg_dict:
-                    return name
-                # Try mapped name
-                if name in ncaab_name_map:
-                    mapped = ncaab_name_map[name]
-                    if mapped in ppg_dict:
-                        return mapped
-                # Try case-insensitive match
-                name_lower = name.lower()
-                for key in ppg_dict:
-                    if key.lower() == name_lower:
-                        return key
-                # Try partial match (team name contains)
-                for key in ppg_dict:
-                    if name_lower in key.lower() or key.lower() in name_lower:
-                        return key
                 # Return original if no match found
-                return name
+                return ncaab_resolver.normalize(name, source='teamrankings')
             
             # Process each game
             for game in games:
@@ -9109,8 +10676,8 @@ async def populate_ppg_and_dots_for_tomorrow(scraped_ppg_data=None, target_date=
                 
                 # Normalize team names for NCAAB
                 if league == 'NCAAB':
-                    away_normalized = normalize_ncaab_team(away, ppg_season)
-                    home_normalized = normalize_ncaab_team(home, ppg_season)
+                    away_normalized = normalize_ncaab_team(away)
+                    home_normalized = normalize_ncaab_team(home)
                 else:
                     away_normalized = away
                     home_normalized = home
@@ -9188,10 +10755,14 @@ async def populate_ppg_and_dots_for_tomorrow(scraped_ppg_data=None, target_date=
             logger.error(f"[8PM Job #2] Error processing {league}: {e}")
             import traceback
             traceback.print_exc()
+            if raise_errors:
+                raise
     
     # ==================== NCAAB PPG PROCESSING ====================
     # NCAAB: Scrape Last 3 PPG directly from CBS Sports team pages
     try:
+        if 'NCAAB' not in leagues:
+            return
         logger.info(f"[8PM Job #2] Processing NCAAB PPG using CBS Sports Last 3 scores...")
         
         collection = db.ncaab_opportunities
@@ -9209,9 +10780,15 @@ async def populate_ppg_and_dots_for_tomorrow(scraped_ppg_data=None, target_date=
             _, team_urls = await scrape_cbssports_ncaab_with_team_urls(tomorrow)
             logger.info(f"[8PM Job #2] Got {len(team_urls)} team URLs from CBS Sports")
             
-            # Scrape Last 3 PPG for each team from CBS Sports
-            team_last3_stats = await scrape_ncaab_team_last3_ppg(team_urls, max_concurrent=5)
-            logger.info(f"[8PM Job #2] Scraped Last 3 PPG for {len(team_last3_stats)} teams from CBS Sports")
+            # Last 3 from our own stored finals; only teams with gaps in the log need their CBS page
+            local_last3 = await team_ppg_from_game_log('NCAAB', list(team_urls.keys()), tomorrow)
+            team_last3_stats = {team: stats for team, stats in local_last3.items() if not stats['gap']}
+            gap_urls = {team: url for team, url in team_urls.items() if team not in team_last3_stats}
+            logger.info(f"[8PM Job #2] Last 3 PPG from game log for {len(team_last3_stats)} teams, scraping {len(gap_urls)} with gaps")
+            
+            # Scrape Last 3 PPG for the remaining teams from CBS Sports
+            team_last3_stats.update(await scrape_ncaab_team_last3_ppg(gap_urls, max_concurrent=5, results_date=tomorrow))
+            logger.info(f"[8PM Job #2] Got Last 3 PPG for {len(team_last3_stats)} teams")
             
             # NCAAB has ~365 teams, dot thresholds are percentile-based
             def get_ncaab_dot_color(rank):
@@ -9229,43 +10806,8 @@ async def populate_ppg_and_dots_for_tomorrow(scraped_ppg_data=None, target_date=
             # NCAAB edge threshold is 9
             ncaab_edge_threshold = 10
             
-            # Helper function to find team in PPG data with fuzzy matching
-            def find_team_data(team_name, data_dict):
-                if not team_name:
-                    return None
-                    
-                def normalize(name):
-                    name = name.strip()
-                    name = name.replace(' St.', '').replace(' St', '')
-                    name = name.replace(' State', '').replace('-Fort Kent', '')
-                    name = name.replace('N. ', 'North ').replace('S. ', 'South ')
-                    name = name.replace('E. ', 'East ').replace('W. ', 'West ')
-                    name = name.replace('C. ', 'Central ')
-                    return name.lower().strip()
-                
-                search_name = normalize(team_name)
-                
-                # Direct match
-                if team_name in data_dict:
-                    return data_dict[team_name]
-                
-                # Try lowercase
-                for key, val in data_dict.items():
-                    if key.lower() == team_name.lower():
-                        return val
-                
-                # Try normalized match
-                for key, val in data_dict.items():
-                    if normalize(key) == search_name:
-                        return val
-                
-                # Try partial match
-                for key, val in data_dict.items():
-                    key_norm = normalize(key)
-                    if search_name in key_norm or key_norm in search_name:
-                        return val
-                
-                return None
+            # TeamRankings / CBS tables looked up through the shared alias index
+            find_team_data = team_table_finder('NCAAB', source='teamrankings')
             
             for game in games:
                 away = game.get('away_team') or game.get('away', '')
@@ -9360,233 +10902,375 @@ async def populate_ppg_and_dots_for_tomorrow(scraped_ppg_data=None, target_date=
         logger.error(f"[8PM Job #2] Error processing NCAAB: {e}")
         import traceback
         traceback.print_exc()
-            
-    except Exception as e:
-        logger.error(f"[8PM Job #2] Error processing NCAAB: {e}")
-        import traceback
-        traceback.print_exc()
+        if raise_errors:
+            raise
     
     logger.info(f"[8PM Job #2] Completed PPG and dots population for tomorrow ({tomorrow})")
 
 
-async def execute_8pm_process():
+async def execute_8pm_process(target_date: str = None, force: bool = False):
     """
     Execute the full 8pm process: #1 (scrape opening lines) + #1.5 (scrape PPG/GPG) + #2 (populate PPG and dots)
     This is called by the scheduled job at 8pm Arizona time or manually via API.
+    Completed stages for the target date are skipped (resume) unless force=True.
     """
+    import json
     from zoneinfo import ZoneInfo
     arizona_tz = ZoneInfo('America/Phoenix')
     now_arizona = datetime.now(arizona_tz)
-    tomorrow = (now_arizona + timedelta(days=1)).strftime('%Y-%m-%d')
+    tomorrow = target_date or (now_arizona + timedelta(days=1)).strftime('%Y-%m-%d')
     
     logger.info(f"=" * 60)
     logger.info(f"[8PM PROCESS] Starting at {now_arizona.strftime('%I:%M %p')} Arizona time")
     logger.info(f"[8PM PROCESS] Target date: {tomorrow}")
     logger.info(f"=" * 60)
     
+    run = await start_pipeline_run('8pm', tomorrow, force=force)
+    
     # Step #1: Scrape tomorrow's opening lines from ScoresAndOdds
     logger.info(f"[8PM PROCESS] Step #1: Scraping tomorrow's opening lines...")
-    await scrape_tomorrows_opening_lines()
+    await report_job_progress("#1 opening lines", 0)
+    await scrape_tomorrows_opening_lines(tomorrow, run=run)
     
     # Step #1.5: Scrape PPG/GPG data from external sources
     logger.info(f"[8PM PROCESS] Step #1.5: Scraping PPG/GPG data from external sources...")
+    await report_job_progress("#1.5 PPG/GPG data", 40)
+    ppg_stage = await run_pipeline_stage(run, "ppg_data", load_ppg_data_stage)
+    # The data this run loaded is kept in the stage result (as JSON text, team
+    # names may contain dots), so a resumed run populates from the same values
+    # instead of whatever snapshot is newest
+    ppg_data = json.loads(ppg_stage["data_json"]) if ppg_stage and ppg_stage.get("data_json") else None
+    
+    # Step #2: Populate PPG and dots, one stage per league so a failed league is retried on resume
+    logger.info(f"[8PM PROCESS] Step #2: Populating PPG and 4-dot analysis...")
+    await report_job_progress("#2 PPG and dots", 50)
+    for league in ['NBA', 'NHL', 'NCAAB']:
+        stage = f"populate_ppg:{league}"
+        rerun_stage_if_inputs_ran(run, stage, f"opening_lines:{league}")
+        rerun_stage_if_inputs_ran(run, stage, "ppg_data")
+        await run_pipeline_stage(run, stage, populate_ppg_stage, ppg_data, tomorrow, league)
+    
+    status = await finish_pipeline_run(run)
+    logger.info(f"[8PM PROCESS] {'✅ Completed successfully' if status == 'completed' else '⚠️ Incomplete: ' + ', '.join(run['failed'])}")
+    return {"status": "success" if status == "completed" else status, "date": tomorrow,
+            "timestamp": now_arizona.isoformat(), "stages": run["stages"]}
+
+
+async def load_ppg_data_stage() -> Dict[str, Any]:
+    import json
+    ppg_data = await scrape_ppg_data_all_leagues()
+    logger.info(f"[8PM PROCESS] PPG data scraped successfully")
+    return {"teams": {league: len(data.get("season", {})) for league, data in ppg_data.items()},
+            "data_json": json.dumps(ppg_data)}
+
+
+async def populate_ppg_stage(ppg_data, target_date: str, league: str) -> Dict[str, Any]:
+    await populate_ppg_and_dots_for_tomorrow(ppg_data, target_date, leagues=[league], raise_errors=True)
+    return {"date": target_date, "league": league}
+
+
+async def morning_scores_for_league(league: str, yesterday: str) -> Dict[str, Any]:
+    """
+    #4 for one league: final scores for yesterday's stored games + edge HIT/MISS.
+    Raises when games are stored but no results could be scraped (retried on resume).
+    """
+    # Update the opportunities collection with final scores
+    collection_name = f"{league.lower()}_opportunities"
+    collection = db[collection_name]
+    cached = await collection.find_one({"date": yesterday}, {"_id": 0})
+    if not cached or not cached.get('games'):
+        logger.info(f"[#4 Process] No stored {league} games for {yesterday}")
+        return {"hits": 0, "misses": 0, "games_updated": 0}
+    
+    # Scrape yesterday's results from ScoresAndOdds (or CBS for NCAAB)
+    logger.info(f"[#4 Process] Scraping {league} results for {yesterday}")
+    if league == 'NCAAB':
+        results = await scrape_cbssports_ncaab(yesterday)
+    else:
+        results = await scrape_scoresandodds(league.upper(), yesterday)
+    if not results:
+        raise RuntimeError(f"No {league} results found for {yesterday}")
+    logger.info(f"[#4 Process] Got {len(results)} {league} games")
+    
+    edge_hits = 0
+    edge_misses = 0
+    games_updated = 0
+    games = cached['games']
+    
+    # Join stored games with scraped results on canonical team keys
+    matching = match_games(league, games, results, date=yesterday, source='morning_refresh')
+    await link_matched_games(league, yesterday, matching['pairs'], source='cbs' if league == 'NCAAB' else 'scoresandodds')
+    for game, result in matching['pairs']:
+        g_away, g_home = game_team_names(game)
+        final_score = result.get('final_score')
+        
+        if final_score:
+            game['final_score'] = final_score
+            game['away_score'] = result.get('away_score')
+            game['home_score'] = result.get('home_score')
+            games_updated += 1
+            
+            # Determine if the total went OVER or UNDER
+            line = game.get('total')
+            if line:
+                actual_result = 'OVER' if final_score > line else 'UNDER'
+                game['actual_result'] = actual_result
+                
+                # Check if our edge recommendation was correct
+                recommendation = game.get('recommendation')
+                if recommendation:
+                    edge_hit = (recommendation == actual_result)
+                    game['result_hit'] = edge_hit
+                    
+                    if edge_hit:
+                        edge_hits += 1
+                    else:
+                        edge_misses += 1
+                    
+                    logger.info(f"[#4] {g_away} @ {g_home}: Final={final_score}, Line={line}, Result={actual_result}, Rec={recommendation}, HIT={edge_hit}")
+    
+    # Save updated games back to database
+    await collection.update_one(
+        {"date": yesterday},
+        {"$set": {
+            "games": games,
+            "scores_updated": True,
+            "scores_updated_at": datetime.now(timezone.utc).isoformat()
+        }}
+    )
+    await record_team_game_finals(league, yesterday, games)
+    
+    logger.info(f"[#4 Process] {league}: Updated {games_updated} games, Edge: {edge_hits}-{edge_misses}")
+    return {"hits": edge_hits, "misses": edge_misses, "games_updated": games_updated}
+
+
+async def morning_bet_results(leagues: List[str]) -> Dict[str, Any]:
+    """#5: settled bet results from Plays888 History"""
+    conn = await db.connections.find_one({}, {"_id": 0}, sort=[("created_at", -1)])
+    if not conn or not conn.get("is_connected"):
+        return {"settled": 0, "connected": False}
+    username = conn["username"]
+    password = decrypt_password(conn["password_encrypted"])
+    
+    scraper = Plays888Service()
     try:
-        ppg_data = await scrape_ppg_data_all_leagues()
-        logger.info(f"[8PM PROCESS] PPG data scraped successfully")
-    except Exception as e:
-        logger.error(f"[8PM PROCESS] Error scraping PPG data: {e}")
-        ppg_data = None
+        await scraper.login(username, password)
+        # Get bet history
+        bets = await scraper.scrape_open_bets()  # This gets history too
+    finally:
+        await scraper.close()
     
-    # Step #2: Populate PPG and dots
-    logger.info(f"[8PM PROCESS] Step #2: Populating PPG and 4-dot analysis...")
-    await populate_ppg_and_dots_for_tomorrow(ppg_data)
+    # Update settled bets
+    settled = [b for b in (bets or []) if b.get('result') in ['won', 'lost', 'push']]
+    logger.info(f"[5AM Job] Found {len(settled)} settled bets")
     
-    logger.info(f"[8PM PROCESS] ✅ Completed successfully")
-    return {"status": "success", "date": tomorrow, "timestamp": now_arizona.isoformat()}
+    by_league = {}
+    for league in leagues:
+        league_bets = [b for b in settled if league.upper() in (b.get('sport') or '').upper()]
+        if league_bets:
+            wins = sum(1 for b in league_bets if b.get('result') == 'won')
+            losses = sum(1 for b in league_bets if b.get('result') == 'lost')
+            
+            if wins > 0 or losses > 0:
+                logger.info(f"[5AM Job] Found {league} bet results: {wins} wins, {losses} losses")
+                by_league[league] = {"wins": wins, "losses": losses}
+    return {"settled": len(settled), "connected": True, "by_league": by_league}
+
+
+async def morning_update_records() -> Dict[str, Any]:
+    """#6: betting and edge records from 12/22/25 to yesterday"""
+    logger.info(f"[#6 Process] Updating betting and edge records from 12/22/25")
+    records_result = await update_records_from_start_date("2025-12-22")
+    logger.info(f"[#6 Process] Records updated: {records_result}")
+    return {"updated": True}
 
 
-async def morning_data_refresh():
+async def morning_data_refresh(scores_date: str = None, force: bool = False):
     """
     5:00 AM Arizona: Morning data refresh
     #3 - Switch to Plays888 live lines (handled by flag)
     #4 - Get yesterday's scores from ScoresAndOdds + Mark edge HITs/MISSes
     #5 - Get bet results from Plays888 History
     #6 - Update betting and edge records
+    
+    Leagues' #4 stages run concurrently; stages completed for scores_date
+    (default yesterday) are skipped unless force=True.
     """
     from zoneinfo import ZoneInfo
     arizona_tz = ZoneInfo('America/Phoenix')
-    yesterday = (datetime.now(arizona_tz) - timedelta(days=1)).strftime('%Y-%m-%d')
+    yesterday = scores_date or (datetime.now(arizona_tz) - timedelta(days=1)).strftime('%Y-%m-%d')
     today = datetime.now(arizona_tz).strftime('%Y-%m-%d')
     
     logger.info(f"[5AM Job] Starting morning data refresh for {today}")
     logger.info(f"[5AM Job] Getting yesterday's ({yesterday}) results")
     
     try:
+        run = await start_pipeline_run('5am', yesterday, force=force)
+        
         # #4 - Get yesterday's scores from ScoresAndOdds and mark edge HITs/MISSes
         # NFL eliminated - only process NBA, NHL, NCAAB
         leagues = ['NBA', 'NHL', 'NCAAB']
-        edge_results = {}  # Track edge performance by league
-        
-        for league in leagues:
-            try:
-                # Scrape yesterday's results from ScoresAndOdds (or CBS for NCAAB)
-                logger.info(f"[#4 Process] Scraping {league} results for {yesterday}")
-                if league == 'NCAAB':
-                    results = await scrape_cbssports_ncaab(yesterday)
-                else:
-                    results = await scrape_scoresandodds(league.upper(), yesterday)
-                
-                if results:
-                    logger.info(f"[#4 Process] Got {len(results)} {league} games")
-                    
-                    # Update the opportunities collection with final scores
-                    collection_name = f"{league.lower()}_opportunities"
-                    collection = db[collection_name]
-                    
-                    dates_to_check = [yesterday]
-                    
-                    edge_hits = 0
-                    edge_misses = 0
-                    games_updated = 0
-                    
-                    for check_date in dates_to_check:
-                        cached = await collection.find_one({"date": check_date}, {"_id": 0})
-                        if cached and cached.get('games'):
-                            games = cached['games']
-                            
-                            for game in games:
-                                # Match with scraped results and update final_score
-                                for result in results:
-                                    r_away = (result.get('away_team') or result.get('away', '')).lower()
-                                    r_home = (result.get('home_team') or result.get('home', '')).lower()
-                                    g_away = (game.get('away_team') or game.get('away', '')).lower()
-                                    g_home = (game.get('home_team') or game.get('home', '')).lower()
-                                    
-                                    # Use multiple matching strategies
-                                    # 1. Exact or substring match
-                                    match1 = (r_away in g_away or g_away in r_away) and (r_home in g_home or g_home in r_home)
-                                    
-                                    # 2. Last word match (team nickname)
-                                    r_away_last = r_away.split()[-1] if r_away else ''
-                                    r_home_last = r_home.split()[-1] if r_home else ''
-                                    g_away_last = g_away.split()[-1] if g_away else ''
-                                    g_home_last = g_home.split()[-1] if g_home else ''
-                                    match2 = (r_away_last == g_away_last) and (r_home_last == g_home_last)
-                                    
-                                    # 3. First word match (city name)
-                                    r_away_first = r_away.split()[0] if r_away else ''
-                                    r_home_first = r_home.split()[0] if r_home else ''
-                                    g_away_first = g_away.split()[0] if g_away else ''
-                                    g_home_first = g_home.split()[0] if g_home else ''
-                                    match3 = (r_away_first == g_away_first) and (r_home_first == g_home_first)
-                                    
-                                    if match1 or match2 or match3:
-                                        final_score = result.get('final_score')
-                                        
-                                        if final_score:
-                                            game['final_score'] = final_score
-                                            game['away_score'] = result.get('away_score')
-                                            game['home_score'] = result.get('home_score')
-                                            games_updated += 1
-                                            
-                                            # Determine if the total went OVER or UNDER
-                                            line = game.get('total')
-                                            if line:
-                                                actual_result = 'OVER' if final_score > line else 'UNDER'
-                                                game['actual_result'] = actual_result
-                                                
-                                                # Check if our edge recommendation was correct
-                                                recommendation = game.get('recommendation')
-                                                if recommendation:
-                                                    edge_hit = (recommendation == actual_result)
-                                                    game['result_hit'] = edge_hit
-                                                    
-                                                    if edge_hit:
-                                                        edge_hits += 1
-                                                    else:
-                                                        edge_misses += 1
-                                                    
-                                                    logger.info(f"[#4] {g_away} @ {g_home}: Final={final_score}, Line={line}, Result={actual_result}, Rec={recommendation}, HIT={edge_hit}")
-                                        break
-                            
-                            # Save updated games back to database
-                            await collection.update_one(
-                                {"date": check_date},
-                                {"$set": {
-                                    "games": games,
-                                    "scores_updated": True,
-                                    "scores_updated_at": datetime.now(timezone.utc).isoformat()
-                                }}
-                            )
-                    
-                    edge_results[league] = {"hits": edge_hits, "misses": edge_misses}
-                    logger.info(f"[#4 Process] {league}: Updated {games_updated} games, Edge: {edge_hits}-{edge_misses}")
-                else:
-                    logger.warning(f"[#4 Process] No {league} results found for {yesterday}")
-                        
-            except Exception as e:
-                logger.error(f"[#4 Process] Error getting {league} results: {e}")
-                import traceback
-                traceback.print_exc()
+        await report_job_progress("#4 scores", 0)
+        scores = await asyncio.gather(*(
+            run_pipeline_stage(run, f"scores:{league}", morning_scores_for_league, league, yesterday)
+            for league in leagues
+        ))
+        # Track edge performance by league
+        edge_results = {league: {"hits": r["hits"], "misses": r["misses"]}
+                        for league, r in zip(leagues, scores) if r and r.get("games_updated")}
         
         # #5 - Get bet results from Plays888 History
-        try:
-            conn = await db.connections.find_one({}, {"_id": 0}, sort=[("created_at", -1)])
-            if conn and conn.get("is_connected"):
-                username = conn["username"]
-                password = decrypt_password(conn["password_encrypted"])
-                
-                scraper = Plays888Service()
-                await scraper.login(username, password)
-                
-                # Get bet history
-                bets = await scraper.scrape_open_bets()  # This gets history too
-                await scraper.close()
-                
-                if bets:
-                    # Update settled bets
-                    settled = [b for b in bets if b.get('result') in ['won', 'lost', 'push']]
-                    logger.info(f"[5AM Job] Found {len(settled)} settled bets")
-                    
-                    # #6 - Update records based on settled bets
-                    for league in leagues:
-                        league_bets = [b for b in settled if league.upper() in (b.get('sport') or '').upper()]
-                        if league_bets:
-                            wins = sum(1 for b in league_bets if b.get('result') == 'won')
-                            losses = sum(1 for b in league_bets if b.get('result') == 'lost')
-                            
-                            if wins > 0 or losses > 0:
-                                logger.info(f"[5AM Job] Found {league} bet results: {wins} wins, {losses} losses")
-                                
-        except Exception as e:
-            logger.error(f"[5AM Job] Error getting bet results: {e}")
+        await report_job_progress("#5 bet results", 60)
+        await run_pipeline_stage(run, "bet_results", morning_bet_results, leagues)
         
-        # #6 - Update Records from 12/22/25 to yesterday
-        try:
-            logger.info(f"[#6 Process] Updating betting and edge records from 12/22/25")
-            records_result = await update_records_from_start_date("2025-12-22")
-            logger.info(f"[#6 Process] Records updated: {records_result}")
-        except Exception as e:
-            logger.error(f"[5AM Job] Error updating records: {e}")
+        # #6 - Update Records from 12/22/25 to yesterday (after #4, which marks the edge results)
+        await report_job_progress("#6 records", 80)
+        rerun_stage_if_inputs_ran(run, "records", "scores:")
+        await run_pipeline_stage(run, "records", morning_update_records)
+        
+        status = await finish_pipeline_run(run)
         
         # Summary
-        logger.info(f"[5AM Job] Morning data refresh completed")
+        logger.info(f"[5AM Job] Morning data refresh {status}")
         logger.info(f"[5AM Job] Edge Results Summary: {edge_results}")
         
-        return {"status": "success", "edge_results": edge_results}
+        return {"status": "success" if status == "completed" else status, "edge_results": edge_results, "stages": run["stages"]}
         
     except Exception as e:
         logger.error(f"[5AM Job] Error in morning_data_refresh: {e}")
         return {"status": "error", "error": str(e)}
 
 
-# ============== PROCESS #6: UPDATE RECORDS FROM 12/22/25 ==============
+# ============================================================================
+# PIPELINE RUNS - stage checkpoints for the 8PM and 5AM pipelines
+# ============================================================================
+# Each run of a pipeline for a date is one db.pipeline_runs document with a
+# status per stage (opening_lines:NBA, ppg_data, scores:NHL, records, ...).
+# Completed stages are skipped when the run is started again, so a failure or
+# a restart only re-runs what didn't finish; resume_pipeline_runs re-queues
+# incomplete runs for dates that are still current at startup.
+
+PIPELINE_MAX_RESUME_ATTEMPTS = 3
+
+
+async def start_pipeline_run(pipeline: str, date: str, force: bool = False) -> Dict[str, Any]:
+    """Load (or create) the run for pipeline/date; force=True clears its stage checkpoints"""
+    now = datetime.now(timezone.utc)
+    doc = None if force else await db.pipeline_runs.find_one({"pipeline": pipeline, "date": date}, {"_id": 0})
+    stages = (doc or {}).get("stages", {})
+    attempts = (doc or {}).get("attempts", 0) + 1
+    await db.pipeline_runs.update_one(
+        {"pipeline": pipeline, "date": date},
+        {"$set": {"pipeline": pipeline, "date": date, "status": "running", "stages": stages,
+                  "attempts": attempts, "updated_at": now},
+         "$setOnInsert": {"created_at": now}},
+        upsert=True
+    )
+    done = [name for name, stage in stages.items() if stage.get("status") == "done"]
+    if done:
+        logger.info(f"[Pipeline] {pipeline} {date}: resuming (attempt {attempts}), skipping {', '.join(sorted(done))}")
+    return {"pipeline": pipeline, "date": date, "stages": stages, "failed": [], "ran": []}
 
-def parse_final_score(final_score):
+
+async def run_pipeline_stage(run: Dict[str, Any], stage: str, fn, *args):
     """
-    Parse final_score which could be:
-    - A number (e.g., 225)
-    - A string number (e.g., "225")
+    Run one stage unless it is already done for this run. Returns the stage's
+    (stored) result, or None if it failed - the failure is recorded and the
+    pipeline carries on with independent stages.
+    """
+    existing = run["stages"].get(stage, {})
+    if existing.get("status") == "done":
+        return existing.get("result")
+    run["ran"].append(stage)
+    
+    field = f"stages.{stage}"
+    started = datetime.now(timezone.utc)
+    await db.pipeline_runs.update_one({"pipeline": run["pipeline"], "date": run["date"]},
+                                      {"$set": {f"{field}.status": "running", f"{field}.started_at": started}})
+    try:
+        result = await fn(*args)
+    except Exception as e:
+        logger.error(f"[Pipeline] {run['pipeline']} {run['date']} stage {stage} failed: {e}")
+        import traceback
+        traceback.print_exc()
+        run["stages"][stage] = {"status": "failed", "error": str(e), "started_at": started,
+                                "finished_at": datetime.now(timezone.utc)}
+        run["failed"].append(stage)
+        await db.pipeline_runs.update_one({"pipeline": run["pipeline"], "date": run["date"]},
+                                          {"$set": {field: run["stages"][stage]}})
+        return None
+    
+    run["stages"][stage] = {"status": "done", "result": result, "started_at": started,
+                            "finished_at": datetime.now(timezone.utc)}
+    await db.pipeline_runs.update_one({"pipeline": run["pipeline"], "date": run["date"]},
+                                      {"$set": {field: run["stages"][stage]}})
+    return result
+
+
+def rerun_stage_if_inputs_ran(run: Dict[str, Any], stage: str, input_prefix: str):
+    """Forget a done stage when a stage it depends on (by name prefix) ran in this attempt"""
+    if any(name.startswith(input_prefix) for name in run["ran"]) and stage in run["stages"]:
+        run["stages"].pop(stage)
+
+
+async def finish_pipeline_run(run: Dict[str, Any]) -> str:
+    status = "incomplete" if run["failed"] else "completed"
+    await db.pipeline_runs.update_one({"pipeline": run["pipeline"], "date": run["date"]},
+                                      {"$set": {"status": status, "finished_at": datetime.now(timezone.utc)}})
+    return status
+
+
+# pipeline -> (entry point, job kind); entry points take (date, force)
+PIPELINE_ENTRY_POINTS = {
+    '8pm': (execute_8pm_process, 'process_8pm'),
+    '8pm_openers': (scrape_tomorrows_opening_lines, 'process_8pm_openers'),
+    '5am': (morning_data_refresh, 'process_5am'),
+}
+PIPELINE_JOB_KINDS = {kind for _, kind in PIPELINE_ENTRY_POINTS.values()}
+
+
+async def resume_pipeline_runs():
+    """
+    Startup hook: re-queue 8PM runs for today/tomorrow and 5AM runs for
+    yesterday that are still running (cut off by the restart) or incomplete.
+    """
+    from zoneinfo import ZoneInfo
+    try:
+        await db.pipeline_runs.create_index([("pipeline", 1), ("date", 1)], unique=True)
+        yesterday = (datetime.now(ZoneInfo('America/Phoenix')) - timedelta(days=1)).strftime('%Y-%m-%d')
+        query = {"status": {"$in": ["running", "incomplete"]}, "date": {"$gte": yesterday},
+                 "attempts": {"$lt": PIPELINE_MAX_RESUME_ATTEMPTS}}
+        async for run in db.pipeline_runs.find(query, {"_id": 0, "pipeline": 1, "date": 1, "stages": 1}):
+            entry = PIPELINE_ENTRY_POINTS.get(run["pipeline"])
+            if not entry:
+                continue
+            _, kind = entry
+            pending = [name for name, stage in run.get("stages", {}).items() if stage.get("status") != "done"]
+            logger.info(f"[Pipeline] Resuming {run['pipeline']} {run['date']} (unfinished: {', '.join(pending) or 'not started'})")
+            await submit_job(kind, {"date": run["date"]})
+    except Exception as e:
+        logger.error(f"[Pipeline] Error resuming runs: {e}")
+
+
+@api_router.get("/process/pipeline-runs")
+async def get_pipeline_runs(pipeline: str = None, date: str = None, limit: int = 10):
+    """Stage checkpoints of recent 8PM/5AM pipeline runs"""
+    query = {}
+    if pipeline:
+        query["pipeline"] = pipeline
+    if date:
+        query["date"] = date
+    runs = await db.pipeline_runs.find(query, {"_id": 0, "stages.ppg_data.result.data_json": 0}).sort("updated_at", -1).to_list(min(limit, 50))
+    return {"runs": runs}
+
+
+# ============== PROCESS #6: UPDATE RECORDS FROM 12/22/25 ==============
+
+def parse_final_score(final_score):
+    """
+    Parse final_score which could be:
+    - A number (e.g., 225)
+    - A string number (e.g., "225")
     - Individual scores (e.g., "110-115" or "70-55")
     Returns the total score as a float, or None if invalid.
     """
@@ -9647,7 +11331,7 @@ async def calculate_records_from_start_date(start_date: str = "2025-12-22"):
     }
     
     # Public Record threshold: only consider games where consensus >= 61%
-    PUBLIC_CONSENSUS_THRESHOLD = 61
+    # (PUBLIC_CONSENSUS_THRESHOLD, shared with the threshold backtest)
     
     # Generate list of dates from start_date to today (inclusive)
     start = datetime.strptime(start_date, '%Y-%m-%d')
@@ -9662,7 +11346,7 @@ async def calculate_records_from_start_date(start_date: str = "2025-12-22"):
     logger.info(f"[#6] Processing {len(dates)} dates: {dates}")
     
     # Process NBA records (threshold: 8)
-    NBA_THRESHOLD = 8
+    NBA_THRESHOLD = EDGE_THRESHOLDS["NBA"]
     for date in dates:
         doc = await db.nba_opportunities.find_one({"date": date})
         if doc and doc.get('games'):
@@ -9849,7 +11533,7 @@ async def calculate_records_from_start_date(start_date: str = "2025-12-22"):
             logger.info(f"[#6] NBA {date}: Edge O:{date_over_hits}-{date_over_misses} U:{date_under_hits}-{date_under_misses}, Betting {date_bet_wins}W-{date_bet_losses}L, Public {date_public_hits}-{date_public_misses}")
     
     # Process NHL records (threshold: 0.6)
-    NHL_THRESHOLD = 0.6
+    NHL_THRESHOLD = EDGE_THRESHOLDS["NHL"]
     for date in dates:
         doc = await db.nhl_opportunities.find_one({"date": date})
         if doc and doc.get('games'):
@@ -10002,7 +11686,7 @@ async def calculate_records_from_start_date(start_date: str = "2025-12-22"):
             logger.info(f"[#6] NHL {date}: Edge O:{date_over_hits}-{date_over_misses} U:{date_under_hits}-{date_under_misses}, Betting {date_bet_wins}W-{date_bet_losses}L, Public {date_public_hits}-{date_public_misses}")
     
     # Process NCAAB records (threshold: 10)
-    NCAAB_THRESHOLD = 10
+    NCAAB_THRESHOLD = EDGE_THRESHOLDS["NCAAB"]
     for date in dates:
         doc = await db.ncaab_opportunities.find_one({"date": date})
         if doc and doc.get('games'):
@@ -10260,365 +11944,817 @@ async def update_records_from_start_date(start_date: str = "2025-12-22"):
     }
 
 
-@api_router.post("/process/backfill-opening-lines")
-async def backfill_opening_lines(start_date: str = "2024-12-22", end_date: str = None):
+# ============== THRESHOLD BACKTESTING ==============
+# Sweeps edge thresholds, consensus thresholds, line sources and dot filters over
+# the historical *_opportunities slates. Games are loaded once into numpy arrays
+# and every grid cell is evaluated in a single vectorized pass.
+
+# Production thresholds (see calculate_records_from_start_date)
+EDGE_THRESHOLDS = {"NBA": 8, "NHL": 0.6, "NCAAB": 10}
+PUBLIC_CONSENSUS_THRESHOLD = 61
+
+BACKTEST_DEFAULT_GRIDS = {
+    "NBA": [4, 5, 6, 7, 8, 9, 10, 12],
+    "NHL": [0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 1.0],
+    "NCAAB": [5, 6, 7, 8, 9, 10, 12, 14],
+}
+BACKTEST_LINE_SOURCES = ["opening", "bet", "live"]
+BACKTEST_DOT_FILTERS = ["all", "agree", "disagree", "no_dot"]
+BACKTEST_CACHE_TTL_SECONDS = 300
+
+backtest_games_cache = {}
+
+
+def _backtest_float(value):
+    """Coerce a stored number/string to float, NaN when missing or invalid"""
+    if value is None or value == '':
+        return float('nan')
+    try:
+        return float(value)
+    except (ValueError, TypeError):
+        return float('nan')
+
+
+def _backtest_line(game: dict, source: str) -> float:
+    """Pick the line a game would have been graded against for a line source.
+
+    opening: line from the 8pm scrape (opening_line, falls back to total)
+    bet:     bet_line when the user bet the game, otherwise total (production rule)
+    live:    latest plays888 line (live_line, falls back to total)
     """
-    Backfill opening_line field for historical games that don't have it.
-    Uses the 'total' field as the opening line if opening_line is not set.
-    
-    Args:
-        start_date: Start date in YYYY-MM-DD format (default: 2024-12-22)
-        end_date: End date in YYYY-MM-DD format (default: today)
+    total = game.get('total')
+    if source == "opening":
+        return _backtest_float(game.get('opening_line') or total)
+    if source == "bet":
+        if game.get('has_bet') and game.get('bet_line'):
+            return _backtest_float(game.get('bet_line'))
+        return _backtest_float(total)
+    return _backtest_float(game.get('live_line') or total)
+
+
+def _backtest_side_result(league: str, game: dict) -> Tuple[float, int]:
+    """Return (public_pct, result) for the sides public pick.
+
+    result is 1 if the public pick covered (NHL: won outright), -1 if it did not,
+    0 for pushes or games missing scores/spreads.
     """
-    from datetime import datetime, timedelta
-    from zoneinfo import ZoneInfo
-    
-    arizona_tz = ZoneInfo('America/Phoenix')
-    
-    if not end_date:
-        end_date = datetime.now(arizona_tz).strftime("%Y-%m-%d")
-    
-    results = {
-        "NBA": {"dates_processed": 0, "games_updated": 0},
-        "NHL": {"dates_processed": 0, "games_updated": 0},
-        "NCAAB": {"dates_processed": 0, "games_updated": 0}
-    }
-    
-    # Parse dates
-    current_date = datetime.strptime(start_date, "%Y-%m-%d")
-    end = datetime.strptime(end_date, "%Y-%m-%d")
-    
-    while current_date <= end:
-        date_str = current_date.strftime("%Y-%m-%d")
-        
-        for league in ["NBA", "NHL", "NCAAB"]:
-            collection_name = f"{league.lower()}_opportunities"
-            collection = db[collection_name]
-            
-            # Find document for this date
-            doc = await collection.find_one({"date": date_str})
-            
-            if doc and doc.get('games'):
-                games = doc['games']
-                updated = False
-                games_updated_count = 0
-                
-                for game in games:
-                    # If opening_line is not set but total exists, use total as opening_line
-                    if not game.get('opening_line') and game.get('total'):
-                        game['opening_line'] = game['total']
-                        updated = True
-                        games_updated_count += 1
-                    # If neither exists, try to use bet_line or live_line
-                    elif not game.get('opening_line') and not game.get('total'):
-                        if game.get('bet_line'):
-                            game['opening_line'] = game['bet_line']
-                            game['total'] = game['bet_line']
-                            updated = True
-                            games_updated_count += 1
-                        elif game.get('live_line'):
-                            game['opening_line'] = game['live_line']
-                            game['total'] = game['live_line']
-                            updated = True
-                            games_updated_count += 1
-                
-                if updated:
-                    await collection.update_one(
-                        {"date": date_str},
-                        {"$set": {"games": games}}
-                    )
-                    results[league]["games_updated"] += games_updated_count
-                
-                results[league]["dates_processed"] += 1
-        
-        current_date += timedelta(days=1)
-    
-    logger.info(f"[Backfill Opening Lines] Results: {results}")
-    
-    return {
-        "success": True,
-        "start_date": start_date,
-        "end_date": end_date,
-        "results": results
-    }
+    away_pct = game.get('away_consensus_pct') or 0
+    home_pct = game.get('home_consensus_pct') or 0
+    if away_pct == 0 and home_pct == 0:
+        return 0.0, 0
+    is_away_public_pick = away_pct >= home_pct
+    public_pct = float(away_pct if is_away_public_pick else home_pct)
+
+    away_score = _backtest_float(game.get('away_score'))
+    home_score = _backtest_float(game.get('home_score'))
+    if away_score != away_score or home_score != home_score:
+        return public_pct, 0
+
+    if league == "NHL":
+        # NHL public record is moneyline - did the public pick win
+        if away_score == home_score:
+            return public_pct, 0
+        won = away_score > home_score if is_away_public_pick else home_score > away_score
+        return public_pct, 1 if won else -1
+
+    # Spread - Covers.com first, CBS Sports as fallback (same as the public record)
+    public_spread = None
+    if game.get('away_spread') is not None:
+        public_spread = _backtest_float(game.get('away_spread'))
+        if not is_away_public_pick:
+            public_spread = -public_spread
+    elif game.get('spread') is not None:
+        public_spread = _backtest_float(game.get('spread'))
+        if is_away_public_pick:
+            public_spread = -public_spread
+    if public_spread is None or public_spread != public_spread:
+        return public_pct, 0
+
+    if is_away_public_pick:
+        margin = away_score + public_spread - home_score
+    else:
+        margin = home_score + public_spread - away_score
+    if margin == 0:
+        return public_pct, 0
+    return public_pct, 1 if margin > 0 else -1
 
 
-@api_router.post("/process/backfill-consensus")
-async def backfill_consensus_data(start_date: str = "2025-12-22", end_date: str = None, league: str = "NBA"):
+async def load_backtest_games(league: str, start_date: str, end_date: str = None, use_cache: bool = True) -> Dict[str, Any]:
     """
-    Backfill consensus percentage data from Covers.com for historical dates.
-    This scrapes the public betting consensus and spread data for each date.
-    
-    Args:
-        start_date: Start date in YYYY-MM-DD format (default: 2025-12-22)
-        end_date: End date in YYYY-MM-DD format (default: yesterday)
-        league: League to backfill (NBA, NHL, NCAAB)
+    Load every game of a league in [start_date, end_date] into numpy arrays.
+    One query per league - the arrays are cached for BACKTEST_CACHE_TTL_SECONDS
+    so repeated sweeps over the same range don't hit Mongo again.
     """
-    from datetime import datetime, timedelta
+    import numpy as np
     from zoneinfo import ZoneInfo
-    
-    arizona_tz = ZoneInfo('America/Phoenix')
-    
-    if not end_date:
-        # Default to yesterday
-        end_date = (datetime.now(arizona_tz) - timedelta(days=1)).strftime("%Y-%m-%d")
-    
+
     league = league.upper()
-    collection_name = f"{league.lower()}_opportunities"
-    
-    results = {
+    if not end_date:
+        end_date = datetime.now(ZoneInfo('America/Phoenix')).strftime('%Y-%m-%d')
+
+    cache_key = (league, start_date, end_date)
+    now = datetime.now(timezone.utc)
+    cached = backtest_games_cache.get(cache_key)
+    if use_cache and cached and (now - cached['cached_at']).total_seconds() < BACKTEST_CACHE_TTL_SECONDS:
+        return cached['data']
+
+    collection = db[f"{league.lower()}_opportunities"]
+    docs = await collection.find(
+        {"date": {"$gte": start_date, "$lte": end_date}},
+        {"_id": 0, "date": 1, "games": 1}
+    ).to_list(length=2000)
+
+    ppg, final = [], []
+    lines = {source: [] for source in BACKTEST_LINE_SOURCES}
+    dot_signal, ou_pick, ou_pct, side_pct, side_result = [], [], [], [], []
+
+    for doc in docs:
+        for game in doc.get('games', []):
+            combined = game.get('combined_ppg')
+            if league == "NHL":
+                combined = game.get('combined_gpg') or combined
+            ppg.append(_backtest_float(combined))
+            final.append(_backtest_float(parse_final_score(game.get('final_score'))))
+            for source in BACKTEST_LINE_SOURCES:
+                lines[source].append(_backtest_line(game, source))
+
+            four_dot = calculate_4dot_result(
+                parse_dots_to_colors(game.get('away_dots', '')),
+                parse_dots_to_colors(game.get('home_dots', ''))
+            )
+            dot_signal.append(1 if four_dot == 'OVER' else -1 if four_dot == 'UNDER' else 0)
+
+            # O/U consensus - raw percentages when stored, else the 61%+ public pick
+            over_pct = game.get('over_consensus_pct')
+            under_pct = game.get('under_consensus_pct')
+            if over_pct is not None or under_pct is not None:
+                over_pct = over_pct or 0
+                under_pct = under_pct or 0
+                ou_pick.append(1 if over_pct >= under_pct else -1)
+                ou_pct.append(float(max(over_pct, under_pct)))
+            elif game.get('ou_public_pick') in ('OVER', 'UNDER'):
+                ou_pick.append(1 if game['ou_public_pick'] == 'OVER' else -1)
+                ou_pct.append(_backtest_float(game.get('ou_public_pct') or 0))
+            else:
+                ou_pick.append(0)
+                ou_pct.append(0.0)
+
+            pct, result = _backtest_side_result(league, game)
+            side_pct.append(pct)
+            side_result.append(result)
+
+    data = {
         "league": league,
         "start_date": start_date,
         "end_date": end_date,
-        "dates_processed": 0,
-        "games_updated": 0,
-        "dates_details": []
-    }
-    
-    # Team abbreviation mapping for matching
-    team_abbrev_map = {
-        # NBA
-        'ATLANTA': 'ATL', 'BOSTON': 'BOS', 'BROOKLYN': 'BKN', 'CHARLOTTE': 'CHA',
-        'CHICAGO': 'CHI', 'CLEVELAND': 'CLE', 'DALLAS': 'DAL', 'DENVER': 'DEN',
-        'DETROIT': 'DET', 'GOLDEN STATE': 'GSW', 'HOUSTON': 'HOU', 'INDIANA': 'IND',
-        'LA CLIPPERS': 'LAC', 'LA LAKERS': 'LAL', 'MEMPHIS': 'MEM', 'MIAMI': 'MIA',
-        'MILWAUKEE': 'MIL', 'MINNESOTA': 'MIN', 'NEW ORLEANS': 'NOP', 'NEW YORK': 'NYK',
-        'OKLA CITY': 'OKC', 'OKLAHOMA CITY': 'OKC', 'ORLANDO': 'ORL', 'PHILADELPHIA': 'PHI',
-        'PHOENIX': 'PHX', 'PORTLAND': 'POR', 'SACRAMENTO': 'SAC', 'SAN ANTONIO': 'SAS',
-        'TORONTO': 'TOR', 'UTAH': 'UTA', 'WASHINGTON': 'WAS',
-        # NHL
-        'ANAHEIM': 'ANA', 'ARIZONA': 'ARI', 'BUFFALO': 'BUF', 'CALGARY': 'CGY',
-        'CAROLINA': 'CAR', 'COLORADO': 'COL', 'COLUMBUS': 'CBJ', 'EDMONTON': 'EDM',
-        'FLORIDA': 'FLA', 'LOS ANGELES': 'LAK', 'MONTREAL': 'MTL', 'NASHVILLE': 'NSH',
-        'NEW JERSEY': 'NJD', 'NY ISLANDERS': 'NYI', 'NY RANGERS': 'NYR', 'OTTAWA': 'OTT',
-        'PITTSBURGH': 'PIT', 'SAN JOSE': 'SJS', 'SEATTLE': 'SEA', 'ST LOUIS': 'STL',
-        'ST. LOUIS': 'STL', 'TAMPA BAY': 'TBL', 'VANCOUVER': 'VAN', 'VEGAS': 'VGK',
-        'WINNIPEG': 'WPG',
+        "dates_loaded": len(docs),
+        "ppg": np.array(ppg, dtype=float),
+        "final": np.array(final, dtype=float),
+        "lines": {source: np.array(values, dtype=float) for source, values in lines.items()},
+        "dot_signal": np.array(dot_signal, dtype=np.int8),
+        "ou_pick": np.array(ou_pick, dtype=np.int8),
+        "ou_pct": np.array(ou_pct, dtype=float),
+        "side_pct": np.array(side_pct, dtype=float),
+        "side_result": np.array(side_result, dtype=np.int8),
     }
-    
-    # Parse dates
-    current_date = datetime.strptime(start_date, "%Y-%m-%d")
-    end = datetime.strptime(end_date, "%Y-%m-%d")
-    
-    while current_date <= end:
-        date_str = current_date.strftime("%Y-%m-%d")
-        date_display = current_date.strftime("%m/%d")
-        
-        logger.info(f"[Backfill Consensus] Processing {league} for {date_str}")
-        
-        # Scrape consensus data from Covers.com
-        consensus_data = await scrape_covers_consensus(league, date_str)
-        
-        if not consensus_data:
-            logger.warning(f"[Backfill Consensus] No consensus data for {league} on {date_str}")
-            results["dates_details"].append({"date": date_display, "status": "no_data", "games_updated": 0})
-            current_date += timedelta(days=1)
-            continue
-        
-        # Find document for this date
-        doc = await db[collection_name].find_one({"date": date_str})
-        
-        if doc and doc.get('games'):
-            games = doc['games']
-            updated = False
-            games_updated_count = 0
-            
-            for game in games:
-                away_team = game.get('away_team', '').upper()
-                home_team = game.get('home_team', '').upper()
-                
-                # Get abbreviations
-                away_abbrev = team_abbrev_map.get(away_team, away_team[:3])
-                home_abbrev = team_abbrev_map.get(home_team, home_team[:3])
-                
-                # Try to match with consensus data
-                away_consensus = consensus_data.get(away_abbrev, {})
-                home_consensus = consensus_data.get(home_abbrev, {})
-                
-                if away_consensus.get('consensus_pct') or home_consensus.get('consensus_pct'):
-                    game['away_consensus_pct'] = away_consensus.get('consensus_pct')
-                    game['home_consensus_pct'] = home_consensus.get('consensus_pct')
-                    
-                    # Store spreads from Covers if available (and we don't have spread already)
-                    # home_consensus['spread'] is the HOME team's spread from Covers
-                    if home_consensus.get('spread') is not None and game.get('spread') is None:
-                        game['spread'] = home_consensus.get('spread')
-                    if away_consensus.get('spread') is not None:
-                        game['away_spread'] = away_consensus.get('spread')
-                    
-                    # Determine public pick - only if meets 61% threshold
-                    if away_consensus.get('consensus_pct') and home_consensus.get('consensus_pct'):
-                        if away_consensus['consensus_pct'] > home_consensus['consensus_pct']:
-                            # Only set public_pick if away team has 61%+
-                            if away_consensus['consensus_pct'] >= 61:
-                                game['public_pick'] = game['away_team']
-                                game['public_pick_pct'] = away_consensus['consensus_pct']
-                        else:
-                            # Only set public_pick if home team has 61%+
-                            if home_consensus['consensus_pct'] >= 61:
-                                game['public_pick'] = game['home_team']
-                                game['public_pick_pct'] = home_consensus['consensus_pct']
-                    
-                    updated = True
-                    games_updated_count += 1
-            
-            if updated:
-                await db[collection_name].update_one(
-                    {"date": date_str},
-                    {"$set": {"games": games}}
-                )
-                results["games_updated"] += games_updated_count
-            
-            results["dates_processed"] += 1
-            results["dates_details"].append({"date": date_display, "status": "success", "games_updated": games_updated_count})
-            logger.info(f"[Backfill Consensus] {date_str}: Updated {games_updated_count} games")
+    backtest_games_cache[cache_key] = {"data": data, "cached_at": now}
+    logger.info(f"[Backtest] Loaded {len(ppg)} {league} games from {len(docs)} dates ({start_date} to {end_date})")
+    return data
+
+
+def run_threshold_backtest(
+    data: Dict[str, Any],
+    edge_thresholds: List[float],
+    consensus_thresholds: List[float] = None,
+    line_sources: List[str] = None,
+    dot_filters: List[str] = None,
+    odds: int = -110
+) -> Dict[str, Any]:
+    """
+    Evaluate the full grid (line_source x edge x consensus x dot_filter) in one pass.
+
+    A game is an edge pick when |PPG - line| >= edge threshold. Consensus threshold
+    keeps only picks where the O/U public is on the same side with at least that
+    percentage (0 = no consensus filter). Dot filters compare the 4-dot signal to
+    the pick: all, agree, disagree, no_dot. Pushes are excluded from the sample.
+
+    The sides public record (spread/ML) is swept over the consensus thresholds too.
+    """
+    import numpy as np
+
+    consensus_thresholds = consensus_thresholds or [0]
+    line_sources = line_sources or BACKTEST_LINE_SOURCES
+    dot_filters = dot_filters or ["all"]
+
+    for source in line_sources:
+        if source not in BACKTEST_LINE_SOURCES:
+            raise ValueError(f"Unknown line source '{source}' (use {', '.join(BACKTEST_LINE_SOURCES)})")
+    for dot_filter in dot_filters:
+        if dot_filter not in BACKTEST_DOT_FILTERS:
+            raise ValueError(f"Unknown dot filter '{dot_filter}' (use {', '.join(BACKTEST_DOT_FILTERS)})")
+
+    payout = calculate_american_odds_payout(1.0, odds)
+    edges_t = np.asarray(edge_thresholds, dtype=float)            # (E,)
+    cons_t = np.asarray(consensus_thresholds, dtype=float)        # (C,)
+
+    # Stack the selected line sources: (S, N)
+    line_matrix = np.stack([data["lines"][source] for source in line_sources]) if len(data["ppg"]) else np.zeros((len(line_sources), 0))
+    ppg = data["ppg"][None, :]
+    final = data["final"][None, :]
+
+    # Rounded like the live records (round(combined_ppg - line, 2)) so a game sitting
+    # exactly on a threshold isn't dropped by float noise (6.1 - 5.5 = 0.5999...)
+    edge = np.round(ppg - line_matrix, 2)                         # (S, N)
+    outcome = np.sign(final - line_matrix)                        # +1 over, -1 under, 0 push
+    valid = ~np.isnan(edge) & ~np.isnan(outcome)
+    outcome = np.where(valid, outcome, 0)
+
+    # Pick direction per (S, E, N): +1 OVER, -1 UNDER, 0 no pick
+    edge_se = np.where(valid, edge, 0)[:, None, :]
+    direction = np.where(edge_se >= edges_t[None, :, None], 1, np.where(edge_se <= -edges_t[None, :, None], -1, 0))
+    direction = np.where(valid[:, None, :], direction, 0).astype(np.int8)
+
+    # Consensus mask per (S, E, C, N)
+    ou_pick = data["ou_pick"][None, None, None, :]
+    ou_pct = data["ou_pct"][None, None, None, :]
+    cons = cons_t[None, None, :, None]
+    consensus_mask = (cons <= 0) | ((ou_pct >= cons) & (ou_pick == direction[:, :, None, :]))
+
+    # Dot filter mask per (S, E, F, N)
+    dot = data["dot_signal"][None, None, :]
+    dot_masks = []
+    for dot_filter in dot_filters:
+        if dot_filter == "all":
+            dot_masks.append(np.ones_like(direction, dtype=bool))
+        elif dot_filter == "agree":
+            dot_masks.append(dot == direction)
+        elif dot_filter == "disagree":
+            dot_masks.append(dot == -direction)
         else:
-            results["dates_details"].append({"date": date_display, "status": "no_games", "games_updated": 0})
-        
-        current_date += timedelta(days=1)
-        
-        # Small delay between requests to be nice to the server
-        await asyncio.sleep(2)
-    
-    logger.info(f"[Backfill Consensus] Results: {results}")
-    
+            dot_masks.append(np.broadcast_to(dot == 0, direction.shape))
+    dot_mask = np.stack(dot_masks, axis=2)
+
+    # Full selection (S, E, C, F, N)
+    picked = (direction != 0)[:, :, None, None, :] & consensus_mask[:, :, :, None, :] & dot_mask[:, :, None, :, :]
+    graded = (direction[:, :, None, None, :] * outcome[:, None, None, None, :])
+    hits = (picked & (graded > 0)).sum(axis=-1)
+    misses = (picked & (graded < 0)).sum(axis=-1)
+    pushes = (picked & (graded == 0)).sum(axis=-1)
+
+    sample = hits + misses
+    with np.errstate(divide='ignore', invalid='ignore'):
+        hit_rate = np.where(sample > 0, hits / sample, np.nan)
+        roi = np.where(sample > 0, (hits * payout - misses) / sample, np.nan)
+
+    cells = []
+    for s, source in enumerate(line_sources):
+        for e, edge_threshold in enumerate(edge_thresholds):
+            for c, consensus_threshold in enumerate(consensus_thresholds):
+                for f, dot_filter in enumerate(dot_filters):
+                    n = int(sample[s, e, c, f])
+                    cells.append({
+                        "line_source": source,
+                        "edge_threshold": edge_threshold,
+                        "consensus_threshold": consensus_threshold,
+                        "dot_filter": dot_filter,
+                        "hits": int(hits[s, e, c, f]),
+                        "misses": int(misses[s, e, c, f]),
+                        "pushes": int(pushes[s, e, c, f]),
+                        "sample": n,
+                        "hit_rate": round(float(hit_rate[s, e, c, f]) * 100, 1) if n else None,
+                        "roi": round(float(roi[s, e, c, f]) * 100, 1) if n else None,
+                    })
+
+    # Sides public record for each consensus threshold (0 = production cutoff)
+    public_t = sorted({float(c) if c > 0 else PUBLIC_CONSENSUS_THRESHOLD for c in consensus_thresholds})
+    side_mask = data["side_pct"][None, :] >= np.asarray(public_t, dtype=float)[:, None]
+    side_hits = (side_mask & (data["side_result"][None, :] > 0)).sum(axis=-1)
+    side_misses = (side_mask & (data["side_result"][None, :] < 0)).sum(axis=-1)
+    public = []
+    for c, consensus_threshold in enumerate(public_t):
+        n = int(side_hits[c] + side_misses[c])
+        public.append({
+            "consensus_threshold": consensus_threshold,
+            "hits": int(side_hits[c]),
+            "misses": int(side_misses[c]),
+            "sample": n,
+            "hit_rate": round(float(side_hits[c]) / n * 100, 1) if n else None,
+            "roi": round(float(side_hits[c] * payout - side_misses[c]) / n * 100, 1) if n else None,
+        })
+
     return {
-        "success": True,
-        "results": results
+        "league": data["league"],
+        "start_date": data["start_date"],
+        "end_date": data["end_date"],
+        "games_loaded": int(len(data["ppg"])),
+        "games_graded": int(valid.any(axis=0).sum()) if valid.size else 0,
+        "odds": odds,
+        "cells": cells,
+        "public": public,
     }
 
 
-@api_router.post("/process/backfill-scores")
-async def backfill_scores_from_cbs(start_date: str = "2025-12-22", end_date: str = None, league: str = "NBA"):
+def _parse_backtest_list(value: Optional[str], cast=float) -> Optional[list]:
+    """Parse a comma-separated query/CLI value ('6,8,10') into a list"""
+    if value is None or value == '':
+        return None
+    return [cast(v.strip()) for v in str(value).split(',') if v.strip()]
+
+
+async def backtest_thresholds(
+    league: str,
+    start_date: str = "2025-12-22",
+    end_date: str = None,
+    edge_thresholds: List[float] = None,
+    consensus_thresholds: List[float] = None,
+    line_sources: List[str] = None,
+    dot_filters: List[str] = None,
+    odds: int = -110,
+    min_sample: int = 20,
+    top: int = 10
+) -> Dict[str, Any]:
+    """Load the slates once, sweep the grid and rank the cells by ROI"""
+    league = league.upper()
+    if league not in EDGE_THRESHOLDS:
+        raise ValueError(f"Invalid league '{league}' (use NBA, NHL or NCAAB)")
+
+    data = await load_backtest_games(league, start_date, end_date)
+    result = run_threshold_backtest(
+        data,
+        edge_thresholds=edge_thresholds or BACKTEST_DEFAULT_GRIDS[league],
+        consensus_thresholds=consensus_thresholds or [0, PUBLIC_CONSENSUS_THRESHOLD],
+        line_sources=line_sources or BACKTEST_LINE_SOURCES,
+        dot_filters=dot_filters or BACKTEST_DOT_FILTERS,
+        odds=odds
+    )
+    # Cells with no graded picks have no ROI (possible with min_sample=0)
+    ranked = [cell for cell in result["cells"] if cell["sample"] >= min_sample and cell["roi"] is not None]
+    ranked.sort(key=lambda cell: (cell["roi"], cell["sample"]), reverse=True)
+    result["production_threshold"] = EDGE_THRESHOLDS[league]
+    result["min_sample"] = min_sample
+    result["top"] = ranked[:top]
+    return result
+
+
+@api_router.get("/backtest/thresholds/{league}")
+async def get_threshold_backtest(
+    league: str,
+    start_date: str = "2025-12-22",
+    end_date: str = None,
+    edges: str = None,
+    consensus: str = None,
+    line_sources: str = None,
+    dot_filters: str = None,
+    odds: int = -110,
+    min_sample: int = 20,
+    top: int = 10
+):
     """
-    Backfill team scores from CBS Sports for historical dates.
-    This scrapes individual team scores (away_score, home_score) and updates the database.
-    
-    Args:
-        start_date: Start date in YYYY-MM-DD format (default: 2025-12-22)
-        end_date: End date in YYYY-MM-DD format (default: yesterday)
-        league: League to backfill (NBA, NHL, NCAAB)
+    Backtest edge/consensus thresholds over historical slates.
+
+    Grid params are comma-separated, e.g.
+    /backtest/thresholds/NBA?edges=6,8,10&consensus=0,61,65&line_sources=opening,bet&dot_filters=all,agree
     """
-    from datetime import datetime, timedelta
-    from zoneinfo import ZoneInfo
-    
-    arizona_tz = ZoneInfo('America/Phoenix')
-    
-    if not end_date:
-        end_date = (datetime.now(arizona_tz) - timedelta(days=1)).strftime("%Y-%m-%d")
+    try:
+        return await backtest_thresholds(
+            league,
+            start_date=start_date,
+            end_date=end_date,
+            edge_thresholds=_parse_backtest_list(edges),
+            consensus_thresholds=_parse_backtest_list(consensus),
+            line_sources=_parse_backtest_list(line_sources, str),
+            dot_filters=_parse_backtest_list(dot_filters, str),
+            odds=odds,
+            min_sample=min_sample,
+            top=top
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"[Backtest] Error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+# ============================================================================
+# BACKFILL ENGINE - resumable, parallel per-day backfills
+# ============================================================================
+# A backfill is split into one task per (league, date). Tasks run with bounded
+# parallelism (host rate limits are enforced by the outbound fetch guard), each
+# finished day is checkpointed in db.backfill_checkpoints, and days already
+# checkpointed are skipped - a re-run or a restart resumes where it stopped.
+# Progress, throughput and ETA are kept per run in db.backfill_runs.
+
+BACKFILL_MAX_CONCURRENT = 3  # also caps the concurrency a request asks for
+BACKFILL_DONE_STATUSES = ('success', 'no_db_games')  # checkpointed; anything else (no_cbs_data, no_matches, error) is retried next run
+
+backfill_runs: Dict[str, Dict[str, Any]] = {}  # run_id -> live progress
+
+
+async def backfill_opening_lines_day(league: str, date_str: str) -> Dict[str, Any]:
+    """Use total (or bet/live line) as opening_line for games that don't have one"""
+    collection = db[f"{league.lower()}_opportunities"]
+    doc = await collection.find_one({"date": date_str})
+    if not doc or not doc.get('games'):
+        return {"status": "no_db_games", "games_updated": 0}
     
-    league = league.upper()
+    games = doc['games']
+    games_updated_count = 0
+    for game in games:
+        # If opening_line is not set but total exists, use total as opening_line
+        if not game.get('opening_line') and game.get('total'):
+            game['opening_line'] = game['total']
+            games_updated_count += 1
+        # If neither exists, try to use bet_line or live_line
+        elif not game.get('opening_line') and not game.get('total'):
+            if game.get('bet_line'):
+                game['opening_line'] = game['bet_line']
+                game['total'] = game['bet_line']
+                games_updated_count += 1
+            elif game.get('live_line'):
+                game['opening_line'] = game['live_line']
+                game['total'] = game['live_line']
+                games_updated_count += 1
+    
+    if games_updated_count:
+        await collection.update_one({"date": date_str}, {"$set": {"games": games}})
+    return {"status": "success", "games_updated": games_updated_count}
+
+
+async def backfill_consensus_day(league: str, date_str: str) -> Dict[str, Any]:
+    """Consensus percentages, spreads and public pick from Covers.com for one date"""
     collection_name = f"{league.lower()}_opportunities"
     
-    results = {
-        "league": league,
-        "start_date": start_date,
-        "end_date": end_date,
-        "dates_processed": 0,
-        "games_updated": 0,
-        "dates_details": []
-    }
+    # Only scrape dates we have games for
+    doc = await db[collection_name].find_one({"date": date_str})
+    if not doc or not doc.get('games'):
+        return {"status": "no_db_games", "games_updated": 0}
     
-    # Parse dates
-    current_date = datetime.strptime(start_date, "%Y-%m-%d")
-    end = datetime.strptime(end_date, "%Y-%m-%d")
+    consensus_data = await scrape_covers_consensus(league, date_str)
+    if not consensus_data:
+        logger.warning(f"[Backfill Consensus] No consensus data for {league} on {date_str}")
+        return {"status": "no_data", "games_updated": 0}
     
-    while current_date <= end:
-        date_str = current_date.strftime("%Y-%m-%d")
-        date_display = current_date.strftime("%m/%d")
-        
-        logger.info(f"[Backfill Scores] Processing {league} for {date_str}")
-        
-        # Scrape scores from CBS Sports
-        if league == "NBA":
-            cbs_games = await scrape_cbssports_nba(date_str)
-        elif league == "NHL":
-            cbs_games = await scrape_cbssports_nhl(date_str)
-        elif league == "NCAAB":
-            cbs_games = await scrape_cbssports_ncaab(date_str)
-        else:
-            cbs_games = []
-        
-        if not cbs_games:
-            logger.warning(f"[Backfill Scores] No CBS data for {league} on {date_str}")
-            results["dates_details"].append({"date": date_display, "status": "no_cbs_data", "games_updated": 0})
-            current_date += timedelta(days=1)
-            continue
-        
-        # Find document for this date
-        doc = await db[collection_name].find_one({"date": date_str})
+    # Covers.com keys consensus by team code (resolved through the shared alias index)
+    consensus_for = covers_consensus_lookup(league, consensus_data)
+    games = doc['games']
+    games_updated_count = 0
+    
+    for game in games:
+        away_consensus = consensus_for(game.get('away_team', ''))
+        home_consensus = consensus_for(game.get('home_team', ''))
         
-        if doc and doc.get('games'):
-            games = doc['games']
-            updated = False
-            games_updated_count = 0
+        if away_consensus.get('consensus_pct') or home_consensus.get('consensus_pct'):
+            game['away_consensus_pct'] = away_consensus.get('consensus_pct')
+            game['home_consensus_pct'] = home_consensus.get('consensus_pct')
             
-            for game in games:
-                away_team = game.get('away_team', '').lower()
-                home_team = game.get('home_team', '').lower()
-                
-                # Find matching CBS game
-                for cbs_game in cbs_games:
-                    cbs_away = cbs_game.get('away_team', '').lower()
-                    cbs_home = cbs_game.get('home_team', '').lower()
-                    
-                    # Match games by team names
-                    if ((away_team in cbs_away or cbs_away in away_team) and
-                        (home_team in cbs_home or cbs_home in home_team)):
-                        
-                        # Update scores if CBS has them
-                        if cbs_game.get('away_score') is not None:
-                            game['away_score'] = cbs_game['away_score']
-                        if cbs_game.get('home_score') is not None:
-                            game['home_score'] = cbs_game['home_score']
-                        if cbs_game.get('final_score') is not None:
-                            game['final_score'] = cbs_game['final_score']
-                        
-                        # Also update spread if missing
-                        if cbs_game.get('spread') is not None and game.get('spread') is None:
-                            game['spread'] = cbs_game['spread']
-                        
-                        updated = True
-                        games_updated_count += 1
-                        logger.debug(f"[Backfill Scores] {away_team} @ {home_team}: {game.get('away_score')}-{game.get('home_score')}")
-                        break
+            # Store spreads from Covers if available (and we don't have spread already)
+            # home_consensus['spread'] is the HOME team's spread from Covers
+            if home_consensus.get('spread') is not None and game.get('spread') is None:
+                game['spread'] = home_consensus.get('spread')
+            if away_consensus.get('spread') is not None:
+                game['away_spread'] = away_consensus.get('spread')
             
-            if updated:
-                await db[collection_name].update_one(
-                    {"date": date_str},
-                    {"$set": {"games": games}}
-                )
-                results["games_updated"] += games_updated_count
+            # Determine public pick - only if meets 61% threshold
+            if away_consensus.get('consensus_pct') and home_consensus.get('consensus_pct'):
+                if away_consensus['consensus_pct'] > home_consensus['consensus_pct']:
+                    # Only set public_pick if away team has 61%+
+                    if away_consensus['consensus_pct'] >= 61:
+                        game['public_pick'] = game['away_team']
+                        game['public_pick_pct'] = away_consensus['consensus_pct']
+                else:
+                    # Only set public_pick if home team has 61%+
+                    if home_consensus['consensus_pct'] >= 61:
+                        game['public_pick'] = game['home_team']
+                        game['public_pick_pct'] = home_consensus['consensus_pct']
             
-            results["dates_processed"] += 1
-            results["dates_details"].append({"date": date_display, "status": "success", "games_updated": games_updated_count})
-            logger.info(f"[Backfill Scores] {date_str}: Updated {games_updated_count} games with scores")
-        else:
-            results["dates_details"].append({"date": date_display, "status": "no_db_games", "games_updated": 0})
-        
-        current_date += timedelta(days=1)
-        
-        # Delay between requests
-        await asyncio.sleep(2)
+            games_updated_count += 1
     
-    logger.info(f"[Backfill Scores] Results: {results}")
+    if games_updated_count:
+        await db[collection_name].update_one({"date": date_str}, {"$set": {"games": games}})
+    logger.info(f"[Backfill Consensus] {league} {date_str}: Updated {games_updated_count} games")
+    return {"status": "success", "games_updated": games_updated_count}
+
+
+async def backfill_scores_day(league: str, date_str: str) -> Dict[str, Any]:
+    """Team scores (away_score, home_score) from CBS Sports for one date"""
+    collection_name = f"{league.lower()}_opportunities"
     
+    doc = await db[collection_name].find_one({"date": date_str})
+    if not doc or not doc.get('games'):
+        return {"status": "no_db_games", "games_updated": 0}
+    
+    # Scrape scores from CBS Sports
+    if league == "NBA":
+        cbs_games = await scrape_cbssports_nba(date_str)
+    elif league == "NHL":
+        cbs_games = await scrape_cbssports_nhl(date_str)
+    elif league == "NCAAB":
+        cbs_games = await scrape_cbssports_ncaab(date_str)
+    else:
+        cbs_games = []
+    
+    if not cbs_games:
+        logger.warning(f"[Backfill Scores] No CBS data for {league} on {date_str}")
+        return {"status": "no_cbs_data", "games_updated": 0}
+    
+    games = doc['games']
+    games_updated_count = 0
+    
+    # Join stored games with CBS games on canonical team keys
+    matching = match_games(league, games, cbs_games, date=date_str, source='backfill_scores')
+    if not matching['pairs']:
+        logger.warning(f"[Backfill Scores] None of {len(games)} {league} games on {date_str} matched CBS")
+        return {"status": "no_matches", "games_updated": 0}
+    await link_matched_games(league, date_str, matching['pairs'], source='cbs')
+    for game, cbs_game in matching['pairs']:
+        away_team, home_team = game_team_names(game)
+        
+        # Update scores if CBS has them
+        if cbs_game.get('away_score') is not None:
+            game['away_score'] = cbs_game['away_score']
+        if cbs_game.get('home_score') is not None:
+            game['home_score'] = cbs_game['home_score']
+        if cbs_game.get('final_score') is not None:
+            game['final_score'] = cbs_game['final_score']
+        
+        # Also update spread if missing
+        if cbs_game.get('spread') is not None and game.get('spread') is None:
+            game['spread'] = cbs_game['spread']
+        
+        games_updated_count += 1
+        logger.debug(f"[Backfill Scores] {away_team} @ {home_team}: {game.get('away_score')}-{game.get('home_score')}")
+    
+    if games_updated_count:
+        await db[collection_name].update_one({"date": date_str}, {"$set": {"games": games}})
+        await record_team_game_finals(league, date_str, games)
+    logger.info(f"[Backfill Scores] {league} {date_str}: Updated {games_updated_count} games with scores")
+    return {"status": "success", "games_updated": games_updated_count}
+
+
+BACKFILL_TASKS = {
+    "opening_lines": backfill_opening_lines_day,
+    "consensus": backfill_consensus_day,
+    "scores": backfill_scores_day,
+}
+
+
+def backfill_run_id(kind: str, leagues: List[str], start_date: str, end_date: str) -> str:
+    """Same kind/leagues/range -> same run, so a re-run resumes it"""
+    return f"{kind}|{','.join(sorted(leagues))}|{start_date}|{end_date}"
+
+
+def backfill_dates(start_date: str, end_date: str) -> List[str]:
+    current = datetime.strptime(start_date, "%Y-%m-%d")
+    end = datetime.strptime(end_date, "%Y-%m-%d")
+    dates = []
+    while current <= end:
+        dates.append(current.strftime("%Y-%m-%d"))
+        current += timedelta(days=1)
+    return dates
+
+
+def parse_backfill_leagues(league: str) -> List[str]:
+    """'NBA', 'nba,nhl' or 'ALL' -> validated league list"""
+    if not league or league.upper() == 'ALL':
+        return ['NBA', 'NHL', 'NCAAB']
+    leagues = [lg.strip().upper() for lg in league.split(',') if lg.strip()]
+    invalid = [lg for lg in leagues if lg not in ('NBA', 'NHL', 'NCAAB')]
+    if invalid or not leagues:
+        raise HTTPException(status_code=400, detail=f"Invalid league: {', '.join(invalid) or league}")
+    return leagues
+
+
+def backfill_progress_snapshot(run: Dict[str, Any]) -> Dict[str, Any]:
+    """Counts plus throughput (days/min over days actually worked) and ETA"""
+    elapsed = (datetime.now(timezone.utc) - run["started_at"]).total_seconds()
+    worked = run["completed"] + run["failed"]
+    remaining = run["total"] - run["skipped"] - worked
+    per_minute = worked / (elapsed / 60) if elapsed > 0 and worked else 0.0
     return {
-        "success": True,
-        "results": results
+        "total": run["total"],
+        "skipped": run["skipped"],
+        "completed": run["completed"],
+        "failed": run["failed"],
+        "remaining": remaining,
+        "games_updated": run["games_updated"],
+        "elapsed_seconds": round(elapsed, 1),
+        "days_per_minute": round(per_minute, 2),
+        "eta_seconds": round(remaining / per_minute * 60) if per_minute else None,
     }
 
 
-@api_router.post("/process/scrape-openers")
-async def scrape_opening_lines_endpoint(target_date: str = None):
+async def run_backfill(kind: str, leagues: List[str], start_date: str, end_date: str,
+                       concurrency: int = BACKFILL_MAX_CONCURRENT, force: bool = False) -> Dict[str, Any]:
     """
-    Process #1 - 8:00 PM Job: Scrape tomorrow's opening lines from ScoresAndOdds/CBS Sports.
-    Creates game documents in the opportunities collections with opening lines.
-    
-    Args:
-        target_date: Target date in 'YYYY-MM-DD' format. Defaults to tomorrow (Arizona time).
+    Run a backfill over [start_date, end_date] for each league, one task per
+    day, at most `concurrency` (capped at BACKFILL_MAX_CONCURRENT) at a time.
+    Days with a done checkpoint are skipped unless force=True. Returns
+    per-league totals and day details.
     """
-    from zoneinfo import ZoneInfo
+    task_fn = BACKFILL_TASKS[kind]
+    concurrency = max(1, min(concurrency, BACKFILL_MAX_CONCURRENT))
+    run_id = backfill_run_id(kind, leagues, start_date, end_date)
+    dates = backfill_dates(start_date, end_date)
+    
+    done = set()
+    if not force:
+        async for cp in db.backfill_checkpoints.find(
+            {"kind": kind, "league": {"$in": leagues}, "date": {"$gte": start_date, "$lte": end_date},
+             "status": {"$in": list(BACKFILL_DONE_STATUSES)}},
+            {"_id": 0, "league": 1, "date": 1}
+        ):
+            done.add((cp["league"], cp["date"]))
+    
+    # Interleave leagues so parallel slots go to different leagues (and hosts) first
+    tasks = [(league, date_str) for date_str in dates for league in leagues]
+    pending = [t for t in tasks if t not in done]
+    
+    run = {
+        "run_id": run_id, "kind": kind, "leagues": leagues, "start_date": start_date, "end_date": end_date,
+        "total": len(tasks), "skipped": len(tasks) - len(pending), "completed": 0, "failed": 0,
+        "games_updated": 0, "started_at": datetime.now(timezone.utc), "status": "running",
+    }
+    backfill_runs[run_id] = run
+    await db.backfill_runs.update_one(
+        {"run_id": run_id},
+        {"$set": {"run_id": run_id, "kind": kind, "leagues": leagues, "start_date": start_date, "end_date": end_date,
+                  "concurrency": concurrency, "status": "running", "started_at": run["started_at"],
+                  "progress": backfill_progress_snapshot(run)}},
+        upsert=True
+    )
+    logger.info(f"[Backfill] {run_id}: {len(pending)} of {len(tasks)} days to do ({run['skipped']} checkpointed)")
+    
+    results = {league: {"dates_processed": 0, "games_updated": 0, "dates_details": []} for league in leagues}
+    semaphore = asyncio.Semaphore(concurrency)
+    
+    async def run_day(league: str, date_str: str):
+        async with semaphore:
+            try:
+                outcome = await task_fn(league, date_str)
+            except Exception as e:
+                logger.error(f"[Backfill] {kind} {league} {date_str} failed: {e}")
+                outcome = {"status": "error", "games_updated": 0, "error": str(e)}
+        
+        await db.backfill_checkpoints.update_one(
+            {"kind": kind, "league": league, "date": date_str},
+            {"$set": {**outcome, "kind": kind, "league": league, "date": date_str,
+                      "run_id": run_id, "finished_at": datetime.now(timezone.utc)}},
+            upsert=True
+        )
+        league_results = results[league]
+        league_results["dates_details"].append({"date": date_str[5:].replace('-', '/'), **outcome})
+        if outcome["status"] == "success":
+            league_results["dates_processed"] += 1
+            league_results["games_updated"] += outcome["games_updated"]
+            run["games_updated"] += outcome["games_updated"]
+        if outcome["status"] in BACKFILL_DONE_STATUSES:
+            run["completed"] += 1
+        else:
+            run["failed"] += 1
+        
+        progress = backfill_progress_snapshot(run)
+        await db.backfill_runs.update_one({"run_id": run_id}, {"$set": {"progress": progress}})
+        finished = progress["total"] - progress["skipped"] - progress["remaining"]
+        await report_job_progress(f"{kind} {league} {date_str}", 100 * finished / max(1, len(pending)))
+    
+    try:
+        await asyncio.gather(*(run_day(league, date_str) for league, date_str in pending))
+        run["status"] = "completed" if not run["failed"] else "completed_with_failures"
+    except asyncio.CancelledError:
+        run["status"] = "interrupted"
+        raise
+    finally:
+        progress = backfill_progress_snapshot(run)
+        await db.backfill_runs.update_one(
+            {"run_id": run_id},
+            {"$set": {"status": run["status"], "progress": progress, "finished_at": datetime.now(timezone.utc)}}
+        )
+        backfill_runs.pop(run_id, None)
+    
+    for league_results in results.values():
+        league_results["dates_details"].sort(key=lambda d: d["date"])
+    logger.info(f"[Backfill] {run_id} {run['status']}: {progress}")
+    return {"success": True, "run_id": run_id, "status": run["status"], "start_date": start_date,
+            "end_date": end_date, "progress": progress, "results": results}
+
+
+async def submit_backfill(kind: str, league: str, start_date: str, end_date: str, concurrency: int, force: bool):
+    """Validate a backfill request and queue it as a job (deduplicated per run)"""
+    leagues = parse_backfill_leagues(league)
+    try:
+        datetime.strptime(start_date, "%Y-%m-%d")
+        datetime.strptime(end_date, "%Y-%m-%d")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+    return await submit_job(
+        f"backfill_{kind}",
+        {"leagues": ','.join(leagues), "start_date": start_date, "end_date": end_date,
+         "concurrency": concurrency, "force": force}
+    )
+
+
+async def run_backfill_job(kind: str, params: Dict[str, Any]):
+    """JOB_KINDS runner for backfill_* jobs"""
+    return await run_backfill(kind, params["leagues"].split(','), params["start_date"], params["end_date"],
+                              concurrency=params.get("concurrency", BACKFILL_MAX_CONCURRENT),
+                              force=params.get("force", False))
+
+
+async def resume_backfill_runs():
+    """Re-queue backfills that were running when the server stopped (checkpointed days are skipped)"""
+    try:
+        await db.backfill_checkpoints.create_index([("kind", 1), ("league", 1), ("date", 1)], unique=True)
+        await db.backfill_runs.create_index("run_id", unique=True)
+        async for run in db.backfill_runs.find({"status": {"$in": ["running", "interrupted"]}}, {"_id": 0}):
+            logger.info(f"[Backfill] Resuming {run['run_id']}")
+            await submit_job(
+                f"backfill_{run['kind']}",
+                {"leagues": ','.join(run["leagues"]), "start_date": run["start_date"], "end_date": run["end_date"],
+                 "concurrency": run.get("concurrency", BACKFILL_MAX_CONCURRENT), "force": False}
+            )
+    except Exception as e:
+        logger.error(f"[Backfill] Error resuming runs: {e}")
+
+
+@api_router.post("/process/backfill-opening-lines", status_code=202)
+async def backfill_opening_lines(start_date: str = "2024-12-22", end_date: str = None, league: str = "ALL",
+                                 concurrency: int = BACKFILL_MAX_CONCURRENT, force: bool = False):
+    """
+    Backfill opening_line field for historical games that don't have it.
+    Uses the 'total' field as the opening line if opening_line is not set.
+    
+    Args:
+        start_date: Start date in YYYY-MM-DD format (default: 2024-12-22)
+        end_date: End date in YYYY-MM-DD format (default: today)
+        league: League(s) to backfill, comma-separated or ALL (default)
+        force: Redo days that already have a checkpoint
+    """
+    from zoneinfo import ZoneInfo
+    if not end_date:
+        end_date = datetime.now(ZoneInfo('America/Phoenix')).strftime("%Y-%m-%d")
+    return await submit_backfill("opening_lines", league, start_date, end_date, concurrency, force)
+
+
+@api_router.post("/process/backfill-consensus", status_code=202)
+async def backfill_consensus_data(start_date: str = "2025-12-22", end_date: str = None, league: str = "NBA",
+                                  concurrency: int = BACKFILL_MAX_CONCURRENT, force: bool = False):
+    """
+    Backfill consensus percentage data from Covers.com for historical dates.
+    This scrapes the public betting consensus and spread data for each date.
+    
+    Args:
+        start_date: Start date in YYYY-MM-DD format (default: 2025-12-22)
+        end_date: End date in YYYY-MM-DD format (default: yesterday)
+        league: League(s) to backfill (NBA, NHL, NCAAB), comma-separated or ALL
+        force: Redo days that already have a checkpoint
+    """
+    from zoneinfo import ZoneInfo
+    if not end_date:
+        # Default to yesterday
+        end_date = (datetime.now(ZoneInfo('America/Phoenix')) - timedelta(days=1)).strftime("%Y-%m-%d")
+    return await submit_backfill("consensus", league, start_date, end_date, concurrency, force)
+
+
+@api_router.post("/process/backfill-scores", status_code=202)
+async def backfill_scores_from_cbs(start_date: str = "2025-12-22", end_date: str = None, league: str = "NBA",
+                                   concurrency: int = BACKFILL_MAX_CONCURRENT, force: bool = False):
+    """
+    Backfill team scores from CBS Sports for historical dates.
+    This scrapes individual team scores (away_score, home_score) and updates the database.
+    
+    Args:
+        start_date: Start date in YYYY-MM-DD format (default: 2025-12-22)
+        end_date: End date in YYYY-MM-DD format (default: yesterday)
+        league: League(s) to backfill (NBA, NHL, NCAAB), comma-separated or ALL
+        force: Redo days that already have a checkpoint
+    """
+    from zoneinfo import ZoneInfo
+    if not end_date:
+        end_date = (datetime.now(ZoneInfo('America/Phoenix')) - timedelta(days=1)).strftime("%Y-%m-%d")
+    return await submit_backfill("scores", league, start_date, end_date, concurrency, force)
+
+
+@api_router.get("/process/backfill/status")
+async def get_backfill_status(limit: int = 10):
+    """Live progress (throughput, ETA) of running backfills and the most recent runs"""
+    live = {run_id: backfill_progress_snapshot(run) for run_id, run in backfill_runs.items()}
+    recent = await db.backfill_runs.find({}, {"_id": 0}).sort("started_at", -1).to_list(min(limit, 50))
+    for run in recent:
+        if run["run_id"] in live:
+            run["progress"] = live[run["run_id"]]
+    return {"running": list(live.keys()), "runs": recent}
+
+
+@api_router.post("/process/scrape-openers")
+async def scrape_opening_lines_endpoint(target_date: str = None):
+    """
+    Process #1 - 8:00 PM Job: Scrape tomorrow's opening lines from ScoresAndOdds/CBS Sports.
+    Creates game documents in the opportunities collections with opening lines.
+    
+    Args:
+        target_date: Target date in 'YYYY-MM-DD' format. Defaults to tomorrow (Arizona time).
+    """
+    from zoneinfo import ZoneInfo
     arizona_tz = ZoneInfo('America/Phoenix')
     
     # Default to tomorrow if no date specified
@@ -10669,32 +12805,11 @@ async def scrape_opening_lines_endpoint(target_date: str = None):
                 # Try CBS Sports first, fallback to scoresandodds if CBS fails
                 games = []
                 
-                if league == 'NBA':
-                    games = await scrape_cbssports_nba(target_date)
+                if league in ['NBA', 'NHL']:
+                    # CBS first, hedged with ScoresAndOdds (and the NHL API, no lines) if it's slow or fails
+                    games, source = await hedged_fetch('lines', league, target_date)
                     if games:
-                        league_result["data_source"] = "cbssports.com"
-                    else:
-                        # Fallback to scoresandodds
-                        games = await scrape_scoresandodds(league.upper(), target_date)
-                        if games:
-                            league_result["data_source"] = "scoresandodds.com"
-                            
-                elif league == 'NHL':
-                    games = await scrape_cbssports_nhl(target_date)
-                    if games:
-                        league_result["data_source"] = "cbssports.com"
-                    else:
-                        # Fallback to scoresandodds
-                        games = await scrape_scoresandodds(league.upper(), target_date)
-                        if games:
-                            league_result["data_source"] = "scoresandodds.com"
-                        else:
-                            # Final fallback: NHL API (no lines, but at least gets games)
-                            logger.warning(f"[8PM Job] CBS Sports and ScoresAndOdds failed for NHL, trying NHL API fallback...")
-                            games = await scrape_nhl_api_schedule(target_date)
-                            if games:
-                                league_result["data_source"] = "nhl-api (no lines)"
-                                logger.info(f"[8PM Job] NHL API fallback successful: {len(games)} games found")
+                        league_result["data_source"] = HEDGE_SOURCE_LABELS.get(source, source)
                             
                 elif league == 'NCAAB':
                     games = await scrape_cbssports_ncaab(target_date)
@@ -10862,6 +12977,71 @@ async def get_records_summary():
 
 # ============== EXCEL EXPORT ==============
 
+# Helper to get color name from dot emoji
+def get_color_from_emoji(emoji):
+    if emoji == '🟢':
+        return 'green'
+    elif emoji == '🟡':
+        return 'yellow'
+    elif emoji == '🔴':
+        return 'red'
+    elif emoji == '🔵':
+        return 'blue'
+    return None
+
+# Helper to parse dots string
+def parse_dots_to_colors(dots_str):
+    colors = []
+    if not dots_str:
+        return [None, None]
+    for char in str(dots_str):
+        color = get_color_from_emoji(char)
+        if color:
+            colors.append(color)
+    while len(colors) < 2:
+        colors.append(None)
+    return colors
+
+# 4-DOT LOGIC (verified against user's Excel file):
+# 1. If GREEN + BLUE >= 3: OVER
+# 2. If RED + YELLOW >= 3: UNDER
+# 3. In exact 2-2 ties:
+#    a. If GREEN >= 2 AND at least one GREEN on AWAY team: OVER
+#    b. If YELLOW >= 2 AND BLUE >= 2 (no GREEN, no RED): UNDER
+#    c. Otherwise: NO BET
+def calculate_4dot_result(away_colors, home_colors):
+    """Calculate 4-dot result using verified logic from user's Excel"""
+    all_colors = away_colors + home_colors
+    
+    green_count = all_colors.count('green')
+    blue_count = all_colors.count('blue')
+    red_count = all_colors.count('red')
+    yellow_count = all_colors.count('yellow')
+    
+    over_score = green_count + blue_count
+    under_score = red_count + yellow_count
+    
+    # Rule 1: >= 3 in either direction wins
+    if over_score >= 3:
+        return 'OVER'
+    if under_score >= 3:
+        return 'UNDER'
+    
+    # Rule 2: Handle 2-2 ties
+    away_green = away_colors.count('green')
+    
+    # 2a: GREEN >= 2 AND at least one on away team = OVER
+    if green_count >= 2 and away_green >= 1:
+        return 'OVER'
+    
+    # 2b: YELLOW >= 2 AND BLUE >= 2 with no GREEN and no RED = UNDER
+    if yellow_count >= 2 and blue_count >= 2 and green_count == 0 and red_count == 0:
+        return 'UNDER'
+    
+    # 2c: Everything else is NO BET
+    return 'NO BET'
+
+
 @api_router.get("/export/excel")
 async def export_to_excel(
     league: str = "NBA",
@@ -10997,70 +13177,6 @@ async def export_to_excel(
         betting_wins = 0
         betting_losses = 0
         
-        # Helper to get color name from dot emoji
-        def get_color_from_emoji(emoji):
-            if emoji == '🟢':
-                return 'green'
-            elif emoji == '🟡':
-                return 'yellow'
-            elif emoji == '🔴':
-                return 'red'
-            elif emoji == '🔵':
-                return 'blue'
-            return None
-        
-        # Helper to parse dots string
-        def parse_dots_to_colors(dots_str):
-            colors = []
-            if not dots_str:
-                return [None, None]
-            for char in str(dots_str):
-                color = get_color_from_emoji(char)
-                if color:
-                    colors.append(color)
-            while len(colors) < 2:
-                colors.append(None)
-            return colors
-        
-        # 4-DOT LOGIC (verified against user's Excel file):
-        # 1. If GREEN + BLUE >= 3: OVER
-        # 2. If RED + YELLOW >= 3: UNDER
-        # 3. In exact 2-2 ties:
-        #    a. If GREEN >= 2 AND at least one GREEN on AWAY team: OVER
-        #    b. If YELLOW >= 2 AND BLUE >= 2 (no GREEN, no RED): UNDER
-        #    c. Otherwise: NO BET
-        def calculate_4dot_result(away_colors, home_colors):
-            """Calculate 4-dot result using verified logic from user's Excel"""
-            all_colors = away_colors + home_colors
-            
-            green_count = all_colors.count('green')
-            blue_count = all_colors.count('blue')
-            red_count = all_colors.count('red')
-            yellow_count = all_colors.count('yellow')
-            
-            over_score = green_count + blue_count
-            under_score = red_count + yellow_count
-            
-            # Rule 1: >= 3 in either direction wins
-            if over_score >= 3:
-                return 'OVER'
-            if under_score >= 3:
-                return 'UNDER'
-            
-            # Rule 2: Handle 2-2 ties
-            away_green = away_colors.count('green')
-            
-            # 2a: GREEN >= 2 AND at least one on away team = OVER
-            if green_count >= 2 and away_green >= 1:
-                return 'OVER'
-            
-            # 2b: YELLOW >= 2 AND BLUE >= 2 with no GREEN and no RED = UNDER
-            if yellow_count >= 2 and blue_count >= 2 and green_count == 0 and red_count == 0:
-                return 'UNDER'
-            
-            # 2c: Everything else is NO BET
-            return 'NO BET'
-        
         # Process each date
         for date in dates:
             doc = await collection.find_one({"date": date})
@@ -11268,7 +13384,7 @@ async def export_to_excel(
         
         # Save to buffer
         buffer = io.BytesIO()
-        wb.save(buffer)
+        await run_blocking(wb.save, buffer)
         buffer.seek(0)
         
         # Generate filename
@@ -11458,7 +13574,7 @@ async def scrape_todays_history_bets(page, league: str, target_date: str) -> Lis
         logger.info(f"[History] Scraping history bets for {league} on {target_date}")
         
         # Navigate to History page
-        await page.goto('https://www.plays888.co/wager/History.aspx', timeout=30000)
+        await guarded_goto(page, plays888_url('/wager/History.aspx'), timeout=30000)
         await page.wait_for_load_state('networkidle')
         await page.wait_for_timeout(2000)
         
@@ -11834,7 +13950,6 @@ async def update_game_line(request: dict):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@api_router.post("/opportunities/refresh-lines")
 async def refresh_lines_and_bets(league: str = "NBA", day: str = "today"):
     """
     Refresh live betting lines AND open bets from plays888.co.
@@ -11885,11 +14000,8 @@ async def refresh_lines_and_bets(league: str = "NBA", day: str = "today"):
             elif league.upper() == "NBA":
                 live_games = await scrape_cbssports_nba(target_date)
             elif league.upper() == "NHL":
-                live_games = await scrape_cbssports_nhl(target_date)
-                if not live_games:
-                    # Fallback to NHL API if CBS fails
-                    logger.warning(f"[Refresh Lines] CBS Sports failed for NHL, trying NHL API fallback...")
-                    live_games = await scrape_nhl_api_schedule(target_date)
+                # CBS first, hedged with ScoresAndOdds / NHL API if it's slow or fails
+                live_games, _ = await hedged_fetch('lines', 'NHL', target_date)
             else:
                 live_games = []
             
@@ -11995,6 +14107,8 @@ async def refresh_lines_and_bets(league: str = "NBA", day: str = "today"):
         lines_updated = 0
         bets_added = 0
         bets_skipped = 0  # #3.5 - Track duplicates
+        identity_updates = []  # plays888 keys of matched bets, written in one batch after the loop
+        known_bet_keys = await slate_identity_keys(league.upper(), target_date, 'plays888')
         
         # Create a set of existing bet tickets for deduplication
         existing_bet_tickets = set()
@@ -12186,6 +14300,7 @@ async def refresh_lines_and_bets(league: str = "NBA", day: str = "today"):
                     logger.warning(f"[Refresh Lines] No combined_gpg/ppg for Edge calculation: {away} @ {home}, fields: combined_gpg={game.get('combined_gpg')}, game_avg={game.get('game_avg')}")
             
             # #3.75 - Match open bets to games and store bet_line
+            game_bet_keys = known_bet_keys.get(game_identity_id(league.upper(), target_date, away, home), set())
             for bet in open_bets:
                 bet_game = bet.get('game', '').upper()
                 bet_sport = bet.get('sport', '').upper()
@@ -12505,9 +14620,20 @@ async def refresh_lines_and_bets(league: str = "NBA", day: str = "today"):
                     logger.info(f"[DEBUG MICHIGAN/MIAMI] Game: {away} @ {home} -> {away_norm} @ {home_norm}")
                     logger.info(f"[DEBUG MICHIGAN/MIAMI] Bet: {bet_away} vs {bet_home} -> {bet_away_norm} vs {bet_home_norm}")
                 
-                # Try various matching approaches
+                # Bet text an earlier refresh matched to this game (game identity index) first, then the
+                # shared alias index: when all four names resolve, the canonical teams decide
+                if f"{bet_away} VS {bet_home}" in game_bet_keys:
+                    canonical_match = True
+                else:
+                    canonical_match = same_teams(league, [away, home], [bet_away, bet_home], source='plays888')
+                if canonical_match is not None:
+                    game_matches = canonical_match
+                    if game_matches:
+                        logger.info(f"[Refresh Bets] MATCHED: {away} @ {home} -> bet {bet_away} vs {bet_home}")
+                        identity_updates.append(game_identity_update(league.upper(), target_date, away, home, {"plays888": f"{bet_away} VS {bet_home}"}))
+                # Try various matching approaches (names the index doesn't know)
                 # IMPORTANT: Require BOTH teams to match for accurate bet tracking
-                if bet_away_norm and bet_home_norm:
+                elif bet_away_norm and bet_home_norm:
                     # Check away team match
                     away_match = (away_norm == bet_away_norm or 
                                  away_norm in bet_away_norm or bet_away_norm in away_norm or
@@ -12535,6 +14661,7 @@ async def refresh_lines_and_bets(league: str = "NBA", day: str = "today"):
                         if away_word_match and home_word_match:
                             game_matches = True
                             logger.info(f"[Refresh Bets] MATCHED: {away} @ {home} -> bet {bet_away} vs {bet_home}")
+                            identity_updates.append(game_identity_update(league.upper(), target_date, away, home, {"plays888": f"{bet_away} VS {bet_home}"}))
                         else:
                             # Log near matches that failed word overlap
                             if 'MICHIGAN' in away_norm or 'MIAMI' in home_norm:
@@ -12669,6 +14796,8 @@ async def refresh_lines_and_bets(league: str = "NBA", day: str = "today"):
                 bets_added += 1
                 logger.info(f"[Refresh Bets] Added bet #{game['bet_count']} to {away} @ {home}: {bet_type_display}")
         
+        await write_game_identities(league.upper(), target_date, identity_updates)
+        
         # CRITICAL: After all bets are matched, recalculate edge for games with bet_line
         # This ensures edge is locked to bet_line, not live_line
         for game in games:
@@ -12929,12 +15058,15 @@ async def refresh_lines_and_bets(league: str = "NBA", day: str = "today"):
                                 'WPG': ['WINNIPEG', 'JETS'],
                             }
                             
-                            # Helper function to find team in consensus_data using abbreviation map
+                            # Helper function to find team in consensus_data (alias index, then abbreviation map)
+                            find_consensus_team = team_table_finder('NHL', source='covers')
+                            
                             def find_team_ml(team_name, consensus_data, abbrev_map):
                                 team_upper = team_name.upper()
-                                # Direct match first
-                                if team_upper in consensus_data:
-                                    return consensus_data[team_upper].get('spread')
+                                # Direct match / Covers abbreviation via the shared alias index
+                                entry = find_consensus_team(team_upper, consensus_data)
+                                if entry is not None:
+                                    return entry.get('spread')
                                 # Try abbreviation map
                                 for abbrev, names in abbrev_map.items():
                                     if abbrev in consensus_data:
@@ -12998,110 +15130,43 @@ async def refresh_lines_and_bets(league: str = "NBA", day: str = "today"):
             if ou_consensus_data:
                 logger.info(f"[Refresh Lines] Got O/U consensus data for {len(ou_consensus_data)} games")
                 
+                # Covers O/U team codes for the first lookup (NBA: first 3 letters)
+                name_to_abbrev = COVERS_OU_ABBREVS.get(league.upper(), {})
+                
+                # Index Covers O/U rows once: by their own team codes and by canonical team keys
+                ou_by_teams = {}
+                ou_by_key = {}
+                for data in ou_consensus_data.values():
+                    covers_away = data.get('away_team', '').upper()
+                    covers_home = data.get('home_team', '').upper()
+                    ou_by_teams.setdefault((covers_away, covers_home), data)
+                    ou_by_key.setdefault(game_match_key(league, covers_away, covers_home, source='covers_ou'), data)
+                
                 for game in games:
                     away = game.get('away_team', '').upper()
                     home = game.get('home_team', '').upper()
                     
-                    # NCAAB abbreviation mapping for O/U consensus matching
-                    ncaab_name_to_abbrev = {
-                        'LE MOYNE': 'LMC', 'LEMOYNE': 'LMC',
-                        'FDU': 'FDU', 'FAIRLEIGH DICKINSON': 'FDU',
-                        'ALCORN ST': 'ALCN', 'ALCORN ST.': 'ALCN', 'ALCORN STATE': 'ALCN',
-                        'BETHUNE-COOK': 'COOK', 'BETHUNE-COOK.': 'COOK', 'BETHUNE-COOKMAN': 'COOK',
-                        'ARIZONA': 'ARIZ',
-                        'BYU': 'BYU', 'BRIGHAM YOUNG': 'BYU',
-                        'JACKSON ST': 'JKST', 'JACKSON ST.': 'JKST', 'JACKSON STATE': 'JKST',
-                        'FLORIDA A&M': 'FAMU', 'FLORIDA AM': 'FAMU',
-                        'MORGAN ST': 'MORG', 'MORGAN ST.': 'MORG', 'MORGAN STATE': 'MORG',
-                        'NORFOLK ST': 'NORF', 'NORFOLK ST.': 'NORF', 'NORFOLK STATE': 'NORF',
-                        'UTRGV': 'UTRGV', 'UT-RIO GRANDE VALLEY': 'UTRGV', 'UT RIO GRANDE VALLEY': 'UTRGV',
-                        'TX A&M-CC': 'AMCC', 'TEXAS A&M-CC': 'AMCC', 'A&M-CORPUS CHRISTI': 'AMCC',
-                        'LOUISVILLE': 'LOU',
-                        'DUKE': 'DUKE',
-                        'CCSU': 'CCSU', 'CENTRAL CONN': 'CCSU', 'CENTRAL CONNECTICUT': 'CCSU',
-                        'STONEHILL': 'STONE',
-                        'PENN ST': 'PSU', 'PENN ST.': 'PSU', 'PENN STATE': 'PSU',
-                        'OHIO ST': 'OSU', 'OHIO ST.': 'OSU', 'OHIO STATE': 'OSU',
-                        'ABILENE CHR': 'AC', 'ABILENE CHR.': 'AC', 'ABILENE CHRISTIAN': 'AC',
-                        'TARLETON ST': 'TST', 'TARLETON ST.': 'TST', 'TARLETON STATE': 'TST',
-                        'DELAWARE ST': 'DSU', 'DELAWARE ST.': 'DSU', 'DELAWARE STATE': 'DSU',
-                        'SC STATE': 'SCST', 'S.C. STATE': 'SCST', 'SOUTH CAROLINA STATE': 'SCST',
-                    }
-                    
-                    # NHL abbreviation mapping for O/U consensus matching
-                    nhl_name_to_abbrev = {
-                        'ANAHEIM': 'ANA', 'DUCKS': 'ANA',
-                        'ARIZONA': 'ARI', 'COYOTES': 'ARI',
-                        'BOSTON': 'BOS', 'BRUINS': 'BOS',
-                        'BUFFALO': 'BUF', 'SABRES': 'BUF',
-                        'CALGARY': 'CAL', 'FLAMES': 'CAL', 'CGY': 'CAL',
-                        'CAROLINA': 'CAR', 'HURRICANES': 'CAR',
-                        'CHICAGO': 'CHI', 'BLACKHAWKS': 'CHI',
-                        'COLORADO': 'COL', 'AVALANCHE': 'COL',
-                        'COLUMBUS': 'CBJ', 'BLUE JACKETS': 'CBJ',
-                        'DALLAS': 'DAL', 'STARS': 'DAL',
-                        'DETROIT': 'DET', 'RED WINGS': 'DET',
-                        'EDMONTON': 'EDM', 'OILERS': 'EDM',
-                        'FLORIDA': 'FLA', 'PANTHERS': 'FLA',
-                        'LOS ANGELES': 'LA', 'LA KINGS': 'LA', 'KINGS': 'LA', 'LAK': 'LA',
-                        'MINNESOTA': 'MIN', 'WILD': 'MIN',
-                        'MONTREAL': 'MTL', 'CANADIENS': 'MTL',
-                        'NASHVILLE': 'NSH', 'PREDATORS': 'NSH',
-                        'NEW JERSEY': 'NJ', 'DEVILS': 'NJ', 'NJD': 'NJ',
-                        'NY ISLANDERS': 'NYI', 'NEW YORK ISLANDERS': 'NYI', 'ISLANDERS': 'NYI',
-                        'NY RANGERS': 'NYR', 'NEW YORK RANGERS': 'NYR', 'RANGERS': 'NYR',
-                        'OTTAWA': 'OTT', 'SENATORS': 'OTT',
-                        'PHILADELPHIA': 'PHI', 'FLYERS': 'PHI',
-                        'PITTSBURGH': 'PIT', 'PENGUINS': 'PIT',
-                        'SAN JOSE': 'SJ', 'SHARKS': 'SJ', 'SJS': 'SJ',
-                        'SEATTLE': 'SEA', 'KRAKEN': 'SEA',
-                        'ST. LOUIS': 'STL', 'ST LOUIS': 'STL', 'BLUES': 'STL',
-                        'TAMPA BAY': 'TB', 'LIGHTNING': 'TB', 'TBL': 'TB',
-                        'TORONTO': 'TOR', 'MAPLE LEAFS': 'TOR',
-                        'UTAH': 'UTA', 'UTAH HOCKEY CLUB': 'UTA',
-                        'VANCOUVER': 'VAN', 'CANUCKS': 'VAN',
-                        'VEGAS': 'VEG', 'GOLDEN KNIGHTS': 'VEG', 'VGK': 'VEG',
-                        'WASHINGTON': 'WAS', 'CAPITALS': 'WAS', 'WSH': 'WAS',
-                        'WINNIPEG': 'WPG', 'JETS': 'WPG',
-                    }
-                    
-                    # Select the correct abbreviation map based on league
-                    if league.upper() == 'NHL':
-                        name_to_abbrev = nhl_name_to_abbrev
-                    elif league.upper() == 'NCAAB':
-                        name_to_abbrev = ncaab_name_to_abbrev
-                    else:
-                        # NBA - use first 3 letters as default
-                        name_to_abbrev = {}
-                    
                     # Convert full team names to abbreviations for matching
                     away_abbrev = name_to_abbrev.get(away, away[:3])
                     home_abbrev = name_to_abbrev.get(home, home[:3])
                     
                     logger.info(f"[O/U Match] Looking for {away} ({away_abbrev}) @ {home} ({home_abbrev})")
                     
-                    # Try to find matching game in O/U consensus data by iterating all entries
-                    ou_data = None
-                    for key, data in ou_consensus_data.items():
-                        covers_away = data.get('away_team', '').upper()
-                        covers_home = data.get('home_team', '').upper()
-                        
-                        # Match by abbreviation
-                        if covers_away == away_abbrev and covers_home == home_abbrev:
-                            ou_data = data
-                            logger.debug(f"[O/U Match] Found by abbrev: {covers_away}_{covers_home}")
-                            break
-                        # Match by full name
-                        if covers_away == away and covers_home == home:
-                            ou_data = data
-                            logger.debug(f"[O/U Match] Found by full name: {covers_away}_{covers_home}")
-                            break
-                        # Try partial match (covers abbrev in full name or vice versa)
-                        if (covers_away in away or away in covers_away or covers_away == away_abbrev) and \
-                           (covers_home in home or home in covers_home or covers_home == home_abbrev):
-                            ou_data = data
-                            logger.debug(f"[O/U Match] Found by partial: {covers_away}_{covers_home}")
-                            break
+                    # Look up matching game in O/U consensus data: abbreviation, full name, canonical key
+                    ou_data = (ou_by_teams.get((away_abbrev, home_abbrev)) or ou_by_teams.get((away, home))
+                               or ou_by_key.get(game_match_key(league, away, home, source='covers_ou')))
+                    if ou_data:
+                        logger.debug(f"[O/U Match] Found {ou_data.get('away_team')}_{ou_data.get('home_team')}")
+                    else:
+                        # Partial match (covers abbrev in full name or vice versa)
+                        for data in ou_consensus_data.values():
+                            covers_away = data.get('away_team', '').upper()
+                            covers_home = data.get('home_team', '').upper()
+                            if (covers_away in away or away in covers_away or covers_away == away_abbrev) and \
+                               (covers_home in home or home in covers_home or covers_home == home_abbrev):
+                                ou_data = data
+                                logger.debug(f"[O/U Match] Found by partial: {covers_away}_{covers_home}")
+                                break
                     
                     if ou_data:
                         over_pct = ou_data.get('over_pct')
@@ -13214,7 +15279,6 @@ async def refresh_lines_and_bets(league: str = "NBA", day: str = "today"):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@api_router.post("/opportunities/refresh")
 async def refresh_opportunities(day: str = "today", use_live_lines: bool = False):
     """Manually refresh NBA opportunities data. 
     day parameter: 'yesterday', 'today' or 'tomorrow'
@@ -13905,7 +15969,6 @@ async def get_nhl_opportunities(day: str = "today"):
         logger.error(f"Error getting NHL opportunities: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@api_router.post("/opportunities/nhl/refresh")
 async def refresh_nhl_opportunities(day: str = "today", use_live_lines: bool = False):
     """Manually refresh NHL opportunities data. 
     day parameter: 'yesterday', 'today' or 'tomorrow'
@@ -14056,54 +16119,12 @@ async def refresh_nhl_opportunities(day: str = "today", use_live_lines: bool = F
         # BUT we need to avoid duplicates - games already scraped from Plays888
         if day == "today":
             # Create comprehensive matching keys for existing games
-            # Use both city names and team nicknames for matching
-            nhl_team_nicknames = {
-                'NY ISLANDERS': ['ISLANDERS', 'NY ISLANDERS', 'NEW YORK ISLANDERS'],
-                'NY RANGERS': ['RANGERS', 'NY RANGERS', 'NEW YORK RANGERS'],
-                'COLUMBUS': ['BLUE JACKETS', 'JACKETS', 'COLUMBUS'],
-                'TORONTO': ['MAPLE LEAFS', 'LEAFS', 'TORONTO'],
-                'DETROIT': ['RED WINGS', 'WINGS', 'DETROIT'],
-                'PITTSBURGH': ['PENGUINS', 'PITTSBURGH'],
-                'CHICAGO': ['BLACKHAWKS', 'HAWKS', 'CHICAGO'],
-                'PHILADELPHIA': ['FLYERS', 'PHILADELPHIA'],
-                'SEATTLE': ['KRAKEN', 'SEATTLE'],
-                'MONTREAL': ['CANADIENS', 'HABS', 'MONTREAL'],
-                'TAMPA BAY': ['LIGHTNING', 'BOLTS', 'TAMPA BAY', 'TAMPA'],
-                'BOSTON': ['BRUINS', 'BOSTON'],
-                'BUFFALO': ['SABRES', 'BUFFALO'],
-                'CAROLINA': ['HURRICANES', 'CANES', 'CAROLINA'],
-                'OTTAWA': ['SENATORS', 'SENS', 'OTTAWA'],
-                'NEW JERSEY': ['DEVILS', 'NEW JERSEY'],
-                'DALLAS': ['STARS', 'DALLAS'],
-                'NASHVILLE': ['PREDATORS', 'PREDS', 'NASHVILLE'],
-                'ST. LOUIS': ['BLUES', 'ST. LOUIS', 'ST LOUIS'],
-                'ANAHEIM': ['DUCKS', 'ANAHEIM'],
-                'LOS ANGELES': ['KINGS', 'LOS ANGELES', 'LA KINGS'],
-                'COLORADO': ['AVALANCHE', 'AVS', 'COLORADO'],
-                'VEGAS': ['GOLDEN KNIGHTS', 'KNIGHTS', 'VEGAS'],
-                'EDMONTON': ['OILERS', 'EDMONTON'],
-                'CALGARY': ['FLAMES', 'CALGARY'],
-                'SAN JOSE': ['SHARKS', 'SAN JOSE'],
-                'VANCOUVER': ['CANUCKS', 'VANCOUVER'],
-                'WASHINGTON': ['CAPITALS', 'CAPS', 'WASHINGTON'],
-                'FLORIDA': ['PANTHERS', 'FLORIDA'],
-                'MINNESOTA': ['WILD', 'MINNESOTA'],
-                'WINNIPEG': ['JETS', 'WINNIPEG'],
-                'UTAH': ['MAMMOTH', 'UTAH']
-            }
+            # Use both city names and team nicknames for matching (shared alias index)
+            team_index = get_team_index('NHL')
             
             def normalize_team_name(team_name):
                 """Normalize team name to a standard key for matching"""
-                team_upper = team_name.upper().strip()
-                # Check if it matches any known team
-                for standard_name, aliases in nhl_team_nicknames.items():
-                    if team_upper in aliases or standard_name in team_upper:
-                        return standard_name
-                    # Also check if any alias is contained in the team name
-                    for alias in aliases:
-                        if alias in team_upper or team_upper in alias:
-                            return standard_name
-                return team_upper
+                return team_index.normalize(team_name, source='plays888').upper()
             
             existing_matchups = set()
             for g in games_raw:
@@ -14482,7 +16503,6 @@ async def get_ncaab_opportunities_endpoint(day: str = "today"):
         logger.error(f"Error getting NCAAB opportunities: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
-@api_router.post("/opportunities/ncaab/refresh")
 async def refresh_ncaab_opportunities(day: str = "today"):
     """Manually refresh NCAAB opportunities data. 
     day parameter: 'yesterday', 'today' or 'tomorrow'
@@ -14533,49 +16553,29 @@ async def refresh_ncaab_opportunities(day: str = "today"):
             else:
                 return '⚪'  # Unknown - not in top 365
         
+        # Resolve team names onto the PPG tables (compiled once, O(1) per lookup)
+        team_index = get_team_index('NCAAB')
+        ppg_resolvers = {table: team_index.resolver_for(ppg_data[table].keys()) for table in ('season_ranks', 'season_values', 'last3_ranks', 'last3_values')}
+        
+        def find_team_value(team_name, table):
+            """Find team rank/PPG in a PPG table via the alias index"""
+            key = ppg_resolvers[table].resolve(team_name, source='teamrankings') if team_name else None
+            return ppg_data[table].get(key) if key else None
+        
         for game in games:
             away_team = game.get('away', '')
             home_team = game.get('home', '')
             
-            # Try to find team in PPG data (NCAAB teams have varied names)
-            def find_team_ppg(team_name, ppg_dict):
-                """Find team PPG using fuzzy matching"""
-                if not team_name:
-                    return None
-                # Direct match
-                if team_name in ppg_dict:
-                    return ppg_dict[team_name]
-                # Try lowercase match
-                team_lower = team_name.lower()
-                for k, v in ppg_dict.items():
-                    if k.lower() == team_lower or team_lower in k.lower() or k.lower() in team_lower:
-                        return v
-                return None
-            
-            def find_team_rank(team_name, rank_dict):
-                """Find team rank using fuzzy matching"""
-                if not team_name:
-                    return None
-                # Direct match
-                if team_name in rank_dict:
-                    return rank_dict[team_name]
-                # Try lowercase match
-                team_lower = team_name.lower()
-                for k, v in rank_dict.items():
-                    if k.lower() == team_lower or team_lower in k.lower() or k.lower() in team_lower:
-                        return v
-                return None
-            
             # Get PPG data with fuzzy matching
-            away_ppg_rank = find_team_rank(away_team, ppg_data['season_ranks'])
-            away_ppg_value = find_team_ppg(away_team, ppg_data['season_values'])
-            away_last3_rank = find_team_rank(away_team, ppg_data['last3_ranks'])
-            away_last3_value = find_team_ppg(away_team, ppg_data['last3_values'])
+            away_ppg_rank = find_team_value(away_team, 'season_ranks')
+            away_ppg_value = find_team_value(away_team, 'season_values')
+            away_last3_rank = find_team_value(away_team, 'last3_ranks')
+            away_last3_value = find_team_value(away_team, 'last3_values')
             
-            home_ppg_rank = find_team_rank(home_team, ppg_data['season_ranks'])
-            home_ppg_value = find_team_ppg(home_team, ppg_data['season_values'])
-            home_last3_rank = find_team_rank(home_team, ppg_data['last3_ranks'])
-            home_last3_value = find_team_ppg(home_team, ppg_data['last3_values'])
+            home_ppg_rank = find_team_value(home_team, 'season_ranks')
+            home_ppg_value = find_team_value(home_team, 'season_values')
+            home_last3_rank = find_team_value(home_team, 'last3_ranks')
+            home_last3_value = find_team_value(home_team, 'last3_values')
             
             # Calculate combined PPG using the correct formula:
             # (Team1 Season PPG + Team2 Season PPG + Team1 L3 PPG + Team2 L3 PPG) / 2
@@ -14827,6 +16827,9 @@ async def add_ncaab_manual_data(data: dict):
             else:
                 return '⚪'  # Unknown - not in top 365
         
+        # PPG tables are keyed by TeamRankings names (shared alias index)
+        find_team = team_table_finder('NCAAB', source='manual')
+        
         # Process games
         processed_games = []
         
@@ -14835,18 +16838,6 @@ async def add_ncaab_manual_data(data: dict):
             home_team = game.get('home', '')
             line = game.get('total')
             
-            # Get PPG data (with fuzzy matching)
-            def find_team(team_name, data_dict):
-                if not team_name:
-                    return None
-                if team_name in data_dict:
-                    return data_dict[team_name]
-                team_lower = team_name.lower()
-                for k, v in data_dict.items():
-                    if k.lower() == team_lower or team_lower in k.lower() or k.lower() in team_lower:
-                        return v
-                return None
-            
             away_ppg_rank = find_team(away_team, ppg_data['season_ranks'])
             away_ppg_value = find_team(away_team, ppg_data['season_values'])
             away_last3_rank = find_team(away_team, ppg_data['last3_ranks'])
@@ -15013,8 +17004,9 @@ async def update_ncaab_ppg_from_cbs(target_date: str = None):
         env = os.environ.copy()
         env['TARGET_DATE'] = target_date
         
-        # Run with timeout of 300 seconds
-        result = subprocess.run(
+        # Run with timeout of 300 seconds (off the event loop - the script takes minutes)
+        result = await run_blocking(
+            subprocess.run,
             ['python3', script_path],
             capture_output=True,
             text=True,
@@ -15114,257 +17106,270 @@ async def upload_ppg_excel(league: str, target_date: str = None, target_day: str
         
         logger.info(f"[PPG Excel] Processing {league} PPG for {target_date}")
         
-        # Read Excel file
-        xlsx = pd.ExcelFile('/tmp/PPG.xlsx')
-        
-        ppg_data = []
-        
-        if league == 'NBA':
-            df = pd.read_excel(xlsx, sheet_name='NBA - PPG SEASON AND PPGL3', header=None)
-            for i, row in df.iterrows():
-                vals = row.values
-                try:
-                    rank = int(vals[0]) if pd.notna(vals[0]) else None
-                    if rank and rank <= 30:
-                        team = str(vals[1]).strip() if pd.notna(vals[1]) else None
-                        season_ppg = float(vals[2]) if pd.notna(vals[2]) else None
-                        last3_ppg = float(vals[3]) if pd.notna(vals[3]) else None
-                        if team and season_ppg:
-                            ppg_data.append({
-                                'rank': rank,
-                                'team': team,
-                                'season_ppg': season_ppg,
-                                'last3_ppg': last3_ppg
-                            })
-                except:
-                    continue
-                    
-        elif league == 'NHL':
-            # NHL team name normalization map
-            nhl_normalize = {
-                'Penguins': 'Pittsburgh', 'Golden Knights': 'Vegas', 'Maple Leafs': 'Toronto',
-                'Avalanche': 'Colorado', 'Stars': 'Dallas', 'Oilers': 'Edmonton',
-                'Ducks': 'Anaheim', 'Lightning': 'Tampa Bay', 'Canadiens': 'Montreal',
-                'Hurricanes': 'Carolina', 'Senators': 'Ottawa', 'Bruins': 'Boston',
-                'Rangers': 'NY Rangers', 'Islanders': 'NY Islanders', 'Flyers': 'Philadelphia',
-                'Devils': 'New Jersey', 'Blue Jackets': 'Columbus', 'Panthers': 'Florida',
-                'Sabres': 'Buffalo', 'Red Wings': 'Detroit', 'Blackhawks': 'Chicago',
-                'Blues': 'St. Louis', 'Predators': 'Nashville', 'Wild': 'Minnesota',
-                'Jets': 'Winnipeg', 'Kraken': 'Seattle', 'Sharks': 'San Jose',
-                'Kings': 'LA Kings', 'Flames': 'Calgary', 'Canucks': 'Vancouver',
-                'Capitals': 'Washington', 'Utah HC': 'Utah', 'Utah Mammoth': 'Utah', 'Mammoth': 'Utah'
-            }
-            
-            def normalize_nhl_team(full_name):
-                for key, val in nhl_normalize.items():
-                    if key in full_name:
-                        return val
-                return full_name.replace('Montréal', 'Montreal').strip()
-            
-            # NHL Season GPG from "NHL - PPG SEASON" tab
-            df_season = pd.read_excel(xlsx, sheet_name='NHL - PPG SEASON', header=None)
-            season_gpg = {}
-            for i, row in df_season.iterrows():
-                vals = row.values
-                try:
-                    rank = int(vals[0]) if pd.notna(vals[0]) else None
-                    if rank and rank <= 32:
-                        team_full = str(vals[1]).strip() if pd.notna(vals[1]) else None
-                        gpg = float(vals[15]) if pd.notna(vals[15]) else None
-                        if team_full and gpg:
-                            team = normalize_nhl_team(team_full)
-                            season_gpg[team] = gpg
-                except:
-                    continue
-            
-            logger.info(f"[PPG Excel] NHL Season GPG: {len(season_gpg)} teams")
-            
-            # NHL Last 3 GPG from "NHL - PPGL3" tab
-            df_l3 = pd.read_excel(xlsx, sheet_name='NHL - PPGL3', header=None)
-            last3_gpg = {}
-            last3_gpg_ordered = []  # Keep track of order to find the last one
-            current_gpg = None
-            for i, row in df_l3.iterrows():
-                vals = row.values
-                try:
-                    # Row with rank has G (goals) in column 3 and GP (games played) in column 4
-                    # GPG = G / GP
-                    if pd.notna(vals[0]):
-                        g_value = float(vals[3]) if pd.notna(vals[3]) else None
-                        gp_value = float(vals[4]) if pd.notna(vals[4]) else None
-                        if g_value and gp_value and gp_value > 0:
-                            current_gpg = round(g_value / gp_value, 2)  # Calculate GPG
-                        else:
-                            current_gpg = None
-                    # Team name is in column 2
-                    team_name = vals[2] if pd.notna(vals[2]) else None
-                    if team_name and isinstance(team_name, str) and len(team_name) > 2 and team_name != 'TEAM':
-                        team = normalize_nhl_team(team_name.strip())
-                        if current_gpg:
-                            last3_gpg[team] = current_gpg
-                            last3_gpg_ordered.append(current_gpg)
-                except:
-                    continue
+        def parse_ppg_workbook():
+            """Sheet parsing is sync pandas/openpyxl work - runs in blocking_executor"""
+            ncaab_map = {}
             
-            logger.info(f"[PPG Excel] NHL Last3 GPG: {len(last3_gpg)} teams")
+            # Read Excel file
+            xlsx = pd.ExcelFile('/tmp/PPG.xlsx')
             
-            # Default Last3 GPG = the last team's value in PPGL3 (25th team)
-            # This changes daily based on Excel data
-            default_l3_gpg = last3_gpg_ordered[-1] if last3_gpg_ordered else 2.33
-            logger.info(f"[PPG Excel] NHL default Last3 GPG for missing teams: {default_l3_gpg}")
+            ppg_data = []
             
-            # Combine season and last3 data
-            for team, season in season_gpg.items():
-                l3 = last3_gpg.get(team, default_l3_gpg)  # Use default if missing
-                ppg_data.append({
-                    'team': team,
-                    'season_gpg': season,
-                    'last3_gpg': l3
-                })
-                    
-        elif league == 'NCAAB':
-            # NCAAB team name mapping (CBS Sports name -> Excel name)
-            ncaab_map = {
-                # A
-                'App. St.': 'App State',
-                # B
-                # C
-                'CCSU': 'C Connecticut',
-                'Clev. St.': 'Cleveland St',
-                'Chicago St.': 'Chicago St',
-                'Colo. St.': 'Colorado St',
-                'Colorado State': 'Colorado St',
-                # D
-                'Detroit': 'Detroit Mercy',
-                # E
-                'East Carolina': 'E Carolina',
-                'E. Kentucky': 'E Kentucky',
-                'E. Michigan': 'E Michigan',
-                # F
-                'FAU': 'Florida Atlantic',
-                'FDU': 'F Dickinson',
-                'FIU': 'Florida Intl',
-                'Fla. Gulf Coast': 'Florida Gulf Coast',
-                # G
-                'Ga. Tech': 'Georgia Tech',
-                'Ga. Southern': 'Georgia Southern',
-                'George Wash.': 'G Washington',
-                # I
-                'IUI': None,  # Indiana University Indianapolis - not in Excel
-                'Ill.-Chicago': 'Illinois Chicago',
-                # J
-                'J&W-Prov.': None,
-                'Jax. State': 'Jacksonville St',
-                # K
-                'Kennesaw St.': 'Kennesaw St',
-                # L
-                'LIU': 'Long Island',
-                'LMU': 'Loyola Mymt',
-                'La. Tech': 'Louisiana Tech',
-                'Loyola-Md.': 'Loyola MD',
-                'Loyola Chi.': 'Loyola Chi',
-                'Lindenwood': 'Lindenwood',
-                # M
-                'Middle Tenn.': 'Middle Tenn',
-                'Missouri St.': 'Missouri St',
-                'Mt St Mary\'s': 'Mount St Mary\'s',
-                'Murray St.': 'Murray St',
-                'Massachusetts': 'UMass',
-                'MASS': 'UMass',
-                'Miami Ohio': 'Miami (Ohio)',
-                'MIAMI OHIO': 'Miami (Ohio)',
-                'Miami (OH)': 'Miami (Ohio)',
-                # N
-                'N. Dak. St.': 'N Dakota St',
-                'N. Iowa': 'Northern Iowa',
-                'N. Kentucky': 'N Kentucky',
-                'N. Mex. St.': 'New Mexico St',
-                'N.J. Tech': 'NJIT',
-                # O
-                'Oregon St.': 'Oregon St',
-                'Okla. St.': 'Oklahoma St',
-                'Okla St': 'Oklahoma St',
-                'Oklahoma State': 'Oklahoma St',
-                # P
-                'PFW': 'Purdue FW',
-                # R
-                # S
-                'S. Illinois': 'Southern Illinois',
-                'S. Carolina': 'South Carolina',
-                'S Carolina': 'South Carolina',
-                'SC': 'South Carolina',
-                'SIUE': 'SIU Edwardsville',
-                'SIU-E': 'SIU Edwardsville',
-                'Saint Francis': 'St Francis PA',
-                "Saint Mary's": "Saint Mary's",
-                'Sam Houston': 'Sam Houston St',
-                'San Fran.': 'San Francisco',
-                'St. Bona.': 'St Bonaventure',
-                "St. John's": "St John's",
-                'St. Thomas (MN)': 'St Thomas',
-                # T
-                'TX A&M-CC': 'Texas A&M-CC',
-                # U
-                'UAB': 'UAB',
-                'UConn': 'UConn',
-                'UIC': 'Illinois Chicago',
-                'UTEP': 'UTEP',
-                'UNC-Ash.': 'NC Asheville',
-                'UNCW': 'NC Wilmington',
-                'UT-Rio Grande Valley': 'UT Rio Grande',
-                # V
-                'Va. Tech': 'Virginia Tech',
-                # W
-                'W. Michigan': 'Western Michigan',
-                'WESTERN MICHIGAN': 'W. Michigan',
-                'W Michigan': 'W. Michigan',
-                'W. Carolina': 'W Carolina',
-                'W. Kentucky': 'W Kentucky',
-                'Wash. St.': 'Washington St',
-                'Wright St.': 'Wright St',
-                # Y
-                'Youngstown St.': 'Youngstown St',
-                # Others
-                'E. Texas A&M': 'E Texas A&M',
-                'East Texas A&M': 'E Texas A&M',
-                'NC A&T': 'NC A&T',
-            }
-            
-            # Try both possible sheet names
-            sheet_names = xlsx.sheet_names
-            ncaab_sheet = None
-            for sn in sheet_names:
-                if 'NCAAB' in sn.upper() and 'PPG' in sn.upper():
-                    ncaab_sheet = sn
-                    break
-            
-            if not ncaab_sheet:
-                ncaab_sheet = 'NCAAB - PPG SEASON AND PPGL3'  # Fallback
-            
-            logger.info(f"[PPG Excel] Using NCAAB sheet: {ncaab_sheet}")
-            df = pd.read_excel(xlsx, sheet_name=ncaab_sheet, header=None)
-            for i, row in df.iterrows():
-                vals = row.values
-                try:
-                    rank = int(vals[0]) if pd.notna(vals[0]) else None
-                    if rank and rank <= 400:
-                        team = str(vals[1]).strip() if pd.notna(vals[1]) else None
-                        season_ppg = float(vals[2]) if pd.notna(vals[2]) else None
-                        last3_ppg = float(vals[3]) if pd.notna(vals[3]) else None
-                        if team and season_ppg:
-                            ppg_data.append({
-                                'rank': rank,
-                                'team': team,
-                                'season_ppg': season_ppg,
-                                'last3_ppg': last3_ppg
-                            })
-                except:
-                    continue
+            if league == 'NBA':
+                df = pd.read_excel(xlsx, sheet_name='NBA - PPG SEASON AND PPGL3', header=None)
+                for i, row in df.iterrows():
+                    vals = row.values
+                    try:
+                        rank = int(vals[0]) if pd.notna(vals[0]) else None
+                        if rank and rank <= 30:
+                            team = str(vals[1]).strip() if pd.notna(vals[1]) else None
+                            season_ppg = float(vals[2]) if pd.notna(vals[2]) else None
+                            last3_ppg = float(vals[3]) if pd.notna(vals[3]) else None
+                            if team and season_ppg:
+                                ppg_data.append({
+                                    'rank': rank,
+                                    'team': team,
+                                    'season_ppg': season_ppg,
+                                    'last3_ppg': last3_ppg
+                                })
+                    except:
+                        continue
+                        
+            elif league == 'NHL':
+                # NHL team name normalization map
+                nhl_normalize = {
+                    'Penguins': 'Pittsburgh', 'Golden Knights': 'Vegas', 'Maple Leafs': 'Toronto',
+                    'Avalanche': 'Colorado', 'Stars': 'Dallas', 'Oilers': 'Edmonton',
+                    'Ducks': 'Anaheim', 'Lightning': 'Tampa Bay', 'Canadiens': 'Montreal',
+                    'Hurricanes': 'Carolina', 'Senators': 'Ottawa', 'Bruins': 'Boston',
+                    'Rangers': 'NY Rangers', 'Islanders': 'NY Islanders', 'Flyers': 'Philadelphia',
+                    'Devils': 'New Jersey', 'Blue Jackets': 'Columbus', 'Panthers': 'Florida',
+                    'Sabres': 'Buffalo', 'Red Wings': 'Detroit', 'Blackhawks': 'Chicago',
+                    'Blues': 'St. Louis', 'Predators': 'Nashville', 'Wild': 'Minnesota',
+                    'Jets': 'Winnipeg', 'Kraken': 'Seattle', 'Sharks': 'San Jose',
+                    'Kings': 'LA Kings', 'Flames': 'Calgary', 'Canucks': 'Vancouver',
+                    'Capitals': 'Washington', 'Utah HC': 'Utah', 'Utah Mammoth': 'Utah', 'Mammoth': 'Utah'
+                }
+                
+                nhl_index = get_team_index('NHL')
+                
+                def normalize_nhl_team(full_name):
+                    canonical = nhl_index.resolve(full_name, source='ppg_excel')
+                    if canonical:
+                        return canonical
+                    for key, val in nhl_normalize.items():
+                        if key in full_name:
+                            return val
+                    return full_name.replace('Montréal', 'Montreal').strip()
+                
+                # NHL Season GPG from "NHL - PPG SEASON" tab
+                df_season = pd.read_excel(xlsx, sheet_name='NHL - PPG SEASON', header=None)
+                season_gpg = {}
+                for i, row in df_season.iterrows():
+                    vals = row.values
+                    try:
+                        rank = int(vals[0]) if pd.notna(vals[0]) else None
+                        if rank and rank <= 32:
+                            team_full = str(vals[1]).strip() if pd.notna(vals[1]) else None
+                            gpg = float(vals[15]) if pd.notna(vals[15]) else None
+                            if team_full and gpg:
+                                team = normalize_nhl_team(team_full)
+                                season_gpg[team] = gpg
+                    except:
+                        continue
+                
+                logger.info(f"[PPG Excel] NHL Season GPG: {len(season_gpg)} teams")
+                
+                # NHL Last 3 GPG from "NHL - PPGL3" tab
+                df_l3 = pd.read_excel(xlsx, sheet_name='NHL - PPGL3', header=None)
+                last3_gpg = {}
+                last3_gpg_ordered = []  # Keep track of order to find the last one
+                current_gpg = None
+                for i, row in df_l3.iterrows():
+                    vals = row.values
+                    try:
+                        # Row with rank has G (goals) in column 3 and GP (games played) in column 4
+                        # GPG = G / GP
+                        if pd.notna(vals[0]):
+                            g_value = float(vals[3]) if pd.notna(vals[3]) else None
+                            gp_value = float(vals[4]) if pd.notna(vals[4]) else None
+                            if g_value and gp_value and gp_value > 0:
+                                current_gpg = round(g_value / gp_value, 2)  # Calculate GPG
+                            else:
+                                current_gpg = None
+                        # Team name is in column 2
+                        team_name = vals[2] if pd.notna(vals[2]) else None
+                        if team_name and isinstance(team_name, str) and len(team_name) > 2 and team_name != 'TEAM':
+                            team = normalize_nhl_team(team_name.strip())
+                            if current_gpg:
+                                last3_gpg[team] = current_gpg
+                                last3_gpg_ordered.append(current_gpg)
+                    except:
+                        continue
+                
+                logger.info(f"[PPG Excel] NHL Last3 GPG: {len(last3_gpg)} teams")
+                
+                # Default Last3 GPG = the last team's value in PPGL3 (25th team)
+                # This changes daily based on Excel data
+                default_l3_gpg = last3_gpg_ordered[-1] if last3_gpg_ordered else 2.33
+                logger.info(f"[PPG Excel] NHL default Last3 GPG for missing teams: {default_l3_gpg}")
+                
+                # Combine season and last3 data
+                for team, season in season_gpg.items():
+                    l3 = last3_gpg.get(team, default_l3_gpg)  # Use default if missing
+                    ppg_data.append({
+                        'team': team,
+                        'season_gpg': season,
+                        'last3_gpg': l3
+                    })
+                        
+            elif league == 'NCAAB':
+                # NCAAB team name mapping (CBS Sports name -> Excel name)
+                ncaab_map = {
+                    # A
+                    'App. St.': 'App State',
+                    # B
+                    # C
+                    'CCSU': 'C Connecticut',
+                    'Clev. St.': 'Cleveland St',
+                    'Chicago St.': 'Chicago St',
+                    'Colo. St.': 'Colorado St',
+                    'Colorado State': 'Colorado St',
+                    # D
+                    'Detroit': 'Detroit Mercy',
+                    # E
+                    'East Carolina': 'E Carolina',
+                    'E. Kentucky': 'E Kentucky',
+                    'E. Michigan': 'E Michigan',
+                    # F
+                    'FAU': 'Florida Atlantic',
+                    'FDU': 'F Dickinson',
+                    'FIU': 'Florida Intl',
+                    'Fla. Gulf Coast': 'Florida Gulf Coast',
+                    # G
+                    'Ga. Tech': 'Georgia Tech',
+                    'Ga. Southern': 'Georgia Southern',
+                    'George Wash.': 'G Washington',
+                    # I
+                    'IUI': None,  # Indiana University Indianapolis - not in Excel
+                    'Ill.-Chicago': 'Illinois Chicago',
+                    # J
+                    'J&W-Prov.': None,
+                    'Jax. State': 'Jacksonville St',
+                    # K
+                    'Kennesaw St.': 'Kennesaw St',
+                    # L
+                    'LIU': 'Long Island',
+                    'LMU': 'Loyola Mymt',
+                    'La. Tech': 'Louisiana Tech',
+                    'Loyola-Md.': 'Loyola MD',
+                    'Loyola Chi.': 'Loyola Chi',
+                    'Lindenwood': 'Lindenwood',
+                    # M
+                    'Middle Tenn.': 'Middle Tenn',
+                    'Missouri St.': 'Missouri St',
+                    'Mt St Mary\'s': 'Mount St Mary\'s',
+                    'Murray St.': 'Murray St',
+                    'Massachusetts': 'UMass',
+                    'MASS': 'UMass',
+                    'Miami Ohio': 'Miami (Ohio)',
+                    'MIAMI OHIO': 'Miami (Ohio)',
+                    'Miami (OH)': 'Miami (Ohio)',
+                    # N
+                    'N. Dak. St.': 'N Dakota St',
+                    'N. Iowa': 'Northern Iowa',
+                    'N. Kentucky': 'N Kentucky',
+                    'N. Mex. St.': 'New Mexico St',
+                    'N.J. Tech': 'NJIT',
+                    # O
+                    'Oregon St.': 'Oregon St',
+                    'Okla. St.': 'Oklahoma St',
+                    'Okla St': 'Oklahoma St',
+                    'Oklahoma State': 'Oklahoma St',
+                    # P
+                    'PFW': 'Purdue FW',
+                    # R
+                    # S
+                    'S. Illinois': 'Southern Illinois',
+                    'S. Carolina': 'South Carolina',
+                    'S Carolina': 'South Carolina',
+                    'SC': 'South Carolina',
+                    'SIUE': 'SIU Edwardsville',
+                    'SIU-E': 'SIU Edwardsville',
+                    'Saint Francis': 'St Francis PA',
+                    "Saint Mary's": "Saint Mary's",
+                    'Sam Houston': 'Sam Houston St',
+                    'San Fran.': 'San Francisco',
+                    'St. Bona.': 'St Bonaventure',
+                    "St. John's": "St John's",
+                    'St. Thomas (MN)': 'St Thomas',
+                    # T
+                    'TX A&M-CC': 'Texas A&M-CC',
+                    # U
+                    'UAB': 'UAB',
+                    'UConn': 'UConn',
+                    'UIC': 'Illinois Chicago',
+                    'UTEP': 'UTEP',
+                    'UNC-Ash.': 'NC Asheville',
+                    'UNCW': 'NC Wilmington',
+                    'UT-Rio Grande Valley': 'UT Rio Grande',
+                    # V
+                    'Va. Tech': 'Virginia Tech',
+                    # W
+                    'W. Michigan': 'Western Michigan',
+                    'WESTERN MICHIGAN': 'W. Michigan',
+                    'W Michigan': 'W. Michigan',
+                    'W. Carolina': 'W Carolina',
+                    'W. Kentucky': 'W Kentucky',
+                    'Wash. St.': 'Washington St',
+                    'Wright St.': 'Wright St',
+                    # Y
+                    'Youngstown St.': 'Youngstown St',
+                    # Others
+                    'E. Texas A&M': 'E Texas A&M',
+                    'East Texas A&M': 'E Texas A&M',
+                    'NC A&T': 'NC A&T',
+                }
+                
+                # Try both possible sheet names
+                sheet_names = xlsx.sheet_names
+                ncaab_sheet = None
+                for sn in sheet_names:
+                    if 'NCAAB' in sn.upper() and 'PPG' in sn.upper():
+                        ncaab_sheet = sn
+                        break
+                
+                if not ncaab_sheet:
+                    ncaab_sheet = 'NCAAB - PPG SEASON AND PPGL3'  # Fallback
+                
+                logger.info(f"[PPG Excel] Using NCAAB sheet: {ncaab_sheet}")
+                df = pd.read_excel(xlsx, sheet_name=ncaab_sheet, header=None)
+                for i, row in df.iterrows():
+                    vals = row.values
+                    try:
+                        rank = int(vals[0]) if pd.notna(vals[0]) else None
+                        if rank and rank <= 400:
+                            team = str(vals[1]).strip() if pd.notna(vals[1]) else None
+                            season_ppg = float(vals[2]) if pd.notna(vals[2]) else None
+                            last3_ppg = float(vals[3]) if pd.notna(vals[3]) else None
+                            if team and season_ppg:
+                                ppg_data.append({
+                                    'rank': rank,
+                                    'team': team,
+                                    'season_ppg': season_ppg,
+                                    'last3_ppg': last3_ppg
+                                })
+                    except:
+                        continue
+                
+                # Store the mapping for use in find_ppg
+                ncaab_team_mapping = ncaab_map
+            else:
+                raise HTTPException(status_code=400, detail=f"Unknown league: {league}")
             
-            # Store the mapping for use in find_ppg
-            ncaab_team_mapping = ncaab_map
-        else:
-            raise HTTPException(status_code=400, detail=f"Unknown league: {league}")
+            return ppg_data, ncaab_map
+        
+        ppg_data, ncaab_map = await run_blocking(parse_ppg_workbook)
         
         logger.info(f"[PPG Excel] Parsed {len(ppg_data)} teams for {league}")
         
@@ -15648,6 +17653,9 @@ async def add_nba_manual_data(data: dict):
             else:
                 return '🔴'
         
+        # PPG tables are keyed by TeamRankings names (shared alias index)
+        find_team = team_table_finder('NBA', source='manual')
+        
         # Process games
         processed_games = []
         
@@ -15656,18 +17664,6 @@ async def add_nba_manual_data(data: dict):
             home_team = game.get('home', '')
             line = game.get('total')
             
-            # Get PPG data (with fuzzy matching)
-            def find_team(team_name, data_dict):
-                if not team_name:
-                    return None
-                if team_name in data_dict:
-                    return data_dict[team_name]
-                team_lower = team_name.lower()
-                for k, v in data_dict.items():
-                    if k.lower() == team_lower or team_lower in k.lower() or k.lower() in team_lower:
-                        return v
-                return None
-            
             away_ppg_rank = find_team(away_team, ppg_data['season_ranks'])
             away_ppg_value = find_team(away_team, ppg_data['season_values'])
             away_last3_rank = find_team(away_team, ppg_data['last3_ranks'])
@@ -15756,28 +17752,1449 @@ async def add_nba_manual_data(data: dict):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-# Team name aliases for matching scores
-NBA_TEAM_ALIASES = {
-    'Bucks': 'Milwaukee', 'Hornets': 'Charlotte', 'Suns': 'Phoenix', 'Wizards': 'Washington',
-    'Warriors': 'Golden State', 'Nets': 'Brooklyn', 'Magic': 'Orlando', 'Raptors': 'Toronto',
-    'Nuggets': 'Denver', 'Heat': 'Miami', 'Knicks': 'New York', 'Pelicans': 'New Orleans',
-    'Pacers': 'Indiana', 'Rockets': 'Houston', 'Hawks': 'Atlanta', 'Thunder': 'Okla City',
-    'Timberwolves': 'Minnesota', 'Bulls': 'Chicago', 'Cavaliers': 'Cleveland', 'Spurs': 'San Antonio',
-    'Mavericks': 'Dallas', 'Trail Blazers': 'Portland', 'Lakers': 'Los Angeles', 'Clippers': 'LA Clippers',
-    'Celtics': 'Boston', 'Kings': 'Sacramento', 'Jazz': 'Utah', 'Grizzlies': 'Memphis',
-    '76ers': 'Philadelphia', 'Pistons': 'Detroit'
-}
+# Team name aliases for matching scores
+NBA_TEAM_ALIASES = {
+    'Bucks': 'Milwaukee', 'Hornets': 'Charlotte', 'Suns': 'Phoenix', 'Wizards': 'Washington',
+    'Warriors': 'Golden State', 'Nets': 'Brooklyn', 'Magic': 'Orlando', 'Raptors': 'Toronto',
+    'Nuggets': 'Denver', 'Heat': 'Miami', 'Knicks': 'New York', 'Pelicans': 'New Orleans',
+    'Pacers': 'Indiana', 'Rockets': 'Houston', 'Hawks': 'Atlanta', 'Thunder': 'Okla City',
+    'Timberwolves': 'Minnesota', 'Bulls': 'Chicago', 'Cavaliers': 'Cleveland', 'Spurs': 'San Antonio',
+    'Mavericks': 'Dallas', 'Trail Blazers': 'Portland', 'Lakers': 'Los Angeles', 'Clippers': 'LA Clippers',
+    'Celtics': 'Boston', 'Kings': 'Sacramento', 'Jazz': 'Utah', 'Grizzlies': 'Memphis',
+    '76ers': 'Philadelphia', 'Pistons': 'Detroit'
+}
+
+NHL_TEAM_ALIASES = {
+    'Hurricanes': 'Carolina', 'Penguins': 'Pittsburgh', 'Devils': 'New Jersey', 'Maple Leafs': 'Toronto',
+    'Canadiens': 'Montreal', 'Panthers': 'Florida', 'Islanders': 'NY Islanders', 'Blackhawks': 'Chicago',
+    'Flyers': 'Philadelphia', 'Canucks': 'Vancouver', 'Bruins': 'Boston', 'Sabres': 'Buffalo',
+    'Red Wings': 'Detroit', 'Lightning': 'Tampa Bay', 'Senators': 'Ottawa', 'Blue Jackets': 'Columbus',
+    'Rangers': 'NY Rangers', 'Capitals': 'Washington', 'Jets': 'Winnipeg', 'Wild': 'Minnesota',
+    'Predators': 'Nashville', 'Blues': 'St. Louis', 'Stars': 'Dallas', 'Avalanche': 'Colorado',
+    'Coyotes': 'Utah', 'Mammoth': 'Utah', 'Utah Hockey Club': 'Utah', 'Golden Knights': 'Vegas', 'Kraken': 'Seattle', 'Ducks': 'Anaheim',
+    'Kings': 'Los Angeles', 'Sharks': 'San Jose', 'Flames': 'Calgary', 'Oilers': 'Edmonton'
+}
+
+# ============================================================================
+# TEAM NAME RESOLUTION INDEX
+# ============================================================================
+# Each scraper and score updater used to carry its own alias dict and scan it
+# with substring checks on every lookup. The maps below are compiled once per
+# league into exact, normalized-key and token tables; every lookup (hits and
+# misses) is cached per raw name, and misses are kept for /teams/unresolved.
+
+# scoresandodds.com names -> our NBA names
+SCORESANDODDS_TEAM_MAP = {
+    # NBA
+    'CAVALIERS': 'Cleveland', 'CAVS': 'Cleveland', 'CLEVELAND': 'Cleveland',
+    'KNICKS': 'New York', 'NEW YORK': 'New York',
+    'SPURS': 'San Antonio', 'SAN ANTONIO': 'San Antonio',
+    'THUNDER': 'Okla City', 'OKLAHOMA CITY': 'Okla City', 'OKC': 'Okla City',
+    'MAVERICKS': 'Dallas', 'DALLAS': 'Dallas', 'MAVS': 'Dallas',
+    'WARRIORS': 'Golden State', 'GOLDEN STATE': 'Golden State', 'GSW': 'Golden State',
+    'ROCKETS': 'Houston', 'HOUSTON': 'Houston',
+    'LAKERS': 'LA Lakers', 'LOS ANGELES LAKERS': 'LA Lakers', 'LAL': 'LA Lakers',
+    'TIMBERWOLVES': 'Minnesota', 'MINNESOTA': 'Minnesota', 'WOLVES': 'Minnesota',
+    'NUGGETS': 'Denver', 'DENVER': 'Denver',
+    'CELTICS': 'Boston', 'BOSTON': 'Boston',
+    '76ERS': 'Philadelphia', 'SIXERS': 'Philadelphia', 'PHILADELPHIA': 'Philadelphia',
+    'PACERS': 'Indiana', 'INDIANA': 'Indiana',
+    'NETS': 'Brooklyn', 'BROOKLYN': 'Brooklyn',
+    'MAGIC': 'Orlando', 'ORLANDO': 'Orlando',
+    'HORNETS': 'Charlotte', 'CHARLOTTE': 'Charlotte',
+    'BUCKS': 'Milwaukee', 'MILWAUKEE': 'Milwaukee',
+    'RAPTORS': 'Toronto', 'TORONTO': 'Toronto',
+    'HEAT': 'Miami', 'MIAMI': 'Miami',
+    'HAWKS': 'Atlanta', 'ATLANTA': 'Atlanta',
+    'BULLS': 'Chicago', 'CHICAGO': 'Chicago',
+    'GRIZZLIES': 'Memphis', 'MEMPHIS': 'Memphis',
+    'PISTONS': 'Detroit', 'DETROIT': 'Detroit',
+    'CLIPPERS': 'LA Clippers', 'LOS ANGELES CLIPPERS': 'LA Clippers', 'LAC': 'LA Clippers',
+    'SUNS': 'Phoenix', 'PHOENIX': 'Phoenix',
+    'KINGS': 'Sacramento', 'SACRAMENTO': 'Sacramento',
+    'BLAZERS': 'Portland', 'TRAIL BLAZERS': 'Portland', 'PORTLAND': 'Portland',
+    'JAZZ': 'Utah', 'UTAH': 'Utah',
+    'PELICANS': 'New Orleans', 'NEW ORLEANS': 'New Orleans',
+    'WIZARDS': 'Washington', 'WASHINGTON': 'Washington',
+}
+
+# CBS Sports scoreboard names -> our names (these are the stored canonical names)
+CBS_NBA_TEAM_MAP = {
+    'WIZARDS': 'Washington',
+    'BULLS': 'Chicago',
+    'KNICKS': 'New York',
+    'THUNDER': 'Okla City',
+    'BUCKS': 'Milwaukee',
+    'NUGGETS': 'Denver',
+    'WARRIORS': 'Golden State',
+    'MAVERICKS': 'Dallas',
+    'SUNS': 'Phoenix',
+    'SPURS': 'San Antonio',
+    'CAVALIERS': 'Cleveland',
+    'HEAT': 'Miami',
+    'CELTICS': 'Boston',
+    'LAKERS': 'LA Lakers',
+    'CLIPPERS': 'LA Clippers',
+    'KINGS': 'Sacramento',
+    'TRAIL BLAZERS': 'Portland',
+    'BLAZERS': 'Portland',
+    'JAZZ': 'Utah',
+    'TIMBERWOLVES': 'Minnesota',
+    'ROCKETS': 'Houston',
+    'PELICANS': 'New Orleans',
+    'GRIZZLIES': 'Memphis',
+    'HAWKS': 'Atlanta',
+    'MAGIC': 'Orlando',
+    'PACERS': 'Indiana',
+    '76ERS': 'Philadelphia',
+    'NETS': 'Brooklyn',
+    'RAPTORS': 'Toronto',
+    'HORNETS': 'Charlotte',
+    'PISTONS': 'Detroit',
+}
+
+CBS_NHL_TEAM_MAP = {
+    'CAPITALS': 'Washington',
+    'BRUINS': 'Boston',
+    'RANGERS': 'NY Rangers',
+    'ISLANDERS': 'NY Islanders',
+    'FLYERS': 'Philadelphia',
+    'PENGUINS': 'Pittsburgh',
+    'DEVILS': 'New Jersey',
+    'BLUE JACKETS': 'Columbus',
+    'HURRICANES': 'Carolina',
+    'PANTHERS': 'Florida',
+    'LIGHTNING': 'Tampa Bay',
+    'MAPLE LEAFS': 'Toronto',
+    'CANADIENS': 'Montreal',
+    'SENATORS': 'Ottawa',
+    'SABRES': 'Buffalo',
+    'RED WINGS': 'Detroit',
+    'BLACKHAWKS': 'Chicago',
+    'BLUES': 'St. Louis',
+    'PREDATORS': 'Nashville',
+    'STARS': 'Dallas',
+    'WILD': 'Minnesota',
+    'JETS': 'Winnipeg',
+    'AVALANCHE': 'Colorado',
+    'UTAH HC': 'Utah',
+    'UTAH': 'Utah',
+    'MAMMOTH': 'Utah',
+    'GOLDEN KNIGHTS': 'Vegas',
+    'KRAKEN': 'Seattle',
+    'SHARKS': 'San Jose',
+    'KINGS': 'LA Kings',
+    'DUCKS': 'Anaheim',
+    'OILERS': 'Edmonton',
+    'FLAMES': 'Calgary',
+    'CANUCKS': 'Vancouver',
+}
+
+# NHL API placeName/commonName -> our NHL names
+NHL_API_TEAM_MAP = {
+    'Washington': 'Washington', 'Boston': 'Boston', 'New York': 'NY Rangers',
+    'Islanders': 'NY Islanders', 'Philadelphia': 'Philadelphia', 'Pittsburgh': 'Pittsburgh',
+    'New Jersey': 'New Jersey', 'Columbus': 'Columbus', 'Carolina': 'Carolina',
+    'Florida': 'Florida', 'Tampa Bay': 'Tampa Bay', 'Toronto': 'Toronto',
+    'Montréal': 'Montreal', 'Montreal': 'Montreal', 'Ottawa': 'Ottawa', 'Buffalo': 'Buffalo',
+    'Detroit': 'Detroit', 'Chicago': 'Chicago', 'St. Louis': 'St. Louis', 'St Louis': 'St. Louis',
+    'Nashville': 'Nashville', 'Dallas': 'Dallas', 'Minnesota': 'Minnesota',
+    'Winnipeg': 'Winnipeg', 'Colorado': 'Colorado', 'Utah': 'Utah',
+    'Vegas': 'Vegas', 'Seattle': 'Seattle', 'San Jose': 'San Jose',
+    'Los Angeles': 'LA Kings', 'Anaheim': 'Anaheim', 'Edmonton': 'Edmonton',
+    'Calgary': 'Calgary', 'Vancouver': 'Vancouver',
+    # Full names
+    'Capitals': 'Washington', 'Bruins': 'Boston', 'Rangers': 'NY Rangers',
+    'Flyers': 'Philadelphia', 'Penguins': 'Pittsburgh', 'Devils': 'New Jersey',
+    'Blue Jackets': 'Columbus', 'Hurricanes': 'Carolina', 'Panthers': 'Florida',
+    'Lightning': 'Tampa Bay', 'Maple Leafs': 'Toronto', 'Canadiens': 'Montreal',
+    'Senators': 'Ottawa', 'Sabres': 'Buffalo', 'Red Wings': 'Detroit',
+    'Blackhawks': 'Chicago', 'Blues': 'St. Louis', 'Predators': 'Nashville',
+    'Stars': 'Dallas', 'Wild': 'Minnesota', 'Jets': 'Winnipeg',
+    'Avalanche': 'Colorado', 'Golden Knights': 'Vegas', 'Kraken': 'Seattle',
+    'Sharks': 'San Jose', 'Kings': 'LA Kings', 'Ducks': 'Anaheim',
+    'Oilers': 'Edmonton', 'Flames': 'Calgary', 'Canucks': 'Vancouver',
+    'Hockey Club': 'Utah'
+}
+
+# Plays888 / open-bet NHL spellings (nicknames and short forms) by team
+NHL_TEAM_NICKNAMES = {
+    'NY ISLANDERS': ['ISLANDERS', 'NY ISLANDERS', 'NEW YORK ISLANDERS'],
+    'NY RANGERS': ['RANGERS', 'NY RANGERS', 'NEW YORK RANGERS'],
+    'COLUMBUS': ['BLUE JACKETS', 'JACKETS', 'COLUMBUS'],
+    'TORONTO': ['MAPLE LEAFS', 'LEAFS', 'TORONTO'],
+    'DETROIT': ['RED WINGS', 'WINGS', 'DETROIT'],
+    'PITTSBURGH': ['PENGUINS', 'PITTSBURGH'],
+    'CHICAGO': ['BLACKHAWKS', 'HAWKS', 'CHICAGO'],
+    'PHILADELPHIA': ['FLYERS', 'PHILADELPHIA'],
+    'SEATTLE': ['KRAKEN', 'SEATTLE'],
+    'MONTREAL': ['CANADIENS', 'HABS', 'MONTREAL'],
+    'TAMPA BAY': ['LIGHTNING', 'BOLTS', 'TAMPA BAY', 'TAMPA'],
+    'BOSTON': ['BRUINS', 'BOSTON'],
+    'BUFFALO': ['SABRES', 'BUFFALO'],
+    'CAROLINA': ['HURRICANES', 'CANES', 'CAROLINA'],
+    'OTTAWA': ['SENATORS', 'SENS', 'OTTAWA'],
+    'NEW JERSEY': ['DEVILS', 'NEW JERSEY'],
+    'DALLAS': ['STARS', 'DALLAS'],
+    'NASHVILLE': ['PREDATORS', 'PREDS', 'NASHVILLE'],
+    'ST. LOUIS': ['BLUES', 'ST. LOUIS', 'ST LOUIS'],
+    'ANAHEIM': ['DUCKS', 'ANAHEIM'],
+    'LOS ANGELES': ['KINGS', 'LOS ANGELES', 'LA KINGS'],
+    'COLORADO': ['AVALANCHE', 'AVS', 'COLORADO'],
+    'VEGAS': ['GOLDEN KNIGHTS', 'KNIGHTS', 'VEGAS'],
+    'EDMONTON': ['OILERS', 'EDMONTON'],
+    'CALGARY': ['FLAMES', 'CALGARY'],
+    'SAN JOSE': ['SHARKS', 'SAN JOSE'],
+    'VANCOUVER': ['CANUCKS', 'VANCOUVER'],
+    'WASHINGTON': ['CAPITALS', 'CAPS', 'WASHINGTON'],
+    'FLORIDA': ['PANTHERS', 'FLORIDA'],
+    'MINNESOTA': ['WILD', 'MINNESOTA'],
+    'WINNIPEG': ['JETS', 'WINNIPEG'],
+    'UTAH': ['MAMMOTH', 'UTAH']
+}
+
+# Covers.com consensus is keyed by team abbreviation
+COVERS_NBA_ABBREVS = {
+    'CLEVELAND': 'CLE', 'CAVALIERS': 'CLE',
+    'INDIANA': 'IND', 'PACERS': 'IND',
+    'MEMPHIS': 'MEM', 'GRIZZLIES': 'MEM',
+    'SAN ANTONIO': 'SA', 'SAS': 'SA', 'SPURS': 'SA',
+    'LA LAKERS': 'LAL', 'LOS ANGELES LAKERS': 'LAL', 'LAKERS': 'LAL',
+    'NEW ORLEANS': 'NO', 'NOP': 'NO', 'PELICANS': 'NO',
+    'DALLAS': 'DAL', 'MAVERICKS': 'DAL',
+    'SACRAMENTO': 'SAC', 'KINGS': 'SAC',
+    'ORLANDO': 'ORL', 'MAGIC': 'ORL',
+    'WASHINGTON': 'WAS', 'WIZARDS': 'WAS',
+    'MIAMI': 'MIA', 'HEAT': 'MIA',
+    'MINNESOTA': 'MIN', 'TIMBERWOLVES': 'MIN',
+    'BOSTON': 'BOS', 'CELTICS': 'BOS',
+    'DENVER': 'DEN', 'NUGGETS': 'DEN',
+    'PHOENIX': 'PHO', 'PHX': 'PHO', 'SUNS': 'PHO',
+    'LA CLIPPERS': 'LAC', 'LOS ANGELES CLIPPERS': 'LAC', 'CLIPPERS': 'LAC',
+    'GOLDEN STATE': 'GS', 'GSW': 'GS', 'WARRIORS': 'GS',
+    'BROOKLYN': 'BKN', 'BK': 'BKN', 'NETS': 'BKN',
+    'NEW YORK': 'NY', 'NYK': 'NY', 'KNICKS': 'NY',
+    'PHILADELPHIA': 'PHI', '76ERS': 'PHI', 'SIXERS': 'PHI',
+    'CHICAGO': 'CHI', 'BULLS': 'CHI',
+    'DETROIT': 'DET', 'PISTONS': 'DET',
+    'ATLANTA': 'ATL', 'HAWKS': 'ATL',
+    'CHARLOTTE': 'CHA', 'HORNETS': 'CHA',
+    'TORONTO': 'TOR', 'RAPTORS': 'TOR',
+    'MILWAUKEE': 'MIL', 'BUCKS': 'MIL',
+    'OKLAHOMA CITY': 'OKC', 'THUNDER': 'OKC',
+    'PORTLAND': 'POR', 'TRAIL BLAZERS': 'POR', 'BLAZERS': 'POR',
+    'UTAH': 'UTA', 'JAZZ': 'UTA',
+    'HOUSTON': 'HOU', 'ROCKETS': 'HOU',
+}
+
+COVERS_NHL_ABBREVS = {
+    'COLORADO': 'COL', 'AVALANCHE': 'COL',
+    'TAMPA BAY': 'TB', 'LIGHTNING': 'TB',
+    'FLORIDA': 'FLA', 'PANTHERS': 'FLA',
+    'TORONTO': 'TOR', 'MAPLE LEAFS': 'TOR',
+    'NEW JERSEY': 'NJ', 'DEVILS': 'NJ',
+    'NY ISLANDERS': 'NYI', 'ISLANDERS': 'NYI',
+    'WASHINGTON': 'WAS', 'CAPITALS': 'WAS',
+    'DALLAS': 'DAL', 'STARS': 'DAL',
+    'CALGARY': 'CGY', 'FLAMES': 'CGY',
+    'MONTREAL': 'MTL', 'CANADIENS': 'MTL',
+    'ST. LOUIS': 'STL', 'BLUES': 'STL',
+    'UTAH': 'UTA',
+    'LOS ANGELES': 'LA', 'KINGS': 'LA',
+    'BOSTON': 'BOS', 'BRUINS': 'BOS',
+    'DETROIT': 'DET', 'RED WINGS': 'DET',
+    'CHICAGO': 'CHI', 'BLACKHAWKS': 'CHI',
+    'PITTSBURGH': 'PIT', 'PENGUINS': 'PIT',
+    'PHILADELPHIA': 'PHI', 'FLYERS': 'PHI',
+    'NY RANGERS': 'NYR', 'RANGERS': 'NYR',
+    'CAROLINA': 'CAR', 'HURRICANES': 'CAR',
+    'COLUMBUS': 'CBJ', 'BLUE JACKETS': 'CBJ',
+    'OTTAWA': 'OTT', 'SENATORS': 'OTT',
+    'BUFFALO': 'BUF', 'SABRES': 'BUF',
+    'MINNESOTA': 'MIN', 'WILD': 'MIN',
+    'WINNIPEG': 'WPG', 'JETS': 'WPG',
+    'EDMONTON': 'EDM', 'OILERS': 'EDM',
+    'VANCOUVER': 'VAN', 'CANUCKS': 'VAN',
+    'SEATTLE': 'SEA', 'KRAKEN': 'SEA',
+    'VEGAS': 'VGK', 'GOLDEN KNIGHTS': 'VGK',
+    'ARIZONA': 'ARI', 'COYOTES': 'ARI',
+    'SAN JOSE': 'SJ', 'SHARKS': 'SJ',
+    'ANAHEIM': 'ANA', 'DUCKS': 'ANA',
+    'NASHVILLE': 'NSH', 'PREDATORS': 'NSH',
+}
+
+# Covers.com O/U consensus rows use their own team codes (CAL, VEG, AMCC...)
+COVERS_OU_NCAAB_ABBREVS = {
+    'LE MOYNE': 'LMC', 'LEMOYNE': 'LMC',
+    'FDU': 'FDU', 'FAIRLEIGH DICKINSON': 'FDU',
+    'ALCORN ST': 'ALCN', 'ALCORN ST.': 'ALCN', 'ALCORN STATE': 'ALCN',
+    'BETHUNE-COOK': 'COOK', 'BETHUNE-COOK.': 'COOK', 'BETHUNE-COOKMAN': 'COOK',
+    'ARIZONA': 'ARIZ',
+    'BYU': 'BYU', 'BRIGHAM YOUNG': 'BYU',
+    'JACKSON ST': 'JKST', 'JACKSON ST.': 'JKST', 'JACKSON STATE': 'JKST',
+    'FLORIDA A&M': 'FAMU', 'FLORIDA AM': 'FAMU',
+    'MORGAN ST': 'MORG', 'MORGAN ST.': 'MORG', 'MORGAN STATE': 'MORG',
+    'NORFOLK ST': 'NORF', 'NORFOLK ST.': 'NORF', 'NORFOLK STATE': 'NORF',
+    'UTRGV': 'UTRGV', 'UT-RIO GRANDE VALLEY': 'UTRGV', 'UT RIO GRANDE VALLEY': 'UTRGV',
+    'TX A&M-CC': 'AMCC', 'TEXAS A&M-CC': 'AMCC', 'A&M-CORPUS CHRISTI': 'AMCC',
+    'LOUISVILLE': 'LOU',
+    'DUKE': 'DUKE',
+    'CCSU': 'CCSU', 'CENTRAL CONN': 'CCSU', 'CENTRAL CONNECTICUT': 'CCSU',
+    'STONEHILL': 'STONE',
+    'PENN ST': 'PSU', 'PENN ST.': 'PSU', 'PENN STATE': 'PSU',
+    'OHIO ST': 'OSU', 'OHIO ST.': 'OSU', 'OHIO STATE': 'OSU',
+    'ABILENE CHR': 'AC', 'ABILENE CHR.': 'AC', 'ABILENE CHRISTIAN': 'AC',
+    'TARLETON ST': 'TST', 'TARLETON ST.': 'TST', 'TARLETON STATE': 'TST',
+    'DELAWARE ST': 'DSU', 'DELAWARE ST.': 'DSU', 'DELAWARE STATE': 'DSU',
+    'SC STATE': 'SCST', 'S.C. STATE': 'SCST', 'SOUTH CAROLINA STATE': 'SCST',
+}
+
+COVERS_OU_NHL_ABBREVS = {
+    'ANAHEIM': 'ANA', 'DUCKS': 'ANA',
+    'ARIZONA': 'ARI', 'COYOTES': 'ARI',
+    'BOSTON': 'BOS', 'BRUINS': 'BOS',
+    'BUFFALO': 'BUF', 'SABRES': 'BUF',
+    'CALGARY': 'CAL', 'FLAMES': 'CAL', 'CGY': 'CAL',
+    'CAROLINA': 'CAR', 'HURRICANES': 'CAR',
+    'CHICAGO': 'CHI', 'BLACKHAWKS': 'CHI',
+    'COLORADO': 'COL', 'AVALANCHE': 'COL',
+    'COLUMBUS': 'CBJ', 'BLUE JACKETS': 'CBJ',
+    'DALLAS': 'DAL', 'STARS': 'DAL',
+    'DETROIT': 'DET', 'RED WINGS': 'DET',
+    'EDMONTON': 'EDM', 'OILERS': 'EDM',
+    'FLORIDA': 'FLA', 'PANTHERS': 'FLA',
+    'LOS ANGELES': 'LA', 'LA KINGS': 'LA', 'KINGS': 'LA', 'LAK': 'LA',
+    'MINNESOTA': 'MIN', 'WILD': 'MIN',
+    'MONTREAL': 'MTL', 'CANADIENS': 'MTL',
+    'NASHVILLE': 'NSH', 'PREDATORS': 'NSH',
+    'NEW JERSEY': 'NJ', 'DEVILS': 'NJ', 'NJD': 'NJ',
+    'NY ISLANDERS': 'NYI', 'NEW YORK ISLANDERS': 'NYI', 'ISLANDERS': 'NYI',
+    'NY RANGERS': 'NYR', 'NEW YORK RANGERS': 'NYR', 'RANGERS': 'NYR',
+    'OTTAWA': 'OTT', 'SENATORS': 'OTT',
+    'PHILADELPHIA': 'PHI', 'FLYERS': 'PHI',
+    'PITTSBURGH': 'PIT', 'PENGUINS': 'PIT',
+    'SAN JOSE': 'SJ', 'SHARKS': 'SJ', 'SJS': 'SJ',
+    'SEATTLE': 'SEA', 'KRAKEN': 'SEA',
+    'ST. LOUIS': 'STL', 'ST LOUIS': 'STL', 'BLUES': 'STL',
+    'TAMPA BAY': 'TB', 'LIGHTNING': 'TB', 'TBL': 'TB',
+    'TORONTO': 'TOR', 'MAPLE LEAFS': 'TOR',
+    'UTAH': 'UTA', 'UTAH HOCKEY CLUB': 'UTA',
+    'VANCOUVER': 'VAN', 'CANUCKS': 'VAN',
+    'VEGAS': 'VEG', 'GOLDEN KNIGHTS': 'VEG', 'VGK': 'VEG',
+    'WASHINGTON': 'WAS', 'CAPITALS': 'WAS', 'WSH': 'WAS',
+    'WINNIPEG': 'WPG', 'JETS': 'WPG',
+}
+
+COVERS_OU_ABBREVS = {'NCAAB': COVERS_OU_NCAAB_ABBREVS, 'NHL': COVERS_OU_NHL_ABBREVS}
+
+# NCAAB team name normalization mapping (Plays888 -> TeamRankings)
+NCAAB_TEAM_NAME_MAP = {
+    # State abbreviations
+    'Miss Valley St.': 'Mississippi Valley State', 'Miss. Valley St.': 'Mississippi Valley State',
+    'Southern U.': 'Southern', 'Southern Univ.': 'Southern',
+    'Illinois St.': 'Illinois State', 'Murray St.': 'Murray State',
+    'La. Tech': 'Louisiana Tech', 'Utah St.': 'Utah State',
+    'Wash. St.': 'Washington State', 'Oregon St.': 'Oregon State',
+    'Colo. St.': 'Colorado State', 'San Diego St.': 'San Diego State',
+    'San Fran.': 'San Francisco', 'Fla. St.': 'Florida State',
+    'Florida St.': 'Florida State', 'Michigan St.': 'Michigan State',
+    'Ohio St.': 'Ohio State', 'Penn St.': 'Penn State',
+    'Iowa St.': 'Iowa State', 'Kansas St.': 'Kansas State',
+    'Boise St.': 'Boise State', 'Fresno St.': 'Fresno State',
+    'Arizona St.': 'Arizona State', 'Ball St.': 'Ball State',
+    'Kent St.': 'Kent State', 'N.C. State': 'NC State',
+    'NC State': 'NC State', 'Appalachian St.': 'Appalachian State',
+    'Georgia St.': 'Georgia State', 'Wichita St.': 'Wichita State',
+    'Wright St.': 'Wright State', 'Youngstown St.': 'Youngstown State',
+    'Portland St.': 'Portland State', 'Sacramento St.': 'Sacramento State',
+    'San Jose St.': 'San Jose State', 'Idaho St.': 'Idaho State',
+    'Weber St.': 'Weber State', 'Montana St.': 'Montana State',
+    'N. Dakota St.': 'North Dakota State', 'S. Dakota St.': 'South Dakota State',
+    'Morehead St.': 'Morehead State', 'E. Kentucky': 'Eastern Kentucky',
+    'W. Kentucky': 'Western Kentucky', 'E. Michigan': 'Eastern Michigan',
+    'W. Michigan': 'Western Michigan', 'N. Illinois': 'Northern Illinois',
+    'S. Illinois': 'Southern Illinois', 'E. Illinois': 'Eastern Illinois',
+    'W. Illinois': 'Western Illinois', 'SE Missouri St.': 'Southeast Missouri State',
+    'SE Missouri': 'Southeast Missouri State', 'SIU Edwardsville': 'SIU-Edwardsville',
+    'UT Martin': 'Tennessee-Martin', 'Ark.-Pine Bluff': 'Arkansas-Pine Bluff',
+    'UAPB': 'Arkansas-Pine Bluff', 'Alcorn St.': 'Alcorn State',
+    'Jackson St.': 'Jackson State', 'Grambling St.': 'Grambling',
+    'Grambling': 'Grambling', 'Prairie View': 'Prairie View A&M',
+    'Texas Southern': 'Texas Southern', 'Alabama St.': 'Alabama State',
+    'Alabama A&M': 'Alabama A&M', 'Bethune-Cookman': 'Bethune-Cookman',
+    'Fla. A&M': 'Florida A&M', 'FAMU': 'Florida A&M',
+    'N.C. A&T': 'NC A&T', 'NC A&T': 'NC A&T',
+    'Norfolk St.': 'Norfolk State', 'Morgan St.': 'Morgan State',
+    'Delaware St.': 'Delaware State', 'Coppin St.': 'Coppin State',
+    'S.C. State': 'South Carolina State', 'SC State': 'South Carolina State',
+    'Howard': 'Howard', 'Hampton': 'Hampton',
+    # Directional schools
+    'N. Colorado': 'Northern Colorado', 'N. Arizona': 'Northern Arizona',
+    'N. Iowa': 'Northern Iowa', 'S. Alabama': 'South Alabama',
+    'S. Carolina': 'South Carolina', 'N. Carolina': 'North Carolina',
+    'W. Virginia': 'West Virginia', 'E. Carolina': 'East Carolina',
+    'E. Washington': 'Eastern Washington', 'C. Michigan': 'Central Michigan',
+    'C. Arkansas': 'Central Arkansas', 'C. Connecticut': 'Central Connecticut',
+    'Cent. Arkansas': 'Central Arkansas', 'Cent. Michigan': 'Central Michigan',
+    # NEW MAPPINGS - Missing teams from logs
+    'N. Kentucky': 'Northern Kentucky', 'N Kentucky': 'Northern Kentucky',
+    'Clev. St.': 'Cleveland State', 'Cleveland St.': 'Cleveland State',
+    'Ga. Southern': 'Georgia Southern', 'Ga Southern': 'Georgia Southern',
+    'UL-Monroe': 'Louisiana-Monroe', 'UL Monroe': 'Louisiana-Monroe', 'LA-Monroe': 'Louisiana-Monroe',
+    'UL-Lafayette': 'Louisiana', 'UL Lafayette': 'Louisiana', 'Louisiana-Lafayette': 'Louisiana',
+    'IUI': 'IUPUI', 'Ind.-Purdue': 'IUPUI',
+    'Akron': 'Akron', 'Princeton': 'Princeton', 'Cornell': 'Cornell',
+    'Siena': 'Siena', 'Niagara': 'Niagara', 'Iona': 'Iona',
+    'Green Bay': 'Green Bay', 'Milwaukee': 'Milwaukee',
+    'Dartmouth': 'Dartmouth', 'Yale': 'Yale', 'Harvard': 'Harvard',
+    'Brown': 'Brown', 'Penn': 'Penn', 'Columbia': 'Columbia',
+    'Fairfield': 'Fairfield', 'Marist': 'Marist', 'Canisius': 'Canisius',
+    'Detroit': 'Detroit Mercy', 'Detroit Mercy': 'Detroit Mercy',
+    'Mt St Mary\'s': "Mount St. Mary's", 'Mt. St. Mary\'s': "Mount St. Mary's",
+    "Mount St. Mary's": "Mount St. Mary's", 'Mt St Marys': "Mount St. Mary's",
+    'Saint Peter\'s': "Saint Peter's", "St. Peter's": "Saint Peter's",
+    'Grand Canyon': 'Grand Canyon', 'GCU': 'Grand Canyon',
+    'Loyola Chi.': 'Loyola Chicago', 'Loyola-Chi.': 'Loyola Chicago',
+    'UNLV': 'UNLV', 'Nevada': 'Nevada',
+    'Charlotte': 'Charlotte', 'Rice': 'Rice',
+    # Texas schools
+    'Texas A&M': 'Texas A&M', 'UTEP': 'UTEP', 'UTSA': 'UTSA',
+    'UT Arlington': 'Texas-Arlington', 'UTA': 'Texas-Arlington',
+    'UT Rio Grande': 'Texas-Rio Grande Valley', 'UTRGV': 'Texas-Rio Grande Valley',
+    'Texas St.': 'Texas State', 'Sam Houston': 'Sam Houston State',
+    'Sam Houston St.': 'Sam Houston State', 'Stephen F. Austin': 'Stephen F. Austin',
+    'SFA': 'Stephen F. Austin', 'Abilene Christian': 'Abilene Christian',
+    'Tarleton St.': 'Tarleton State', 'Lamar': 'Lamar',
+    # California schools
+    'USC': 'USC', 'UCLA': 'UCLA', 'Cal': 'California',
+    'Cal St. Fullerton': 'Cal State Fullerton', 'CSUF': 'Cal State Fullerton',
+    'Cal St. Northridge': 'Cal State Northridge', 'CSUN': 'Cal State Northridge',
+    'Long Beach St.': 'Long Beach State', 'Cal Poly': 'Cal Poly',
+    'UC Davis': 'UC Davis', 'UC Irvine': 'UC Irvine',
+    'UC Riverside': 'UC Riverside', 'UC San Diego': 'UC San Diego',
+    'UC Santa Barbara': 'UC Santa Barbara', 'UCSB': 'UC Santa Barbara',
+    'Pepperdine': 'Pepperdine', 'LMU': 'Loyola Marymount',
+    'Loyola Marymount': 'Loyola Marymount', 'Santa Clara': 'Santa Clara',
+    'San Diego': 'San Diego', 'Pacific': 'Pacific',
+    'St. Mary\'s': 'Saint Mary\'s', "Saint Mary's": "Saint Mary's",
+    'Gonzaga': 'Gonzaga', 'Portland': 'Portland',
+    # Other common variations
+    'UConn': 'Connecticut', 'Connecticut': 'Connecticut',
+    'UMass': 'Massachusetts', 'Massachusetts': 'Massachusetts',
+    'Miami': 'Miami', 'Miami (FL)': 'Miami', 'Miami FL': 'Miami',
+    'Miami (OH)': 'Miami (OH)', 'Miami OH': 'Miami (OH)',
+    'St. John\'s': "St. John's", "St. John's": "St. John's",
+    'St. Joseph\'s': "Saint Joseph's", "Saint Joseph's": "Saint Joseph's",
+    'St. Peter\'s': "Saint Peter's", 'St. Bonaventure': 'St. Bonaventure',
+    'Loyola-Md.': 'Loyola (MD)', 'Loyola MD': 'Loyola (MD)',
+    'Loyola Chicago': 'Loyola Chicago', 'Loyola-Chicago': 'Loyola Chicago',
+    'VCU': 'VCU', 'SMU': 'SMU', 'TCU': 'TCU', 'BYU': 'BYU',
+    'LSU': 'LSU', 'Ole Miss': 'Ole Miss', 'Miss. St.': 'Mississippi State',
+    'Mississippi St.': 'Mississippi State', 'Miss St.': 'Mississippi State',
+    'Ark. St.': 'Arkansas State', 'Arkansas St.': 'Arkansas State',
+    'Tulsa': 'Tulsa', 'Tulane': 'Tulane', 'Memphis': 'Memphis',
+    'Cincinnati': 'Cincinnati', 'UCF': 'UCF', 'USF': 'South Florida',
+    'South Florida': 'South Florida', 'Temple': 'Temple',
+    'La Salle': 'La Salle', 'Duquesne': 'Duquesne',
+    'Dayton': 'Dayton', 'Xavier': 'Xavier', 'Butler': 'Butler',
+    'Creighton': 'Creighton', 'Marquette': 'Marquette',
+    'DePaul': 'DePaul', 'Providence': 'Providence',
+    'Villanova': 'Villanova', 'Seton Hall': 'Seton Hall',
+    'Georgetown': 'Georgetown', 'Syracuse': 'Syracuse',
+    'Pittsburgh': 'Pittsburgh', 'Pitt': 'Pittsburgh',
+    'Notre Dame': 'Notre Dame', 'Boston College': 'Boston College',
+    'Wake Forest': 'Wake Forest', 'Duke': 'Duke',
+    'Virginia': 'Virginia', 'Virginia Tech': 'Virginia Tech',
+    'Louisville': 'Louisville', 'Clemson': 'Clemson',
+    'Georgia Tech': 'Georgia Tech', 'Ga. Tech': 'Georgia Tech',
+    'Northwestern': 'Northwestern', 'Wisconsin': 'Wisconsin',
+    'Minnesota': 'Minnesota', 'Nebraska': 'Nebraska',
+    'Purdue': 'Purdue', 'Indiana': 'Indiana', 'Illinois': 'Illinois',
+    'Maryland': 'Maryland', 'Rutgers': 'Rutgers',
+    'N\'western': 'Northwestern', 'N. Western': 'Northwestern',
+    'Seattle': 'Seattle', 'Seattle U': 'Seattle',
+    'Army': 'Army', 'Navy': 'Navy', 'Air Force': 'Air Force',
+    'Lehigh': 'Lehigh', 'Bucknell': 'Bucknell', 'Colgate': 'Colgate',
+    'Lafayette': 'Lafayette', 'American': 'American',
+    'Boston U': 'Boston University', 'Boston U.': 'Boston University',
+    'Holy Cross': 'Holy Cross', 'Fordham': 'Fordham',
+    'Richmond': 'Richmond', 'Davidson': 'Davidson',
+    'George Mason': 'George Mason', 'GMU': 'George Mason',
+    'George Washington': 'George Washington', 'GW': 'George Washington',
+    'St. Louis': 'Saint Louis', 'Saint Louis': 'Saint Louis',
+    'UNC': 'North Carolina', 'North Carolina': 'North Carolina',
+    'Stanford': 'Stanford', 'Oregon': 'Oregon', 'Washington': 'Washington',
+    'Colorado': 'Colorado', 'Utah': 'Utah', 'Arizona': 'Arizona',
+    'USC': 'USC', 'Cal': 'California', 'California': 'California',
+    # Queens and other newer teams
+    'Queens': 'Queens (NC)', 'Queens NC': 'Queens (NC)',
+    'Bellarmine': 'Bellarmine', 'Lindenwood': 'Lindenwood',
+    'Southern Ind.': 'Southern Indiana', 'Southern Indiana': 'Southern Indiana',
+    'Stonehill': 'Stonehill', 'Le Moyne': 'Le Moyne',
+    'Mercyhurst': 'Mercyhurst',
+    # More state schools
+    'Texas': 'Texas', 'Oklahoma': 'Oklahoma', 'Oklahoma St.': 'Oklahoma State',
+    'Baylor': 'Baylor', 'Kansas': 'Kansas', 'Houston': 'Houston',
+    'Auburn': 'Auburn', 'Alabama': 'Alabama', 'Tennessee': 'Tennessee',
+    'Kentucky': 'Kentucky', 'Florida': 'Florida', 'Georgia': 'Georgia',
+    'Vanderbilt': 'Vanderbilt', 'Arkansas': 'Arkansas',
+    'Missouri': 'Missouri', 'Texas Tech': 'Texas Tech',
+    'Iowa': 'Iowa', 'Michigan': 'Michigan',
+}
+
+# Words a partial NCAAB match may leave over ("Duke Blue Devils" -> Duke). Any
+# other leftover word can name a different school ("Kansas State", "North
+# Carolina A&T", "Nebraska Omaha", "Texas A&M-CC"), so those names only resolve
+# through an exact alias.
+NCAAB_SUFFIX_TOKENS = {
+    'MEN', 'MENS', 'BASKETBALL',
+    'AGGIES', 'AZTECS', 'BADGERS', 'BEARCATS', 'BEARS', 'BEAVERS', 'BILLIKENS', 'BLUE', 'BLUEJAYS',
+    'BOILERMAKERS', 'BOBCATS', 'BRONCOS', 'BRUINS', 'BUCKEYES', 'BUFFALOES', 'BULLDOGS', 'BULLS',
+    'CAVALIERS', 'COMMODORES', 'COUGARS', 'COWBOYS', 'CRIMSON', 'CYCLONES', 'DEVILS', 'DUCKS',
+    'EAGLES', 'FIGHTING', 'FLYERS', 'FRIARS', 'GAELS', 'GAMECOCKS', 'GATORS', 'GOLDEN', 'GOPHERS',
+    'GRIZZLIES', 'HAWKEYES', 'HEELS', 'HOKIES', 'HOOSIERS', 'HORNED', 'HOYAS', 'HURRICANES', 'HUSKIES',
+    'ILLINI', 'IRISH', 'JAYHAWKS', 'KNIGHTS', 'LIONS', 'LOBOS', 'LONGHORNS', 'MOUNTAINEERS', 'MUSKETEERS',
+    'MUSTANGS', 'OWLS', 'PANTHERS', 'PIRATES', 'RAIDERS', 'RAMS', 'RAZORBACKS', 'REBELS', 'RED',
+    'SEMINOLES', 'SHOCKERS', 'SOONERS', 'SPARTANS', 'SPIDERS', 'TAR', 'TERRAPINS', 'TIDE', 'TIGERS',
+    'TROJANS', 'UTES', 'VOLUNTEERS', 'WILDCATS', 'WOLFPACK', 'WOLVERINES', 'ZAGS',
+}
+TEAM_NAME_MISSES_LIMIT = 500  # unresolved names kept per league (least recently seen dropped)
+TEAM_ALIAS_SYNC_OVERLAP_SECONDS = 300
+
+
+def team_name_key(name: str) -> str:
+    """Normalized lookup key: upper case, punctuation stripped, ST./ST -> STATE (suffix) or SAINT (prefix)"""
+    import re
+    if not name:
+        return ''
+    key = str(name).upper().replace('A&M', 'AM').replace('&', ' AND ').replace("'", '')
+    key = re.sub(r'[^A-Z0-9]+', ' ', key)
+    words = [w for w in key.split() if w not in ('UNIVERSITY', 'UNIV', 'THE')]
+    if words and words[0] == 'ST':
+        words[0] = 'SAINT'
+    if len(words) > 1 and words[-1] == 'ST':
+        words[-1] = 'STATE'
+    return ' '.join(words)
+
+
+class TeamNameIndex:
+    """
+    Precompiled alias index for one league.
+
+    resolve() tries, in order: exact alias, normalized key, then the longest
+    unambiguous word n-gram shared with a known alias. NBA/NHL are closed sets so
+    any n-gram may match; NCAAB only accepts a known name at the start followed
+    by mascot words (NCAAB_SUFFIX_TOKENS), so "North Carolina A&T" does not
+    become "North Carolina".
+    """
+
+    def __init__(self, league: str, closed: bool = True, parent: 'TeamNameIndex' = None):
+        self.league = league
+        self.closed = closed
+        self.parent = parent
+        self.exact = {}
+        self.keys = {}
+        self.partial = {}
+        self.by_canonical = {}
+        self.abbreviations = {}
+        self.cache = {}
+        self.misses = {}
+
+    def add(self, alias: str, canonical: str):
+        """Register alias -> canonical (canonical is also an alias of itself)"""
+        if not alias or not canonical:
+            return
+        for name in (canonical, alias):
+            self.exact[str(name).strip().upper()] = canonical
+            key = team_name_key(name)
+            if not key:
+                continue
+            self.keys[key] = canonical
+            self.by_canonical.setdefault(canonical, set()).add(name)
+            words = key.split()
+            for n in range(1, len(words) + 1):
+                for i in range(len(words) - n + 1):
+                    self.partial.setdefault(' '.join(words[i:i + n]), set()).add(canonical)
+        self.cache.clear()
+
+    def add_aliases(self, mapping: Dict[str, str]):
+        for alias, canonical in mapping.items():
+            self.add(alias, canonical)
+
+    def set_abbreviations(self, source: str, mapping: Dict[str, str]):
+        """
+        Register a source's name -> abbreviation table (e.g. Covers keys). The
+        abbreviation and every name listed for it (PHX, NYK...) become aliases of
+        the team that any of those names resolves to.
+        """
+        table = self.abbreviations.setdefault(source, {})
+        canonical_by_abbrev = {}
+        for name, abbrev in mapping.items():
+            canonical = self._lookup(name)
+            if canonical:
+                canonical_by_abbrev.setdefault(abbrev, canonical)
+                if canonical not in table:
+                    table[canonical] = abbrev
+        for name, abbrev in mapping.items():
+            canonical = canonical_by_abbrev.get(abbrev)
+            if canonical:
+                self.exact.setdefault(abbrev.upper(), canonical)
+                self.exact.setdefault(name.upper(), canonical)
+        self.cache.clear()
+
+    def _lookup(self, raw: str) -> Optional[str]:
+        upper = raw.upper()
+        if upper in self.exact:
+            return self.exact[upper]
+        key = team_name_key(raw)
+        if key in self.keys:
+            return self.keys[key]
+        words = key.split()
+        if not self.closed:
+            for n in range(len(words) - 1, 0, -1):
+                rest = words[n:]
+                if all(w in NCAAB_SUFFIX_TOKENS for w in rest) and ' '.join(rest) not in self.keys:
+                    canonical = self.keys.get(' '.join(words[:n]))
+                    if canonical:
+                        return canonical
+            return None
+        for n in range(len(words), 0, -1):
+            candidates = set()
+            for i in range(len(words) - n + 1):
+                candidates |= self.partial.get(' '.join(words[i:i + n]), set())
+            if len(candidates) == 1:
+                return next(iter(candidates))
+            if len(candidates) > 1:
+                return None
+        return None
+
+    def resolve_alias(self, name: str) -> Optional[str]:
+        """Canonical name only for an exact alias or normalized-key hit (no partial matching)"""
+        if not name:
+            return None
+        raw = str(name).strip()
+        return self.exact.get(raw.upper()) or self.keys.get(team_name_key(raw))
+
+    def resolve(self, name: str, source: str = None) -> Optional[str]:
+        """Canonical team name, or None if the name can't be resolved (cached either way)"""
+        if not name:
+            return None
+        raw = str(name).strip()
+        if raw in self.cache:
+            result = self.cache[raw]
+        else:
+            result = self._lookup(raw)
+            self.cache[raw] = result
+        if result is None:
+            (self.parent or self)._record_miss(raw, source)
+        return result
+
+    def normalize(self, name: str, source: str = None) -> str:
+        """Canonical team name, falling back to the stripped input (old normalize_team behaviour)"""
+        if not name:
+            return name
+        return self.resolve(name, source) or str(name).strip()
+
+    def abbrev(self, name: str, source: str = 'covers') -> str:
+        """Source abbreviation for a team (first 3 letters of the name if unknown)"""
+        canonical = self.resolve(name, source)
+        abbrev = self.abbreviations.get(source, {}).get(canonical) if canonical else None
+        if abbrev:
+            return abbrev
+        return str(name).upper().strip()[:3] if name else ''
+
+    def resolver_for(self, keys) -> 'TeamNameIndex':
+        """
+        Index that resolves names onto one of `keys` (e.g. the teams of a PPG table),
+        using this league's aliases to bridge spellings. Misses are reported here.
+        """
+        resolver = TeamNameIndex(self.league, closed=self.closed, parent=self.parent or self)
+        for key in keys:
+            if not key:
+                continue
+            resolver.add(key, key)
+            canonical = self._lookup(str(key).strip())
+            if canonical:
+                for alias in self.by_canonical.get(canonical, ()):
+                    resolver.add(alias, key)
+        return resolver
+
+    def _record_miss(self, raw: str, source: str = None):
+        now = datetime.now(timezone.utc).isoformat()
+        miss = self.misses.pop(raw, None)  # re-inserted last: the dict is kept in last-seen order
+        if miss:
+            miss["count"] += 1
+            miss["last_seen"] = now
+            if source and source not in miss["sources"]:
+                miss["sources"].append(source)
+        else:
+            miss = {"name": raw, "count": 1, "sources": [source] if source else [], "first_seen": now, "last_seen": now}
+            while len(self.misses) >= TEAM_NAME_MISSES_LIMIT:
+                self.misses.pop(next(iter(self.misses)))
+        self.misses[raw] = miss
+
+
+team_name_indexes: Dict[str, TeamNameIndex] = {}
+
+
+def build_team_name_index(league: str) -> TeamNameIndex:
+    """Compile the alias index for a league from the scraper/score maps"""
+    league = league.upper()
+    if league == 'NBA':
+        index = TeamNameIndex('NBA')
+        index.add_aliases({nickname.title(): canonical for nickname, canonical in CBS_NBA_TEAM_MAP.items()})
+        index.add_aliases(SCORESANDODDS_TEAM_MAP)
+        # NBA_TEAM_ALIASES maps nickname -> city; the city is another alias of the CBS name
+        for nickname, city in NBA_TEAM_ALIASES.items():
+            canonical = CBS_NBA_TEAM_MAP.get(nickname.upper())
+            if canonical:
+                index.add(nickname, canonical)
+                index.add(city, canonical)
+        index.set_abbreviations('covers', COVERS_NBA_ABBREVS)
+    elif league == 'NHL':
+        index = TeamNameIndex('NHL')
+        index.add_aliases({nickname.title(): canonical for nickname, canonical in CBS_NHL_TEAM_MAP.items()})
+        index.add_aliases(NHL_API_TEAM_MAP)
+        for nickname, city in NHL_TEAM_ALIASES.items():
+            canonical = index._lookup(nickname)
+            if canonical:
+                index.add(city, canonical)
+        index.add_aliases({'NEW YORK RANGERS': 'NY Rangers', 'NEW YORK ISLANDERS': 'NY Islanders', 'LOS ANGELES KINGS': 'LA Kings'})
+        for standard_name, nicknames in NHL_TEAM_NICKNAMES.items():
+            canonical = index._lookup(nicknames[0])
+            if canonical:
+                for alias in [standard_name] + nicknames:
+                    index.add(alias, canonical)
+        index.set_abbreviations('covers', COVERS_NHL_ABBREVS)
+        index.set_abbreviations('nhl_api', NHL_TEAM_ABBREV)
+        index.set_abbreviations('covers_ou', COVERS_OU_NHL_ABBREVS)
+    elif league == 'NCAAB':
+        index = TeamNameIndex('NCAAB', closed=False)
+        index.add_aliases(NCAAB_TEAM_NAME_MAP)
+        index.set_abbreviations('covers_ou', COVERS_OU_NCAAB_ABBREVS)
+    else:
+        index = TeamNameIndex(league)
+    return index
+
+
+def get_team_index(league: str) -> TeamNameIndex:
+    """Shared per-league team name index (compiled on first use)"""
+    league = league.upper()
+    index = team_name_indexes.get(league)
+    if index is None:
+        index = build_team_name_index(league)
+        team_name_indexes[league] = index
+    return index
+
+
+def team_table_finder(league: str, source: str = None):
+    """
+    find(name, table) -> table's value for the key `name` resolves to, or None.
+    Tables keyed by another source's spelling (PPG ranks, L3 stats...) are bridged
+    with the league's aliases; one resolver is compiled per table and reused.
+    """
+    team_index = get_team_index(league)
+    resolvers = {}
+    
+    def find(name, table):
+        if not name or not table:
+            return None
+        if name in table:
+            return table[name]
+        resolver = resolvers.get(id(table))
+        if resolver is None:
+            resolver = resolvers[id(table)] = team_index.resolver_for(table.keys())
+        key = resolver.resolve(name, source)
+        return table.get(key) if key else None
+    
+    return find
+
+
+def same_teams(league: str, teams: List[str], other: List[str], source: str = None) -> Optional[bool]:
+    """
+    Whether two team lists name the same teams (order ignored) per the alias index;
+    None when a name doesn't resolve, so the caller can fall back to its own matching
+    """
+    team_index = get_team_index(league)
+    resolved = [team_index.resolve(name, source) for name in list(teams) + list(other)]
+    if not all(resolved):
+        return None
+    return set(resolved[:len(teams)]) == set(resolved[len(teams):])
+
+
+team_aliases_loaded_at: Optional[datetime] = None
+
+
+async def load_team_aliases_from_db():
+    """
+    Apply aliases added through POST /teams/aliases (survive restarts). Later calls
+    only read aliases added since the previous load - workers call this from their
+    heartbeat so an alias added on the API process reaches their indexes too.
+    """
+    global team_aliases_loaded_at
+    started = datetime.now(timezone.utc)
+    query = {}
+    if team_aliases_loaded_at:
+        # re-applying an alias is harmless; the overlap covers clock skew between processes
+        query = {"created_at": {"$gte": team_aliases_loaded_at - timedelta(seconds=TEAM_ALIAS_SYNC_OVERLAP_SECONDS)}}
+    try:
+        aliases = await db.team_aliases.find(query, {"_id": 0}).to_list(5000)
+        for entry in aliases:
+            index = get_team_index(entry["league"])
+            index.add(entry["alias"], entry["canonical"])
+            index.misses.pop(entry["alias"].strip(), None)
+        if aliases and not team_aliases_loaded_at:
+            logger.info(f"Loaded {len(aliases)} team aliases from database")
+        team_aliases_loaded_at = started
+    except Exception as e:
+        logger.error(f"Error loading team aliases: {e}")
+
+
+class TeamAliasCreate(BaseModel):
+    league: str
+    alias: str
+    canonical: str
+
+
+@api_router.get("/teams/unresolved")
+async def get_unresolved_team_names(league: str = None):
+    """Team names that no alias index could resolve since the last restart, most frequent first"""
+    leagues = [league.upper()] if league else sorted(team_name_indexes.keys())
+    result = {}
+    for lg in leagues:
+        index = team_name_indexes.get(lg)
+        if not index:
+            result[lg] = []
+            continue
+        result[lg] = sorted(index.misses.values(), key=lambda m: m["count"], reverse=True)
+    if PROCESS_ROLE != 'api':
+        return {"unresolved": result}
+    workers = {worker_id: {lg: misses for lg, misses in (state or {}).items() if lg in leagues or not league}
+               for worker_id, state in (await worker_states("unresolved")).items()}
+    return {"unresolved": result, "workers": workers}
+
+
+@api_router.get("/teams/resolve")
+async def resolve_team_name(league: str, name: str):
+    """Debug a lookup: what a raw name resolves to in a league's index"""
+    index = get_team_index(league)
+    canonical = index.resolve(name, source="api")
+    return {
+        "league": league.upper(),
+        "name": name,
+        "canonical": canonical,
+        "key": team_name_key(name),
+        "abbreviations": {source: table.get(canonical) for source, table in index.abbreviations.items()} if canonical else {}
+    }
+
+
+@api_router.post("/teams/aliases")
+async def add_team_alias(data: TeamAliasCreate):
+    """Add an alias for an unresolved name (persisted and applied immediately)"""
+    league = data.league.upper()
+    if league not in ['NBA', 'NHL', 'NCAAB', 'NFL']:
+        raise HTTPException(status_code=400, detail="Invalid league")
+    await db.team_aliases.update_one(
+        {"league": league, "alias": data.alias},
+        {"$set": {"league": league, "alias": data.alias, "canonical": data.canonical, "created_at": datetime.now(timezone.utc)}},
+        upsert=True
+    )
+    index = get_team_index(league)
+    index.add(data.alias, data.canonical)
+    index.misses.pop(data.alias.strip(), None)
+    return {"success": True, "league": league, "alias": data.alias, "canonical": data.canonical}
+
+
+# ============================================================================
+# GAME MATCHING (HASH JOIN)
+# ============================================================================
+# Score and consensus ingest used to compare every stored game with every scraped
+# row (lowercasing and substring checks each time). match_games() builds a
+# canonical (date, away, home) key once per row on each side and joins them with
+# dict lookups; rows that still don't line up fall back to a word-token index
+# (NCAAB names vary a lot) and are reported with diagnostics.
+
+GAME_MATCH_REPORT_LIMIT = 50  # unmatched rows kept per report
+game_match_reports: Dict[str, Dict[str, Any]] = {}  # "{league}:{source}" -> last report
+
+
+def game_team_names(game: Dict[str, Any]) -> Tuple[str, str]:
+    """(away, home) raw names from a stored game or scraped row"""
+    away = game.get('away_team') or game.get('away') or ''
+    home = game.get('home_team') or game.get('home') or ''
+    return str(away).strip(), str(home).strip()
+
+
+def game_team_key(team_index: 'TeamNameIndex', name: str, source: str = None) -> str:
+    """Canonical team name when the index knows it, else the normalized name key"""
+    if not name:
+        return ''
+    return team_index.resolve(name, source) or team_name_key(name)
+
+
+def game_match_key(league: str, away: str, home: str, date: str = None, source: str = None) -> Tuple[str, str, str]:
+    """Canonical (date, away, home) key for a game"""
+    team_index = get_team_index(league)
+    return (date or '', game_team_key(team_index, away, source), game_team_key(team_index, home, source))
+
+
+def match_games(league: str, stored_games: List[Dict[str, Any]], scraped_games: List[Dict[str, Any]],
+                date: str = None, source: str = None, allow_swapped: bool = True) -> Dict[str, Any]:
+    """
+    Join stored games to scraped rows on canonical (date, away, home) keys.
+
+    Each scraped row is matched at most once. Order of attempts per stored game:
+    exact key, swapped home/away key (if allow_swapped), then word-token overlap on
+    both teams. `date` applies to both sides; without it each row's own 'date' is used.
+
+    Returns:
+        {"pairs": [(stored_game, scraped_row)], "unmatched": [...], "unmatched_scraped": [...],
+         "methods": {"key": n, "swapped": n, "tokens": n}}
+    """
+    team_index = get_team_index(league)
+    keyed = {}
+    token_index = {}
+    scraped_keys = []
+    
+    for i, row in enumerate(scraped_games or []):
+        away, home = game_team_names(row)
+        key = (date or row.get('date') or '', game_team_key(team_index, away, source), game_team_key(team_index, home, source))
+        scraped_keys.append(key)
+        keyed.setdefault(key, i)
+        for side, team in ((0, key[1]), (1, key[2])):
+            for word in team_name_key(team).split():
+                token_index.setdefault((key[0], side, word), set()).add(i)
+    
+    used = set()
+    pairs = []
+    unmatched = []
+    methods = {"key": 0, "swapped": 0, "tokens": 0}
+    
+    for game in stored_games or []:
+        away, home = game_team_names(game)
+        game_date = date or game.get('date') or ''
+        away_canonical = team_index.resolve(away, source) if away else None
+        home_canonical = team_index.resolve(home, source) if home else None
+        away_key = away_canonical or team_name_key(away)
+        home_key = home_canonical or team_name_key(home)
+        
+        match = keyed.get((game_date, away_key, home_key))
+        method = "key"
+        if (match is None or match in used) and allow_swapped:
+            match = keyed.get((game_date, home_key, away_key))
+            method = "swapped"
+        if match is not None and match in used:
+            match = None
+        
+        candidates = []
+        if match is None:
+            # Token fallback: scraped rows sharing a word with both teams (same orientation)
+            scores = {}
+            for side, team in ((0, away_key), (1, home_key)):
+                for word in team_name_key(team).split():
+                    for i in token_index.get((game_date, side, word), ()):
+                        if i not in used:
+                            hits = scores.setdefault(i, [0, 0])
+                            hits[side] += 1
+            candidates = sorted(((a + h, i) for i, (a, h) in scores.items() if a and h), reverse=True)
+            if candidates and (len(candidates) == 1 or candidates[0][0] > candidates[1][0]):
+                match = candidates[0][1]
+                method = "tokens"
+        
+        if match is None:
+            reason = "no_candidate" if not candidates else "ambiguous"
+            if not away_canonical and not home_canonical:
+                reason += ":both_unresolved"
+            elif not away_canonical:
+                reason += ":away_unresolved"
+            elif not home_canonical:
+                reason += ":home_unresolved"
+            unmatched.append({
+                "away": away,
+                "home": home,
+                "key": [game_date, away_key, home_key],
+                "reason": reason,
+                "candidates": [list(scraped_keys[i]) for _, i in candidates[:3]]
+            })
+            continue
+        
+        used.add(match)
+        methods[method] += 1
+        pairs.append((game, scraped_games[match]))
+    
+    unmatched_scraped = [
+        {"away": game_team_names(row)[0], "home": game_team_names(row)[1], "key": list(scraped_keys[i])}
+        for i, row in enumerate(scraped_games or []) if i not in used
+    ]
+    
+    report = {
+        "league": league.upper(),
+        "source": source,
+        "date": date,
+        "stored": len(stored_games or []),
+        "scraped": len(scraped_games or []),
+        "matched": len(pairs),
+        "methods": methods,
+        "unmatched": unmatched,
+        "unmatched_scraped": unmatched_scraped,
+    }
+    game_match_reports[f"{league.upper()}:{source or 'unknown'}"] = {
+        **report,
+        "unmatched": unmatched[:GAME_MATCH_REPORT_LIMIT],
+        "unmatched_scraped": unmatched_scraped[:GAME_MATCH_REPORT_LIMIT],
+        "at": datetime.now(timezone.utc).isoformat()
+    }
+    if unmatched:
+        logger.info(f"[Match] {league.upper()} {date or ''} ({source}): matched {len(pairs)}/{len(stored_games or [])}, "
+                    f"unmatched: {', '.join(u['away'] + ' @ ' + u['home'] for u in unmatched[:5])}")
+    
+    return {"pairs": pairs, "unmatched": unmatched, "unmatched_scraped": unmatched_scraped, "methods": methods}
+
+
+def match_covers_ou_leftovers(league: str, games: List[Dict[str, Any]], ou_rows: List[Dict[str, Any]],
+                              matching: Dict[str, Any]) -> List[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """
+    Extra (game, Covers O/U row) pairs for the games match_games left unmatched:
+    Covers code pair first, then a substring match on both teams, so a code the
+    index doesn't know (new NCAAB schools) still gets its consensus.
+    """
+    matched_games = {id(game) for game, _ in matching['pairs']}
+    matched_rows = {id(row) for _, row in matching['pairs']}
+    remaining = [row for row in ou_rows if id(row) not in matched_rows]
+    name_to_abbrev = COVERS_OU_ABBREVS.get(league.upper(), {})
+    pairs = []
+    for game in games:
+        if id(game) in matched_games or not remaining:
+            continue
+        away, home = (name.upper() for name in game_team_names(game))
+        if not away or not home:
+            continue
+        away_abbrev, home_abbrev = name_to_abbrev.get(away, away[:3]), name_to_abbrev.get(home, home[:3])
+        found = None
+        for row in remaining:
+            covers_away, covers_home = (name.upper() for name in game_team_names(row))
+            if (covers_away, covers_home) in ((away_abbrev, home_abbrev), (away, home)):
+                found = row
+                break
+        if found is None:
+            for row in remaining:
+                covers_away, covers_home = (name.upper() for name in game_team_names(row))
+                if covers_away and covers_home and \
+                        (covers_away in away or away in covers_away) and (covers_home in home or home in covers_home):
+                    found = row
+                    break
+        if found is not None:
+            remaining.remove(found)
+            pairs.append((game, found))
+    return pairs
+
+
+def covers_consensus_lookup(league: str, consensus_data: Dict[str, Dict[str, Any]]):
+    """
+    team name -> its Covers consensus row ({} if none). Rows are keyed by the page's
+    team code; codes are resolved through the index, so either spelling of a code
+    (GS/GSW, NO/NOP, PHO/PHX) finds the team.
+    """
+    team_index = get_team_index(league)
+    by_team = {}
+    for code, data in consensus_data.items():
+        by_team.setdefault(game_team_key(team_index, code, 'covers'), data)
+    
+    def lookup(name: str) -> Dict[str, Any]:
+        if not name:
+            return {}
+        return (consensus_data.get(team_index.abbrev(name, 'covers'))
+                or by_team.get(game_team_key(team_index, name, 'covers')) or {})
+    
+    return lookup
+
+
+@api_router.get("/games/match-diagnostics")
+async def get_game_match_diagnostics(league: str = None):
+    """Last game matching report per league/source, with unmatched rows on both sides"""
+    def select(reports):
+        return sorted((r for r in reports if not league or r["league"] == league.upper()), key=lambda r: r["at"], reverse=True)
+    
+    result = {"reports": select(game_match_reports.values())}
+    if PROCESS_ROLE == 'api':
+        result["workers"] = {worker_id: select(reports or []) for worker_id, reports in (await worker_states("match_reports")).items()}
+    return result
+
+
+# ============================================================================
+# GAME IDENTITY INDEX
+# ============================================================================
+# Every source keys a game its own way: CBS "AWAY_HOME", opening_lines.game_key
+# ("league_date_away_home"), Covers team abbreviations, plays888 bet text and the
+# NHL API game id. game_identities holds one document per game with a stable
+# game_id and every source key seen for it (source_keys is indexed), so a game
+# seen by one source can be found from another source's key with one lookup.
+# The index is filled as games are matched. refresh_lines_and_bets reads the
+# slate's plays888 keys so bet text matched once is joined by key on later
+# refreshes; get_opening_line and /games/identity read it too. The lines,
+# consensus and scores joins use match_games.
+
+GAME_IDENTITY_SOURCES = ['cbs', 'opening_lines', 'covers', 'plays888', 'nhl_api']
+GAME_IDENTITY_LINK_DATES = 7  # slates whose already-written links are remembered
+game_identity_links: Dict[str, set] = {}  # date -> {(game_id, source_key)} written by this process
+
+
+def linked_identity_keys(date: str) -> set:
+    """Links already written for a slate; only the newest GAME_IDENTITY_LINK_DATES slates are kept"""
+    links = game_identity_links.get(date)
+    if links is None:
+        links = game_identity_links[date] = set()
+        for old in sorted(game_identity_links)[:-GAME_IDENTITY_LINK_DATES]:
+            game_identity_links.pop(old, None)
+    return links
+
+
+def game_identity_id(league: str, date: str, away: str, home: str) -> str:
+    """Stable game ID from the canonical (league, date, away, home) key"""
+    _, away_key, home_key = game_match_key(league, away, home)
+    return str(uuid.uuid5(uuid.NAMESPACE_URL, f"game/{league.upper()}/{date}/{away_key}/{home_key}".lower()))
+
+
+def opening_line_game_key(league: str, date: str, away: str, home: str) -> str:
+    """opening_lines.game_key for a game (same format store_opening_line has always used)"""
+    return f"{league}_{date}_{away}_{home}".lower().replace(" ", "_")
+
+
+def game_source_keys(league: str, date: str, game: Dict[str, Any], source: str = 'cbs') -> Dict[str, str]:
+    """Keys a stored/scraped game is known by in each source"""
+    away, home = game_team_names(game)
+    team_index = get_team_index(league)
+    keys = {
+        source: f"{away}_{home}".upper(),
+        'opening_lines': opening_line_game_key(league, date, away, home),
+        'covers': f"{team_index.abbrev(away, 'covers')}_{team_index.abbrev(home, 'covers')}",
+    }
+    if game.get('game_id'):
+        keys['nhl_api'] = str(game['game_id'])
+    return keys
+
+
+def game_identity_update(league: str, date: str, away: str, home: str, keys: Dict[str, str]) -> Tuple[Optional[str], Any, List[str]]:
+    """
+    (game_id, UpdateOne registering the source keys, source_keys written) for a game.
+    Keys this process already stored are left out; the op is None when nothing is new.
+    """
+    from pymongo import UpdateOne
+    if not away or not home:
+        return None, None, []
+    game_id = game_identity_id(league, date, away, home)
+    linked = linked_identity_keys(date)
+    new_keys = {source: key for source, key in keys.items() if key and (game_id, f"{source}:{key}") not in linked}
+    if not new_keys:
+        return game_id, None, []
+    _, away_key, home_key = game_match_key(league, away, home)
+    source_keys = [f"{source}:{key}" for source, key in new_keys.items()]
+    add_to_set = {f"keys.{source}": key for source, key in new_keys.items()}
+    add_to_set["source_keys"] = {"$each": source_keys}
+    op = UpdateOne(
+        {"game_id": game_id},
+        {
+            "$setOnInsert": {"game_id": game_id, "league": league.upper(), "date": date, "away": away_key, "home": home_key,
+                             "created_at": datetime.now(timezone.utc)},
+            "$set": {"updated_at": datetime.now(timezone.utc)},
+            "$addToSet": add_to_set
+        },
+        upsert=True
+    )
+    return game_id, op, source_keys
+
+
+async def write_game_identities(league: str, date: str, updates: List[Tuple[Optional[str], Any, List[str]]]) -> int:
+    """One bulk_write for a slate's game_identity_update() results; returns ops written"""
+    ops = [op for _, op, _ in updates if op is not None]
+    if not ops:
+        return 0
+    try:
+        await db.game_identities.bulk_write(ops, ordered=False)
+    except Exception as e:
+        logger.error(f"Error linking {len(ops)} game identities for {league} {date}: {e}")
+        return 0
+    linked = linked_identity_keys(date)
+    for game_id, _, source_keys in updates:
+        linked.update((game_id, source_key) for source_key in source_keys)
+    return len(ops)
+
+
+async def link_game_identity(league: str, date: str, away: str, home: str, keys: Dict[str, str]) -> Optional[str]:
+    """Register source keys for one game and return its game_id"""
+    update = game_identity_update(league, date, away, home, keys)
+    await write_game_identities(league, date, [update])
+    return update[0]
+
+
+async def register_game_identities(league: str, date: str, games: List[Dict[str, Any]], source: str = 'cbs') -> int:
+    """Link every game of a slate to its identity and stamp game_uid on each game dict"""
+    updates = []
+    for game in games:
+        away, home = game_team_names(game)
+        update = game_identity_update(league, date, away, home, game_source_keys(league, date, game, source))
+        if update[0]:
+            game['game_uid'] = update[0]
+            updates.append(update)
+    await write_game_identities(league, date, updates)
+    return len(updates)
+
+
+async def slate_identity_keys(league: str, date: str, source: str) -> Dict[str, set]:
+    """game_id -> keys one source is known by, for every game of a slate"""
+    try:
+        docs = await db.game_identities.find({"league": league, "date": date}, {"_id": 0, "game_id": 1, f"keys.{source}": 1}).to_list(2000)
+    except Exception as e:
+        logger.error(f"Error loading {source} game identities for {league} {date}: {e}")
+        return {}
+    return {doc["game_id"]: set(doc.get("keys", {}).get(source, [])) for doc in docs}
+
+
+async def find_game_identity(source: str, key: str) -> Optional[Dict[str, Any]]:
+    """Identity document for a source key (single indexed lookup)"""
+    return await db.game_identities.find_one({"source_keys": f"{source}:{key}"}, {"_id": 0})
+
+
+async def ensure_game_identity_indexes():
+    """Indexes for game_identities: stable id, every source key, and slate lookups"""
+    try:
+        await db.game_identities.create_index("game_id", unique=True)
+        await db.game_identities.create_index("source_keys")
+        await db.game_identities.create_index([("league", 1), ("date", 1)])
+    except Exception as e:
+        logger.error(f"Error creating game identity indexes: {e}")
+
+
+@api_router.get("/games/identity")
+async def get_game_identity(source: str = None, key: str = None, game_id: str = None):
+    """Look up a game's identity by any source key (source + key) or by game_id"""
+    if game_id:
+        identity = await db.game_identities.find_one({"game_id": game_id}, {"_id": 0})
+    elif source and key:
+        if source not in GAME_IDENTITY_SOURCES:
+            raise HTTPException(status_code=400, detail=f"Invalid source. Use one of: {', '.join(GAME_IDENTITY_SOURCES)}")
+        identity = await find_game_identity(source, key)
+    else:
+        raise HTTPException(status_code=400, detail="Provide game_id, or source and key")
+    if not identity:
+        raise HTTPException(status_code=404, detail="Game identity not found")
+    return identity
+
+
+async def link_matched_games(league: str, date: str, pairs: List[Tuple[Dict[str, Any], Dict[str, Any]]], source: str = 'cbs') -> int:
+    """Record the scraped row's key on the stored game's identity for each match_games() pair"""
+    updates = []
+    for game, row in pairs:
+        away, home = game_team_names(game)
+        row_away, row_home = game_team_names(row)
+        keys = {source: f"{row_away}_{row_home}".upper()}
+        if row.get('game_id'):
+            keys['nhl_api'] = str(row['game_id'])
+        update = game_identity_update(league, date, away, home, keys)
+        if update[0]:
+            game['game_uid'] = update[0]
+            updates.append(update)
+    await write_game_identities(league, date, updates)
+    return len(pairs)
+
+
+# ============================================================================
+# TEAM GAME LOG - Last-N PPG from our own stored finals
+# ============================================================================
+# Every final we store in {league}_opportunities (away_score/home_score) is also
+# written to team_game_log as one row per team per game, indexed by
+# (league, team_key, date). Last-3/last-5/season PPG as of any date is then a
+# local query; team pages only need scraping for teams whose log has gaps.
+
+TEAM_GAME_LOG_MAX_AGE_DAYS = {'NBA': 5, 'NHL': 6, 'NCAAB': 10}  # older last game = probably a gap
+
+
+def season_start_for(date: str) -> str:
+    """First day of the season a date belongs to (seasons start in the fall)"""
+    year, month = int(date[:4]), int(date[5:7])
+    return f"{year if month >= 8 else year - 1}-08-01"
+
+
+def game_log_team_key(team_index: 'TeamNameIndex', name: str) -> str:
+    """
+    team_key for team_game_log rows: the canonical name only for an exact or alias
+    hit, else the normalized name. A partial match could merge two schools into
+    one (league, team_key, date) row and overwrite one team's final with the other's.
+    """
+    if not name:
+        return ''
+    return team_index.resolve_alias(name) or team_name_key(name)
+
+
+def team_game_log_rows(league: str, date: str, games: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """One log row per team for each game with both scores"""
+    team_index = get_team_index(league)
+    rows = []
+    for game in games:
+        away_score, home_score = game.get('away_score'), game.get('home_score')
+        if away_score is None or home_score is None:
+            continue
+        try:
+            away_score, home_score = float(away_score), float(home_score)
+        except (TypeError, ValueError):
+            continue
+        away, home = game_team_names(game)
+        if not away or not home:
+            continue
+        for team, opponent, points_for, points_against, is_home in ((away, home, away_score, home_score, False),
+                                                                    (home, away, home_score, away_score, True)):
+            rows.append({
+                "league": league.upper(),
+                "date": date,
+                "team": team,
+                "team_key": game_log_team_key(team_index, team),
+                "opponent": opponent,
+                "home": is_home,
+                "points_for": points_for,
+                "points_against": points_against,
+            })
+    return rows
+
+
+async def record_team_game_finals(league: str, date: str, games: List[Dict[str, Any]]) -> int:
+    """Upsert the game log rows for a slate's finals (called wherever finals are saved)"""
+    from pymongo import UpdateOne
+    rows = team_game_log_rows(league, date, games)
+    if not rows:
+        return 0
+    try:
+        await db.team_game_log.bulk_write([
+            UpdateOne({"league": row["league"], "team_key": row["team_key"], "date": row["date"]},
+                      {"$set": {**row, "updated_at": datetime.now(timezone.utc)}}, upsert=True)
+            for row in rows
+        ], ordered=False)
+    except Exception as e:
+        logger.error(f"[Game Log] Error recording {league} finals for {date}: {e}")
+        return 0
+    return len(rows)
+
+
+async def rebuild_team_game_log(league: str, start_date: str = None, end_date: str = None) -> Dict[str, Any]:
+    """Backfill team_game_log from stored opportunities documents"""
+    league = league.upper()
+    query = {"games.home_score": {"$ne": None}}
+    if start_date or end_date:
+        query["date"] = {}
+        if start_date:
+            query["date"]["$gte"] = start_date
+        if end_date:
+            query["date"]["$lte"] = end_date
+    dates = 0
+    rows = 0
+    async for doc in db[f"{league.lower()}_opportunities"].find(query, {"_id": 0, "date": 1, "games": 1}):
+        rows += await record_team_game_finals(league, doc["date"], doc.get("games", []))
+        dates += 1
+    logger.info(f"[Game Log] Rebuilt {league}: {rows} team-games from {dates} dates")
+    return {"league": league, "dates": dates, "team_games": rows}
+
+
+async def ensure_team_game_log_indexes():
+    try:
+        await db.team_game_log.create_index([("league", 1), ("team_key", 1), ("date", -1)], unique=True)
+        await db.team_game_log.create_index([("league", 1), ("team", 1), ("date", -1)])  # standalone NCAAB scripts
+        await db.team_game_log.create_index([("league", 1), ("date", 1)])
+    except Exception as e:
+        logger.error(f"Error creating team game log indexes: {e}")
+
+
+def latest_slate_by_team(team_index: 'TeamNameIndex', docs) -> Dict[str, str]:
+    """team_key -> latest date among the stored slates (opportunities docs) the team appears on"""
+    latest = {}
+    for doc in docs:
+        for game in doc.get("games", []):
+            for name in game_team_names(game):
+                key = game_log_team_key(team_index, name)
+                if key and doc["date"] > latest.get(key, ''):
+                    latest[key] = doc["date"]
+    return latest
+
+
+async def team_ppg_from_game_log(league: str, teams: List[str], as_of_date: str, windows: Tuple[int, ...] = (3, 5),
+                                 required_games: int = 3) -> Dict[str, Dict[str, Any]]:
+    """
+    Season and last-N PPG per team from games before as_of_date.
+    
+    Returns:
+        {team: {'last3_scores', 'last3_total', 'last3_avg', 'last5_avg', 'season_avg',
+                'games_played', 'last_game_date', 'gap'}} - same keys as the CBS
+        team page scrape, plus 'gap' (True when the log can't be trusted and the
+        team should be scraped: fewer than required_games games, last game too old,
+        or it appears on a stored slate after its last logged game - a final we
+        never recorded). Same rules as last3_from_game_log in team_game_log.py.
+    """
+    league = league.upper()
+    team_index = get_team_index(league)
+    keys = {team: game_log_team_key(team_index, team) for team in teams if team}
+    season_start = season_start_for(as_of_date)
+    
+    by_key = {}
+    async for row in db.team_game_log.find(
+        {"league": league, "team_key": {"$in": list(set(keys.values()))}, "date": {"$gte": season_start, "$lt": as_of_date}},
+        {"_id": 0, "team_key": 1, "date": 1, "points_for": 1}
+    ).sort("date", -1):
+        by_key.setdefault(row["team_key"], []).append(row)
+    
+    max_age = TEAM_GAME_LOG_MAX_AGE_DAYS.get(league, 7)
+    as_of = datetime.strptime(as_of_date, '%Y-%m-%d')
+    
+    # Latest stored slate each team played on after its last logged game. A slate
+    # with some finals logged still leaves a gap for the teams whose final is missing.
+    # Teams last logged before the max-age cutoff are a gap anyway.
+    last_logged = [rows[0]["date"] for rows in by_key.values()]
+    last_slate = {}
+    if last_logged:
+        since = max(min(last_logged), (as_of - timedelta(days=max_age)).strftime('%Y-%m-%d'))
+        docs = await db[f"{league.lower()}_opportunities"].find(
+            {"date": {"$gt": since, "$lt": as_of_date}},
+            {"_id": 0, "date": 1, "games.away_team": 1, "games.home_team": 1, "games.away": 1, "games.home": 1}
+        ).to_list(None)
+        last_slate = latest_slate_by_team(team_index, docs)
+    
+    result = {}
+    for team, key in keys.items():
+        rows = by_key.get(key, [])
+        scores = [row["points_for"] for row in rows]  # most recent first
+        stats = {'games_played': len(scores), 'last_game_date': rows[0]["date"] if rows else None}
+        for n in windows:
+            if scores:
+                window = scores[:n]
+                stats[f'last{n}_avg'] = round(sum(window) / len(window), 1)
+        if scores:
+            stats['last3_scores'] = scores[:3]
+            stats['last3_total'] = sum(scores[:3])
+            stats['season_avg'] = round(sum(scores) / len(scores), 1)
+        stats['gap'] = (
+            len(scores) < required_games
+            or (as_of - datetime.strptime(rows[0]["date"], '%Y-%m-%d')).days > max_age
+            or last_slate.get(key, '') > rows[0]["date"]
+        )
+        result[team] = stats
+    return result
+
+
+@api_router.get("/teams/game-log/{league}")
+async def get_team_game_log_ppg(league: str, teams: str, date: str = None):
+    """Last-3/last-5/season PPG from stored finals (comma-separated team names, as of date - default today)"""
+    from zoneinfo import ZoneInfo
+    if league.upper() not in ['NBA', 'NHL', 'NCAAB']:
+        raise HTTPException(status_code=400, detail="Invalid league")
+    as_of = date or datetime.now(ZoneInfo('America/Phoenix')).strftime('%Y-%m-%d')
+    team_list = [t.strip() for t in teams.split(',') if t.strip()]
+    return {"league": league.upper(), "as_of": as_of, "teams": await team_ppg_from_game_log(league, team_list, as_of)}
+
+
+@api_router.post("/teams/game-log/{league}/rebuild")
+async def rebuild_team_game_log_endpoint(league: str, start_date: str = None, end_date: str = None):
+    """Backfill the team game log from stored finals"""
+    if league.upper() not in ['NBA', 'NHL', 'NCAAB']:
+        raise HTTPException(status_code=400, detail="Invalid league")
+    return await rebuild_team_game_log(league, start_date, end_date)
 
-NHL_TEAM_ALIASES = {
-    'Hurricanes': 'Carolina', 'Penguins': 'Pittsburgh', 'Devils': 'New Jersey', 'Maple Leafs': 'Toronto',
-    'Canadiens': 'Montreal', 'Panthers': 'Florida', 'Islanders': 'NY Islanders', 'Blackhawks': 'Chicago',
-    'Flyers': 'Philadelphia', 'Canucks': 'Vancouver', 'Bruins': 'Boston', 'Sabres': 'Buffalo',
-    'Red Wings': 'Detroit', 'Lightning': 'Tampa Bay', 'Senators': 'Ottawa', 'Blue Jackets': 'Columbus',
-    'Rangers': 'NY Rangers', 'Capitals': 'Washington', 'Jets': 'Winnipeg', 'Wild': 'Minnesota',
-    'Predators': 'Nashville', 'Blues': 'St. Louis', 'Stars': 'Dallas', 'Avalanche': 'Colorado',
-    'Coyotes': 'Utah', 'Mammoth': 'Utah', 'Utah Hockey Club': 'Utah', 'Golden Knights': 'Vegas', 'Kraken': 'Seattle', 'Ducks': 'Anaheim',
-    'Kings': 'Los Angeles', 'Sharks': 'San Jose', 'Flames': 'Calgary', 'Oilers': 'Edmonton'
-}
 
 
 @api_router.post("/scores/nba/update")
@@ -15819,73 +19236,19 @@ async def update_nba_scores(date: str = None):
         db_games = db_data.get('games', [])
         logger.info(f"[NBA Scores] Found {len(db_games)} games in database")
         
+        team_index = get_team_index('NBA')
+        
         # Helper function to normalize team names
         def normalize_team(team_name):
             if not team_name:
                 return ''
-            team_name = team_name.strip()
-            for alias, full_name in NBA_TEAM_ALIASES.items():
-                if alias.lower() in team_name.lower() or team_name.lower() in alias.lower():
-                    return full_name
-            return team_name
+            return team_index.normalize(team_name, source='cbssports')
         
         # Helper to get team abbreviation for Covers lookup
         def get_team_abbrev(team_name):
             """Convert team name to abbreviation for Covers lookup"""
-            abbrevs = {
-                'CLEVELAND': 'CLE', 'CAVALIERS': 'CLE',
-                'INDIANA': 'IND', 'PACERS': 'IND',
-                'MEMPHIS': 'MEM', 'GRIZZLIES': 'MEM',
-                'SAN ANTONIO': 'SA', 'SPURS': 'SA',
-                'LA LAKERS': 'LAL', 'LOS ANGELES LAKERS': 'LAL', 'LAKERS': 'LAL',
-                'NEW ORLEANS': 'NO', 'PELICANS': 'NO',
-                'DALLAS': 'DAL', 'MAVERICKS': 'DAL',
-                'SACRAMENTO': 'SAC', 'KINGS': 'SAC',
-                'ORLANDO': 'ORL', 'MAGIC': 'ORL',
-                'WASHINGTON': 'WAS', 'WIZARDS': 'WAS',
-                'MIAMI': 'MIA', 'HEAT': 'MIA',
-                'MINNESOTA': 'MIN', 'TIMBERWOLVES': 'MIN',
-                'BOSTON': 'BOS', 'CELTICS': 'BOS',
-                'DENVER': 'DEN', 'NUGGETS': 'DEN',
-                'PHOENIX': 'PHO', 'PHX': 'PHO', 'SUNS': 'PHO',
-                'LA CLIPPERS': 'LAC', 'LOS ANGELES CLIPPERS': 'LAC', 'CLIPPERS': 'LAC',
-                'GOLDEN STATE': 'GS', 'GSW': 'GS', 'WARRIORS': 'GS',
-                'BROOKLYN': 'BKN', 'BK': 'BKN', 'NETS': 'BKN',
-                'NEW YORK': 'NY', 'NYK': 'NY', 'KNICKS': 'NY',
-                'PHILADELPHIA': 'PHI', '76ERS': 'PHI', 'SIXERS': 'PHI',
-                'CHICAGO': 'CHI', 'BULLS': 'CHI',
-                'DETROIT': 'DET', 'PISTONS': 'DET',
-                'ATLANTA': 'ATL', 'HAWKS': 'ATL',
-                'CHARLOTTE': 'CHA', 'HORNETS': 'CHA',
-                'TORONTO': 'TOR', 'RAPTORS': 'TOR',
-                'MILWAUKEE': 'MIL', 'BUCKS': 'MIL',
-                'OKLAHOMA CITY': 'OKC', 'THUNDER': 'OKC',
-                'PORTLAND': 'POR', 'TRAIL BLAZERS': 'POR', 'BLAZERS': 'POR',
-                'UTAH': 'UTA', 'JAZZ': 'UTA',
-                'HOUSTON': 'HOU', 'ROCKETS': 'HOU',
-            }
-            team_upper = team_name.upper() if team_name else ''
-            for name, abbrev in abbrevs.items():
-                if name in team_upper:
-                    return abbrev
-            return team_upper[:3] if team_upper else ''
-        
-        # Helper function to match games
-        def match_game(db_game, scraped):
-            db_away = normalize_team(db_game.get('away_team', ''))
-            db_home = normalize_team(db_game.get('home_team', ''))
-            
-            for sg in scraped:
-                scraped_away = normalize_team(sg.get('away_team', ''))
-                scraped_home = normalize_team(sg.get('home_team', ''))
-                
-                if (db_away.lower() in scraped_away.lower() or scraped_away.lower() in db_away.lower()) and \
-                   (db_home.lower() in scraped_home.lower() or scraped_home.lower() in db_home.lower()):
-                    return sg
-                if (db_away.lower() in scraped_home.lower() or scraped_home.lower() in db_away.lower()) and \
-                   (db_home.lower() in scraped_away.lower() or scraped_away.lower() in db_home.lower()):
-                    return sg
-            return None
+            return team_index.abbrev(team_name, source='covers')
+        
         
         # Update games with scores
         updated_count = 0
@@ -15893,8 +19256,13 @@ async def update_nba_scores(date: str = None):
         misses = 0
         results = []
         
+        # Join stored games with scraped scores on canonical (date, away, home) keys
+        matching = match_games('NBA', db_games, scraped_games, date=date, source='cbssports')
+        await link_matched_games('NBA', date, matching['pairs'], source='cbs')
+        matched_games = {id(g): sg for g, sg in matching['pairs']}
+        
         for game in db_games:
-            matched = match_game(game, scraped_games)
+            matched = matched_games.get(id(game))
             if matched:
                 final_score = matched.get('final_score')
                 game['final_score'] = final_score
@@ -15988,6 +19356,7 @@ async def update_nba_scores(date: str = None):
                 "scores_updated": datetime.now(arizona_tz).isoformat()
             }}
         )
+        await record_team_game_finals('NBA', date, db_games)
         
         logger.info(f"[NBA Scores] Updated {updated_count}/{len(db_games)} games")
         
@@ -16035,12 +19404,8 @@ async def update_nhl_scores(date: str = None):
         logger.info(f"[NHL Scores] Updating scores for {date} from CBS Sports")
         
         # Scrape scores from CBS Sports (same source as Process #1)
-        scraped_games = await scrape_cbssports_nhl(date)
-        
-        if not scraped_games:
-            # Fallback to NHL API if CBS fails
-            logger.warning(f"[NHL Scores] CBS Sports failed, trying NHL API fallback...")
-            scraped_games = await scrape_nhl_api_schedule(date)
+        # (hedged with the NHL API if CBS is slow or fails)
+        scraped_games, _ = await hedged_fetch('scores', 'NHL', date)
         
         logger.info(f"[NHL Scores] Scraped {len(scraped_games)} games")
         
@@ -16055,89 +19420,19 @@ async def update_nhl_scores(date: str = None):
         db_games = db_data.get('games', [])
         logger.info(f"[NHL Scores] Found {len(db_games)} games in database")
         
-        # Create reverse mapping for NHL teams (city name -> team name)
-        NHL_CITY_TO_TEAM = {v: k for k, v in NHL_TEAM_ALIASES.items()}
+        team_index = get_team_index('NHL')
         
         # Helper to get team abbreviation for Covers lookup
         def get_team_abbrev(team_name):
             """Convert team name to abbreviation for Covers lookup"""
-            abbrevs = {
-                'COLORADO': 'COL', 'AVALANCHE': 'COL',
-                'TAMPA BAY': 'TB', 'LIGHTNING': 'TB',
-                'FLORIDA': 'FLA', 'PANTHERS': 'FLA',
-                'TORONTO': 'TOR', 'MAPLE LEAFS': 'TOR',
-                'NEW JERSEY': 'NJ', 'DEVILS': 'NJ',
-                'NY ISLANDERS': 'NYI', 'ISLANDERS': 'NYI',
-                'WASHINGTON': 'WAS', 'CAPITALS': 'WAS',
-                'DALLAS': 'DAL', 'STARS': 'DAL',
-                'CALGARY': 'CGY', 'FLAMES': 'CGY',
-                'MONTREAL': 'MTL', 'CANADIENS': 'MTL',
-                'ST. LOUIS': 'STL', 'BLUES': 'STL',
-                'UTAH': 'UTA',
-                'LOS ANGELES': 'LA', 'KINGS': 'LA',
-                'BOSTON': 'BOS', 'BRUINS': 'BOS',
-                'DETROIT': 'DET', 'RED WINGS': 'DET',
-                'CHICAGO': 'CHI', 'BLACKHAWKS': 'CHI',
-                'PITTSBURGH': 'PIT', 'PENGUINS': 'PIT',
-                'PHILADELPHIA': 'PHI', 'FLYERS': 'PHI',
-                'NY RANGERS': 'NYR', 'RANGERS': 'NYR',
-                'CAROLINA': 'CAR', 'HURRICANES': 'CAR',
-                'COLUMBUS': 'CBJ', 'BLUE JACKETS': 'CBJ',
-                'OTTAWA': 'OTT', 'SENATORS': 'OTT',
-                'BUFFALO': 'BUF', 'SABRES': 'BUF',
-                'MINNESOTA': 'MIN', 'WILD': 'MIN',
-                'WINNIPEG': 'WPG', 'JETS': 'WPG',
-                'EDMONTON': 'EDM', 'OILERS': 'EDM',
-                'VANCOUVER': 'VAN', 'CANUCKS': 'VAN',
-                'SEATTLE': 'SEA', 'KRAKEN': 'SEA',
-                'VEGAS': 'VGK', 'GOLDEN KNIGHTS': 'VGK',
-                'ARIZONA': 'ARI', 'COYOTES': 'ARI',
-                'SAN JOSE': 'SJ', 'SHARKS': 'SJ',
-                'ANAHEIM': 'ANA', 'DUCKS': 'ANA',
-                'NASHVILLE': 'NSH', 'PREDATORS': 'NSH',
-            }
-            team_upper = team_name.upper() if team_name else ''
-            for name, abbrev in abbrevs.items():
-                if name in team_upper:
-                    return abbrev
-            return team_upper[:3] if team_upper else ''
+            return team_index.abbrev(team_name, source='covers')
         
-        # Helper function to normalize team names (converts to city name)
+        # Helper function to normalize team names (converts to canonical city name)
         def normalize_team(team_name):
             if not team_name:
                 return ''
-            team_name = team_name.strip()
-            # First check if it's already a city name
-            for city in NHL_TEAM_ALIASES.values():
-                if city.lower() in team_name.lower() or team_name.lower() in city.lower():
-                    return city
-            # Then check if it's a team nickname
-            for alias, city in NHL_TEAM_ALIASES.items():
-                if alias.lower() in team_name.lower() or team_name.lower() in alias.lower():
-                    return city
-            return team_name
-        
-        # Helper function to match games
-        def match_game(db_game, scraped):
-            db_away = normalize_team(db_game.get('away_team', ''))
-            db_home = normalize_team(db_game.get('home_team', ''))
-            
-            for sg in scraped:
-                scraped_away = normalize_team(sg.get('away_team', ''))
-                scraped_home = normalize_team(sg.get('home_team', ''))
-                
-                logger.debug(f"[NHL Match] Comparing DB: {db_away}@{db_home} vs Scraped: {scraped_away}@{scraped_home}")
-                
-                if (db_away.lower() == scraped_away.lower() and db_home.lower() == scraped_home.lower()):
-                    return sg
-                # Check reverse order
-                if (db_away.lower() == scraped_home.lower() and db_home.lower() == scraped_away.lower()):
-                    return sg
-                # Fuzzy match
-                if (db_away.lower() in scraped_away.lower() or scraped_away.lower() in db_away.lower()) and \
-                   (db_home.lower() in scraped_home.lower() or scraped_home.lower() in db_home.lower()):
-                    return sg
-            return None
+            return team_index.normalize(team_name, source='cbssports')
+        
         
         # Update games with scores
         updated_count = 0
@@ -16150,8 +19445,13 @@ async def update_nhl_scores(date: str = None):
         # NHL edge threshold is 0.5
         edge_threshold = 0.5
         
+        # Join stored games with scraped scores on canonical (date, away, home) keys
+        matching = match_games('NHL', db_games, scraped_games, date=date, source='cbssports')
+        await link_matched_games('NHL', date, matching['pairs'], source='cbs')
+        matched_games = {id(g): sg for g, sg in matching['pairs']}
+        
         for game in db_games:
-            matched = match_game(game, scraped_games)
+            matched = matched_games.get(id(game))
             if matched:
                 final_score = matched.get('final_score')
                 game['final_score'] = final_score
@@ -16239,6 +19539,7 @@ async def update_nhl_scores(date: str = None):
                 "scores_updated": datetime.now(arizona_tz).isoformat()
             }}
         )
+        await record_team_game_finals('NHL', date, db_games)
         
         logger.info(f"[NHL Scores] Updated {updated_count}/{len(db_games)} games")
         
@@ -16304,14 +19605,13 @@ async def update_ncaab_scores(date: str = None):
         db_games = db_data.get('games', [])
         logger.info(f"[NCAAB Scores] Found {len(db_games)} games in database")
         
+        team_index = get_team_index('NCAAB')
+        
         # Helper function to normalize NCAAB team names
         def normalize_team(team_name):
             if not team_name:
                 return ''
-            team_name = team_name.strip()
-            # Remove common prefixes/suffixes
-            team_name = team_name.replace('State', 'St.').replace('University', '')
-            return team_name
+            return team_index.normalize(team_name, source='cbssports')
         
         # Helper to get team abbreviation for Covers lookup (NCAAB uses different abbrevs)
         def get_team_abbrev(team_name):
@@ -16338,36 +19638,6 @@ async def update_ncaab_scores(date: str = None):
             # Default: use first 4 chars
             return team_upper.replace(' ', '')[:4]
         
-        # Helper function to match games (fuzzy matching for NCAAB)
-        def match_game(db_game, scraped):
-            db_away = normalize_team(db_game.get('away_team', '')).lower()
-            db_home = normalize_team(db_game.get('home_team', '')).lower()
-            
-            for sg in scraped:
-                scraped_away = normalize_team(sg.get('away_team', '')).lower()
-                scraped_home = normalize_team(sg.get('home_team', '')).lower()
-                
-                # Try to match by key words in team names
-                db_away_words = set(db_away.split())
-                db_home_words = set(db_home.split())
-                scraped_away_words = set(scraped_away.split())
-                scraped_home_words = set(scraped_home.split())
-                
-                # Match if significant overlap in team name words
-                away_match = len(db_away_words & scraped_away_words) >= 1 or db_away in scraped_away or scraped_away in db_away
-                home_match = len(db_home_words & scraped_home_words) >= 1 or db_home in scraped_home or scraped_home in db_home
-                
-                if away_match and home_match:
-                    return sg
-                    
-                # Try reverse order
-                away_match_rev = len(db_away_words & scraped_home_words) >= 1 or db_away in scraped_home or scraped_home in db_away
-                home_match_rev = len(db_home_words & scraped_away_words) >= 1 or db_home in scraped_away or scraped_away in db_home
-                
-                if away_match_rev and home_match_rev:
-                    return sg
-            
-            return None
         
         # Update games with scores
         updated_count = 0
@@ -16378,8 +19648,13 @@ async def update_ncaab_scores(date: str = None):
         # NCAAB edge threshold is 9
         edge_threshold = 9
         
+        # Join stored games with scraped scores on canonical (date, away, home) keys
+        matching = match_games('NCAAB', db_games, scraped_games, date=date, source='cbssports')
+        await link_matched_games('NCAAB', date, matching['pairs'], source='cbs')
+        matched_games = {id(g): sg for g, sg in matching['pairs']}
+        
         for game in db_games:
-            matched = match_game(game, scraped_games)
+            matched = matched_games.get(id(game))
             
             # IMPORTANT: Only update if scraped has a final score
             # Preserve existing scores if CBS doesn't have this game
@@ -16473,6 +19748,7 @@ async def update_ncaab_scores(date: str = None):
                 "scores_updated": datetime.now(arizona_tz).isoformat()
             }}
         )
+        await record_team_game_finals('NCAAB', date, db_games)
         
         logger.info(f"[NCAAB Scores] Updated {updated_count}/{len(db_games)} games")
         
@@ -16545,7 +19821,7 @@ async def update_nba_bet_results(date: str = None):
             logger.info("[NBA Bet Results] Logged in to plays888.co")
             
             # Navigate to History page
-            await service.page.goto('https://www.plays888.co/wager/History.aspx', timeout=30000)
+            await guarded_goto(service.page, plays888_url('/wager/History.aspx'), timeout=30000)
             await service.page.wait_for_load_state('domcontentloaded')
             await service.page.wait_for_timeout(3000)
             
@@ -16577,9 +19853,15 @@ async def update_nba_bet_results(date: str = None):
                 'WASHINGTON': 'Washington', 'WIZARDS': 'Washington'
             }
             
+            nba_index = get_team_index('NBA')
+            
             def normalize_team(team_str):
                 if not team_str:
                     return None
+                # Stored game names are the index's canonical names
+                canonical = nba_index.resolve(team_str, source='plays888')
+                if canonical:
+                    return canonical
                 team_upper = team_str.upper().strip()
                 for key, value in NBA_TEAMS.items():
                     if key in team_upper:
@@ -16840,7 +20122,7 @@ async def update_nhl_bet_results(date: str = None):
             logger.info("[NHL Bet Results] Logged in to plays888.co")
             
             # Navigate to History page
-            await service.page.goto('https://www.plays888.co/wager/History.aspx', timeout=30000)
+            await guarded_goto(service.page, plays888_url('/wager/History.aspx'), timeout=30000)
             await service.page.wait_for_load_state('domcontentloaded')
             await service.page.wait_for_timeout(3000)
             
@@ -16888,11 +20170,17 @@ async def update_nhl_bet_results(date: str = None):
                 'WINNIPEG': 'Winnipeg', 'JETS': 'Winnipeg'
             }
             
+            nhl_index = get_team_index('NHL')
+            
             def normalize_team(team_str):
                 if not team_str:
                     return None
                 # Clean up REG.TIME and period suffixes
                 team_upper = team_str.upper().strip().replace(' REG.TIME', '').replace('REG.TIME', '').replace(' 1ST PERIOD', '').replace(' 2ND PERIOD', '')
+                # Stored game names are the index's canonical names
+                canonical = nhl_index.resolve(team_upper, source='plays888')
+                if canonical:
+                    return canonical
                 for key, value in NHL_TEAMS.items():
                     if key in team_upper:
                         return value
@@ -17234,7 +20522,7 @@ async def update_ncaab_bet_results(date: str = None):
             logger.info("[NCAAB Bet Results] Logged in to plays888.co")
             
             # Navigate to History page
-            await service.page.goto('https://www.plays888.co/wager/History.aspx', timeout=30000)
+            await guarded_goto(service.page, plays888_url('/wager/History.aspx'), timeout=30000)
             await service.page.wait_for_load_state('domcontentloaded')
             await service.page.wait_for_timeout(3000)
             
@@ -17478,7 +20766,19 @@ async def update_ncaab_bet_results(date: str = None):
             return name
         
         def match_teams(db_game, bet):
-            """Match a bet to a database game"""
+            """Match a bet to a database game (shared alias index, then word matching)"""
+            game_teams = [db_game.get('away_team', ''), db_game.get('home_team', '')]
+            if bet.get('is_spread'):
+                team_index = get_team_index('NCAAB')
+                bet_team = team_index.resolve(bet.get('team_name', ''), source='plays888')
+                resolved = [team_index.resolve(team, source='cbssports') for team in game_teams]
+                if bet_team and all(resolved):
+                    return bet_team in resolved
+            else:
+                canonical_match = same_teams('NCAAB', game_teams, [bet.get('away_team', ''), bet.get('home_team', '')], source='plays888')
+                if canonical_match is not None:
+                    return canonical_match
+            
             db_away = normalize_team_name(db_game.get('away_team', ''))
             db_home = normalize_team_name(db_game.get('home_team', ''))
             
@@ -17715,6 +21015,9 @@ async def add_nhl_manual_data(data: dict):
             else:
                 return '🔴'
         
+        # PPG tables are keyed by TeamRankings names (shared alias index)
+        find_team = team_table_finder('NHL', source='manual')
+        
         # Process games
         processed_games = []
         
@@ -17723,18 +21026,6 @@ async def add_nhl_manual_data(data: dict):
             home_team = game.get('home', '')
             line = game.get('total')
             
-            # Get GPG data (with fuzzy matching)
-            def find_team(team_name, data_dict):
-                if not team_name:
-                    return None
-                if team_name in data_dict:
-                    return data_dict[team_name]
-                team_lower = team_name.lower()
-                for k, v in data_dict.items():
-                    if k.lower() == team_lower or team_lower in k.lower() or k.lower() in team_lower:
-                        return v
-                return None
-            
             away_gpg_rank = find_team(away_team, gpg_data['season_ranks'])
             away_gpg_value = find_team(away_team, gpg_data['season_values'])
             away_last3_rank = find_team(away_team, gpg_data['last3_ranks'])
@@ -18407,23 +21698,478 @@ async def refresh_nfl_opportunities(day: str = "today", use_live_lines: bool = F
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@api_router.post("/process/8pm")
-async def trigger_8pm_process():
+# ============================================================================
+# BACKGROUND JOBS - long-running endpoints return 202 + job id
+# ============================================================================
+# Refreshes and the 8PM/5AM processes scrape for minutes, longer than proxies
+# keep a request open. Their endpoints now submit a job: status, progress and
+# the result are persisted in db.jobs, at most JOB_MAX_CONCURRENT run at once
+# per process, and submitting the same kind + params while one is queued or
+# running returns that job instead of starting another.
+#
+# db.jobs is also the queue: job_worker_loop claims queued jobs by kind +
+# params (JOB_KINDS), so jobs can be run by this process (PROCESS_ROLE=all)
+# or by separate scraper workers (see PROCESS ROLES below). A running job
+# holds a lease that its worker renews; if the worker dies the job is
+# requeued (up to JOB_MAX_ATTEMPTS) by whichever worker notices first.
+
+JOB_MAX_CONCURRENT = int(os.environ.get('JOB_MAX_CONCURRENT', '2'))
+JOB_LIST_LIMIT = 100
+JOB_POLL_SECONDS = 2
+JOB_LEASE_SECONDS = 90
+JOB_MAX_ATTEMPTS = 3
+
+# kind -> (runner(params) -> awaitable, resource class)
+JOB_KINDS = {
+    'refresh_lines': (lambda p: refresh_lines_and_bets(p['league'], p['day']), 'browser'),
+    'refresh_nba': (lambda p: refresh_opportunities(p['day'], p['use_live_lines']), 'browser'),
+    'refresh_nhl': (lambda p: refresh_nhl_opportunities(p['day'], p['use_live_lines']), 'browser'),
+    'refresh_ncaab': (lambda p: refresh_ncaab_opportunities(p['day']), 'browser'),
+    'process_8pm': (lambda p: execute_8pm_process(p.get('date'), p.get('force', False)), 'browser'),
+    'process_8pm_openers': (lambda p: scrape_tomorrows_opening_lines(p.get('date'), p.get('force', False)), 'browser'),
+    'process_5am': (lambda p: morning_data_refresh(p.get('date'), p.get('force', False)), 'browser'),
+    'scrape_date': (lambda p: scrape_specific_date(p['date']), 'browser'),
+    'bet_check': (lambda p: run_monitoring_cycle(), 'monitor'),
+    'backfill_opening_lines': (lambda p: run_backfill_job('opening_lines', p), 'db'),
+    'backfill_consensus': (lambda p: run_backfill_job('consensus', p), 'browser'),
+    'backfill_scores': (lambda p: run_backfill_job('scores', p), 'browser'),
+}
+
+job_semaphore = asyncio.Semaphore(JOB_MAX_CONCURRENT)
+job_tasks: Dict[str, asyncio.Task] = {}  # jobs running in this process
+job_wakeup = asyncio.Event()  # set by submit_job so the local worker loop claims immediately
+current_job_id = contextvars.ContextVar('current_job_id', default=None)
+
+
+def job_dedupe_key(kind: str, params: Dict[str, Any]) -> str:
+    """Identical jobs share a key; a pipeline run is one job per (pipeline, date), forced or resumed alike"""
+    if kind in PIPELINE_JOB_KINDS:
+        return f"{kind}|date={params.get('date')}"
+    return kind + '|' + '&'.join(f"{k}={params[k]}" for k in sorted(params))
+
+
+def job_result_summary(result: Any) -> Dict[str, Any]:
+    """Top-level scalar fields of a result (success, counts, messages) for job listings"""
+    if not isinstance(result, dict):
+        return {}
+    return {k: v for k, v in result.items() if isinstance(v, (str, int, float, bool)) or v is None}
+
+
+async def update_job(job_id: str, **fields):
+    try:
+        await db.jobs.update_one({"job_id": job_id}, {"$set": {**fields, "updated_at": datetime.now(timezone.utc)}})
+    except Exception as e:
+        logger.error(f"[Jobs] Error updating job {job_id}: {e}")
+
+
+async def report_job_progress(step: str, percent: float = None):
+    """Record progress for the job running in this task (no-op outside a job)"""
+    job_id = current_job_id.get()
+    if not job_id:
+        return
+    progress = {"step": step}
+    if percent is not None:
+        progress["percent"] = round(percent, 1)
+    await update_job(job_id, progress=progress)
+
+
+async def renew_job_lease(job_id: str):
+    """Heartbeat for a running job; a failed renewal is logged and retried on the next beat"""
+    while True:
+        await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+        try:
+            await db.jobs.update_one({"job_id": job_id, "worker_id": WORKER_ID},
+                                     {"$set": {"lease_until": datetime.now(timezone.utc) + timedelta(seconds=JOB_LEASE_SECONDS)}})
+        except Exception as e:
+            logger.warning(f"[Jobs] Could not renew lease for {job_id}: {e}")
+
+
+async def run_job(job: Dict[str, Any]):
+    """Run a claimed job (holds a job_semaphore slot, released here)"""
+    from fastapi.encoders import jsonable_encoder
+    import json
+    job_id, kind = job["job_id"], job["kind"]
+    current_job_id.set(job_id)
+    heartbeat = asyncio.create_task(renew_job_lease(job_id))
+    finished = {"$unset": {"active_key": ""}}
+    try:
+        runner, resource = JOB_KINDS[kind]
+        started = datetime.now(timezone.utc)
+        logger.info(f"[Jobs] {kind} {job_id} running on {WORKER_ID}")
+        try:
+            result = jsonable_encoder(await run_with_resource(kind, resource, runner, job.get("params", {})))
+            # Stored as JSON text - results are keyed by team names, which may contain dots
+            finished["$set"] = {"status": "succeeded", "finished_at": datetime.now(timezone.utc),
+                                "duration_seconds": round((datetime.now(timezone.utc) - started).total_seconds(), 1),
+                                "progress": {"step": "done", "percent": 100},
+                                "result_json": json.dumps(result), "result_summary": job_result_summary(result)}
+            logger.info(f"[Jobs] {kind} {job_id} succeeded")
+        except HTTPException as e:
+            finished["$set"] = {"status": "failed", "finished_at": datetime.now(timezone.utc),
+                                "error": str(e.detail), "error_status": e.status_code}
+            logger.error(f"[Jobs] {kind} {job_id} failed: {e.detail}")
+        except Exception as e:
+            finished["$set"] = {"status": "failed", "finished_at": datetime.now(timezone.utc), "error": str(e), "error_status": 500}
+            logger.error(f"[Jobs] {kind} {job_id} failed: {e}")
+    finally:
+        heartbeat.cancel()
+        if "$set" in finished:
+            try:
+                await db.jobs.update_one({"job_id": job_id}, finished)
+            except Exception as e:
+                logger.error(f"[Jobs] Error finishing job {job_id}: {e}")
+        job_tasks.pop(job_id, None)
+        job_semaphore.release()
+
+
+async def claim_next_job() -> Optional[Dict[str, Any]]:
+    """Atomically take the oldest queued job for this worker"""
+    from pymongo import ReturnDocument
+    now = datetime.now(timezone.utc)
+    return await db.jobs.find_one_and_update(
+        {"status": "queued", "kind": {"$in": list(JOB_KINDS)}},
+        {"$set": {"status": "running", "worker_id": WORKER_ID, "started_at": now,
+                  "lease_until": now + timedelta(seconds=JOB_LEASE_SECONDS), "progress": {"step": "started"}},
+         "$inc": {"attempts": 1}},
+        sort=[("created_at", 1)],
+        return_document=ReturnDocument.AFTER
+    )
+
+
+async def requeue_expired_jobs():
+    """Jobs whose worker stopped renewing the lease go back to the queue (or give up after JOB_MAX_ATTEMPTS)"""
+    now = datetime.now(timezone.utc)
+    expired = {"status": "running", "lease_until": {"$lt": now}}
+    requeued = await db.jobs.update_many(
+        {**expired, "attempts": {"$lt": JOB_MAX_ATTEMPTS}},
+        {"$set": {"status": "queued", "progress": {"step": "requeued after worker loss"}}, "$unset": {"worker_id": ""}}
+    )
+    abandoned = await db.jobs.update_many(
+        expired,
+        {"$set": {"status": "interrupted", "error": "Worker stopped before the job finished", "finished_at": now},
+         "$unset": {"active_key": ""}}
+    )
+    if requeued.modified_count or abandoned.modified_count:
+        logger.warning(f"[Jobs] Expired leases: {requeued.modified_count} requeued, {abandoned.modified_count} interrupted")
+
+
+async def job_worker_loop():
+    """Claim and run queued jobs, at most JOB_MAX_CONCURRENT at a time in this process"""
+    logger.info(f"[Jobs] Worker loop started on {WORKER_ID} ({JOB_MAX_CONCURRENT} slots)")
+    while True:
+        try:
+            await requeue_expired_jobs()
+            await job_semaphore.acquire()
+            job_wakeup.clear()
+            job = await claim_next_job()
+            if not job:
+                job_semaphore.release()
+                try:
+                    await asyncio.wait_for(job_wakeup.wait(), JOB_POLL_SECONDS)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            job_tasks[job["job_id"]] = asyncio.create_task(run_job(job))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"[Jobs] Worker loop error: {e}")
+            await asyncio.sleep(JOB_POLL_SECONDS)
+
+
+async def submit_job(kind: str, params: Dict[str, Any]):
     """
-    Manually trigger the 8pm process for all leagues.
-    This runs:
-    #1 - Scrape tomorrow's games opening lines from ScoresAndOdds
-    #2 - Fill PPG data and 4-dot analysis for all games
+    Queue a job (runner and resource class from JOB_KINDS) and return a 202
+    response with its id. An identical queued/running job is returned instead
+    (deduplicated: true) - db.jobs.active_key is unique while a job is active,
+    so this also holds across API processes.
     """
+    from fastapi.responses import JSONResponse
+    from pymongo.errors import DuplicateKeyError
+    if kind not in JOB_KINDS:
+        raise HTTPException(status_code=400, detail=f"Unknown job kind: {kind}")
+    dedupe_key = job_dedupe_key(kind, params)
+    job_id = str(uuid.uuid4())
     try:
-        result = await execute_8pm_process()
-        return result
+        await db.jobs.insert_one({
+            "job_id": job_id,
+            "kind": kind,
+            "params": params,
+            "dedupe_key": dedupe_key,
+            "active_key": dedupe_key,
+            "status": "queued",
+            "attempts": 0,
+            "progress": {"step": "queued"},
+            "created_at": datetime.now(timezone.utc),
+        })
+    except DuplicateKeyError:
+        existing = await db.jobs.find_one({"active_key": dedupe_key}, {"_id": 0, "job_id": 1, "status": 1})
+        if existing:
+            return JSONResponse(status_code=202, content={
+                "job_id": existing["job_id"], "kind": kind, "status": existing["status"], "deduplicated": True,
+                "status_url": f"/api/jobs/{existing['job_id']}"
+            })
+        return await submit_job(kind, params)  # it finished in between
+    
+    job_wakeup.set()
+    logger.info(f"[Jobs] Queued {kind} {job_id} ({dedupe_key})")
+    return JSONResponse(status_code=202, content={
+        "job_id": job_id, "kind": kind, "status": "queued", "deduplicated": False,
+        "status_url": f"/api/jobs/{job_id}"
+    })
+
+
+async def recover_interrupted_jobs():
+    """Job indexes; jobs from before leases (no lease_until) can't be recovered - mark them"""
+    try:
+        await db.jobs.create_index("job_id", unique=True)
+        await db.jobs.create_index("active_key", unique=True, sparse=True)
+        await db.jobs.create_index([("status", 1), ("created_at", -1)])
+        result = await db.jobs.update_many(
+            {"status": "running", "lease_until": {"$exists": False}},
+            {"$set": {"status": "interrupted", "error": "Server restarted before the job finished",
+                      "finished_at": datetime.now(timezone.utc)},
+             "$unset": {"active_key": ""}}
+        )
+        if result.modified_count:
+            logger.info(f"[Jobs] Marked {result.modified_count} interrupted jobs")
     except Exception as e:
-        logger.error(f"Error in 8pm process: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
+        logger.error(f"[Jobs] Error recovering jobs: {e}")
+
+
+@api_router.get("/jobs")
+async def list_jobs(status: str = None, kind: str = None, limit: int = 20):
+    """Recent jobs, newest first (results omitted - see /jobs/{job_id})"""
+    query = {}
+    if status:
+        query["status"] = status
+    if kind:
+        query["kind"] = kind
+    jobs = await db.jobs.find(query, {"_id": 0, "result_json": 0}).sort("created_at", -1).to_list(min(limit, JOB_LIST_LIMIT))
+    running = await db.jobs.count_documents({"status": "running"})
+    return {"jobs": jobs, "running": running, "max_concurrent_per_worker": JOB_MAX_CONCURRENT}
+
+
+@api_router.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Job status and progress; includes the result once it succeeded"""
+    import json
+    job = await db.jobs.find_one({"job_id": job_id}, {"_id": 0, "active_key": 0})
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    result_json = job.pop("result_json", None)
+    if result_json is not None:
+        job["result"] = json.loads(result_json)
+    return job
+
+
+@api_router.post("/opportunities/refresh-lines", status_code=202)
+async def submit_refresh_lines_and_bets(league: str = "NBA", day: str = "today"):
+    """Refresh live lines and open bets from plays888.co (background job)"""
+    return await submit_job("refresh_lines", {"league": league, "day": day})
+
+
+@api_router.post("/opportunities/refresh", status_code=202)
+async def submit_refresh_opportunities(day: str = "today", use_live_lines: bool = False):
+    """Refresh NBA opportunities (background job)"""
+    return await submit_job("refresh_nba", {"day": day, "use_live_lines": use_live_lines})
+
+
+@api_router.post("/opportunities/nhl/refresh", status_code=202)
+async def submit_refresh_nhl_opportunities(day: str = "today", use_live_lines: bool = False):
+    """Refresh NHL opportunities (background job)"""
+    return await submit_job("refresh_nhl", {"day": day, "use_live_lines": use_live_lines})
+
+
+@api_router.post("/opportunities/ncaab/refresh", status_code=202)
+async def submit_refresh_ncaab_opportunities(day: str = "today"):
+    """Refresh NCAAB opportunities (background job)"""
+    return await submit_job("refresh_ncaab", {"day": day})
+
+
+@api_router.post("/process/8pm", status_code=202)
+async def submit_8pm_process(force: bool = False):
+    """Run the 8pm process for all leagues (background job); stages already done for tomorrow are skipped unless force"""
+    from zoneinfo import ZoneInfo
+    tomorrow = (datetime.now(ZoneInfo('America/Phoenix')) + timedelta(days=1)).strftime('%Y-%m-%d')
+    return await submit_job("process_8pm", {"date": tomorrow, "force": force})
+
+
+@api_router.post("/process/scrape-date/{target_date}", status_code=202)
+async def submit_scrape_specific_date(target_date: str):
+    """Scrape games for a specific date, YYYY-MM-DD (background job)"""
+    try:
+        datetime.strptime(target_date, '%Y-%m-%d')
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+    return await submit_job("scrape_date", {"date": target_date})
+
+
+@api_router.post("/process/5am", status_code=202)
+async def submit_5am_process(force: bool = False):
+    """Run the 5am morning process (background job); stages already done for yesterday are skipped unless force"""
+    from zoneinfo import ZoneInfo
+    yesterday = (datetime.now(ZoneInfo('America/Phoenix')) - timedelta(days=1)).strftime('%Y-%m-%d')
+    return await submit_job("process_5am", {"date": yesterday, "force": force})
+
+
+# ============================================================================
+# PROCESS ROLES - API process vs scraper workers
+# ============================================================================
+# PROCESS_ROLE=all (default) keeps everything in the uvicorn process as before.
+# With PROCESS_ROLE=api the server only serves requests and enqueues jobs;
+# `python worker.py` processes (PROCESS_ROLE=worker) claim jobs from db.jobs,
+# and one of them - whoever holds the "scheduler" lease in db.process_leases -
+# also runs APScheduler, the bet monitoring loop and the startup resume hooks.
+# If the leader dies another worker takes over once the lease expires.
+#
+# Diagnostics kept in process memory (unresolved team names, match reports, job
+# resource stats, outbound host guards) are gathered where the scrapes run. Each
+# worker publishes them with its heartbeat, and under PROCESS_ROLE=api
+# /teams/unresolved, /games/match-diagnostics, /scheduler/jobs and
+# /process/status add a "workers" view next to the API process's own. The
+# heartbeat also reloads new team aliases, so POST /teams/aliases reaches the
+# workers within one beat; profile arms are shared through db.profile_arms.
+
+SCHEDULER_LEASE_SECONDS = 90
+WORKER_HEARTBEAT_STALE_SECONDS = 180
+WORKER_STATE_UNRESOLVED_LIMIT = 100  # unresolved names per league published with the heartbeat
+
+is_scheduler_leader = PROCESS_ROLE == 'all'
+scheduled_duties_started = False
+
+
+async def start_scheduled_duties():
+    """Resume hooks, bet monitoring and scheduled jobs - run by exactly one process"""
+    global scheduled_duties_started
+    scheduled_duties_started = True
+    await resume_backfill_runs()  # re-queues backfills cut off by the restart
+    await resume_pipeline_runs()  # unfinished 8PM/5AM stages
+    if PROCESS_ROLE == 'worker':
+        # The loop reads monitor_config itself, so /monitoring/start on the API takes effect here
+        asyncio.create_task(monitoring_loop())
+    else:
+        await auto_start_monitoring()
+    schedule_daily_summary()
+    await startup_recovery()  # Check if we missed anything overnight
+    await process_pending_deletions()  # Clean up any scheduled deletions from before restart
+
+
+async def monitoring_enabled_in_config() -> bool:
+    """Monitoring on/off as stored by /monitoring/start|stop (shared by all processes)"""
+    conn = await db.connections.find_one({}, {"_id": 0, "is_connected": 1}, sort=[("created_at", -1)])
+    if not conn or not conn.get("is_connected"):
+        return False
+    monitor_config = await db.monitor_config.find_one({}, {"_id": 0})
+    return bool(monitor_config and monitor_config.get("auto_start", True))
+
+
+async def try_acquire_scheduler_lease() -> bool:
+    from pymongo.errors import DuplicateKeyError
+    now = datetime.now(timezone.utc)
+    try:
+        await db.process_leases.update_one(
+            {"_id": "scheduler", "$or": [{"holder": WORKER_ID}, {"expires_at": {"$lt": now}}]},
+            {"$set": {"holder": WORKER_ID, "renewed_at": now,
+                      "expires_at": now + timedelta(seconds=SCHEDULER_LEASE_SECONDS)}},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        return False  # held by another live worker
+
+
+async def scheduler_leader_loop():
+    """Keep (or wait for) the scheduler lease and record this worker's heartbeat"""
+    global is_scheduler_leader
+    while True:
+        try:
+            leader = await try_acquire_scheduler_lease()
+            if leader and not is_scheduler_leader:
+                is_scheduler_leader = True
+                logger.info(f"[Worker] {WORKER_ID} is now the scheduler leader")
+                if not scheduled_duties_started:
+                    await start_scheduled_duties()
+                if not scheduler.running:
+                    scheduler.start()
+                else:
+                    scheduler.resume()
+            elif not leader and is_scheduler_leader:
+                is_scheduler_leader = False
+                logger.warning(f"[Worker] {WORKER_ID} lost the scheduler lease - pausing scheduled jobs")
+                if scheduler.running:
+                    scheduler.pause()
+            
+            await load_team_aliases_from_db()
+            await db.workers.update_one(
+                {"_id": WORKER_ID},
+                {"$set": {"role": PROCESS_ROLE, "leader": is_scheduler_leader, "running_jobs": list(job_tasks),
+                          "state": worker_state_snapshot(), "last_seen": datetime.now(timezone.utc)}},
+                upsert=True
+            )
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.error(f"[Worker] Leader loop error: {e}")
+        await asyncio.sleep(SCHEDULER_LEASE_SECONDS / 3)
+
+
+async def release_scheduler_lease():
+    try:
+        await db.process_leases.delete_one({"_id": "scheduler", "holder": WORKER_ID})
+        await db.workers.delete_one({"_id": WORKER_ID})
+    except Exception as e:
+        logger.debug(f"[Worker] Could not release lease: {e}")
+
+
+def worker_state_snapshot() -> str:
+    """This process's in-memory diagnostics as JSON text (host names and team names contain dots)"""
+    import json
+    return json.dumps({
+        "unresolved": {
+            league: sorted(index.misses.values(), key=lambda m: m["count"], reverse=True)[:WORKER_STATE_UNRESOLVED_LIMIT]
+            for league, index in team_name_indexes.items()
+        },
+        "match_reports": list(game_match_reports.values()),
+        "job_resources": resource_scheduler_status(),
+        "outbound_hosts": {host: guard.status() for host, guard in sorted(host_guards.items())},
+    }, default=str)
+
+
+async def worker_states(section: str) -> Dict[str, Any]:
+    """worker_id -> one section of the state each live worker published with its heartbeat"""
+    import json
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=WORKER_HEARTBEAT_STALE_SECONDS)
+    workers = await db.workers.find({"last_seen": {"$gte": cutoff}, "state": {"$exists": True}},
+                                    {"state": 1}).to_list(50)
+    return {w["_id"]: json.loads(w["state"]).get(section) for w in workers}
+
+
+async def worker_status() -> Dict[str, Any]:
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=WORKER_HEARTBEAT_STALE_SECONDS)
+    workers = await db.workers.find({"last_seen": {"$gte": cutoff}}, {"state": 0}).to_list(50)
+    return {
+        "role": PROCESS_ROLE,
+        "process": WORKER_ID,
+        "scheduler_leader": is_scheduler_leader,
+        "workers": [{"worker_id": w.pop("_id"), **w} for w in workers],
+        "queued_jobs": await db.jobs.count_documents({"status": "queued"}),
+    }
+
+
+async def run_worker():
+    """Entry point for worker.py: job loop + scheduler leadership, until cancelled"""
+    logger.info(f"[Worker] {WORKER_ID} starting")
+    await init_process_state()
+    try:
+        await asyncio.gather(job_worker_loop(), scheduler_leader_loop())
+    finally:
+        if scheduler.running:
+            scheduler.shutdown(wait=False)
+        await release_scheduler_lease()
+        await plays888_service.close()
 
 
-@api_router.post("/process/scrape-date/{target_date}")
 async def scrape_specific_date(target_date: str):
     """
     Manually scrape games for a specific date (YYYY-MM-DD format).
@@ -18454,11 +22200,8 @@ async def scrape_specific_date(target_date: str):
                 elif league == 'NBA':
                     games = await scrape_cbssports_nba(target_date)
                 elif league == 'NHL':
-                    games = await scrape_cbssports_nhl(target_date)
-                    if not games:
-                        # Fallback to NHL API if CBS fails
-                        logger.warning(f"[Manual Scrape] CBS Sports failed for NHL, trying NHL API fallback...")
-                        games = await scrape_nhl_api_schedule(target_date)
+                    # CBS first, hedged with ScoresAndOdds / NHL API if it's slow or fails
+                    games, _ = await hedged_fetch('lines', 'NHL', target_date)
                 else:
                     games = []
                 
@@ -18576,23 +22319,6 @@ async def scrape_specific_date(target_date: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@api_router.post("/process/5am")
-async def trigger_5am_process():
-    """
-    Manually trigger the 5am morning process for all leagues.
-    This runs:
-    #4 - Get yesterday's scores from ScoresAndOdds + mark edge HITs/MISSes
-    #5 - Get bet results from Plays888 History
-    #6 - Update betting and edge records
-    """
-    try:
-        result = await morning_data_refresh()
-        return result
-    except Exception as e:
-        logger.error(f"Error in 5am process: {e}")
-        raise HTTPException(status_code=500, detail=str(e))
-
-
 # ================= RANKING PPG FEATURE =================
 
 class RankingPPGUpdate(BaseModel):
@@ -19318,6 +23044,20 @@ async def get_process_status():
                 "has_combined_ppg": False
             }
     
+    status["outbound_hosts"] = {host: guard.status() for host, guard in sorted(host_guards.items())}
+    status["hedged_fetch"] = hedged_fetch_summary()
+    status["job_resources"] = resource_scheduler_status()
+    status["process_roles"] = await worker_status()
+    if PROCESS_ROLE == 'api':
+        status["workers_outbound_hosts"] = await worker_states("outbound_hosts")
+        status["workers_job_resources"] = await worker_states("job_resources")
+    status["event_loop"] = event_loop_lag_summary()
+    status["scrape_single_flight"] = {
+        **scrape_single_flight_stats,
+        "in_flight": [list(key) for key in scrape_inflight],
+        "ttl_seconds": SCRAPE_SINGLE_FLIGHT_TTL_SECONDS
+    }
+    
     return status
 
 
@@ -19394,7 +23134,7 @@ async def scrape_first_period_bets_enano():
         logger.info("[1st Period Bets] Logged in successfully")
         
         # Navigate to History page
-        await service.page.goto('https://www.plays888.co/wager/History.aspx', timeout=30000)
+        await guarded_goto(service.page, plays888_url('/wager/History.aspx'), timeout=30000)
         await service.page.wait_for_load_state('networkidle')
         await service.page.wait_for_timeout(2000)
         
@@ -20793,7 +24533,7 @@ async def debug_first_period_scrape():
         logger.info("[Debug Scrape] Logged in successfully")
         
         # Navigate to History page
-        await service.page.goto('https://www.plays888.co/wager/History.aspx', timeout=30000)
+        await guarded_goto(service.page, plays888_url('/wager/History.aspx'), timeout=30000)
         await service.page.wait_for_load_state('networkidle')
         await service.page.wait_for_timeout(3000)
         
@@ -20866,7 +24606,7 @@ async def fetch_nhl_first_period_goals():
             date_str = current_date.strftime("%Y-%m-%d")
             try:
                 # Get schedule for this date
-                response = await http_client.get(f"{NHL_API_BASE}/schedule/{date_str}")
+                response = await guarded_get(http_client, f"{NHL_API_BASE}/schedule/{date_str}")
                 if response.status_code == 200:
                     data = response.json()
                     for day_data in data.get("gameWeek", []):
@@ -20876,7 +24616,7 @@ async def fetch_nhl_first_period_goals():
                                 game_date = day_data["date"]
                                 
                                 # Get play-by-play to check 1st period goals
-                                pbp_response = await http_client.get(f"{NHL_API_BASE}/gamecenter/{game_id}/play-by-play")
+                                pbp_response = await guarded_get(http_client, f"{NHL_API_BASE}/gamecenter/{game_id}/play-by-play")
                                 if pbp_response.status_code == 200:
                                     pbp_data = pbp_response.json()
                                     away_team_id = pbp_data.get("awayTeam", {}).get("id")
@@ -21266,8 +25006,13 @@ async def update_consensus_data(league: str, data: dict):
         
         team_map = nhl_team_map if league_upper == 'NHL' else nba_team_map
         
+        team_index = get_team_index(league_upper)
+        
         def normalize_team(name):
-            """Normalize team name for matching"""
+            """Normalize team name for matching (shared alias index, then the abbreviation map)"""
+            canonical = team_index.resolve(name, source='consensus')
+            if canonical:
+                return canonical
             name_upper = name.upper().strip()
             if name_upper in team_map:
                 return team_map[name_upper]
@@ -21279,74 +25024,67 @@ async def update_consensus_data(league: str, data: dict):
         
         updates_made = 0
         
-        for game_update in games_data:
-            away_input = game_update.get('away', '')
-            home_input = game_update.get('home', '')
-            
-            away_normalized = normalize_team(away_input)
-            home_normalized = normalize_team(home_input)
+        # Payload names go through the abbreviation map first (MON, NAS, CLB...), then
+        # both sides are joined on canonical team keys; away/home are taken as given
+        updates = [{"away": normalize_team(game_update.get('away', '')), "home": normalize_team(game_update.get('home', '')),
+                    "update": game_update} for game_update in games_data]
+        matching = match_games(league_upper, existing_games, updates, date=target_date, source='manual_consensus', allow_swapped=False)
+        
+        for game, row in matching['pairs']:
+            game_update = row["update"]
+            away_normalized, home_normalized = row["away"], row["home"]
+            
+            # Update consensus data
+            if 'away_consensus_pct' in game_update:
+                game['away_consensus_pct'] = game_update['away_consensus_pct']
+            if 'home_consensus_pct' in game_update:
+                game['home_consensus_pct'] = game_update['home_consensus_pct']
+            if 'away_spread' in game_update:
+                game['away_spread'] = game_update['away_spread']
+            if 'home_spread' in game_update:
+                game['home_spread'] = game_update['home_spread']
+            
+            # For NHL, also set moneyline fields (used by frontend for ML columns)
+            if league_upper == 'NHL':
+                # Determine favorite (negative moneyline) for moneyline_team
+                away_ml = game_update.get('away_spread')
+                home_ml = game_update.get('home_spread')
+                
+                if away_ml is not None and home_ml is not None:
+                    # Set the favorite's moneyline (current)
+                    if away_ml < 0 and (home_ml > 0 or away_ml < home_ml):
+                        game['moneyline'] = away_ml
+                        game['moneyline_team'] = away_normalized
+                        # Only set opening_moneyline if it doesn't exist yet
+                        if not game.get('opening_moneyline'):
+                            game['opening_moneyline'] = away_ml
+                            game['opening_moneyline_team'] = away_normalized
+                    else:
+                        game['moneyline'] = home_ml
+                        game['moneyline_team'] = home_normalized
+                        # Only set opening_moneyline if it doesn't exist yet
+                        if not game.get('opening_moneyline'):
+                            game['opening_moneyline'] = home_ml
+                            game['opening_moneyline_team'] = home_normalized
+            
+            # Also update opening line if provided
+            if 'total' in game_update and game_update['total']:
+                game['total'] = game_update['total']
+                if not game.get('opening_line'):
+                    game['opening_line'] = game_update['total']
+                
+                # Recalculate Edge if we have GPG Avg and Line
+                gpg_avg = game.get('gpg_avg') or game.get('ppg_avg')
+                if gpg_avg:
+                    try:
+                        edge = round(float(gpg_avg) - float(game_update['total']), 1)
+                        game['edge'] = edge
+                        logger.info(f"[Manual Consensus] Calculated Edge for {away_normalized} @ {home_normalized}: {gpg_avg} - {game_update['total']} = {edge}")
+                    except (ValueError, TypeError):
+                        pass
             
-            # Find matching game in existing data
-            for game in existing_games:
-                game_away = game.get('away_team', game.get('away', ''))
-                game_home = game.get('home_team', game.get('home', ''))
-                
-                # Check if this is the matching game
-                if (normalize_team(game_away) == away_normalized and 
-                    normalize_team(game_home) == home_normalized):
-                    
-                    # Update consensus data
-                    if 'away_consensus_pct' in game_update:
-                        game['away_consensus_pct'] = game_update['away_consensus_pct']
-                    if 'home_consensus_pct' in game_update:
-                        game['home_consensus_pct'] = game_update['home_consensus_pct']
-                    if 'away_spread' in game_update:
-                        game['away_spread'] = game_update['away_spread']
-                    if 'home_spread' in game_update:
-                        game['home_spread'] = game_update['home_spread']
-                    
-                    # For NHL, also set moneyline fields (used by frontend for ML columns)
-                    if league_upper == 'NHL':
-                        # Determine favorite (negative moneyline) for moneyline_team
-                        away_ml = game_update.get('away_spread')
-                        home_ml = game_update.get('home_spread')
-                        
-                        if away_ml is not None and home_ml is not None:
-                            # Set the favorite's moneyline (current)
-                            if away_ml < 0 and (home_ml > 0 or away_ml < home_ml):
-                                game['moneyline'] = away_ml
-                                game['moneyline_team'] = away_normalized
-                                # Only set opening_moneyline if it doesn't exist yet
-                                if not game.get('opening_moneyline'):
-                                    game['opening_moneyline'] = away_ml
-                                    game['opening_moneyline_team'] = away_normalized
-                            else:
-                                game['moneyline'] = home_ml
-                                game['moneyline_team'] = home_normalized
-                                # Only set opening_moneyline if it doesn't exist yet
-                                if not game.get('opening_moneyline'):
-                                    game['opening_moneyline'] = home_ml
-                                    game['opening_moneyline_team'] = home_normalized
-                    
-                    # Also update opening line if provided
-                    if 'total' in game_update and game_update['total']:
-                        game['total'] = game_update['total']
-                        if not game.get('opening_line'):
-                            game['opening_line'] = game_update['total']
-                        
-                        # Recalculate Edge if we have GPG Avg and Line
-                        gpg_avg = game.get('gpg_avg') or game.get('ppg_avg')
-                        if gpg_avg:
-                            try:
-                                edge = round(float(gpg_avg) - float(game_update['total']), 1)
-                                game['edge'] = edge
-                                logger.info(f"[Manual Consensus] Calculated Edge for {away_normalized} @ {home_normalized}: {gpg_avg} - {game_update['total']} = {edge}")
-                            except (ValueError, TypeError):
-                                pass
-                    
-                    updates_made += 1
-                    logger.info(f"[Manual Consensus] Updated {away_normalized} @ {home_normalized}")
-                    break
+            updates_made += 1
+            logger.info(f"[Manual Consensus] Updated {away_normalized} @ {home_normalized}")
         
         # Save updated document
         await collection.update_one(
@@ -21697,6 +25435,143 @@ async def download_backup(backup_id: str):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+# ============================================================================
+# REQUEST TIMING - per-route latency, size and status
+# ============================================================================
+# RequestTimingMiddleware (pure ASGI, so streamed exports are timed to the last
+# byte) records every request against its route template, e.g.
+# /api/opportunities/{league}. The last ENDPOINT_SAMPLE_SIZE latencies per route
+# give rolling percentiles at /debug/endpoints; requests slower than
+# SLOW_REQUEST_MS are logged with their query string.
+
+ENDPOINT_SAMPLE_SIZE = 500
+SLOW_REQUEST_MS = int(os.environ.get('SLOW_REQUEST_MS', '2000'))
+SLOW_REQUEST_HISTORY = 50
+
+endpoint_stats: Dict[Tuple[str, str], Dict[str, Any]] = {}
+slow_requests = deque(maxlen=SLOW_REQUEST_HISTORY)
+route_templates_by_endpoint: Dict[Any, List[Any]] = {}
+
+
+def route_template(scope) -> str:
+    """Path template of the route that handled the request"""
+    endpoint = scope.get("endpoint")
+    if endpoint is None:
+        return "<unmatched>"
+    if not route_templates_by_endpoint:
+        for route in app.router.routes:
+            route_templates_by_endpoint.setdefault(getattr(route, "endpoint", None), []).append(route)
+    routes = route_templates_by_endpoint.get(endpoint, [])
+    if len(routes) == 1:
+        return routes[0].path
+    from starlette.routing import Match
+    for route in routes:
+        if route.matches(scope)[0] == Match.FULL:
+            return route.path
+    return scope.get("path", "<unknown>")
+
+
+def record_request(method: str, template: str, status: int, seconds: float, size: int, query: str):
+    stats = endpoint_stats.get((method, template))
+    if stats is None:
+        stats = endpoint_stats[(method, template)] = {
+            "count": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0, "total_bytes": 0,
+            "status": {}, "samples": deque(maxlen=ENDPOINT_SAMPLE_SIZE),
+        }
+    stats["count"] += 1
+    stats["errors"] += status >= 500
+    stats["total_seconds"] += seconds
+    stats["max_seconds"] = max(stats["max_seconds"], seconds)
+    stats["total_bytes"] += size
+    status_class = f"{status // 100}xx"
+    stats["status"][status_class] = stats["status"].get(status_class, 0) + 1
+    stats["samples"].append(seconds)
+    observe_metric('http_request_seconds', seconds, method=method, route=template, status=status_class)
+    
+    if seconds * 1000 >= SLOW_REQUEST_MS:
+        target = f"{template}?{query}" if query else template
+        logger.warning(f"[Slow] {method} {target} took {seconds * 1000:.0f}ms (status {status}, {size} bytes)")
+        slow_requests.append({
+            "at": datetime.now(timezone.utc).isoformat(), "method": method, "route": template,
+            "query": query, "status": status, "ms": round(seconds * 1000), "bytes": size,
+        })
+
+
+class RequestTimingMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        import time
+        started = time.monotonic()
+        response = {"status": 500, "bytes": 0}
+        work_origin.set(scope)  # route template is resolved lazily, once routing has run
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                response["status"] = message["status"]
+            elif message["type"] == "http.response.body":
+                response["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            try:
+                record_request(scope["method"], route_template(scope), response["status"], time.monotonic() - started,
+                               response["bytes"], scope.get("query_string", b"").decode("latin-1"))
+            except Exception as e:
+                logger.debug(f"[Timing] Could not record request: {e}")
+
+
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+
+@api_router.get("/debug/endpoints")
+async def get_endpoint_timings(sort: str = "total", limit: int = 50, route: str = None):
+    """
+    Per-route latency summary. Percentiles cover the last ENDPOINT_SAMPLE_SIZE
+    requests; sort by total (time spent since start), p95, max or count.
+    """
+    rows = []
+    for (method, template), stats in endpoint_stats.items():
+        if route and route not in template:
+            continue
+        samples = sorted(stats["samples"])
+        ms = lambda value: round(value * 1000, 1) if value is not None else None
+        rows.append({
+            "method": method,
+            "route": template,
+            "count": stats["count"],
+            "errors": stats["errors"],
+            "status": stats["status"],
+            "total_seconds": round(stats["total_seconds"], 2),
+            "avg_ms": ms(stats["total_seconds"] / stats["count"]),
+            "p50_ms": ms(percentile(samples, 50)),
+            "p90_ms": ms(percentile(samples, 90)),
+            "p95_ms": ms(percentile(samples, 95)),
+            "p99_ms": ms(percentile(samples, 99)),
+            "max_ms": ms(stats["max_seconds"]),
+            "avg_bytes": round(stats["total_bytes"] / stats["count"]),
+        })
+    sort_keys = {"total": "total_seconds", "p95": "p95_ms", "max": "max_ms", "count": "count"}
+    if sort not in sort_keys:
+        raise HTTPException(status_code=400, detail=f"sort must be one of {', '.join(sort_keys)}")
+    rows.sort(key=lambda row: row[sort_keys[sort]] or 0, reverse=True)
+    return {
+        "slow_request_ms": SLOW_REQUEST_MS,
+        "sample_size": ENDPOINT_SAMPLE_SIZE,
+        "routes": rows[:limit],
+        "slow_requests": list(slow_requests)[::-1],
+    }
+
+
 # Include the router in the main app
 app.include_router(api_router)
 
@@ -21708,6 +25583,8 @@ app.add_middleware(
     allow_headers=["*"],
     expose_headers=["Content-Disposition"],
 )
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(RequestTimingMiddleware)
 
 
 @app.on_event("shutdown")
@@ -21716,5 +25593,7 @@ async def shutdown_db_client():
     monitoring_enabled = False
     if scheduler.running:
         scheduler.shutdown()
+    if is_scheduler_leader and PROCESS_ROLE != 'all':
+        await release_scheduler_lease()
     client.close()
     await plays888_service.close()
@@ -0,0 +1,88 @@
+"""
+Team last-3 scores from the team_game_log collection (sync pymongo), for the
+standalone NCAAB PPG scripts. The server writes a row per team per stored final;
+see "TEAM GAME LOG" in server.py.
+"""
+import os
+from datetime import datetime, timedelta
+
+MAX_AGE_DAYS = 10
+aliases_loaded = set()  # leagues whose db.team_aliases were applied in this process
+
+
+def server_module():
+    """server.py, for its team name index and key helpers"""
+    # server.py reads these at import; same defaults the scripts connect with
+    os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+    os.environ.setdefault('DB_NAME', 'test_database')
+    import server
+    return server
+
+
+def load_team_aliases(db, league: str):
+    """Apply the aliases added through POST /teams/aliases, as the server does at startup"""
+    if league in aliases_loaded:
+        return
+    team_index = server_module().get_team_index(league)
+    for entry in db.team_aliases.find({"league": league}, {"_id": 0, "alias": 1, "canonical": 1}):
+        team_index.add(entry["alias"], entry["canonical"])
+    aliases_loaded.add(league)
+
+
+def canonical_team_keys(db, teams, league: str = 'NCAAB') -> dict:
+    """team_key per raw name (CBS link text etc.), computed exactly as the server writes team_game_log rows"""
+    server = server_module()
+    load_team_aliases(db, league)
+    team_index = server.get_team_index(league)
+    return {team: server.game_log_team_key(team_index, team) for team in teams if team}
+
+
+def last3_from_game_log(db, teams, target_date: str, league: str = 'NCAAB', max_age_days: int = MAX_AGE_DAYS):
+    """
+    Returns:
+        ({team: {'last3_scores', 'last3_avg'}}, [teams that still need scraping])
+
+    A team needs scraping when it has fewer than 3 logged games, its last logged
+    game is older than max_age_days, or it appears on a stored slate after its
+    last logged game (a final we never recorded). Teams are matched on the
+    canonical team_key, so scoreboard spellings find the server's rows.
+    """
+    target = datetime.strptime(target_date, '%Y-%m-%d')
+    keys = canonical_team_keys(db, teams, league)
+    server = server_module()
+    season_start = server.season_start_for(target_date)
+
+    rows_by_key = {}
+    for row in db.team_game_log.find(
+        {"league": league, "team_key": {"$in": list(set(keys.values()))}, "date": {"$gte": season_start, "$lt": target_date}},
+        {"_id": 0, "team_key": 1, "date": 1, "points_for": 1}
+    ).sort("date", -1):
+        rows = rows_by_key.setdefault(row["team_key"], [])
+        if len(rows) < 3:
+            rows.append(row)
+
+    # Latest stored slate each team played on after its last logged game (same rule
+    # as team_ppg_from_game_log); teams last logged before the age cutoff are missing anyway
+    last_logged = [rows[0]["date"] for rows in rows_by_key.values()]
+    last_slate = {}
+    if last_logged:
+        since = max(min(last_logged), (target - timedelta(days=max_age_days)).strftime('%Y-%m-%d'))
+        last_slate = server.latest_slate_by_team(server.get_team_index(league), db[f"{league.lower()}_opportunities"].find(
+            {"date": {"$gt": since, "$lt": target_date}},
+            {"_id": 0, "date": 1, "games.away_team": 1, "games.home_team": 1, "games.away": 1, "games.home": 1}
+        ))
+
+    found = {}
+    missing = []
+    for team in teams:
+        key = keys.get(team)
+        rows = rows_by_key.get(key, []) if key else []
+        if len(rows) < 3 or (target - datetime.strptime(rows[0]["date"], '%Y-%m-%d')).days > max_age_days:
+            missing.append(team)
+            continue
+        if last_slate.get(key, '') > rows[0]["date"]:
+            missing.append(team)
+            continue
+        last3 = [row["points_for"] for row in rows]
+        found[team] = {'last3_scores': last3, 'last3_avg': round(sum(last3) / len(last3), 1)}
+    return found, missing
@@ -0,0 +1,180 @@
+#!/usr/bin/env python3
+"""
+Local Telegram Bot API stand-in - sendMessage, editMessageText and deleteMessage.
+
+Answers like api.telegram.org (same JSON envelope and error texts) with
+configurable latency and flood control: per-chat and global message rates
+answered with 429 + retry_after once exceeded, plus an optional random 429
+fraction. Messages are kept in memory so edits/deletes of unknown ids fail
+the way Telegram does.
+
+Point the backend at it with TELEGRAM_API_BASE_URL:
+    python telegram_standin.py --port 8081 --per-chat-rate 1 --latency-ms 80
+    TELEGRAM_API_BASE_URL=http://127.0.0.1:8081 python benchmark.py --only notifications --notify-bets 200
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from collections import deque
+from urllib.parse import parse_qs
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+class StandinConfig:
+    """Command line settings shared by the request handlers"""
+
+    def __init__(self, args):
+        self.latency_ms = args.latency_ms
+        self.jitter_ms = args.jitter_ms
+        self.per_chat_rate = args.per_chat_rate
+        self.global_rate = args.global_rate
+        self.random_429 = args.random_429
+        self.retry_after = args.retry_after
+
+
+config: StandinConfig = None
+messages = {}  # (chat_id, message_id) -> text
+next_message_id = {}  # chat_id -> next id
+sent_at = {"global": deque()}  # chat_id / "global" -> send times within the last second
+stats = {"requests": 0, "rate_limited": 0, "methods": {}, "errors": {}}
+MAX_MESSAGE_LENGTH = 4096
+
+app = FastAPI()
+
+
+def ok(result) -> JSONResponse:
+    return JSONResponse({"ok": True, "result": result})
+
+
+def error(code: int, description: str, **parameters) -> JSONResponse:
+    stats["errors"][description] = stats["errors"].get(description, 0) + 1
+    body = {"ok": False, "error_code": code, "description": description}
+    if parameters:
+        body["parameters"] = parameters
+    return JSONResponse(body, status_code=code)
+
+
+def message_json(chat_id: int, message_id: int, text: str, edited: bool = False) -> dict:
+    message = {"message_id": message_id, "date": int(time.time()),
+               "chat": {"id": chat_id, "type": "group" if chat_id < 0 else "private", "title": "stand-in"},
+               "from": {"id": 1, "is_bot": True, "first_name": "standin", "username": "standin_bot"},
+               "text": text}
+    if edited:
+        message["edit_date"] = int(time.time())
+    return message
+
+
+def store_message(chat_id: int, text: str) -> int:
+    message_id = next_message_id.get(chat_id, 1)
+    next_message_id[chat_id] = message_id + 1
+    messages[(chat_id, message_id)] = text
+    return message_id
+
+
+def flood_limited(chat_id: int) -> bool:
+    """Sliding one-second windows per chat and globally, like Telegram's flood control"""
+    now = time.monotonic()
+    windows = [(sent_at["global"], config.global_rate), (sent_at.setdefault(chat_id, deque()), config.per_chat_rate)]
+    for window, rate in windows:
+        while window and now - window[0] > 1.0:
+            window.popleft()
+        if rate and len(window) >= rate:
+            return True
+    for window, _ in windows:
+        window.append(now)
+    return False
+
+
+async def read_params(request: Request) -> dict:
+    """python-telegram-bot posts form data; accept JSON too"""
+    body = (await request.body()).decode()
+    if request.headers.get('content-type', '').startswith('application/json'):
+        return json.loads(body or '{}')
+    return {key: values[0] for key, values in parse_qs(body).items()}
+
+
+@app.post("/bot{token}/{method}")
+async def bot_method(token: str, method: str, request: Request):
+    stats["requests"] += 1
+    stats["methods"][method] = stats["methods"].get(method, 0) + 1
+    delay = config.latency_ms + random.uniform(-config.jitter_ms, config.jitter_ms)
+    if delay > 0:
+        await asyncio.sleep(delay / 1000)
+    params = await read_params(request)
+    method = method.lower()
+
+    if method == 'getme':
+        return ok({"id": 1, "is_bot": True, "first_name": "standin", "username": "standin_bot"})
+    if method not in ('sendmessage', 'editmessagetext', 'deletemessage'):
+        return error(404, "Not Found")
+    try:
+        chat_id = int(params["chat_id"])
+    except (KeyError, ValueError):
+        return error(400, "Bad Request: chat not found")
+
+    # Flood control applies to messages sent/edited; deletes aren't counted
+    limited = method != 'deletemessage' and flood_limited(chat_id)
+    if limited or (config.random_429 and random.random() < config.random_429):
+        stats["rate_limited"] += 1
+        return error(429, f"Too Many Requests: retry after {config.retry_after}", retry_after=config.retry_after)
+
+    if method in ('sendmessage', 'editmessagetext') and len(params.get("text", "")) > MAX_MESSAGE_LENGTH:
+        return error(400, "Bad Request: message is too long")
+
+    if method == 'sendmessage':
+        if not params.get("text"):
+            return error(400, "Bad Request: message text is empty")
+        message_id = store_message(chat_id, params["text"])
+        return ok(message_json(chat_id, message_id, params["text"]))
+
+    key = (chat_id, int(params.get("message_id", 0)))
+    if method == 'editmessagetext':
+        if key not in messages:
+            return error(400, "Bad Request: message to edit not found")
+        if messages[key] == params.get("text"):
+            return error(400, "Bad Request: message is not modified")
+        messages[key] = params.get("text", "")
+        return ok(message_json(chat_id, key[1], messages[key], edited=True))
+
+    if key not in messages:
+        return error(400, "Bad Request: message to delete not found")
+    del messages[key]
+    return ok(True)
+
+
+@app.post("/_standin/seed")
+async def seed_messages(chat_id: int, count: int = 100):
+    """Put `count` messages in a chat without rate limits (setup for delete benchmarks)"""
+    return {"message_ids": [store_message(chat_id, f"seeded message {n}") for n in range(count)]}
+
+
+@app.get("/_standin/stats")
+async def standin_stats():
+    """Requests per method, 429s and other errors sent, messages currently in chats"""
+    return {**stats, "messages": len(messages)}
+
+
+def main():
+    global config
+    parser = argparse.ArgumentParser(description="Local Telegram Bot API stand-in")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--latency-ms', type=float, default=0, help='Added to every response')
+    parser.add_argument('--jitter-ms', type=float, default=0)
+    parser.add_argument('--per-chat-rate', type=float, default=1, help='Messages per second per chat before 429 (0 = off)')
+    parser.add_argument('--global-rate', type=float, default=30, help='Messages per second across chats before 429 (0 = off)')
+    parser.add_argument('--random-429', type=float, default=0, help='Fraction of requests answered 429 regardless of rate')
+    parser.add_argument('--retry-after', type=int, default=5, help='retry_after seconds in 429 answers')
+    args = parser.parse_args()
+    config = StandinConfig(args)
+
+    import uvicorn
+    uvicorn.run(app, host=args.host, port=args.port, log_level='warning')
+
+
+if __name__ == "__main__":
+    main()
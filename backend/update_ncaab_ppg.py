@@ -10,6 +10,8 @@ import os
 from datetime import datetime, timedelta
 from pymongo import MongoClient
 
+from team_game_log import last3_from_game_log
+
 client = MongoClient(os.environ.get('MONGO_URL', 'mongodb://localhost:27017'))
 db = client[os.environ.get('DB_NAME', 'test_database')]
 
@@ -84,60 +86,69 @@ async def main():
     
     print(f"[NCAAB PPG] Need PPG for {len(teams_needed)} teams")
     
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(headless=True)
-        
-        # Get team URLs from scoreboard
-        print("[NCAAB PPG] Fetching team URLs from scoreboard...")
-        url = f"https://www.cbssports.com/college-basketball/scoreboard/FBS/{date_url}/?layout=compact"
-        page = await browser.new_page()
-        await page.goto(url, timeout=30000)
-        await page.wait_for_load_state("domcontentloaded")
-        await page.wait_for_timeout(2000)
-        
-        all_team_urls = await page.evaluate("""() => {
-            const teamUrls = {};
-            const links = document.querySelectorAll('a[href*="/college-basketball/teams/"]');
-            links.forEach(a => {
-                const href = a.getAttribute('href');
-                let name = a.innerText.trim().replace(/^\\d+\\s*/, '').split('\\n')[0].trim();
-                if (name && name.length > 1 && name.length < 35 && href) {
-                    teamUrls[name] = href;
-                }
-            });
-            return teamUrls;
-        }""")
-        await page.close()
-        
-        print(f"[NCAAB PPG] Found {len(all_team_urls)} team URLs on scoreboard")
-        
-        # Match teams we need to URLs (fuzzy match)
-        team_urls = {}
-        for team in teams_needed:
-            team_lower = team.lower()
-            for url_team, url in all_team_urls.items():
-                url_team_lower = url_team.lower()
-                if team_lower == url_team_lower or team_lower in url_team_lower or url_team_lower in team_lower:
-                    team_urls[team] = url
-                    break
-        
-        print(f"[NCAAB PPG] Matched {len(team_urls)}/{len(teams_needed)} teams to URLs")
-        
-        # Scrape teams concurrently (5 at a time)
-        print(f"[NCAAB PPG] Scraping {len(team_urls)} teams (5 concurrent)...")
-        semaphore = asyncio.Semaphore(5)
-        
-        tasks = [
-            scrape_team_ppg(browser, team_name, team_url, semaphore)
-            for team_name, team_url in team_urls.items()
-        ]
-        
-        results = await asyncio.gather(*tasks)
-        
-        await browser.close()
+    # Teams whose last 3 games are already in our stored finals don't need a page load
+    logged_stats, teams_missing = last3_from_game_log(db, teams_needed, target_date)
+    logged_stats = {name: {'last3_avg': stats['last3_avg'], 'scores': stats['last3_scores']} for name, stats in logged_stats.items()}
+    teams_needed = set(teams_missing)
+    print(f"[NCAAB PPG] {len(logged_stats)} teams from game log, scraping {len(teams_needed)}")
+    
+    results = []
+    if teams_needed:
+        async with async_playwright() as p:
+            browser = await p.chromium.launch(headless=True)
+            
+            # Get team URLs from scoreboard
+            print("[NCAAB PPG] Fetching team URLs from scoreboard...")
+            url = f"https://www.cbssports.com/college-basketball/scoreboard/FBS/{date_url}/?layout=compact"
+            page = await browser.new_page()
+            await page.goto(url, timeout=30000)
+            await page.wait_for_load_state("domcontentloaded")
+            await page.wait_for_timeout(2000)
+            
+            all_team_urls = await page.evaluate("""() => {
+                const teamUrls = {};
+                const links = document.querySelectorAll('a[href*="/college-basketball/teams/"]');
+                links.forEach(a => {
+                    const href = a.getAttribute('href');
+                    let name = a.innerText.trim().replace(/^\\d+\\s*/, '').split('\\n')[0].trim();
+                    if (name && name.length > 1 && name.length < 35 && href) {
+                        teamUrls[name] = href;
+                    }
+                });
+                return teamUrls;
+            }""")
+            await page.close()
+            
+            print(f"[NCAAB PPG] Found {len(all_team_urls)} team URLs on scoreboard")
+            
+            # Match teams we need to URLs (fuzzy match)
+            team_urls = {}
+            for team in teams_needed:
+                team_lower = team.lower()
+                for url_team, url in all_team_urls.items():
+                    url_team_lower = url_team.lower()
+                    if team_lower == url_team_lower or team_lower in url_team_lower or url_team_lower in team_lower:
+                        team_urls[team] = url
+                        break
+            
+            print(f"[NCAAB PPG] Matched {len(team_urls)}/{len(teams_needed)} teams to URLs")
+            
+            # Scrape teams concurrently (5 at a time)
+            print(f"[NCAAB PPG] Scraping {len(team_urls)} teams (5 concurrent)...")
+            semaphore = asyncio.Semaphore(5)
+            
+            tasks = [
+                scrape_team_ppg(browser, team_name, team_url, semaphore)
+                for team_name, team_url in team_urls.items()
+            ]
+            
+            results = await asyncio.gather(*tasks)
+            
+            await browser.close()
     
     # Build team_stats from results
     team_stats = {name: data for name, data in results if data is not None}
+    team_stats.update(logged_stats)
     
     print(f"\n[NCAAB PPG] Got Last 3 PPG for {len(team_stats)} teams")
     
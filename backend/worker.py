@@ -0,0 +1,27 @@
+#!/usr/bin/env python3
+"""
+Scraper worker - runs queued jobs (refreshes, 8PM/5AM, backfills) outside the API process.
+
+Start the API with PROCESS_ROLE=api and one or more workers next to it; the
+worker holding the scheduler lease also runs APScheduler and bet monitoring.
+
+Usage:
+    PROCESS_ROLE=api uvicorn server:app --host 0.0.0.0 --port 8001
+    python worker.py
+    JOB_MAX_CONCURRENT=1 BROWSER_JOB_CONCURRENCY=1 python worker.py
+"""
+import asyncio
+import os
+
+os.environ.setdefault('PROCESS_ROLE', 'worker')
+
+from server import run_worker, client  # noqa: E402
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(run_worker())
+    except KeyboardInterrupt:
+        pass
+    finally:
+        client.close()
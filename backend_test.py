@@ -7,6 +7,7 @@ Tests the Opportunities endpoints and plays888.co scraping functionality
 import requests
 import sys
 import json
+import time
 from datetime import datetime
 
 class BettingSystemAPITester:
@@ -36,6 +37,26 @@ class BettingSystemAPITester:
         if details:
             print(f"    Details: {details}")
 
+    def post_job(self, path, timeout):
+        """
+        POST an endpoint that queues a background job (202 + job_id) and poll the
+        job until it finishes. Returns (status_code, data): 200 and the job result,
+        the job's error status and message, or the POST status if it wasn't queued.
+        """
+        response = requests.post(f"{self.api_url}{path}", timeout=15)
+        if response.status_code != 202:
+            return response.status_code, None
+        accepted = response.json()
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            job = requests.get(f"{self.base_url}{accepted['status_url']}", timeout=10).json()
+            if job['status'] == 'succeeded':
+                return 200, job.get('result')
+            if job['status'] in ('failed', 'interrupted'):
+                return job.get('error_status', 500), job.get('error')
+            time.sleep(2)
+        raise requests.exceptions.Timeout(f"Job {accepted['job_id']} still {job['status']} after {timeout}s")
+
     def test_get_opportunities(self):
         """Test GET /api/opportunities endpoint"""
         try:
@@ -107,11 +128,9 @@ class BettingSystemAPITester:
     def test_refresh_opportunities(self):
         """Test POST /api/opportunities/refresh endpoint"""
         try:
-            response = requests.post(f"{self.api_url}/opportunities/refresh", timeout=15)
+            status_code, data = self.post_job("/opportunities/refresh", timeout=15)
             
-            if response.status_code == 200:
-                data = response.json()
-                
+            if status_code == 200:
                 # Validate response structure (same as GET)
                 required_fields = ['games', 'plays', 'date', 'last_updated']
                 missing_fields = [field for field in required_fields if field not in data]
@@ -129,7 +148,7 @@ class BettingSystemAPITester:
                 return True
             else:
                 self.log_test("POST /api/opportunities/refresh", False,
-                            f"Status code: {response.status_code}")
+                            f"Status code: {status_code}")
                 return False
                 
         except requests.exceptions.RequestException as e:
@@ -355,11 +374,9 @@ class BettingSystemAPITester:
         """Test POST /api/opportunities/refresh?use_live_lines=true for NBA"""
         try:
             print("Testing NBA opportunities refresh with live lines (this may take 30-60 seconds)...")
-            response = requests.post(f"{self.api_url}/opportunities/refresh?use_live_lines=true", timeout=90)
+            status_code, data = self.post_job("/opportunities/refresh?use_live_lines=true", timeout=90)
             
-            if response.status_code == 200:
-                data = response.json()
-                
+            if status_code == 200:
                 # Validate response structure
                 required_fields = ['games', 'plays', 'date', 'last_updated', 'data_source']
                 missing_fields = [field for field in required_fields if field not in data]
@@ -384,7 +401,7 @@ class BettingSystemAPITester:
                 return True
             else:
                 self.log_test("POST /api/opportunities/refresh?use_live_lines=true", False,
-                            f"Status code: {response.status_code}")
+                            f"Status code: {status_code}")
                 return False
                 
         except requests.exceptions.Timeout:
@@ -401,11 +418,9 @@ class BettingSystemAPITester:
         """Test POST /api/opportunities/nhl/refresh?use_live_lines=true for NHL"""
         try:
             print("Testing NHL opportunities refresh with live lines (this may take 30-60 seconds)...")
-            response = requests.post(f"{self.api_url}/opportunities/nhl/refresh?use_live_lines=true", timeout=90)
+            status_code, data = self.post_job("/opportunities/nhl/refresh?use_live_lines=true", timeout=90)
             
-            if response.status_code == 200:
-                data = response.json()
-                
+            if status_code == 200:
                 # Validate response structure
                 required_fields = ['games', 'plays', 'date', 'last_updated', 'data_source']
                 missing_fields = [field for field in required_fields if field not in data]
@@ -430,7 +445,7 @@ class BettingSystemAPITester:
                 return True
             else:
                 self.log_test("POST /api/opportunities/nhl/refresh?use_live_lines=true", False,
-                            f"Status code: {response.status_code}")
+                            f"Status code: {status_code}")
                 return False
                 
         except requests.exceptions.Timeout:
@@ -616,11 +631,9 @@ class BettingSystemAPITester:
     def test_refresh_opportunities_yesterday(self):
         """Test POST /api/opportunities/refresh?day=yesterday for bet-time line tracking"""
         try:
-            response = requests.post(f"{self.api_url}/opportunities/refresh?day=yesterday", timeout=15)
+            status_code, data = self.post_job("/opportunities/refresh?day=yesterday", timeout=15)
             
-            if response.status_code == 200:
-                data = response.json()
-                
+            if status_code == 200:
                 # Validate response structure
                 required_fields = ['games', 'date', 'success']
                 missing_fields = [field for field in required_fields if field not in data]
@@ -662,7 +675,7 @@ class BettingSystemAPITester:
                 return True
             else:
                 self.log_test("POST /api/opportunities/refresh?day=yesterday", False,
-                            f"Status code: {response.status_code}")
+                            f"Status code: {status_code}")
                 return False
                 
         except requests.exceptions.RequestException as e:
@@ -899,11 +912,9 @@ class BettingSystemAPITester:
     def test_nba_refresh_tomorrow_scoresandodds(self):
         """Test POST /api/opportunities/refresh?day=tomorrow - should force refresh from scoresandodds.com"""
         try:
-            response = requests.post(f"{self.api_url}/opportunities/refresh?day=tomorrow", timeout=15)
+            status_code, data = self.post_job("/opportunities/refresh?day=tomorrow", timeout=15)
             
-            if response.status_code == 200:
-                data = response.json()
-                
+            if status_code == 200:
                 # Validate response structure
                 required_fields = ['games', 'date', 'success']
                 missing_fields = [field for field in required_fields if field not in data]
@@ -933,7 +944,7 @@ class BettingSystemAPITester:
                 return True
             else:
                 self.log_test("POST /api/opportunities/refresh?day=tomorrow", False,
-                            f"Status code: {response.status_code}")
+                            f"Status code: {status_code}")
                 return False
                 
         except requests.exceptions.RequestException as e:
@@ -946,11 +957,9 @@ class BettingSystemAPITester:
     def test_nba_refresh_today_plays888(self):
         """Test POST /api/opportunities/refresh?day=today&use_live_lines=true - should use plays888.co"""
         try:
-            response = requests.post(f"{self.api_url}/opportunities/refresh?day=today&use_live_lines=true", timeout=30)
+            status_code, data = self.post_job("/opportunities/refresh?day=today&use_live_lines=true", timeout=30)
             
-            if response.status_code == 200:
-                data = response.json()
-                
+            if status_code == 200:
                 # Validate response structure
                 required_fields = ['games', 'date', 'success']
                 missing_fields = [field for field in required_fields if field not in data]
@@ -976,7 +985,7 @@ class BettingSystemAPITester:
                 return True
             else:
                 self.log_test("POST /api/opportunities/refresh?day=today&use_live_lines=true", False,
-                            f"Status code: {response.status_code}")
+                            f"Status code: {status_code}")
                 return False
                 
         except requests.exceptions.RequestException as e:
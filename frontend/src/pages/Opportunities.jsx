@@ -161,6 +161,20 @@ const isSpreadTeamHome = (spreadTeam, homeTeam, awayTeam) => {
   return true; // Default to home
 };
 
+// Long-running refreshes return 202 with a job id - poll until the job finishes
+const waitForJob = async (job, timeoutMs = 300000) => {
+  const started = Date.now();
+  while (Date.now() - started < timeoutMs) {
+    const { data } = await axios.get(`${API}/jobs/${job.job_id}`);
+    if (data.status === 'succeeded') return data.result || {};
+    if (data.status === 'failed' || data.status === 'interrupted') {
+      throw new Error(data.error || `Job ${data.status}`);
+    }
+    await new Promise((resolve) => setTimeout(resolve, 2000));
+  }
+  throw new Error('Job timed out');
+};
+
 export default function Opportunities() {
   const [league, setLeague] = useState('NBA');
   const [day, setDay] = useState('today');
@@ -589,7 +603,8 @@ export default function Opportunities() {
     try {
       // Use the "refresh lines & bets" endpoint that preserves PPG values and opening lines
       // Pass the current day parameter so tomorrow's games get refreshed correctly
-      const response = await axios.post(`${API}/opportunities/refresh-lines?league=${league}&day=${day}`, {}, { timeout: 60000 });
+      const jobResponse = await axios.post(`${API}/opportunities/refresh-lines?league=${league}&day=${day}`, {}, { timeout: 60000 });
+      const result = await waitForJob(jobResponse.data);
       
       // For NHL, also refresh 1st Period bets (includes Open Bets for pending wagers)
       if (league === 'NHL') {
@@ -608,9 +623,9 @@ export default function Opportunities() {
       // Reload data to show updates
       await loadOpportunities();
       
-      const linesUpdated = response.data.lines_updated || 0;
-      const betsAdded = response.data.bets_added || 0;
-      const betsSkipped = response.data.bets_skipped_duplicates || 0;
+      const linesUpdated = result.lines_updated || 0;
+      const betsAdded = result.bets_added || 0;
+      const betsSkipped = result.bets_skipped_duplicates || 0;
       
       let message = `${league} refreshed! ${linesUpdated} line(s) updated`;
       if (betsAdded > 0) {
@@ -7,6 +7,7 @@ Tests the specific requirements from the review request
 import requests
 import sys
 import json
+import time
 from datetime import datetime
 
 class NBADataSourcingTester:
@@ -36,6 +37,26 @@ class NBADataSourcingTester:
         if details:
             print(f"    Details: {details}")
 
+    def post_job(self, path, timeout):
+        """
+        POST an endpoint that queues a background job (202 + job_id) and poll the
+        job until it finishes. Returns (status_code, data): 200 and the job result,
+        the job's error status and message, or the POST status if it wasn't queued.
+        """
+        response = requests.post(f"{self.api_url}{path}", timeout=15)
+        if response.status_code != 202:
+            return response.status_code, None
+        accepted = response.json()
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            job = requests.get(f"{self.base_url}{accepted['status_url']}", timeout=10).json()
+            if job['status'] == 'succeeded':
+                return 200, job.get('result')
+            if job['status'] in ('failed', 'interrupted'):
+                return job.get('error_status', 500), job.get('error')
+            time.sleep(2)
+        raise requests.exceptions.Timeout(f"Job {accepted['job_id']} still {job['status']} after {timeout}s")
+
     def test_tomorrow_scoresandodds(self):
         """Test GET /api/opportunities?day=tomorrow - should use scoresandodds.com"""
         try:
@@ -168,11 +189,9 @@ class NBADataSourcingTester:
     def test_refresh_tomorrow_force(self):
         """Test POST /api/opportunities/refresh?day=tomorrow - should force refresh from scoresandodds.com"""
         try:
-            response = requests.post(f"{self.api_url}/opportunities/refresh?day=tomorrow", timeout=15)
+            status_code, data = self.post_job("/opportunities/refresh?day=tomorrow", timeout=15)
             
-            if response.status_code == 200:
-                data = response.json()
-                
+            if status_code == 200:
                 # Check data source indicates correct source
                 data_source = data.get('data_source')
                 expected_sources = ['scoresandodds.com', 'hardcoded']
@@ -189,7 +208,7 @@ class NBADataSourcingTester:
                 return True
             else:
                 self.log_test("Refresh Tomorrow - Force Refresh", False,
-                            f"Status code: {response.status_code}")
+                            f"Status code: {status_code}")
                 return False
                 
         except Exception as e:
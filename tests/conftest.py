@@ -0,0 +1,22 @@
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# server.py reads these at import time; nothing connects until a query runs
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'test_database')
+os.environ.setdefault('ENCRYPTION_KEY', '4Cb6MhWtOY3ZLibLuFTdpVa1ThnFAUY-bypB7JdOUkk=')
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'backend'))
+
+
+@pytest.fixture
+def mock_db(monkeypatch):
+    """server.db backed by an in-memory mongomock database"""
+    from mongomock_motor import AsyncMongoMockClient
+    import server
+    database = AsyncMongoMockClient()['test_database']
+    monkeypatch.setattr(server, 'db', database)
+    return database
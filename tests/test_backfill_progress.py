@@ -0,0 +1,88 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+def make_run(minutes_ago, total=10, skipped=0, completed=0, failed=0):
+    return {
+        "total": total, "skipped": skipped, "completed": completed, "failed": failed, "games_updated": 7,
+        "started_at": datetime.now(timezone.utc) - timedelta(minutes=minutes_ago),
+    }
+
+
+def test_throughput_and_eta_count_worked_days_only():
+    snapshot = server.backfill_progress_snapshot(make_run(2, total=10, skipped=4, completed=3, failed=1))
+    assert snapshot["remaining"] == 2
+    assert snapshot["days_per_minute"] == pytest.approx(2.0, abs=0.01)
+    assert snapshot["eta_seconds"] == pytest.approx(60, abs=1)
+    assert snapshot["games_updated"] == 7
+
+
+def test_no_eta_before_the_first_day_finishes():
+    snapshot = server.backfill_progress_snapshot(make_run(1, total=5, skipped=2))
+    assert snapshot["remaining"] == 3
+    assert snapshot["days_per_minute"] == 0.0
+    assert snapshot["eta_seconds"] is None
+
+
+def test_finished_run_has_zero_eta():
+    snapshot = server.backfill_progress_snapshot(make_run(5, total=4, completed=4))
+    assert snapshot["remaining"] == 0
+    assert snapshot["eta_seconds"] == 0
+
+
+def test_backfill_dates_are_inclusive():
+    assert server.backfill_dates("2026-02-27", "2026-03-01") == ["2026-02-27", "2026-02-28", "2026-03-01"]
+    assert server.backfill_dates("2026-03-02", "2026-03-01") == []
+
+
+def test_run_id_ignores_league_order():
+    a = server.backfill_run_id("scores", ["NHL", "NBA"], "2026-01-01", "2026-01-31")
+    b = server.backfill_run_id("scores", ["NBA", "NHL"], "2026-01-01", "2026-01-31")
+    assert a == b
+
+
+def test_parse_backfill_leagues():
+    assert server.parse_backfill_leagues("ALL") == ["NBA", "NHL", "NCAAB"]
+    assert server.parse_backfill_leagues("nba, nhl") == ["NBA", "NHL"]
+    with pytest.raises(HTTPException):
+        server.parse_backfill_leagues("NBA,NFL")
+
+
+def test_requested_concurrency_is_capped(mock_db, monkeypatch):
+    active, peak = [], []
+
+    async def day(league, date_str):
+        active.append(date_str)
+        peak.append(len(active))
+        await asyncio.sleep(0.01)
+        active.remove(date_str)
+        return {"status": "no_db_games", "games_updated": 0}
+
+    monkeypatch.setitem(server.BACKFILL_TASKS, "opening_lines", day)
+    result = asyncio.run(server.run_backfill("opening_lines", ["NBA"], "2026-01-01", "2026-01-10", concurrency=50))
+    assert result["progress"]["completed"] == 10
+    assert max(peak) == server.BACKFILL_MAX_CONCURRENT
+
+
+def test_scores_day_without_matches_is_retried(mock_db, monkeypatch):
+    async def cbs(date_str):
+        return [{"away_team": "Boston", "home_team": "Miami", "away_score": 100, "home_score": 90}]
+
+    monkeypatch.setattr(server, "scrape_cbssports_nba", cbs)
+
+    async def run():
+        await mock_db.nba_opportunities.insert_one({"date": "2026-01-10", "games": [
+            {"away_team": "Denver", "home_team": "Utah"}]})
+        first = await server.run_backfill("scores", ["NBA"], "2026-01-10", "2026-01-10")
+        second = await server.run_backfill("scores", ["NBA"], "2026-01-10", "2026-01-10")
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert first["results"]["NBA"]["dates_details"][0]["status"] == "no_matches"
+    assert first["progress"]["failed"] == 1
+    assert second["progress"]["skipped"] == 0
@@ -0,0 +1,50 @@
+import asyncio
+import time
+from collections import deque
+
+import server
+
+
+def fresh_monitor(monkeypatch):
+    monkeypatch.setattr(server, 'loop_lag_state', {
+        "heartbeat": None, "loop_thread_id": None, "pending_stall": None,
+        "samples": 0, "total_lag_ms": 0.0, "max_lag_ms": 0.0, "last_lag_ms": 0.0, "stalls": 0,
+    })
+    monkeypatch.setattr(server, 'loop_stalls', deque(maxlen=server.LOOP_STALL_HISTORY))
+    monkeypatch.setattr(server, 'loop_stall_offenders', {})
+    monkeypatch.setattr(server, 'LOOP_STALL_THRESHOLD_MS', 100)
+
+
+def block_the_loop(seconds):
+    time.sleep(seconds)
+
+
+def test_stall_is_recorded_with_the_blocking_frame(monkeypatch):
+    fresh_monitor(monkeypatch)
+
+    async def run():
+        server.start_event_loop_monitor()
+        await asyncio.sleep(server.LOOP_LAG_INTERVAL * 2)
+        block_the_loop(0.5)
+        await asyncio.sleep(server.LOOP_LAG_INTERVAL * 2)
+
+    asyncio.run(run())
+    summary = server.event_loop_lag_summary()
+    assert summary["stalls"] == 1
+    assert summary["max_lag_ms"] >= 300
+    stall = server.loop_stalls[0]
+    assert stall["offender"].startswith("block_the_loop (test_event_loop_lag.py:")
+    assert any("in block_the_loop" in frame for frame in stall["stack"])
+
+
+def test_run_blocking_keeps_the_loop_responsive(monkeypatch):
+    fresh_monitor(monkeypatch)
+
+    async def run():
+        server.start_event_loop_monitor()
+        await asyncio.sleep(server.LOOP_LAG_INTERVAL * 2)
+        await server.run_blocking(block_the_loop, 0.5)
+        await asyncio.sleep(server.LOOP_LAG_INTERVAL)
+
+    asyncio.run(run())
+    assert server.event_loop_lag_summary()["stalls"] == 0
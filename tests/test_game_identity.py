@@ -0,0 +1,27 @@
+import asyncio
+
+import server
+
+
+def test_slate_keys_follow_spellings_to_one_game(mock_db, monkeypatch):
+    monkeypatch.setattr(server, 'game_identity_links', {})
+
+    async def run():
+        game_id = await server.link_game_identity('NBA', '2026-01-10', 'Golden State', 'Phoenix',
+                                                  {'plays888': 'GOLDEN STATE WARRIORS VS PHOENIX SUNS'})
+        await server.link_game_identity('NBA', '2026-01-10', 'Golden State Warriors', 'Phoenix Suns',
+                                        {'plays888': 'WARRIORS VS SUNS'})
+        await server.link_game_identity('NBA', '2026-01-11', 'Golden State', 'Phoenix', {'plays888': 'GSW VS PHX'})
+        return game_id, await server.slate_identity_keys('NBA', '2026-01-10', 'plays888')
+
+    game_id, keys = asyncio.run(run())
+    assert keys == {game_id: {'GOLDEN STATE WARRIORS VS PHOENIX SUNS', 'WARRIORS VS SUNS'}}
+
+
+def test_same_key_is_written_once_per_process(mock_db, monkeypatch):
+    monkeypatch.setattr(server, 'game_identity_links', {})
+    first = server.game_identity_update('NHL', '2026-01-10', 'Calgary', 'Vegas', {'plays888': 'CALGARY VS VEGAS'})
+    asyncio.run(server.write_game_identities('NHL', '2026-01-10', [first]))
+    again = server.game_identity_update('NHL', '2026-01-10', 'Calgary Flames', 'Vegas', {'plays888': 'CALGARY VS VEGAS'})
+    assert again[0] == first[0]
+    assert again[1] is None
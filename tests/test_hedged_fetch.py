@@ -0,0 +1,59 @@
+import asyncio
+
+import server
+
+
+def fake_sources(monkeypatch, behaviour):
+    """behaviour: source -> (delay seconds, games or exception)"""
+    cancelled = []
+
+    def fetcher(source, league):
+        async def fetch(target_date):
+            delay, outcome = behaviour[source]
+            try:
+                await asyncio.sleep(delay)
+            except asyncio.CancelledError:
+                cancelled.append(source)
+                raise
+            if isinstance(outcome, Exception):
+                raise outcome
+            return outcome
+        return fetch
+
+    monkeypatch.setattr(server, 'hedge_source_fetcher', fetcher)
+    monkeypatch.setattr(server, 'hedged_fetch_stats', {})
+    return cancelled
+
+
+LINES = [{'away_team': 'Calgary', 'home_team': 'Vegas', 'total': 6.0}]
+NO_LINES = [{'away_team': 'Calgary', 'home_team': 'Vegas', 'total': None}]
+
+
+def test_slow_primary_is_hedged_and_cancelled(monkeypatch):
+    cancelled = fake_sources(monkeypatch, {'cbssports': (5, LINES), 'scoresandodds': (0.01, LINES), 'nhl_api': (0, NO_LINES)})
+    games, source = asyncio.run(server.hedged_fetch('lines', 'NHL', '2026-01-10', budget=0.02))
+    assert source == 'scoresandodds'
+    assert games == LINES
+    assert cancelled == ['cbssports']
+    stats = server.hedged_fetch_stats['NHL:lines']
+    assert stats['hedges'] == 1
+    assert stats['outcomes']['cbssports'] == {'cancelled': 1}
+
+
+def test_fast_primary_never_starts_the_backup(monkeypatch):
+    fake_sources(monkeypatch, {'cbssports': (0, LINES), 'scoresandodds': (0, LINES), 'nhl_api': (0, LINES)})
+    games, source = asyncio.run(server.hedged_fetch('lines', 'NHL', '2026-01-10', budget=1))
+    assert source == 'cbssports'
+    assert set(server.hedged_fetch_stats['NHL:lines']['outcomes']) == {'cbssports'}
+
+
+def test_failures_fall_through_to_best_unvalidated_result(monkeypatch):
+    fake_sources(monkeypatch, {'cbssports': (0, RuntimeError('timeout')), 'scoresandodds': (0, []), 'nhl_api': (0, NO_LINES)})
+    games, source = asyncio.run(server.hedged_fetch('lines', 'NHL', '2026-01-10', budget=5))
+    assert (games, source) == (NO_LINES, 'nhl_api')
+    assert server.hedged_fetch_stats['NHL:lines']['hedges'] == 0  # launched on failure, not after the budget
+
+
+def test_nothing_usable_returns_no_source(monkeypatch):
+    fake_sources(monkeypatch, {'cbssports': (0, [])})
+    assert asyncio.run(server.hedged_fetch('scores', 'NBA', '2026-01-10', budget=5)) == ([], None)
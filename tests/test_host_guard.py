@@ -0,0 +1,88 @@
+import asyncio
+import time
+
+import pytest
+
+import server
+
+
+def fresh_guard(monkeypatch, host='example.test', rate=(50.0, 2)):
+    monkeypatch.setitem(server.HOST_RATE_LIMITS, host, rate)
+    monkeypatch.setattr(server, 'host_guards', {})
+    return server.get_host_guard(f'https://{host}/page')
+
+
+async def ok():
+    return 'ok'
+
+
+async def boom():
+    raise ConnectionError('reset')
+
+
+def test_token_bucket_allows_a_burst_then_paces(monkeypatch):
+    guard = fresh_guard(monkeypatch, rate=(50.0, 2))
+
+    async def run():
+        started = time.monotonic()
+        for _ in range(4):
+            await guard.acquire_token()
+        return time.monotonic() - started
+
+    elapsed = asyncio.run(run())
+    # two tokens from the burst, two more refilled at 50/s
+    assert 0.03 <= elapsed < 0.5
+
+
+def test_breaker_opens_after_consecutive_failures(monkeypatch):
+    guard = fresh_guard(monkeypatch)
+    url = 'https://example.test/page'
+
+    async def run():
+        for _ in range(server.BREAKER_FAILURE_THRESHOLD):
+            with pytest.raises(ConnectionError):
+                await server.guarded_fetch(url, boom)
+        with pytest.raises(server.SourceUnavailableError):
+            await server.guarded_fetch(url, ok)
+
+    asyncio.run(run())
+    assert guard.state == 'open'
+    assert guard.requests == server.BREAKER_FAILURE_THRESHOLD
+    assert guard.fast_failures == 1
+
+
+def test_http_errors_count_as_failures(monkeypatch):
+    guard = fresh_guard(monkeypatch)
+
+    async def throttled():
+        return 429
+
+    asyncio.run(server.guarded_fetch('https://example.test/page', throttled, status_of=lambda status: status))
+    assert guard.consecutive_failures == 1
+    assert guard.last_error == 'HTTP 429'
+
+
+def test_half_open_probe_closes_or_reopens_with_longer_cooldown(monkeypatch):
+    guard = fresh_guard(monkeypatch)
+    url = 'https://example.test/page'
+    for _ in range(server.BREAKER_FAILURE_THRESHOLD):
+        guard.record_failure(False, 'timeout')
+    guard.opened_at -= guard.cooldown  # cooldown elapsed
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(server.guarded_fetch(url, boom))
+    assert guard.state == 'open'
+    assert guard.cooldown == 2 * server.BREAKER_COOLDOWN_SECONDS
+
+    guard.opened_at -= guard.cooldown
+    assert asyncio.run(server.guarded_fetch(url, ok)) == 'ok'
+    assert guard.state == 'closed'
+    assert guard.cooldown == server.BREAKER_COOLDOWN_SECONDS
+
+
+def test_only_one_probe_while_half_open(monkeypatch):
+    guard = fresh_guard(monkeypatch)
+    guard.state, guard.opened_at = 'open', time.monotonic() - guard.cooldown
+    assert guard.before_request() is True
+    with pytest.raises(server.SourceUnavailableError):
+        guard.before_request()
@@ -0,0 +1,52 @@
+import asyncio
+
+import server
+
+
+def fresh_scheduler(monkeypatch, limits):
+    monkeypatch.setattr(server, 'JOB_RESOURCE_LIMITS', limits)
+    monkeypatch.setattr(server, 'job_resource_semaphores', {})
+    monkeypatch.setattr(server, 'job_resource_waiting', {})
+    monkeypatch.setattr(server, 'job_resource_running', {})
+    monkeypatch.setattr(server, 'resource_job_stats', {})
+
+
+def test_browser_jobs_run_one_at_a_time(monkeypatch, mock_db):
+    fresh_scheduler(monkeypatch, {'browser': 1, 'monitor': 1})
+    active, peak = [], []
+
+    async def job():
+        active.append(1)
+        peak.append(len(active))
+        await asyncio.sleep(0.01)
+        active.pop()
+
+    async def run():
+        await asyncio.gather(*(server.run_with_resource(f'job{i}', 'browser', job) for i in range(3)))
+
+    asyncio.run(run())
+    assert max(peak) == 1
+    assert server.resource_job_stats['job2']['runs'] == 1
+
+
+def test_bet_monitor_does_not_wait_behind_a_browser_job(monkeypatch, mock_db):
+    fresh_scheduler(monkeypatch, {'browser': 1, 'monitor': 1})
+    order = []
+
+    async def backfill():
+        await asyncio.sleep(0.05)
+        order.append('backfill')
+
+    async def monitor():
+        order.append('monitor')
+
+    async def run():
+        long_job = asyncio.ensure_future(server.run_with_resource('backfill', 'browser', backfill))
+        await asyncio.sleep(0)
+        assert server.resource_scheduler_status()['running'] == {'browser': ['backfill']}
+        await server.run_with_resource('bet_monitor', 'monitor', monitor)
+        await long_job
+
+    asyncio.run(run())
+    assert order == ['monitor', 'backfill']
+    assert server.resource_job_stats['bet_monitor']['resource'] == 'monitor'
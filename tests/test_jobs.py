@@ -0,0 +1,92 @@
+import asyncio
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+async def submit(kind, params):
+    return json.loads((await server.submit_job(kind, params)).body)
+
+
+def test_identical_active_job_is_returned_instead_of_queued(mock_db):
+    async def run():
+        await server.recover_interrupted_jobs()
+        first = await submit('refresh_nba', {'day': 'today', 'use_live_lines': False})
+        again = await submit('refresh_nba', {'use_live_lines': False, 'day': 'today'})
+        other = await submit('refresh_nba', {'day': 'tomorrow', 'use_live_lines': False})
+        return first, again, other, await mock_db.jobs.count_documents({})
+
+    first, again, other, count = asyncio.run(run())
+    assert again == {**first, 'deduplicated': True}
+    assert other['deduplicated'] is False
+    assert count == 2
+
+
+def test_finished_job_frees_its_key(mock_db, monkeypatch):
+    async def runner(params):
+        return {'success': True, 'games': 3}
+
+    monkeypatch.setitem(server.JOB_KINDS, 'refresh_nba', (runner, 'db'))
+
+    async def run():
+        await server.recover_interrupted_jobs()
+        first = await submit('refresh_nba', {'day': 'today', 'use_live_lines': False})
+        job = await server.claim_next_job()
+        await server.job_semaphore.acquire()
+        await server.run_job(job)
+        second = await submit('refresh_nba', {'day': 'today', 'use_live_lines': False})
+        return first, second, await mock_db.jobs.find_one({'job_id': first['job_id']}, {'_id': 0})
+
+    first, second, done = asyncio.run(run())
+    assert second['deduplicated'] is False
+    assert second['job_id'] != first['job_id']
+    assert done['status'] == 'succeeded'
+    assert 'active_key' not in done
+    assert json.loads(done['result_json']) == {'success': True, 'games': 3}
+
+
+def test_unknown_kind_is_rejected(mock_db):
+    with pytest.raises(HTTPException):
+        asyncio.run(server.submit_job('nope', {}))
+
+
+def test_expired_lease_is_requeued_then_abandoned(mock_db):
+    async def expire(job_id):
+        past = datetime.now(timezone.utc) - timedelta(seconds=1)
+        await mock_db.jobs.update_one({'job_id': job_id}, {'$set': {'lease_until': past}})
+
+    async def run():
+        await server.recover_interrupted_jobs()
+        job_id = (await submit('scrape_date', {'date': '2026-01-10'}))['job_id']
+        for _ in range(server.JOB_MAX_ATTEMPTS - 1):
+            claimed = await server.claim_next_job()
+            assert claimed['job_id'] == job_id
+            await expire(job_id)
+            await server.requeue_expired_jobs()
+            requeued = await mock_db.jobs.find_one({'job_id': job_id})
+            assert requeued['status'] == 'queued'
+            assert 'worker_id' not in requeued
+        await server.claim_next_job()
+        await expire(job_id)
+        await server.requeue_expired_jobs()
+        return await mock_db.jobs.find_one({'job_id': job_id}, {'_id': 0})
+
+    job = asyncio.run(run())
+    assert job['status'] == 'interrupted'
+    assert job['attempts'] == server.JOB_MAX_ATTEMPTS
+    assert 'active_key' not in job
+
+
+def test_live_lease_is_left_alone(mock_db):
+    async def run():
+        await server.recover_interrupted_jobs()
+        job_id = (await submit('scrape_date', {'date': '2026-01-10'}))['job_id']
+        await server.claim_next_job()
+        await server.requeue_expired_jobs()
+        return await mock_db.jobs.find_one({'job_id': job_id})
+
+    assert asyncio.run(run())['status'] == 'running'
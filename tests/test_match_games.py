@@ -0,0 +1,110 @@
+import asyncio
+
+import server
+
+
+def game(away, home, **extra):
+    return {'away_team': away, 'home_team': home, **extra}
+
+
+def test_key_match_across_spellings():
+    stored = [game('Kansas St.', 'Michigan St.'), game('Duke', 'Kansas')]
+    scraped = [game('Kansas', 'Duke', final=1), game('Kansas State', 'Michigan State', final=2)]
+    result = server.match_games('NCAAB', stored, scraped, date='2026-01-10', source='test')
+    assert [(s['away_team'], r['final']) for s, r in result['pairs']] == [('Kansas St.', 2), ('Duke', 1)]
+    assert result['methods'] == {'key': 1, 'swapped': 1, 'tokens': 0}
+    assert result['unmatched'] == []
+    assert result['unmatched_scraped'] == []
+
+
+def test_swapped_match_can_be_disabled():
+    stored = [game('Duke', 'Kansas')]
+    scraped = [game('Kansas', 'Duke')]
+    result = server.match_games('NCAAB', stored, scraped, date='2026-01-10', source='test', allow_swapped=False)
+    assert result['pairs'] == []
+    assert result['unmatched'][0]['reason'] == 'no_candidate'
+
+
+def test_each_scraped_row_is_matched_once():
+    stored = [game('Duke', 'Kansas'), game('Duke', 'Kansas')]
+    scraped = [game('Duke', 'Kansas')]
+    result = server.match_games('NCAAB', stored, scraped, date='2026-01-10', source='test')
+    assert len(result['pairs']) == 1
+    assert len(result['unmatched']) == 1
+
+
+def test_token_fallback_for_unresolved_names():
+    stored = [game('Zorblat Aggies', 'Quux Tigers')]
+    scraped = [game('Zorblat', 'Quux')]
+    result = server.match_games('NCAAB', stored, scraped, date='2026-01-10', source='test')
+    assert len(result['pairs']) == 1
+    assert result['methods']['tokens'] == 1
+
+
+def test_rows_join_on_their_own_dates():
+    stored = [game('Duke', 'Kansas', date='2026-01-10'), game('Duke', 'Kansas', date='2026-01-11')]
+    scraped = [game('Duke', 'Kansas', date='2026-01-11', final=11)]
+    result = server.match_games('NCAAB', stored, scraped, source='test')
+    assert [(s['date'], r['final']) for s, r in result['pairs']] == [('2026-01-11', 11)]
+    assert result['unmatched'][0]['key'] == ['2026-01-10', 'Duke', 'Kansas']
+
+
+def test_unmatched_reasons_name_the_unresolved_side():
+    stored = [game('Zorblat', 'Kansas'), game('Duke', 'Zorblat'), game('Zorblat', 'Quux')]
+    result = server.match_games('NCAAB', stored, [], date='2026-01-10', source='test')
+    assert [u['reason'] for u in result['unmatched']] == [
+        'no_candidate:away_unresolved', 'no_candidate:home_unresolved', 'no_candidate:both_unresolved']
+
+
+def test_ambiguous_token_candidates_are_not_matched():
+    stored = [game('Zorblat', 'Quux')]
+    scraped = [game('Zorblat North', 'Quux East'), game('Zorblat South', 'Quux West')]
+    result = server.match_games('NCAAB', stored, scraped, date='2026-01-10', source='test')
+    assert result['pairs'] == []
+    assert result['unmatched'][0]['reason'] == 'ambiguous:both_unresolved'
+    assert len(result['unmatched'][0]['candidates']) == 2
+    assert len(result['unmatched_scraped']) == 2
+
+
+def test_covers_codes_join_through_the_index():
+    nba = server.match_games('NBA', [game('Golden State', 'Phoenix'), game('New Orleans', 'San Antonio')],
+                             [game('GS', 'PHX'), game('NOP', 'SA')], date='2026-01-10', source='test')
+    nhl = server.match_games('NHL', [game('Calgary', 'Vegas')], [game('CAL', 'VEG')], date='2026-01-10', source='test')
+    assert len(nba['pairs']) == 2
+    assert len(nhl['pairs']) == 1
+
+
+def test_covers_ou_leftovers_fall_back_to_codes_and_names():
+    stored = [game('Duke', 'Louisville'), game('Zorblat', 'Quux'), game('Kansas', 'Iowa')]
+    rows = [game('ZOR', 'QUU'), game('KANSAS', 'IOWA HAWKEYES'), game('DUKE', 'LOU')]
+    matching = server.match_games('NCAAB', stored, rows, date='2026-01-10', source='test')
+    leftovers = server.match_covers_ou_leftovers('NCAAB', stored, rows, matching)
+    pairs = {s['away_team']: r['away_team'] for s, r in matching['pairs'] + leftovers}
+    assert pairs == {'Duke': 'DUKE', 'Zorblat': 'ZOR', 'Kansas': 'KANSAS'}
+
+
+def test_covers_consensus_lookup_accepts_either_code_spelling():
+    for codes in (('GS', 'PHO', 'NO'), ('GSW', 'PHX', 'NOP')):
+        consensus = {code: {'consensus_pct': pct} for code, pct in zip(codes, (64, 36, 55))}
+        lookup = server.covers_consensus_lookup('NBA', consensus)
+        assert lookup('Golden State')['consensus_pct'] == 64
+        assert lookup('Phoenix')['consensus_pct'] == 36
+        assert lookup('New Orleans')['consensus_pct'] == 55
+        assert lookup('Boston') == {}
+
+
+def test_manual_consensus_update_joins_payload_codes(mock_db):
+    async def run():
+        await mock_db.nhl_opportunities.insert_one({'date': '2026-01-24', 'games': [
+            game('Montreal', 'Boston'), game('Calgary', 'Vegas')]})
+        result = await server.update_consensus_data('NHL', {'date': '2026-01-24', 'games': [
+            {'away': 'MON', 'home': 'BOS', 'away_consensus_pct': 36, 'home_consensus_pct': 64},
+            {'away': 'VEG', 'home': 'CAL', 'away_consensus_pct': 50, 'home_consensus_pct': 50},
+        ]})
+        return result, await mock_db.nhl_opportunities.find_one({'date': '2026-01-24'})
+
+    result, doc = asyncio.run(run())
+    assert result['games_updated'] == 1
+    assert doc['games'][0]['away_consensus_pct'] == 36
+    assert doc['games'][0]['home_consensus_pct'] == 64
+    assert 'away_consensus_pct' not in doc['games'][1]
@@ -0,0 +1,46 @@
+import server
+
+
+def fresh_metrics(monkeypatch):
+    monkeypatch.setattr(server, 'metric_values', {name: {} for name in server.METRICS})
+
+
+def metric_lines(text, prefix):
+    return [line for line in text.splitlines() if line.startswith(prefix)]
+
+
+def test_histogram_buckets_are_cumulative(monkeypatch):
+    fresh_metrics(monkeypatch)
+    for seconds in (0.003, 0.2, 0.2, 700):
+        server.observe_metric('scheduler_job_seconds', seconds, resource='browser', job='process_8pm')
+    text = server.render_metrics()
+    labels = 'job="process_8pm",resource="browser"'
+    buckets = metric_lines(text, 'scheduler_job_seconds_bucket')
+    assert buckets[0] == f'scheduler_job_seconds_bucket{{{labels},le="0.005"}} 1'
+    assert f'scheduler_job_seconds_bucket{{{labels},le="0.25"}} 3' in buckets
+    assert f'scheduler_job_seconds_bucket{{{labels},le="600.0"}} 3' in buckets
+    assert buckets[-1] == f'scheduler_job_seconds_bucket{{{labels},le="+Inf"}} 4'
+    assert len(buckets) == len(server.LATENCY_BUCKETS) + 1
+    assert f'scheduler_job_seconds_sum{{{labels}}} 700.403' in text
+    assert f'scheduler_job_seconds_count{{{labels}}} 4' in text
+
+
+def test_counters_gauges_and_headers(monkeypatch):
+    fresh_metrics(monkeypatch)
+    server.inc_metric('scheduler_job_runs_total', job='daily_cleanup', status='ok')
+    server.inc_metric('scheduler_job_runs_total', job='daily_cleanup', status='ok')
+    server.set_metric('browser_processes', 3)
+    text = server.render_metrics()
+    assert text.endswith('\n')
+    assert '# HELP scheduler_job_runs_total Resource-scheduled job runs by status' in text
+    assert '# TYPE scheduler_job_runs_total counter' in text
+    assert 'scheduler_job_runs_total{job="daily_cleanup",status="ok"} 2' in text
+    assert 'browser_processes 3' in text.splitlines()
+    assert len(metric_lines(text, '# TYPE ')) == len(server.METRICS)
+
+
+def test_label_values_are_escaped(monkeypatch):
+    fresh_metrics(monkeypatch)
+    server.inc_metric('scrape_games_parsed_total', 5, source='say "hi"\\\n', league='NBA')
+    text = server.render_metrics()
+    assert 'scrape_games_parsed_total{league="NBA",source="say \\"hi\\"\\\\\\n"} 5' in text
@@ -0,0 +1,86 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import playwright.async_api
+
+import server
+
+
+class FakePage:
+    async def wait_for_load_state(self, state):
+        pass
+
+    async def wait_for_timeout(self, ms):
+        pass
+
+    async def evaluate(self, script):
+        return "Schedule\nW 80-70\nL 60-75\nW 90-88\nFull Schedule"
+
+    async def close(self):
+        pass
+
+
+class FakeBrowser:
+    async def new_page(self):
+        return FakePage()
+
+    async def close(self):
+        pass
+
+
+class FakePlaywright:
+    class chromium:
+        @staticmethod
+        async def launch(headless=True):
+            return FakeBrowser()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+def test_failed_team_is_requeued_without_holding_its_worker(mock_db, monkeypatch):
+    visits = []
+
+    async def goto(page, url, timeout=None):
+        visits.append(url)
+        if url.endswith('/flaky') and visits.count(url) == 1:
+            raise TimeoutError("page timed out")
+
+    monkeypatch.setattr(playwright.async_api, 'async_playwright', FakePlaywright)
+    monkeypatch.setattr(server, 'guarded_goto', goto)
+    monkeypatch.setattr(server.random, 'uniform', lambda a, b: 0)
+    monkeypatch.setattr(server, 'NCAAB_LAST3_RETRY_POLL_SECONDS', 0.01)
+    urls = {'Flaky': '/flaky', 'Duke': '/duke', 'Kansas': '/kansas'}
+    stats = asyncio.run(server.scrape_ncaab_team_last3_ppg(urls, max_concurrent=1, results_date='2026-01-10'))
+    assert set(stats) == {'Flaky', 'Duke', 'Kansas'}
+    assert stats['Duke']['last3_scores'] == [90, 75, 80]
+    # the single worker went on to the other teams before retrying
+    assert [v.rsplit('/', 1)[1] for v in visits] == ['flaky', 'duke', 'kansas', 'flaky']
+
+
+def test_only_fresh_saved_teams_are_reused(mock_db, monkeypatch):
+    visits = []
+
+    async def goto(page, url, timeout=None):
+        visits.append(url)
+
+    monkeypatch.setattr(playwright.async_api, 'async_playwright', FakePlaywright)
+    monkeypatch.setattr(server, 'guarded_goto', goto)
+    now = datetime.now(timezone.utc)
+    saved = {'last3_scores': [70], 'last3_total': 70, 'last3_avg': 70.0, 'games_played': 1}
+
+    async def run():
+        await server.ensure_ncaab_last3_indexes()
+        await mock_db.ncaab_team_last3.insert_many([
+            {'date': '2026-01-10', 'team': 'Duke', 'stats': saved, 'scraped_at': now},
+            {'date': '2026-01-10', 'team': 'Kansas', 'stats': saved, 'scraped_at': now - timedelta(days=2)},
+        ])
+        return await server.scrape_ncaab_team_last3_ppg({'Duke': '/duke', 'Kansas': '/kansas'}, results_date='2026-01-10')
+
+    stats = asyncio.run(run())
+    assert visits == ['https://www.cbssports.com/kansas']
+    assert stats['Duke'] == saved
+    assert stats['Kansas']['last3_scores'] == [90, 75, 80]
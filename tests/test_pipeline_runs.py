@@ -0,0 +1,71 @@
+import asyncio
+import json
+
+import server
+
+
+def test_forced_and_resumed_runs_share_a_job(mock_db):
+    async def run():
+        await server.recover_interrupted_jobs()  # creates the unique active_key index
+        forced = await server.submit_job('process_8pm', {'date': '2026-01-11', 'force': True})
+        resumed = await server.submit_job('process_8pm', {'date': '2026-01-11'})
+        other_day = await server.submit_job('process_8pm', {'date': '2026-01-12'})
+        return [json.loads(r.body) for r in (forced, resumed, other_day)]
+
+    forced, resumed, other_day = asyncio.run(run())
+    assert resumed['deduplicated'] is True
+    assert resumed['job_id'] == forced['job_id']
+    assert other_day['deduplicated'] is False
+
+
+def test_done_stages_are_skipped_when_a_run_resumes(mock_db):
+    calls = []
+
+    async def stage(name, fail=False):
+        calls.append(name)
+        if fail:
+            raise RuntimeError(f"{name} failed")
+        return {"stage": name}
+
+    async def attempt(fail_scores):
+        run = await server.start_pipeline_run('5am', '2026-01-10')
+        await server.run_pipeline_stage(run, 'scores:NBA', stage, 'scores:NBA', fail_scores)
+        await server.run_pipeline_stage(run, 'records', stage, 'records')
+        return run, await server.finish_pipeline_run(run)
+
+    async def run():
+        first = await attempt(fail_scores=True)
+        second = await attempt(fail_scores=False)
+        return first, second, await mock_db.pipeline_runs.find_one({'pipeline': '5am', 'date': '2026-01-10'})
+
+    (_, first_status), (second_run, second_status), doc = asyncio.run(run())
+    assert first_status == 'incomplete'
+    assert second_status == 'completed'
+    assert calls == ['scores:NBA', 'records', 'scores:NBA']
+    assert second_run['ran'] == ['scores:NBA']
+    assert doc['attempts'] == 2
+    assert doc['stages']['records']['result'] == {'stage': 'records'}
+
+
+def test_stage_reruns_when_its_input_ran_again():
+    run = {'stages': {'records': {'status': 'done'}, 'scores:NBA': {'status': 'done'}}, 'ran': ['scores:NHL']}
+    server.rerun_stage_if_inputs_ran(run, 'records', 'scores:')
+    assert 'records' not in run['stages']
+
+
+def test_incomplete_runs_are_requeued_at_startup(mock_db, monkeypatch):
+    from datetime import datetime, timedelta
+    from zoneinfo import ZoneInfo
+    today = datetime.now(ZoneInfo('America/Phoenix')).strftime('%Y-%m-%d')
+    old = (datetime.now(ZoneInfo('America/Phoenix')) - timedelta(days=5)).strftime('%Y-%m-%d')
+
+    async def run():
+        await mock_db.pipeline_runs.insert_many([
+            {'pipeline': '8pm', 'date': today, 'status': 'incomplete', 'attempts': 1, 'stages': {}},
+            {'pipeline': '8pm', 'date': old, 'status': 'incomplete', 'attempts': 1, 'stages': {}},
+            {'pipeline': '5am', 'date': today, 'status': 'incomplete', 'attempts': 3, 'stages': {}},
+        ])
+        await server.resume_pipeline_runs()
+        return await mock_db.jobs.find({}, {'_id': 0, 'kind': 1, 'params': 1}).to_list(10)
+
+    assert asyncio.run(run()) == [{'kind': 'process_8pm', 'params': {'date': today}}]
@@ -0,0 +1,57 @@
+import asyncio
+from argparse import Namespace
+
+import httpx
+import pytest
+
+import plays888_standin
+
+
+def call(app, *requests):
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://standin') as client:
+            return [await client.request(method, url, **kwargs) for method, url, kwargs in requests]
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def plays888(monkeypatch):
+    args = Namespace(open_bets=3, history_rows=4, latency_ms=0, jitter_ms=0, session_ttl=60,
+                     password='pw', new_bets_per_view=0, seed=7)
+    monkeypatch.setattr(plays888_standin, 'config', plays888_standin.StandinConfig(args))
+    monkeypatch.setattr(plays888_standin, 'sessions', {})
+    monkeypatch.setattr(plays888_standin, 'extra_bets', {})
+    monkeypatch.setattr(plays888_standin, 'stats', {"requests": 0, "logins": 0, "failed_logins": 0,
+                                                    "expired_sessions": 0, "pages": {}})
+    return plays888_standin
+
+
+def test_plays888_pages_need_a_session(plays888):
+    anonymous, = call(plays888.app, ('GET', '/wager/OpenBets.aspx', {}))
+    assert anonymous.status_code == 302
+    assert anonymous.headers['location'] == '/?ReturnUrl=/wager/OpenBets.aspx'
+
+    bad, = call(plays888.app, ('POST', '/Login.aspx', {'data': {'Account': 'bench001', 'Password': 'nope'}}))
+    assert 'Invalid account or password' in bad.text
+    assert plays888.stats["failed_logins"] == 1
+
+
+def test_plays888_tables_are_deterministic_per_account(plays888):
+    def open_bets(user):
+        login = {'data': {'Account': user, 'Password': 'pw'}}
+        _, page = call(plays888.app, ('POST', '/Login.aspx', login), ('GET', '/wager/OpenBets.aspx', {}))
+        return page.text
+
+    first, again, other = open_bets('bench001'), open_bets('bench001'), open_bets('bench002')
+    assert first.count('STRAIGHT BET[') == 3
+    assert first == again
+    assert first != other
+    assert plays888.stats["logins"] == 3
+
+
+def test_plays888_history_rows_carry_results(plays888):
+    _, page = call(plays888.app, ('POST', '/Login.aspx', {'data': {'Account': 'bench001', 'Password': 'pw'}}),
+                   ('GET', '/wager/History.aspx', {}))
+    assert page.text.count('Ticket #: ') == 4
+    assert any(f'<span>{r}</span><span>{r}</span>' in page.text for r in ('WIN', 'LOSE', 'PUSH'))
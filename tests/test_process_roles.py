@@ -0,0 +1,56 @@
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import server
+
+
+def test_aliases_added_on_the_api_reach_a_worker(mock_db, monkeypatch):
+    monkeypatch.setattr(server, 'team_aliases_loaded_at', None)
+    monkeypatch.setattr(server, 'team_name_indexes', {})
+    index = server.get_team_index('NCAAB')
+
+    async def run():
+        await server.load_team_aliases_from_db()
+        assert index.resolve('Zorblat Tech') is None
+        await mock_db.team_aliases.insert_one({'league': 'NCAAB', 'alias': 'Zorblat Tech', 'canonical': 'Kansas',
+                                               'created_at': datetime.now(timezone.utc)})
+        await server.load_team_aliases_from_db()
+
+    asyncio.run(run())
+    assert index.resolve('Zorblat Tech') == 'Kansas'
+    assert 'Zorblat Tech' not in index.misses
+
+
+def test_profile_arm_counts_down_across_processes(mock_db):
+    async def run():
+        await server.arm_job_profile('process_8pm', mode='memory', runs=2)
+        modes = [await server.take_armed_profile('process_8pm') for _ in range(3)]
+        return modes, await mock_db.profile_arms.count_documents({})
+
+    modes, left = asyncio.run(run())
+    assert modes == ['memory', 'memory', None]
+    assert left == 0
+
+
+def test_api_reads_worker_state_from_heartbeats(mock_db, monkeypatch):
+    monkeypatch.setattr(server, 'PROCESS_ROLE', 'api')
+    monkeypatch.setattr(server, 'game_match_reports', {
+        'NHL:cbs': {'league': 'NHL', 'source': 'cbs', 'at': '2026-01-10T03:00:00', 'unmatched': []}})
+    state = server.worker_state_snapshot()
+    monkeypatch.setattr(server, 'game_match_reports', {})
+
+    async def run():
+        now = datetime.now(timezone.utc)
+        await mock_db.workers.insert_many([
+            {'_id': 'worker-1', 'role': 'worker', 'state': state, 'last_seen': now},
+            {'_id': 'worker-2', 'role': 'worker', 'state': state, 'last_seen': now - timedelta(hours=1)},
+        ])
+        return (await server.get_game_match_diagnostics('NHL'), await server.get_game_match_diagnostics('NBA'),
+                await server.worker_status())
+
+    nhl, nba, status = asyncio.run(run())
+    assert nhl['reports'] == []
+    assert [r['source'] for r in nhl['workers']['worker-1']] == ['cbs']
+    assert nba['workers'] == {'worker-1': []}
+    assert [w['worker_id'] for w in status['workers']] == ['worker-1']
+    assert 'state' not in status['workers'][0]
@@ -0,0 +1,51 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import HTTPException
+
+import server
+
+
+async def busy():
+    total = sum(n * n for n in range(20000))
+    await asyncio.sleep(0)
+    return total
+
+
+@pytest.mark.parametrize('mode,suffix', [('cpu', '.pstats'), ('memory', '.snapshot')])
+def test_profiled_run_saves_an_artifact_and_summary(tmp_path, monkeypatch, mode, suffix):
+    monkeypatch.setattr(server, 'PROFILE_DIR', tmp_path)
+    assert asyncio.run(server.run_profiled(mode, 'job process_8pm', busy)) == sum(n * n for n in range(20000))
+    artifacts = [p for p in tmp_path.iterdir() if p.suffix == suffix]
+    assert len(artifacts) == 1
+    meta = json.loads((tmp_path / f"{artifacts[0].name}.json").read_text())
+    assert meta['target'] == 'job process_8pm'
+    assert meta['summary']
+    assert server.profile_active[mode] is False
+
+
+def test_only_the_newest_artifacts_are_kept(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, 'PROFILE_DIR', tmp_path)
+    monkeypatch.setattr(server, 'PROFILE_MAX_ARTIFACTS', 2)
+    for n in range(3):
+        asyncio.run(server.run_profiled('cpu', f'run {n}', busy))
+    kept = sorted(json.loads(p.read_text())['target'] for p in tmp_path.glob('*.json'))
+    assert kept == ['run 1', 'run 2']
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(HTTPException):
+        asyncio.run(server.run_profiled('gpu', 'x', busy))
+
+
+def test_armed_job_is_profiled_when_it_runs(tmp_path, monkeypatch, mock_db):
+    monkeypatch.setattr(server, 'PROFILE_DIR', tmp_path)
+
+    async def run():
+        await server.arm_job_profile('daily_cleanup', mode='cpu')
+        await server.run_with_resource('daily_cleanup', 'db', busy)
+        await server.run_with_resource('daily_cleanup', 'db', busy)
+
+    asyncio.run(run())
+    assert [json.loads(p.read_text())['target'] for p in tmp_path.glob('*.json')] == ['job daily_cleanup']
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+import server
+
+
+def test_values_are_replaced_and_keys_sorted():
+    shape = server.query_shape({"league": "NBA", "date": {"$gte": "2026-01-01", "$lt": "2026-02-01"}})
+    assert shape == {"date": {"$gte": "?", "$lt": "?"}, "league": "?"}
+    assert list(shape) == ["date", "league"]
+
+
+def test_value_lists_collapse_to_one_placeholder():
+    assert server.query_shape({"team": {"$in": ["Duke", "Kansas", "Iowa"]}}) == {"team": {"$in": ["?"]}}
+    assert server.query_shape({"team": {"$in": []}}) == {"team": {"$in": ["?"]}}
+
+
+def test_nested_clauses_keep_their_structure():
+    query = {"$or": [{"away_team": "Duke"}, {"home_team": "Duke"}]}
+    assert server.query_shape(query) == {"$or": [{"away_team": "?"}, {"home_team": "?"}]}
+
+
+def test_same_shape_for_different_values():
+    a = server.query_shape({"date": "2026-01-10", "league": "NHL"})
+    b = server.query_shape({"league": "NCAAB", "date": "2026-03-01"})
+    assert json.dumps(a) == json.dumps(b)
+
+
+@pytest.mark.parametrize("name,command,expected", [
+    ("find", {"filter": {"date": 1}}, {"date": 1}),
+    ("count", {"query": {"league": 1}}, {"league": 1}),
+    ("update", {"updates": [{"q": {"_id": 1}, "u": {}}]}, {"_id": 1}),
+    ("delete", {"deletes": [{"q": {"date": 1}}]}, {"date": 1}),
+    ("aggregate", {"pipeline": [{"$sort": {"date": 1}}, {"$match": {"league": 1}}]}, {"league": 1}),
+    ("insert", {"documents": [{}]}, None),
+])
+def test_command_filter(name, command, expected):
+    assert server.command_filter(name, command) == expected
+
+
+def test_record_mongo_command_groups_by_shape(monkeypatch):
+    monkeypatch.setattr(server, "mongo_profile", {})
+    monkeypatch.setattr(server, "MONGO_SLOW_MS", 1000)
+    for date in ("2026-01-10", "2026-01-11"):
+        server.record_mongo_command("nba_opportunities", "find", {"filter": {"date": date}}, 0.01, False)
+    server.record_mongo_command("nba_opportunities", "find", {"filter": {"league": "NBA"}}, 0.02, True)
+    groups = {key[2]: group for key, group in server.mongo_profile.items()}
+    assert groups['{"date": "?"}']["count"] == 2
+    assert groups['{"league": "?"}']["failures"] == 1
+    assert groups['{"league": "?"}']["slow"] == 0
@@ -0,0 +1,46 @@
+import asyncio
+from collections import deque
+
+import httpx
+
+import server
+
+
+def test_requests_are_grouped_by_route_template(monkeypatch):
+    monkeypatch.setattr(server, 'endpoint_stats', {})
+    monkeypatch.setattr(server, 'SLOW_REQUEST_MS', 10 ** 6)
+
+    async def run():
+        transport = httpx.ASGITransport(app=server.app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as http:
+            for name in ('Lakers', 'Celtics'):
+                assert (await http.get('/api/teams/resolve', params={'league': 'NBA', 'name': name})).status_code == 200
+            assert (await http.get('/api/nowhere')).status_code == 404
+            await http.get('/api/debug/endpoints', params={'sort': 'bogus'})
+        return await server.get_endpoint_timings(sort='count')
+
+    timings = asyncio.run(run())
+    routes = {(row['method'], row['route']): row for row in timings['routes']}
+    resolve = routes[('GET', '/api/teams/resolve')]
+    assert resolve['count'] == 2
+    assert resolve['status'] == {'2xx': 2}
+    assert resolve['avg_bytes'] > 0
+    assert routes[('GET', '<unmatched>')]['status'] == {'4xx': 1}
+    assert routes[('GET', '/api/debug/endpoints')]['status'] == {'4xx': 1}
+    assert timings['routes'][0]['route'] == '/api/teams/resolve'
+
+
+def test_slow_requests_are_kept_with_their_query(monkeypatch):
+    monkeypatch.setattr(server, 'endpoint_stats', {})
+    monkeypatch.setattr(server, 'slow_requests', deque(maxlen=server.SLOW_REQUEST_HISTORY))
+    monkeypatch.setattr(server, 'SLOW_REQUEST_MS', 100)
+    server.record_request('GET', '/api/opportunities/{league}', 200, 0.25, 1024, 'day=today')
+    server.record_request('GET', '/api/opportunities/{league}', 200, 0.05, 1024, '')
+    assert [(r['route'], r['query'], r['ms']) for r in server.slow_requests] == [('/api/opportunities/{league}', 'day=today', 250)]
+
+
+def test_percentile_picks_the_nearest_rank():
+    values = [0.1 * n for n in range(1, 11)]
+    assert server.percentile(values, 50) == values[4]
+    assert server.percentile(values, 99) == values[-1]
+    assert server.percentile([], 95) is None
@@ -0,0 +1,66 @@
+import asyncio
+
+import httpx
+import pytest
+
+import server
+
+
+@pytest.fixture
+def fixtures_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(server, 'SCRAPE_FIXTURES_DIR', tmp_path)
+    monkeypatch.setattr(server, 'scrape_fixtures', {"mode": 'off', "set": 'test', "recorded": 0, "replayed": 0, "missing": 0})
+    monkeypatch.setattr(server, 'host_guards', {})
+    return tmp_path
+
+
+def live_client(calls):
+    def handler(request):
+        calls.append(str(request.url))
+        if request.url.path.endswith('.png'):
+            return httpx.Response(200, headers={'content-type': 'image/png'}, content=b'\x89PNG\xff\x00')
+        return httpx.Response(200, headers={'content-type': 'application/json'}, json={'games': [1, 2]})
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def test_recorded_responses_replay_without_the_network(fixtures_dir):
+    calls = []
+    url = 'https://api-web.nhle.com/v1/schedule/2026-01-10'
+
+    async def run():
+        async with live_client(calls) as http:
+            server.scrape_fixtures["mode"] = 'record'
+            recorded = await server.guarded_get(http, url, params={'lang': 'en'})
+            await server.guarded_get(http, 'https://api-web.nhle.com/logo.png')
+            server.scrape_fixtures["mode"] = 'replay'
+            replayed = await server.guarded_get(http, url, params={'lang': 'en'})
+            logo = await server.guarded_get(http, 'https://api-web.nhle.com/logo.png')
+        return recorded, replayed, logo
+
+    recorded, replayed, logo = asyncio.run(run())
+    assert len(calls) == 2
+    assert replayed.json() == recorded.json() == {'games': [1, 2]}
+    assert replayed.headers['content-type'] == 'application/json'
+    assert logo.content == b'\x89PNG\xff\x00'
+    assert server.scrape_fixtures["recorded"] == 2
+    assert server.scrape_fixtures["replayed"] == 2
+    assert {p.parent.name for p in fixtures_dir.rglob('*.json')} == {'api-web.nhle.com'}
+
+
+def test_missing_fixture_fails_like_an_unavailable_source(fixtures_dir):
+    server.scrape_fixtures["mode"] = 'replay'
+
+    async def run():
+        async with live_client([]) as http:
+            await server.guarded_get(http, 'https://www.cbssports.com/nba/scoreboard/20260110/')
+
+    with pytest.raises(server.SourceUnavailableError):
+        asyncio.run(run())
+    assert server.scrape_fixtures["missing"] == 1
+
+
+def test_fixture_paths_separate_sets_and_query_strings(fixtures_dir):
+    a = server.fixture_path('GET', 'https://www.covers.com/odds?date=2026-01-10')
+    b = server.fixture_path('GET', 'https://www.covers.com/odds?date=2026-01-11')
+    assert a != b
+    assert a.parent == fixtures_dir / 'test' / 'www.covers.com'
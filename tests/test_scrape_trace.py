@@ -0,0 +1,22 @@
+import asyncio
+import time
+
+import server
+
+
+def test_trace_is_stored_with_a_breakdown(mock_db):
+    async def run():
+        async with server.scrape_trace('cbs', 'scrape_cbssports_nba', league='NBA', date='2026-01-10'):
+            started = time.monotonic()
+            await asyncio.sleep(0.01)
+            server.record_span('goto', started, 'https://www.cbssports.com/')
+        assert len(server.scrape_trace_writes) == 1
+        await asyncio.gather(*server.scrape_trace_writes)
+        return await mock_db.scrape_traces.find_one({}, {'_id': 0})
+
+    trace = asyncio.run(run())
+    assert server.scrape_trace_writes == set()
+    assert trace['status'] == 'ok'
+    assert trace['tags'] == {'league': 'NBA', 'date': '2026-01-10'}
+    assert [span['name'] for span in trace['spans']] == ['goto']
+    assert set(trace['breakdown']) == {server.PAGE_SPAN_CATEGORIES['goto'], 'parse'}
@@ -0,0 +1,66 @@
+import asyncio
+
+import server
+
+
+def fresh_single_flight(monkeypatch):
+    monkeypatch.setattr(server, 'scrape_inflight', {})
+    monkeypatch.setattr(server, 'scrape_recent_results', {})
+    monkeypatch.setattr(server, 'scrape_single_flight_stats', {"fetches": 0, "coalesced": 0, "ttl_hits": 0})
+
+
+def counting_scraper(calls, result=None):
+    @server.single_flight_scrape('test')
+    async def scrape(league: str, date_str: str):
+        calls.append((league, date_str))
+        await asyncio.sleep(0.01)
+        return [{"away_team": "Duke", "home_team": "Kansas"}] if result is None else result
+    return scrape
+
+
+def test_concurrent_callers_share_one_fetch(monkeypatch, mock_db):
+    fresh_single_flight(monkeypatch)
+    calls = []
+    scrape = counting_scraper(calls)
+
+    async def run():
+        return await asyncio.gather(*(scrape('NCAAB', '2026-01-10') for _ in range(3)))
+
+    results = asyncio.run(run())
+    assert calls == [('NCAAB', '2026-01-10')]
+    assert server.scrape_single_flight_stats["coalesced"] == 2
+    # every caller gets its own copy
+    results[0][0]["away_team"] = "changed"
+    assert results[1][0]["away_team"] == "Duke"
+
+
+def test_recent_result_is_reused_then_expires(monkeypatch, mock_db):
+    fresh_single_flight(monkeypatch)
+    calls = []
+    scrape = counting_scraper(calls)
+    asyncio.run(scrape('NBA', '2026-01-10'))
+    asyncio.run(scrape('NBA', '2026-01-10'))
+    assert len(calls) == 1
+    assert server.scrape_single_flight_stats["ttl_hits"] == 1
+    monkeypatch.setattr(server, 'SCRAPE_SINGLE_FLIGHT_TTL_SECONDS', 0)
+    asyncio.run(scrape('NBA', '2026-01-10'))
+    assert len(calls) == 2
+
+
+def test_empty_results_are_not_reused(monkeypatch, mock_db):
+    fresh_single_flight(monkeypatch)
+    calls = []
+    scrape = counting_scraper(calls, result=[])
+    asyncio.run(scrape('NHL', '2026-01-10'))
+    asyncio.run(scrape('NHL', '2026-01-10'))
+    assert len(calls) == 2
+    assert server.scrape_recent_results == {}
+
+
+def test_expired_results_are_dropped_on_insert(monkeypatch, mock_db):
+    fresh_single_flight(monkeypatch)
+    server.remember_scrape_result(('test', 'NBA', '2026-01-01'), [1])
+    server.remember_scrape_result(('test', 'NBA', '2026-01-02'), [2])
+    server.scrape_recent_results[('test', 'NBA', '2026-01-01')]["at"] -= 1000
+    server.remember_scrape_result(('test', 'NBA', '2026-01-03'), [3])
+    assert list(server.scrape_recent_results) == [('test', 'NBA', '2026-01-02'), ('test', 'NBA', '2026-01-03')]
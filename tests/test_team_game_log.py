@@ -0,0 +1,89 @@
+import asyncio
+
+import mongomock
+
+import server
+
+
+def final(away, home, away_score, home_score):
+    return {'away_team': away, 'home_team': home, 'away_score': away_score, 'home_score': home_score}
+
+
+def test_similar_schools_get_separate_log_rows():
+    games = [
+        final('North Carolina A&T', 'Elon', 61, 70), final('Duke', 'North Carolina', 80, 77),
+        final('Nebraska Omaha', 'Denver', 72, 68), final('Iowa', 'Nebraska', 90, 85),
+        final('Texas A&M-CC', 'Lamar', 66, 64), final('Texas A&M', 'LSU', 75, 71),
+    ]
+    rows = server.team_game_log_rows('NCAAB', '2026-01-10', games)
+    keys = {row['team']: row['team_key'] for row in rows}
+    assert len(set(keys.values())) == len(rows)
+    for similar, team in (('North Carolina A&T', 'North Carolina'), ('Nebraska Omaha', 'Nebraska'),
+                          ('Texas A&M-CC', 'Texas A&M')):
+        assert keys[similar] != keys[team]
+    points = {row['team_key']: row['points_for'] for row in rows}
+    assert points[keys['North Carolina']] == 77
+    assert points[keys['North Carolina A&T']] == 61
+
+
+def test_log_key_uses_aliases_but_not_partial_matches():
+    team_index = server.get_team_index('NCAAB')
+    assert server.game_log_team_key(team_index, 'Kansas St.') == 'Kansas State'
+    assert server.game_log_team_key(team_index, 'Duke Blue Devils') == 'DUKE BLUE DEVILS'
+    assert server.game_log_team_key(team_index, '') == ''
+
+
+def test_rows_skip_games_without_both_scores():
+    games = [final('Duke', 'Kansas', 70, None), final('Duke', 'Kansas', 'TBD', 60), final('Duke', 'Kansas', '71', 65)]
+    rows = server.team_game_log_rows('NCAAB', '2026-01-10', games)
+    assert [(row['team'], row['points_for'], row['home']) for row in rows] == [('Duke', 71.0, False), ('Kansas', 65.0, True)]
+
+
+def slate(date, *games):
+    return {'date': date, 'games': [{'away_team': away, 'home_team': home} for away, home in games]}
+
+
+def seed_partial_slate():
+    """Duke and Kansas play on 01-09, but only Kansas's final made it into the log"""
+    log = [('Duke', d, 70 + i) for i, d in enumerate(('2026-01-03', '2026-01-05', '2026-01-07'))]
+    log += [('Kansas', d, 80 + i) for i, d in enumerate(('2026-01-05', '2026-01-07', '2026-01-09'))]
+    rows = [{'league': 'NCAAB', 'team': team, 'team_key': team, 'date': date, 'points_for': points}
+            for team, date, points in log]
+    slates = [slate('2026-01-07', ('Duke', 'Iowa'), ('Kansas', 'Utah')),
+              slate('2026-01-09', ('Duke', 'Elon'), ('Kansas', 'Iowa'))]
+    return rows, slates
+
+
+def test_server_flags_a_team_missing_from_a_partly_logged_slate(mock_db):
+    rows, slates = seed_partial_slate()
+
+    async def run():
+        await mock_db.team_game_log.insert_many(rows)
+        await mock_db.ncaab_opportunities.insert_many(slates)
+        return await server.team_ppg_from_game_log('NCAAB', ['Duke', 'Kansas'], '2026-01-11')
+
+    stats = asyncio.run(run())
+    assert stats['Duke']['gap'] is True
+    assert stats['Kansas']['gap'] is False
+    assert stats['Kansas']['last3_scores'] == [82, 81, 80]
+
+
+def test_script_helper_agrees_with_the_server():
+    from team_game_log import last3_from_game_log
+    db = mongomock.MongoClient()['test_database']
+    rows, slates = seed_partial_slate()
+    db.team_game_log.insert_many(rows)
+    db.ncaab_opportunities.insert_many(slates)
+    found, missing = last3_from_game_log(db, ['Duke', 'Kansas'], '2026-01-11')
+    assert missing == ['Duke']
+    assert found['Kansas'] == {'last3_scores': [82, 81, 80], 'last3_avg': 81.0}
+
+
+def test_script_keys_apply_aliases_from_the_database(monkeypatch):
+    import team_game_log
+    monkeypatch.setattr(server, 'team_name_indexes', {})
+    monkeypatch.setattr(team_game_log, 'aliases_loaded', set())
+    db = mongomock.MongoClient()['test_database']
+    db.team_aliases.insert_one({'league': 'NCAAB', 'alias': 'Zorblat Devils', 'canonical': 'Duke'})
+    keys = team_game_log.canonical_team_keys(db, ['Zorblat Devils', 'Kansas St.'])
+    assert keys == {'Zorblat Devils': 'Duke', 'Kansas St.': 'Kansas State'}
@@ -0,0 +1,116 @@
+import server
+
+
+def ncaab_index():
+    index = server.TeamNameIndex('NCAAB', closed=False)
+    index.add_aliases({'Kansas': 'Kansas', 'Kansas St.': 'Kansas State', 'Michigan St.': 'Michigan State',
+                       'St. Louis': 'Saint Louis', 'Duke': 'Duke'})
+    return index
+
+
+def test_team_name_key_normalizes_punctuation_and_st():
+    assert server.team_name_key("St. John's") == 'SAINT JOHNS'
+    assert server.team_name_key('Michigan St.') == 'MICHIGAN STATE'
+    assert server.team_name_key('Texas A&M') == 'TEXAS AM'
+    assert server.team_name_key('') == ''
+
+
+def test_resolve_exact_and_normalized_key():
+    index = ncaab_index()
+    assert index.resolve('KANSAS ST.') == 'Kansas State'
+    assert index.resolve('Kansas State') == 'Kansas State'
+    assert index.resolve('Michigan St') == 'Michigan State'
+    assert index.resolve('Saint Louis') == 'Saint Louis'
+
+
+def test_closed_league_accepts_any_unique_ngram():
+    index = server.TeamNameIndex('NBA')
+    index.add_aliases({'Los Angeles Lakers': 'LA Lakers', 'Los Angeles Clippers': 'LA Clippers'})
+    assert index.resolve('Lakers') == 'LA Lakers'
+    assert index.resolve('LA Clippers basketball') == 'LA Clippers'
+    # "Los Angeles" is shared by two teams
+    assert index.resolve('Los Angeles') is None
+
+
+def test_ncaab_partial_match_rejects_distinguishing_words():
+    index = ncaab_index()
+    assert index.resolve('Duke Blue Devils') == 'Duke'
+    assert index.resolve('North Kansas') is None
+    assert index.resolve('Kansas Tech') is None
+
+
+def test_misses_are_recorded_per_source():
+    index = ncaab_index()
+    assert index.resolve('Nowhere U', source='cbs') is None
+    assert index.resolve('Nowhere U', source='covers') is None
+    miss = index.misses['Nowhere U']
+    assert miss['count'] == 2
+    assert miss['sources'] == ['cbs', 'covers']
+    assert index.normalize(' Nowhere U ') == 'Nowhere U'
+
+
+def test_add_clears_cached_miss():
+    index = ncaab_index()
+    assert index.resolve('KU') is None
+    index.add('KU', 'Kansas')
+    assert index.resolve('KU') == 'Kansas'
+
+
+def test_resolver_for_maps_onto_table_keys():
+    index = ncaab_index()
+    resolver = index.resolver_for(['Kansas St', 'St Louis'])
+    assert resolver.resolve('Kansas State') == 'Kansas St'
+    assert resolver.resolve('Saint Louis') == 'St Louis'
+    assert resolver.resolve('Duke') is None
+    # misses from a table resolver land on the league index
+    assert 'Duke' in index.misses
+    assert 'Duke' not in resolver.misses
+
+
+def test_abbreviations_resolve_both_ways():
+    index = server.TeamNameIndex('NHL')
+    index.add_aliases({'St. Louis Blues': 'St. Louis'})
+    index.set_abbreviations('covers', {'St. Louis': 'STL'})
+    assert index.abbrev('Blues') == 'STL'
+    assert index.resolve('STL') == 'St. Louis'
+    assert index.abbrev('Nowhere') == 'NOW'
+
+
+def test_league_indexes_cover_scraper_spellings():
+    assert server.get_team_index('NBA').resolve('Los Angeles Lakers') == 'LA Lakers'
+    assert server.get_team_index('NHL').resolve('Blues') == 'St. Louis'
+    assert server.get_team_index('NCAAB').resolve('Kansas St.') == 'Kansas State'
+    assert server.get_team_index('NCAAB').resolve('Kansas') == 'Kansas'
+
+
+def test_ncaab_prefix_does_not_merge_different_schools():
+    index = server.TeamNameIndex('NCAAB', closed=False)
+    index.add_aliases({'North Carolina': 'North Carolina', 'Nebraska': 'Nebraska', 'Texas A&M': 'Texas A&M'})
+    assert index.resolve('North Carolina A&T') is None
+    assert index.resolve('Nebraska Omaha') is None
+    assert index.resolve('Texas A&M-CC') is None
+    assert index.resolve('North Carolina Tar Heels') == 'North Carolina'
+
+
+def test_ncaab_prefix_rejects_a_remainder_that_is_a_team():
+    index = server.TeamNameIndex('NCAAB', closed=False)
+    index.add_aliases({'Duke': 'Duke', 'Blue Devils': 'Blue Devils'})
+    assert index.resolve('Duke Blue Devils') is None
+
+
+def test_resolve_alias_skips_partial_matches():
+    index = ncaab_index()
+    assert index.resolve('Duke Blue Devils') == 'Duke'
+    assert index.resolve_alias('Duke Blue Devils') is None
+    assert index.resolve_alias('Kansas St') == 'Kansas State'
+
+
+def test_misses_are_capped_least_recently_seen_first(monkeypatch):
+    monkeypatch.setattr(server, 'TEAM_NAME_MISSES_LIMIT', 3)
+    index = ncaab_index()
+    for name in ('Nowhere A', 'Nowhere B', 'Nowhere C'):
+        index.resolve(name)
+    index.resolve('Nowhere A')
+    index.resolve('Nowhere D')
+    assert list(index.misses) == ['Nowhere C', 'Nowhere A', 'Nowhere D']
+    assert index.misses['Nowhere A']['count'] == 2
@@ -0,0 +1,55 @@
+import asyncio
+
+import server
+
+
+def stats(season, last3=None):
+    return {'season_ranks': {team: rank for rank, team in enumerate(season, 1)}, 'season_values': season,
+            'last3_ranks': {}, 'last3_values': last3 or {}}
+
+
+def test_as_of_reads_the_latest_snapshot_on_or_before_the_date(mock_db, monkeypatch):
+    monkeypatch.setattr(server, 'team_stats_cache', {})
+
+    async def run():
+        await server.record_team_stats_snapshot('NBA', '2026-01-10', stats({'Boston': 118.0, 'Miami': 110.5}), 'teamrankings')
+        await server.record_team_stats_snapshot('NBA', '2026-01-12', stats({'Boston': 119.2}), 'teamrankings')
+        server.team_stats_cache.clear()
+        return (await server.get_team_stats_as_of('NBA', '2026-01-11'), await server.get_team_stats_as_of('NBA'),
+                await server.get_team_stats_as_of('NBA', '2026-01-09'))
+
+    past, current, before = asyncio.run(run())
+    assert past['as_of'] == '2026-01-10'
+    assert past['stats']['season_values'] == {'Boston': 118.0, 'Miami': 110.5}
+    assert past['stats']['season_ranks']['Miami'] == 2
+    assert current['as_of'] == '2026-01-12'
+    assert server.team_stats_cache['NBA'] == current
+    assert before is None
+
+
+def test_rescraping_a_date_overwrites_it(mock_db, monkeypatch):
+    monkeypatch.setattr(server, 'team_stats_cache', {})
+
+    async def run():
+        await server.record_team_stats_snapshot('NHL', '2026-01-10', stats({'Calgary': 2.9}), 'teamrankings')
+        await server.record_team_stats_snapshot('NHL', '2026-01-10', stats({'Calgary': 3.1}), 'teamrankings')
+        return await mock_db.team_stats_history.find({'league': 'NHL'}, {'_id': 0, 'season_value': 1}).to_list(10)
+
+    assert asyncio.run(run()) == [{'season_value': 3.1}]
+
+
+def test_hardcoded_table_is_skipped_by_default(mock_db, monkeypatch):
+    monkeypatch.setattr(server, 'team_stats_cache', {})
+
+    async def run():
+        await server.record_team_stats_snapshot('NCAAB', '2026-01-05', stats({'Duke': 80.1}), 'teamrankings')
+        await server.record_team_stats_snapshot('NCAAB', '2026-01-20', stats({'Duke': 70.0}), server.HARDCODED_PPG_SOURCE)
+        server.team_stats_cache.clear()
+        return await server.get_team_stats_as_of('NCAAB', '2026-01-31')
+
+    assert asyncio.run(run())['stats']['season_values'] == {'Duke': 80.1}
+
+
+def test_ppg_data_layout_round_trips():
+    ppg = {'season': {'Boston': {'rank': 1, 'value': 118.0}}, 'last3': {'Boston': {'rank': 4, 'value': 121.3}}}
+    assert server.team_stats_to_ppg_data(server.team_stats_from_ppg_data(ppg)) == ppg
@@ -0,0 +1,51 @@
+import asyncio
+from argparse import Namespace
+
+import httpx
+import pytest
+
+import telegram_standin
+
+
+def call(app, *requests):
+    async def run():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://standin') as client:
+            return [await client.request(method, url, **kwargs) for method, url, kwargs in requests]
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def telegram(monkeypatch):
+    args = Namespace(latency_ms=0, jitter_ms=0, per_chat_rate=2, global_rate=0, random_429=0, retry_after=3)
+    monkeypatch.setattr(telegram_standin, 'config', telegram_standin.StandinConfig(args))
+    monkeypatch.setattr(telegram_standin, 'messages', {})
+    monkeypatch.setattr(telegram_standin, 'next_message_id', {})
+    monkeypatch.setattr(telegram_standin, 'sent_at', {"global": telegram_standin.deque()})
+    monkeypatch.setattr(telegram_standin, 'stats', {"requests": 0, "rate_limited": 0, "methods": {}, "errors": {}})
+    return telegram_standin
+
+
+def test_telegram_send_edit_delete(telegram):
+    telegram.config.per_chat_rate = 0
+    sent, edited, same, deleted, gone = call(
+        telegram.app,
+        ('POST', '/botTOKEN/sendMessage', {'data': {'chat_id': '-100', 'text': 'hello'}}),
+        ('POST', '/botTOKEN/editMessageText', {'data': {'chat_id': '-100', 'message_id': '1', 'text': 'bye'}}),
+        ('POST', '/botTOKEN/editMessageText', {'json': {'chat_id': -100, 'message_id': 1, 'text': 'bye'}}),
+        ('POST', '/botTOKEN/deleteMessage', {'data': {'chat_id': '-100', 'message_id': '1'}}),
+        ('POST', '/botTOKEN/deleteMessage', {'data': {'chat_id': '-100', 'message_id': '1'}}))
+    assert sent.json()["result"]["message_id"] == 1
+    assert sent.json()["result"]["chat"]["type"] == 'group'
+    assert edited.json()["result"]["text"] == 'bye'
+    assert same.json()["description"] == 'Bad Request: message is not modified'
+    assert deleted.json() == {"ok": True, "result": True}
+    assert gone.status_code == 400
+
+
+def test_telegram_flood_control_returns_retry_after(telegram):
+    send = ('POST', '/botTOKEN/sendMessage', {'data': {'chat_id': '5', 'text': 'x'}})
+    responses = call(telegram.app, send, send, send, ('POST', '/botTOKEN/sendMessage', {'data': {'chat_id': '6', 'text': 'x'}}))
+    assert [r.status_code for r in responses] == [200, 200, 429, 200]
+    assert responses[2].json()["parameters"] == {"retry_after": 3}
+    assert telegram.stats["rate_limited"] == 1
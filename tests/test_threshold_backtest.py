@@ -0,0 +1,86 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+import server
+
+
+def make_data(ppg, final, opening, ou_pick=None, ou_pct=None, dot_signal=None):
+    n = len(ppg)
+    lines = {source: np.full(n, np.nan) for source in server.BACKTEST_LINE_SOURCES}
+    lines["opening"] = np.array(opening, dtype=float)
+    return {
+        "league": "NHL",
+        "start_date": "2025-12-22",
+        "end_date": "2025-12-31",
+        "ppg": np.array(ppg, dtype=float),
+        "final": np.array(final, dtype=float),
+        "lines": lines,
+        "dot_signal": np.array(dot_signal or [0] * n, dtype=np.int8),
+        "ou_pick": np.array(ou_pick or [0] * n, dtype=np.int8),
+        "ou_pct": np.array(ou_pct or [0] * n, dtype=float),
+        "side_pct": np.zeros(n),
+        "side_result": np.zeros(n, dtype=np.int8),
+    }
+
+
+def cell(result, edge, consensus=0, dot_filter="all", source="opening"):
+    return next(c for c in result["cells"]
+                if c["line_source"] == source and c["edge_threshold"] == edge
+                and c["consensus_threshold"] == consensus and c["dot_filter"] == dot_filter)
+
+
+def test_game_exactly_on_threshold_is_picked():
+    # 6.1 - 5.5 is 0.5999... in floats; production rounds the edge first
+    data = make_data(ppg=[6.1, 4.9], final=[7, 4], opening=[5.5, 5.5])
+    result = server.run_threshold_backtest(data, [0.6], line_sources=["opening"])
+    assert cell(result, 0.6)["hits"] == 2
+    assert cell(result, 0.6)["sample"] == 2
+
+
+def test_over_under_hits_misses_and_pushes():
+    data = make_data(ppg=[8, 8, 8, 2, 5.2], final=[7, 5, 6, 5, 9], opening=[6, 6, 6, 6, 5])
+    result = server.run_threshold_backtest(data, [1, 5], line_sources=["opening"], odds=-110)
+    low = cell(result, 1)
+    assert (low["hits"], low["misses"], low["pushes"]) == (2, 1, 1)
+    assert low["hit_rate"] == 66.7
+    assert low["roi"] == round((2 * 100 / 110 - 1) / 3 * 100, 1)
+    empty = cell(result, 5)
+    assert empty["sample"] == 0 and empty["roi"] is None
+
+
+def test_consensus_and_dot_filters():
+    data = make_data(ppg=[8, 8], final=[7, 7], opening=[6, 6],
+                     ou_pick=[1, -1], ou_pct=[70, 70], dot_signal=[1, -1])
+    result = server.run_threshold_backtest(data, [1], consensus_thresholds=[0, 65], line_sources=["opening"],
+                                           dot_filters=["all", "agree", "disagree"])
+    assert cell(result, 1, consensus=0)["sample"] == 2
+    assert cell(result, 1, consensus=65)["sample"] == 1
+    assert cell(result, 1, dot_filter="agree")["sample"] == 1
+    assert cell(result, 1, dot_filter="disagree")["sample"] == 1
+
+
+def test_missing_lines_are_not_graded():
+    data = make_data(ppg=[8, np.nan], final=[np.nan, 7], opening=[6, 6])
+    result = server.run_threshold_backtest(data, [1], line_sources=["opening"])
+    assert result["games_graded"] == 0
+    assert cell(result, 1)["sample"] == 0
+
+
+def test_unknown_line_source_rejected():
+    data = make_data(ppg=[8], final=[7], opening=[6])
+    with pytest.raises(ValueError):
+        server.run_threshold_backtest(data, [1], line_sources=["closing"])
+
+
+def test_ranking_skips_cells_without_roi(monkeypatch):
+    data = make_data(ppg=[8], final=[7], opening=[6])
+
+    async def fake_load(league, start_date, end_date=None, use_cache=True):
+        return data
+
+    monkeypatch.setattr(server, "load_backtest_games", fake_load)
+    result = asyncio.run(server.backtest_thresholds("NHL", edge_thresholds=[1, 5], line_sources=["opening"],
+                                                    dot_filters=["all"], consensus_thresholds=[0], min_sample=0))
+    assert [c["edge_threshold"] for c in result["top"]] == [1]